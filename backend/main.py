@@ -1,7 +1,9 @@
 import os
 import sys
 import logging
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form
+from fastapi import (
+    FastAPI, HTTPException, Depends, status, UploadFile, File, Form, BackgroundTasks
+)
 from starlette.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
@@ -14,6 +16,9 @@ import requests
 from starlette.responses import RedirectResponse
 import google.generativeai as genai
 from google.api_core.exceptions import ResourceExhausted
+from services.publisher.media_url_checks import verify_media_url_in_background
+from services.account_context import invalidate_account_context
+from routes.webhook_routes import router as webhook_router
 
 # Cargar variables de entorno
 load_dotenv()
@@ -88,33 +93,30 @@ app = FastAPI(
 # --- Función de Sincronización Automática de Métricas ---
 def sync_all_accounts_metrics():
     """
-    Job que se ejecuta cada hora para sincronizar métricas
-    de todas las cuentas de Instagram activas.
+    Job que se ejecuta cada 15 minutos para sincronizar métricas
+    de las cuentas de Instagram activas que lo necesitan.
+
+    SyncPriorityPlanner decide qué cuentas tocan en cada ejecución según
+    su actividad (hot: cada 15 min, active: cada hora, idle: cada 6h,
+    dormant: diario) sin superar el presupuesto horario de Graph API.
     """
     logger.info("⏰ Iniciando sincronización automática de métricas...")
 
     try:
         from services.instagram_insights import InstagramInsightsService
+        from services.scheduler.sync_planner import get_sync_planner
 
-        # Obtener todas las cuentas activas (is_active = true o NULL)
-        # NULL para compatibilidad con cuentas antiguas sin el campo
-        all_accounts = supabase.table('instagram_accounts')\
-            .select('id, user_id, long_lived_access_token, '
-                    'instagram_business_account_id, is_active')\
-            .execute()
+        planner = get_sync_planner()
 
-        # Filtrar solo activas (True o NULL)
-        accounts_data = [
-            acc for acc in (all_accounts.data or [])
-            if acc.get('is_active') is not False
-        ]
+        # Cuentas activas (is_active = true o NULL) que tocan en esta ejecución
+        accounts_data = planner.select_accounts(supabase)
 
         if not accounts_data:
-            logger.info("No hay cuentas activas para sincronizar")
+            logger.info("No hay cuentas pendientes de sincronizar")
             return
 
         logger.info(
-            f"📋 Encontradas {len(accounts_data)} cuentas activas para sincronizar"
+            f"📋 {len(accounts_data)} cuentas seleccionadas para sincronizar"
         )
 
         synced_count = 0
@@ -145,7 +147,8 @@ def sync_all_accounts_metrics():
 
                 synced_count += 1
                 logger.info(
-                    f"✅ Cuenta {account['id']} sincronizada correctamente"
+                    f"✅ Cuenta {account['id']} sincronizada correctamente "
+                    f"(tier: {account['sync_tier']})"
                 )
 
             except Exception as e:
@@ -154,6 +157,9 @@ def sync_all_accounts_metrics():
                 )
                 failed_count += 1
 
+            finally:
+                planner.record_sync(account['id'])
+
         logger.info(
             f"📊 Sincronización completada: "
             f"{synced_count} exitosas, {failed_count} fallidas"
@@ -179,24 +185,47 @@ async def startup_event():
         # No lanzar excepción para permitir que la app arranque sin scheduler
 
     # Inicializar cron job para sincronización de métricas
+    # Con SYNC_WORKER_MODE=external la sincronización la hacen procesos
+    # independientes (python -m services.sync_worker) y la API no la ejecuta
+    sync_external = os.getenv('SYNC_WORKER_MODE', 'inline') == 'external'
+
     try:
         from apscheduler.triggers.cron import CronTrigger
+        from services.scheduler.executors import SYNC_EXECUTOR
         from services.scheduler.post_scheduler import PostScheduler
 
-        # Agregar job al scheduler usando la función del módulo
         scheduler = PostScheduler()
-        scheduler.scheduler.add_job(
-            sync_all_accounts_metrics,
-            trigger=CronTrigger(hour='*'),  # Cada hora
-            id='sync_instagram_metrics',
-            replace_existing=True,
-            max_instances=1  # Solo una instancia a la vez
-        )
 
-        logger.info(
-            "✅ Cron job de sincronización de métricas configurado "
-            "(ejecuta cada hora)"
-        )
+        if not scheduler.scheduler:
+            # SCHEDULER_BACKEND=queue: los workers de la cola encolan una
+            # fila sync_insights por franja de 15 min (una sola ejecución)
+            logger.info(
+                "ℹ️  Sincronización de métricas encolada en scheduled_jobs "
+                "(SCHEDULER_BACKEND=queue)"
+            )
+        elif sync_external:
+            # El job queda persistido en el job store: quitarlo si existía
+            if scheduler.scheduler.get_job('sync_instagram_metrics'):
+                scheduler.scheduler.remove_job('sync_instagram_metrics')
+            logger.info(
+                "ℹ️  Sincronización de métricas delegada a services.sync_worker "
+                "(SYNC_WORKER_MODE=external)"
+            )
+        else:
+            # Agregar job al scheduler usando la función del módulo
+            scheduler.scheduler.add_job(
+                sync_all_accounts_metrics,
+                trigger=CronTrigger(minute='*/15'),  # Cada 15 min (el planner filtra)
+                id='sync_instagram_metrics',
+                executor=SYNC_EXECUTOR,  # Pool propio: no ocupa hilos de publicación
+                replace_existing=True,
+                max_instances=1  # Solo una instancia a la vez
+            )
+
+            logger.info(
+                "✅ Cron job de sincronización de métricas configurado "
+                "(ejecuta cada 15 minutos con prioridad por actividad)"
+            )
 
     except Exception as e:
         logger.error(f"❌ Error configurando cron job de métricas: {e}")
@@ -231,6 +260,7 @@ app.include_router(analytics_router)
 app.include_router(drive_router)
 app.include_router(scheduler_router)
 app.include_router(posts_router)
+app.include_router(webhook_router)
 
 # Configuración de CORS
 app.add_middleware(
@@ -339,6 +369,7 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 
 @app.post("/posts", response_model=Post)
 async def create_post(
+    background_tasks: BackgroundTasks,
     content: str = Form(...),
     post_type: str = Form(...),
     status: str = Form(...),
@@ -385,6 +416,9 @@ async def create_post(
 
         if response.data:
             new_post = response.data[0]
+            # Verificar la URL del media ahora para no hacerlo al publicar
+            if media_url:
+                background_tasks.add_task(verify_media_url_in_background, media_url)
             return new_post
         else:
             raise HTTPException(status_code=500, detail="No se pudo crear la publicación.")
@@ -413,6 +447,7 @@ async def get_posts(current_user: User = Depends(get_current_user)):
 @app.put("/posts/{post_id}", response_model=Post)
 async def update_post(
     post_id: int,
+    background_tasks: BackgroundTasks,
     content: str = Form(...),
     post_type: str = Form(...),
     status: str = Form(...),
@@ -474,6 +509,9 @@ async def update_post(
         
         response = supabase.table('posts').update(update_data).eq('id', post_id).execute()
         if response.data:
+            # Verificar la URL del nuevo media ahora para no hacerlo al publicar
+            if media_url and media_url != existing_media_url:
+                background_tasks.add_task(verify_media_url_in_background, media_url)
             return response.data[0]
         else:
             raise HTTPException(status_code=500, detail="No se pudo actualizar la publicación.")
@@ -642,6 +680,12 @@ async def instagram_callback(
                 'expires_at': expires_at.isoformat() + 'Z' # Supabase espera formato ISO con Z para UTC
             }).execute()
             print("Instagram account details saved to Supabase.")
+
+            # El token y la cuenta han cambiado: descartar el contexto cacheado
+            invalidate_account_context(
+                user_id=sociallab_user_id,
+                instagram_business_account_id=instagram_business_account_id
+            )
         except Exception as e:
             print(f"Error saving Instagram account details to Supabase: {e}")
             raise HTTPException(status_code=500, detail=f"Error al guardar los detalles de la cuenta de Instagram: {str(e)}")
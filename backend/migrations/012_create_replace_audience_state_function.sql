@@ -0,0 +1,115 @@
+-- ============================================================
+-- MIGRACIÓN 012: Reemplazo transaccional del estado de audiencia
+-- Fecha: Octubre 2026
+-- Descripción: Función RPC que guarda snapshot diario, demografía
+--              y actividad de seguidores en una sola llamada.
+--              Sustituye los delete + insert secuenciales de
+--              full_sync_account (hasta 8 round trips) y elimina
+--              la ventana en la que las filas no existen.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION replace_audience_state(
+    p_instagram_account_id INTEGER,
+    p_sync_date DATE,
+    p_snapshot JSONB DEFAULT NULL,
+    p_demographics JSONB DEFAULT '{}'::jsonb,
+    p_online_hours JSONB DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_demographics_count INTEGER := 0;
+    v_snapshot_saved BOOLEAN := false;
+    v_online_saved BOOLEAN := false;
+BEGIN
+    -- 1. Snapshot diario (UNIQUE instagram_account_id, date)
+    IF p_snapshot IS NOT NULL AND p_snapshot <> '{}'::jsonb THEN
+        INSERT INTO instagram_account_snapshots (
+            instagram_account_id, date, follower_count, following_count,
+            media_count, reach, impressions, profile_views, website_clicks,
+            email_contacts, phone_call_clicks, text_message_clicks,
+            get_directions_clicks
+        )
+        VALUES (
+            p_instagram_account_id,
+            p_sync_date,
+            COALESCE((p_snapshot->>'follower_count')::INTEGER, 0),
+            COALESCE((p_snapshot->>'following_count')::INTEGER, 0),
+            COALESCE((p_snapshot->>'media_count')::INTEGER, 0),
+            COALESCE((p_snapshot->>'reach')::INTEGER, 0),
+            COALESCE((p_snapshot->>'impressions')::INTEGER, 0),
+            COALESCE((p_snapshot->>'profile_views')::INTEGER, 0),
+            COALESCE((p_snapshot->>'website_clicks')::INTEGER, 0),
+            COALESCE((p_snapshot->>'email_contacts')::INTEGER, 0),
+            COALESCE((p_snapshot->>'phone_call_clicks')::INTEGER, 0),
+            COALESCE((p_snapshot->>'text_message_clicks')::INTEGER, 0),
+            COALESCE((p_snapshot->>'get_directions_clicks')::INTEGER, 0)
+        )
+        ON CONFLICT (instagram_account_id, date) DO UPDATE SET
+            follower_count = EXCLUDED.follower_count,
+            following_count = EXCLUDED.following_count,
+            media_count = EXCLUDED.media_count,
+            reach = EXCLUDED.reach,
+            impressions = EXCLUDED.impressions,
+            profile_views = EXCLUDED.profile_views,
+            website_clicks = EXCLUDED.website_clicks,
+            email_contacts = EXCLUDED.email_contacts,
+            phone_call_clicks = EXCLUDED.phone_call_clicks,
+            text_message_clicks = EXCLUDED.text_message_clicks,
+            get_directions_clicks = EXCLUDED.get_directions_clicks;
+
+        v_snapshot_saved := true;
+    END IF;
+
+    -- 2. Demografía: un registro por metric_type
+    --    (UNIQUE instagram_account_id, metric_type)
+    --    Formato de p_demographics: {"audience_city": {...}, ...}
+    INSERT INTO audience_demographics (
+        instagram_account_id, sync_date, metric_type, data
+    )
+    SELECT p_instagram_account_id, p_sync_date, d.key, d.value
+    FROM jsonb_each(COALESCE(p_demographics, '{}'::jsonb)) AS d
+    WHERE jsonb_typeof(d.value) = 'object' AND d.value <> '{}'::jsonb
+    ON CONFLICT (instagram_account_id, metric_type) DO UPDATE SET
+        sync_date = EXCLUDED.sync_date,
+        data = EXCLUDED.data;
+
+    GET DIAGNOSTICS v_demographics_count = ROW_COUNT;
+
+    -- 3. Actividad de seguidores por hora
+    --    (UNIQUE instagram_account_id, sync_date)
+    IF p_online_hours IS NOT NULL AND p_online_hours <> '{}'::jsonb THEN
+        INSERT INTO online_followers_data (
+            instagram_account_id, sync_date, hour_data
+        )
+        VALUES (p_instagram_account_id, p_sync_date, p_online_hours)
+        ON CONFLICT (instagram_account_id, sync_date) DO UPDATE SET
+            hour_data = EXCLUDED.hour_data;
+
+        v_online_saved := true;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'snapshot_saved', v_snapshot_saved,
+        'demographics_saved', v_demographics_count,
+        'online_followers_saved', v_online_saved
+    );
+END;
+$$;
+
+-- NOTA: SECURITY INVOKER (por defecto) para que las políticas RLS de
+-- migración 011 sigan aplicando igual que con los delete + insert previos.
+
+COMMENT ON FUNCTION replace_audience_state(INTEGER, DATE, JSONB, JSONB, JSONB) IS
+'Reemplaza de forma atómica snapshot diario, demografía y actividad de seguidores de una cuenta';
+
+-- ============================================================
+-- VERIFICACIÓN
+-- ============================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 012 completada';
+    RAISE NOTICE '   - replace_audience_state(): snapshot + demografía + actividad en 1 RPC';
+END $$;
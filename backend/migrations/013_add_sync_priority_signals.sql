@@ -0,0 +1,31 @@
+-- ============================================================
+-- MIGRACIÓN 013: Señales para priorizar la sincronización
+-- Fecha: Octubre 2026
+-- Descripción: Registrar el último acceso al dashboard de cada
+--              cuenta e indexar las consultas que usa el
+--              SyncPriorityPlanner (actividad reciente y posts
+--              programados por cuenta).
+-- ============================================================
+
+ALTER TABLE public.instagram_accounts
+ADD COLUMN IF NOT EXISTS last_dashboard_access_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN instagram_accounts.last_dashboard_access_at IS
+'Último acceso al dashboard de analytics (usado para priorizar la sincronización)';
+
+-- Actividad de publicación reciente por cuenta
+CREATE INDEX IF NOT EXISTS idx_posts_account_publication_date
+ON posts(instagram_account_id, publication_date DESC)
+WHERE status = 'published';
+
+-- Posts programados pendientes por cuenta
+CREATE INDEX IF NOT EXISTS idx_posts_account_scheduled_at
+ON posts(instagram_account_id, scheduled_at)
+WHERE status = 'scheduled';
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 013 completada';
+    RAISE NOTICE '   - instagram_accounts.last_dashboard_access_at';
+    RAISE NOTICE '   - Índices de actividad y posts programados por cuenta';
+END $$;
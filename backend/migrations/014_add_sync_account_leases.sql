@@ -0,0 +1,72 @@
+-- ============================================================
+-- MIGRACIÓN 014: Leases de sincronización por cuenta
+-- Fecha: Octubre 2026
+-- Descripción: Permite que varios procesos sync_worker se repartan
+--              las cuentas sin coordinarse: cada worker reclama un
+--              lease temporal sobre las cuentas que va a sincronizar
+--              (FOR UPDATE SKIP LOCKED) y lo libera al terminar.
+-- ============================================================
+
+ALTER TABLE public.instagram_accounts
+ADD COLUMN IF NOT EXISTS sync_lease_owner TEXT,
+ADD COLUMN IF NOT EXISTS sync_lease_expires_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN instagram_accounts.sync_lease_owner IS
+'Worker de sincronización que tiene reclamada la cuenta';
+COMMENT ON COLUMN instagram_accounts.sync_lease_expires_at IS
+'Fin del lease de sincronización (un lease vencido se puede reclamar de nuevo)';
+
+-- Reclama las cuentas indicadas que no tengan un lease vigente.
+-- Devuelve solo las cuentas reclamadas por este worker.
+CREATE OR REPLACE FUNCTION claim_sync_accounts(
+    p_worker_id TEXT,
+    p_account_ids INTEGER[],
+    p_lease_seconds INTEGER DEFAULT 900
+)
+RETURNS SETOF instagram_accounts
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH claimable AS (
+        SELECT id
+        FROM instagram_accounts
+        WHERE id = ANY(p_account_ids)
+          AND is_active IS DISTINCT FROM false
+          AND (
+              sync_lease_expires_at IS NULL
+              OR sync_lease_expires_at < NOW()
+              OR sync_lease_owner = p_worker_id
+          )
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE instagram_accounts a
+    SET sync_lease_owner = p_worker_id,
+        sync_lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    FROM claimable
+    WHERE a.id = claimable.id
+    RETURNING a.*;
+END;
+$$;
+
+-- Libera el lease de una cuenta (solo si sigue siendo de este worker)
+CREATE OR REPLACE FUNCTION release_sync_account(
+    p_worker_id TEXT,
+    p_account_id INTEGER
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE instagram_accounts
+    SET sync_lease_owner = NULL,
+        sync_lease_expires_at = NULL
+    WHERE id = p_account_id
+      AND sync_lease_owner = p_worker_id;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 014 completada';
+    RAISE NOTICE '   - instagram_accounts.sync_lease_owner / sync_lease_expires_at';
+    RAISE NOTICE '   - claim_sync_accounts() / release_sync_account()';
+END $$;
@@ -0,0 +1,40 @@
+-- ============================================================
+-- MIGRACIÓN 015: Tiempos de procesamiento de contenedores
+-- Fecha: Octubre 2026
+-- Descripción: Registrar cuánto tarda Instagram en procesar cada
+--              contenedor de media (por tipo y tamaño) para ajustar
+--              el calendario de comprobaciones del publisher:
+--              primera comprobación cerca de la mediana y deadline
+--              a partir del percentil 95.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS public.container_processing_times (
+    id BIGSERIAL PRIMARY KEY,
+    media_type TEXT NOT NULL,
+    size_bucket TEXT NOT NULL,
+    size_bytes BIGINT,
+    processing_seconds NUMERIC(8, 2) NOT NULL,
+    checks INTEGER NOT NULL DEFAULT 0,
+    outcome TEXT NOT NULL CHECK (outcome IN ('ready', 'error', 'timeout')),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE container_processing_times IS
+'Tiempo desde la creación del contenedor hasta FINISHED/ERROR/timeout';
+COMMENT ON COLUMN container_processing_times.size_bucket IS
+'small (<=1MB), medium (<=10MB), large (<=50MB), xlarge o unknown';
+COMMENT ON COLUMN container_processing_times.checks IS
+'Comprobaciones de estado realizadas hasta el resultado';
+
+-- Últimos tiempos por tipo de media y tamaño
+CREATE INDEX IF NOT EXISTS idx_container_processing_times_lookup
+ON container_processing_times(media_type, size_bucket, created_at DESC);
+
+-- Solo el backend (service role) escribe y lee estos tiempos
+ALTER TABLE container_processing_times ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 015 completada';
+    RAISE NOTICE '   - Tabla container_processing_times';
+END $$;
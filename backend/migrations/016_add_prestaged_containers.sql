@@ -0,0 +1,24 @@
+-- ============================================================
+-- MIGRACIÓN 016: Contenedores pre-preparados en scheduled_jobs
+-- Fecha: Octubre 2026
+-- Descripción: Los posts programados crean y verifican su
+--              contenedor de Instagram unos minutos antes
+--              (PRESTAGE_LEAD_MINUTES). El contenedor listo se guarda
+--              en el job para que a la hora programada solo haga
+--              falta llamar a media_publish.
+-- ============================================================
+
+ALTER TABLE public.scheduled_jobs
+ADD COLUMN IF NOT EXISTS prestaged_container JSONB,
+ADD COLUMN IF NOT EXISTS container_ready_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN scheduled_jobs.prestaged_container IS
+'Contenedor READY pre-preparado: container_id, ig_user_id, instagram_account_id, media_type, size_bytes, created_at (sin access token)';
+COMMENT ON COLUMN scheduled_jobs.container_ready_at IS
+'Momento en que el contenedor pre-preparado quedó listo para publicar';
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 016 completada';
+    RAISE NOTICE '   - scheduled_jobs.prestaged_container / container_ready_at';
+END $$;
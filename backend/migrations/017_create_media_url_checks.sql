@@ -0,0 +1,37 @@
+-- ============================================================
+-- MIGRACIÓN 017: Caché de verificaciones de URLs de media
+-- Fecha: Octubre 2026
+-- Descripción: Guardar el resultado del HEAD request que verifica
+--              que la URL de media de un post es pública (status,
+--              content type, tamaño). Se verifica al guardar o
+--              programar el post y al publicar solo se repite si la
+--              verificación ha caducado (MEDIA_URL_CHECK_TTL_MINUTES).
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS public.media_url_checks (
+    url TEXT PRIMARY KEY,
+    is_valid BOOLEAN NOT NULL,
+    status_code INTEGER,
+    content_type TEXT,
+    size_bytes BIGINT,
+    error TEXT,
+    checked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE media_url_checks IS
+'Última verificación de accesibilidad de cada URL de media';
+COMMENT ON COLUMN media_url_checks.is_valid IS
+'true si la URL respondió 200 con Content-Type image/* o video/*';
+
+-- Limpieza de verificaciones antiguas
+CREATE INDEX IF NOT EXISTS idx_media_url_checks_checked_at
+ON media_url_checks(checked_at);
+
+-- Solo el backend (service role) lee y escribe estas verificaciones
+ALTER TABLE media_url_checks ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 017 completada';
+    RAISE NOTICE '   - Tabla media_url_checks';
+END $$;
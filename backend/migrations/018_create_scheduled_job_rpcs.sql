@@ -0,0 +1,153 @@
+-- ============================================================
+-- MIGRACIÓN 018: Reclamar y completar jobs programados por RPC
+-- Fecha: Octubre 2026
+-- Descripción: publish_post_job hacía 5-7 llamadas secuenciales a
+--              Supabase (marcar running, leer post, leer cuenta,
+--              actualizar post y job) y el camino de error otra
+--              lectura + 2 updates. Estas funciones hacen cada paso
+--              en un solo round trip y dentro de una transacción,
+--              sin carreras entre las actualizaciones separadas.
+-- ============================================================
+
+-- Pasa el job del post a 'running' (solo desde pending/retrying) y
+-- devuelve en la misma llamada el job, el post y la cuenta activa de
+-- Instagram del usuario. Devuelve NULL si el job no se pudo reclamar
+-- (cancelado, completado o ya en ejecución).
+CREATE OR REPLACE FUNCTION claim_scheduled_job(
+    p_post_id BIGINT
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_job scheduled_jobs%ROWTYPE;
+    v_post posts%ROWTYPE;
+    v_account JSONB;
+BEGIN
+    UPDATE scheduled_jobs
+    SET status = 'running'
+    WHERE id = (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE post_id = p_post_id
+          AND status IN ('pending', 'retrying')
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING * INTO v_job;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT * INTO v_post FROM posts WHERE id = p_post_id;
+
+    SELECT jsonb_build_object(
+        'id', a.id,
+        'user_id', a.user_id,
+        'long_lived_access_token', a.long_lived_access_token,
+        'instagram_business_account_id', a.instagram_business_account_id,
+        'is_active', a.is_active,
+        'expires_at', a.expires_at
+    )
+    INTO v_account
+    FROM instagram_accounts a
+    WHERE a.user_id = v_post.user_id
+      AND a.is_active = true
+    LIMIT 1;
+
+    RETURN jsonb_build_object(
+        'job', to_jsonb(v_job),
+        'post', CASE WHEN v_post.id IS NULL THEN NULL ELSE to_jsonb(v_post) END,
+        'account', v_account
+    );
+END;
+$$;
+
+-- Marca el post como publicado y su job como completado en una sola
+-- transacción.
+CREATE OR REPLACE FUNCTION complete_scheduled_job(
+    p_post_id BIGINT,
+    p_instagram_post_id TEXT
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE posts
+    SET status = 'published',
+        instagram_post_id = p_instagram_post_id,
+        publication_date = NOW()
+    WHERE id = p_post_id;
+
+    UPDATE scheduled_jobs
+    SET status = 'completed',
+        completed_at = NOW()
+    WHERE post_id = p_post_id;
+END;
+$$;
+
+-- Registra el fallo de un job: programa un reintento con backoff
+-- exponencial (p_retry_base_minutes * 2^retry_count) o, agotados los
+-- reintentos, marca job y post como fallidos. Devuelve el estado final
+-- del job (status, retry_count, max_retries, scheduled_time).
+CREATE OR REPLACE FUNCTION fail_scheduled_job(
+    p_post_id BIGINT,
+    p_error TEXT,
+    p_retry_base_minutes INTEGER DEFAULT 5
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_job scheduled_jobs%ROWTYPE;
+BEGIN
+    SELECT * INTO v_job
+    FROM scheduled_jobs
+    WHERE post_id = p_post_id
+    LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF COALESCE(v_job.retry_count, 0) < COALESCE(v_job.max_retries, 3) THEN
+        UPDATE scheduled_jobs
+        SET status = 'retrying',
+            retry_count = COALESCE(retry_count, 0) + 1,
+            error_message = p_error,
+            scheduled_time = NOW() + make_interval(
+                mins => p_retry_base_minutes * (2 ^ COALESCE(retry_count, 0))::INTEGER
+            ),
+            prestaged_container = NULL,
+            container_ready_at = NULL
+        WHERE id = v_job.id
+        RETURNING * INTO v_job;
+    ELSE
+        UPDATE scheduled_jobs
+        SET status = 'failed',
+            error_message = p_error,
+            completed_at = NOW()
+        WHERE id = v_job.id
+        RETURNING * INTO v_job;
+
+        UPDATE posts
+        SET status = 'failed'
+        WHERE id = p_post_id;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'status', v_job.status,
+        'retry_count', v_job.retry_count,
+        'max_retries', v_job.max_retries,
+        'scheduled_time', v_job.scheduled_time
+    );
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 018 completada';
+    RAISE NOTICE '   - claim_scheduled_job() / complete_scheduled_job() / fail_scheduled_job()';
+END $$;
@@ -0,0 +1,163 @@
+-- ============================================================
+-- MIGRACIÓN 019: Cola de jobs sobre scheduled_jobs
+-- Fecha: Octubre 2026
+-- Descripción: Con SCHEDULER_BACKEND=queue los jobs programados no
+--              se registran en APScheduler: cualquier número de
+--              procesos (workers de uvicorn o
+--              python -m services.scheduler.job_queue) reclaman los
+--              jobs vencidos con FOR UPDATE SKIP LOCKED, sin
+--              ejecuciones duplicadas. La sincronización de métricas
+--              se encola como filas sync_insights idempotentes (una
+--              por franja de 15 minutos).
+-- ============================================================
+
+ALTER TABLE public.scheduled_jobs
+ADD COLUMN IF NOT EXISTS locked_by TEXT,
+ADD COLUMN IF NOT EXISTS locked_until TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS prestage_claimed_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN scheduled_jobs.locked_by IS
+'Worker de la cola que tiene reclamado el job';
+COMMENT ON COLUMN scheduled_jobs.locked_until IS
+'Fin del lease del worker (un lease vencido se puede reclamar de nuevo)';
+COMMENT ON COLUMN scheduled_jobs.prestage_claimed_at IS
+'Momento en que un worker reclamó el pre-staging del contenedor';
+
+-- Índice de jobs vencidos: solo las filas que la cola puede reclamar
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_due
+ON scheduled_jobs (scheduled_time)
+WHERE status IN ('pending', 'retrying');
+
+-- Reclama hasta p_limit jobs vencidos sin lease vigente.
+-- Devuelve solo los jobs reclamados por este worker.
+CREATE OR REPLACE FUNCTION claim_due_jobs(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF scheduled_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE status IN ('pending', 'retrying')
+          AND scheduled_time <= NOW()
+          AND (locked_until IS NULL OR locked_until < NOW())
+        ORDER BY scheduled_time
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE scheduled_jobs j
+    SET locked_by = p_worker_id,
+        locked_until = NOW() + make_interval(secs => p_lease_seconds)
+    FROM due
+    WHERE j.id = due.id
+    RETURNING j.*;
+END;
+$$;
+
+-- Reclama los jobs de publicación cuyo contenedor toca pre-preparar
+-- (vencen en menos de p_lead_seconds y en más de un minuto).
+CREATE OR REPLACE FUNCTION claim_prestage_jobs(
+    p_worker_id TEXT,
+    p_lead_seconds INTEGER,
+    p_limit INTEGER DEFAULT 10
+)
+RETURNS SETOF scheduled_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE status IN ('pending', 'retrying')
+          AND job_type = 'publish_post'
+          AND prestaged_container IS NULL
+          AND prestage_claimed_at IS NULL
+          AND scheduled_time > NOW() + INTERVAL '1 minute'
+          AND scheduled_time <= NOW() + make_interval(secs => p_lead_seconds)
+        ORDER BY scheduled_time
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE scheduled_jobs j
+    SET prestage_claimed_at = NOW()
+    FROM due
+    WHERE j.id = due.id
+    RETURNING j.*;
+END;
+$$;
+
+-- fail_scheduled_job (migración 018) libera además el lease y el
+-- pre-staging, para que el reintento lo pueda reclamar cualquier worker
+CREATE OR REPLACE FUNCTION fail_scheduled_job(
+    p_post_id BIGINT,
+    p_error TEXT,
+    p_retry_base_minutes INTEGER DEFAULT 5
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_job scheduled_jobs%ROWTYPE;
+BEGIN
+    SELECT * INTO v_job
+    FROM scheduled_jobs
+    WHERE post_id = p_post_id
+    LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF COALESCE(v_job.retry_count, 0) < COALESCE(v_job.max_retries, 3) THEN
+        UPDATE scheduled_jobs
+        SET status = 'retrying',
+            retry_count = COALESCE(retry_count, 0) + 1,
+            error_message = p_error,
+            scheduled_time = NOW() + make_interval(
+                mins => p_retry_base_minutes * (2 ^ COALESCE(retry_count, 0))::INTEGER
+            ),
+            prestaged_container = NULL,
+            container_ready_at = NULL,
+            prestage_claimed_at = NULL,
+            locked_by = NULL,
+            locked_until = NULL
+        WHERE id = v_job.id
+        RETURNING * INTO v_job;
+    ELSE
+        UPDATE scheduled_jobs
+        SET status = 'failed',
+            error_message = p_error,
+            completed_at = NOW(),
+            locked_by = NULL,
+            locked_until = NULL
+        WHERE id = v_job.id
+        RETURNING * INTO v_job;
+
+        UPDATE posts
+        SET status = 'failed'
+        WHERE id = p_post_id;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'status', v_job.status,
+        'retry_count', v_job.retry_count,
+        'max_retries', v_job.max_retries,
+        'scheduled_time', v_job.scheduled_time
+    );
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 019 completada';
+    RAISE NOTICE '   - scheduled_jobs.locked_by / locked_until / prestage_claimed_at';
+    RAISE NOTICE '   - idx_scheduled_jobs_due';
+    RAISE NOTICE '   - claim_due_jobs() / claim_prestage_jobs()';
+END $$;
@@ -0,0 +1,64 @@
+-- ============================================================
+-- MIGRACIÓN 020: Restauración en bloque de posts programados
+-- Fecha: Octubre 2026
+-- Descripción: Al arrancar, PostScheduler buscaba posts 'scheduled'
+--              sin job con una consulta a scheduled_jobs por post y
+--              un insert por huérfano. Esta función hace el anti-join
+--              y el insert de todos los jobs que faltan en una sola
+--              sentencia, y devuelve los jobs creados.
+-- ============================================================
+
+-- Crea el job de publicación de cada post programado en el futuro
+-- (scheduled_at >= p_after) que no tenga un job pending/retrying.
+-- Un job previo fallido o cancelado del mismo post se reactiva.
+CREATE OR REPLACE FUNCTION restore_orphaned_scheduled_posts(
+    p_after TIMESTAMPTZ DEFAULT NOW()
+)
+RETURNS TABLE (
+    job_id TEXT,
+    post_id BIGINT,
+    scheduled_time TIMESTAMPTZ
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    INSERT INTO scheduled_jobs AS j (
+        job_id, job_type, post_id, scheduled_time, status,
+        retry_count, max_retries
+    )
+    SELECT
+        'post_' || p.id,
+        'publish_post',
+        p.id,
+        p.scheduled_at,
+        'pending',
+        0,
+        3
+    FROM posts p
+    WHERE p.status = 'scheduled'
+      AND p.scheduled_at IS NOT NULL
+      AND p.scheduled_at >= p_after
+      AND NOT EXISTS (
+          SELECT 1
+          FROM scheduled_jobs sj
+          WHERE sj.job_id = 'post_' || p.id
+            AND sj.status IN ('pending', 'retrying', 'running')
+      )
+    ON CONFLICT (job_id) DO UPDATE
+    SET status = 'pending',
+        scheduled_time = EXCLUDED.scheduled_time,
+        retry_count = 0,
+        error_message = NULL,
+        completed_at = NULL
+    WHERE j.status IN ('failed', 'cancelled')
+    RETURNING j.job_id, j.post_id, j.scheduled_time;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 020 completada';
+    RAISE NOTICE '   - restore_orphaned_scheduled_posts()';
+END $$;
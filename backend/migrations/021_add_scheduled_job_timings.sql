@@ -0,0 +1,168 @@
+-- ============================================================
+-- MIGRACIÓN 021: Tiempos de ejecución de jobs programados
+-- Fecha: Octubre 2026
+-- Descripción: Para medir cuánto se retrasan las publicaciones,
+--              cada job guarda cuándo se reclamó, cuándo empezó,
+--              cuándo estuvo listo su contenedor y cuándo se publicó.
+--              Las RPCs de la migración 018/019 rellenan los tiempos
+--              y complete_scheduled_job los devuelve para los
+--              histogramas del scheduler.
+-- ============================================================
+
+ALTER TABLE public.scheduled_jobs
+ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS published_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN scheduled_jobs.claimed_at IS
+'Momento en que un worker reclamó el job (cola) o empezó a ejecutarlo (APScheduler)';
+COMMENT ON COLUMN scheduled_jobs.started_at IS
+'Inicio del último intento de publicación (job en running)';
+COMMENT ON COLUMN scheduled_jobs.published_at IS
+'Momento en que Instagram aceptó la publicación';
+
+-- Lag del scheduler: jobs completados recientemente
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_published_at
+ON scheduled_jobs (published_at DESC)
+WHERE published_at IS NOT NULL;
+
+-- claim_scheduled_job (migración 018) registra además claimed_at y
+-- started_at
+CREATE OR REPLACE FUNCTION claim_scheduled_job(
+    p_post_id BIGINT
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_job scheduled_jobs%ROWTYPE;
+    v_post posts%ROWTYPE;
+    v_account JSONB;
+BEGIN
+    UPDATE scheduled_jobs
+    SET status = 'running',
+        -- Con la cola, claimed_at ya lo puso claim_due_jobs
+        claimed_at = CASE
+            WHEN locked_by IS NOT NULL AND claimed_at IS NOT NULL THEN claimed_at
+            ELSE NOW()
+        END,
+        started_at = NOW()
+    WHERE id = (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE post_id = p_post_id
+          AND status IN ('pending', 'retrying')
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING * INTO v_job;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT * INTO v_post FROM posts WHERE id = p_post_id;
+
+    SELECT jsonb_build_object(
+        'id', a.id,
+        'user_id', a.user_id,
+        'long_lived_access_token', a.long_lived_access_token,
+        'instagram_business_account_id', a.instagram_business_account_id,
+        'is_active', a.is_active,
+        'expires_at', a.expires_at
+    )
+    INTO v_account
+    FROM instagram_accounts a
+    WHERE a.user_id = v_post.user_id
+      AND a.is_active = true
+    LIMIT 1;
+
+    RETURN jsonb_build_object(
+        'job', to_jsonb(v_job),
+        'post', CASE WHEN v_post.id IS NULL THEN NULL ELSE to_jsonb(v_post) END,
+        'account', v_account
+    );
+END;
+$$;
+
+-- claim_due_jobs (migración 019) registra además claimed_at
+CREATE OR REPLACE FUNCTION claim_due_jobs(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF scheduled_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE status IN ('pending', 'retrying')
+          AND scheduled_time <= NOW()
+          AND (locked_until IS NULL OR locked_until < NOW())
+        ORDER BY scheduled_time
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE scheduled_jobs j
+    SET locked_by = p_worker_id,
+        locked_until = NOW() + make_interval(secs => p_lease_seconds),
+        claimed_at = NOW()
+    FROM due
+    WHERE j.id = due.id
+    RETURNING j.*;
+END;
+$$;
+
+-- complete_scheduled_job (migración 018) guarda el momento en que el
+-- contenedor estuvo listo y el de publicación, y devuelve los tiempos
+DROP FUNCTION IF EXISTS complete_scheduled_job(BIGINT, TEXT);
+
+CREATE OR REPLACE FUNCTION complete_scheduled_job(
+    p_post_id BIGINT,
+    p_instagram_post_id TEXT,
+    p_container_ready_at TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_job scheduled_jobs%ROWTYPE;
+BEGIN
+    UPDATE posts
+    SET status = 'published',
+        instagram_post_id = p_instagram_post_id,
+        publication_date = NOW()
+    WHERE id = p_post_id;
+
+    UPDATE scheduled_jobs
+    SET status = 'completed',
+        completed_at = NOW(),
+        published_at = NOW(),
+        container_ready_at = COALESCE(p_container_ready_at, container_ready_at)
+    WHERE post_id = p_post_id
+    RETURNING * INTO v_job;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'scheduled_time', v_job.scheduled_time,
+        'claimed_at', v_job.claimed_at,
+        'started_at', v_job.started_at,
+        'container_ready_at', v_job.container_ready_at,
+        'published_at', v_job.published_at,
+        'retry_count', v_job.retry_count
+    );
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 021 completada';
+    RAISE NOTICE '   - scheduled_jobs.claimed_at / started_at / published_at';
+    RAISE NOTICE '   - claim_scheduled_job() / claim_due_jobs() / complete_scheduled_job() con tiempos';
+END $$;
@@ -0,0 +1,29 @@
+-- ============================================================
+-- MIGRACIÓN 022: Estado 'missed' para jobs programados
+-- Fecha: Octubre 2026
+-- Descripción: Tras una caída del scheduler, los posts que vencieron
+--              hace más de la ventana de recuperación
+--              (CATCH_UP_WINDOW_MINUTES) ya no se publican: el job pasa
+--              a 'missed' y se notifica, en lugar de descartarlo en
+--              silencio. Los que están dentro de la ventana se liberan
+--              poco a poco (services/scheduler/catch_up.py).
+-- ============================================================
+
+ALTER TABLE public.scheduled_jobs
+DROP CONSTRAINT IF EXISTS check_scheduled_jobs_status;
+
+ALTER TABLE public.scheduled_jobs
+ADD CONSTRAINT check_scheduled_jobs_status
+CHECK (status IN ('pending', 'running', 'completed', 'failed', 'cancelled', 'retrying', 'missed'));
+
+-- Recuperación al arrancar: jobs pendientes ya vencidos
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_overdue
+ON scheduled_jobs (scheduled_time)
+WHERE status IN ('pending', 'retrying') AND job_type = 'publish_post';
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 022 completada';
+    RAISE NOTICE '   - scheduled_jobs.status admite missed';
+    RAISE NOTICE '   - idx_scheduled_jobs_overdue';
+END $$;
@@ -0,0 +1,116 @@
+-- ============================================================
+-- MIGRACIÓN 023: Hora de despacho de jobs programados
+-- Fecha: Octubre 2026
+-- Descripción: Los posts se concentran en horas redondas (09:00,
+--              18:00). El suavizado de ráfagas
+--              (services/scheduler/burst_smoothing.py) reparte esos
+--              picos: cada job puede tener un dispatch_at dentro de la
+--              tolerancia de su scheduled_time, que sigue siendo la
+--              hora pedida. La cola reclama por
+--              COALESCE(dispatch_at, scheduled_time).
+-- ============================================================
+
+ALTER TABLE public.scheduled_jobs
+ADD COLUMN IF NOT EXISTS dispatch_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN scheduled_jobs.dispatch_at IS
+'Hora real de ejecución planificada por el suavizado de ráfagas (NULL = scheduled_time)';
+
+-- Un cambio de scheduled_time (reintento, reprogramación, cuota,
+-- recuperación) invalida el despacho planificado
+CREATE OR REPLACE FUNCTION reset_scheduled_job_dispatch_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.scheduled_time IS DISTINCT FROM OLD.scheduled_time
+     AND NEW.dispatch_at IS NOT DISTINCT FROM OLD.dispatch_at THEN
+    NEW.dispatch_at = NULL;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_scheduled_jobs_reset_dispatch_at ON scheduled_jobs;
+
+CREATE TRIGGER trigger_scheduled_jobs_reset_dispatch_at
+  BEFORE UPDATE ON scheduled_jobs
+  FOR EACH ROW
+  EXECUTE FUNCTION reset_scheduled_job_dispatch_at();
+
+-- Jobs vencidos por hora de despacho (sustituye a idx_scheduled_jobs_due)
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_dispatch_due
+ON scheduled_jobs ((COALESCE(dispatch_at, scheduled_time)))
+WHERE status IN ('pending', 'retrying');
+
+DROP INDEX IF EXISTS idx_scheduled_jobs_due;
+
+-- claim_due_jobs (migración 021) reclama por hora de despacho
+CREATE OR REPLACE FUNCTION claim_due_jobs(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF scheduled_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE status IN ('pending', 'retrying')
+          AND COALESCE(dispatch_at, scheduled_time) <= NOW()
+          AND (locked_until IS NULL OR locked_until < NOW())
+        ORDER BY COALESCE(dispatch_at, scheduled_time)
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE scheduled_jobs j
+    SET locked_by = p_worker_id,
+        locked_until = NOW() + make_interval(secs => p_lease_seconds),
+        claimed_at = NOW()
+    FROM due
+    WHERE j.id = due.id
+    RETURNING j.*;
+END;
+$$;
+
+-- claim_prestage_jobs (migración 019): el contenedor se prepara antes
+-- de la hora de despacho, así los picos se pre-preparan antes
+CREATE OR REPLACE FUNCTION claim_prestage_jobs(
+    p_worker_id TEXT,
+    p_lead_seconds INTEGER,
+    p_limit INTEGER DEFAULT 10
+)
+RETURNS SETOF scheduled_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE status IN ('pending', 'retrying')
+          AND job_type = 'publish_post'
+          AND prestaged_container IS NULL
+          AND prestage_claimed_at IS NULL
+          AND COALESCE(dispatch_at, scheduled_time) > NOW() + INTERVAL '1 minute'
+          AND COALESCE(dispatch_at, scheduled_time) <= NOW() + make_interval(secs => p_lead_seconds)
+        ORDER BY COALESCE(dispatch_at, scheduled_time)
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE scheduled_jobs j
+    SET prestage_claimed_at = NOW()
+    FROM due
+    WHERE j.id = due.id
+    RETURNING j.*;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 023 completada';
+    RAISE NOTICE '   - scheduled_jobs.dispatch_at (se limpia al cambiar scheduled_time)';
+    RAISE NOTICE '   - idx_scheduled_jobs_dispatch_due';
+    RAISE NOTICE '   - claim_due_jobs() / claim_prestage_jobs() por hora de despacho';
+END $$;
@@ -0,0 +1,106 @@
+-- ============================================================
+-- MIGRACIÓN 025: Paginación e histórico de jobs programados
+-- Fecha: Octubre 2026
+-- Descripción: GET /api/scheduler/jobs cargaba todos los jobs y
+--              filtraba en Python, y scheduled_jobs crece sin límite
+--              con los jobs terminados. Ahora el listado se pagina por
+--              keyset (scheduled_time, id) con filtros en la base de
+--              datos, y un job de mantenimiento mueve los jobs
+--              terminados hace más de N días a una tabla de histórico
+--              compacta.
+-- ============================================================
+
+-- Keyset del listado: ORDER BY scheduled_time, id
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_scheduled_time_id
+ON scheduled_jobs (scheduled_time, id);
+
+-- Jobs terminados candidatos a archivar
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_finished
+ON scheduled_jobs ((COALESCE(completed_at, updated_at)))
+WHERE status IN ('completed', 'failed', 'cancelled', 'missed');
+
+-- Histórico compacto: sin leases, contenedores ni tiempos intermedios
+CREATE TABLE IF NOT EXISTS public.scheduled_jobs_history (
+    id BIGINT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    job_type TEXT NOT NULL,
+    post_id BIGINT,
+    status TEXT NOT NULL,
+    scheduled_time TIMESTAMPTZ NOT NULL,
+    started_at TIMESTAMPTZ,
+    published_at TIMESTAMPTZ,
+    completed_at TIMESTAMPTZ,
+    retry_count INTEGER DEFAULT 0,
+    error_message TEXT,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_history_job_id
+ON scheduled_jobs_history (job_id);
+
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_history_post_id
+ON scheduled_jobs_history (post_id);
+
+COMMENT ON TABLE scheduled_jobs_history IS
+'Jobs programados terminados y archivados por archive_scheduled_jobs()';
+
+-- Mismo acceso de lectura que scheduled_jobs (migración 009)
+ALTER TABLE scheduled_jobs_history ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own archived jobs"
+  ON scheduled_jobs_history
+  FOR SELECT
+  USING (
+    post_id IN (
+      SELECT id FROM posts WHERE user_id = auth.uid()
+    )
+  );
+
+-- Mueve hasta p_batch_size jobs terminados hace más de p_older_than_days
+-- días al histórico. Devuelve cuántos movió.
+CREATE OR REPLACE FUNCTION archive_scheduled_jobs(
+    p_older_than_days INTEGER,
+    p_batch_size INTEGER DEFAULT 1000
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_archived INTEGER;
+BEGIN
+    WITH moved AS (
+        DELETE FROM scheduled_jobs
+        WHERE id IN (
+            SELECT id
+            FROM scheduled_jobs
+            WHERE status IN ('completed', 'failed', 'cancelled', 'missed')
+              AND COALESCE(completed_at, updated_at)
+                  < NOW() - make_interval(days => p_older_than_days)
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+    )
+    INSERT INTO scheduled_jobs_history (
+        id, job_id, job_type, post_id, status, scheduled_time,
+        started_at, published_at, completed_at, retry_count, error_message
+    )
+    SELECT
+        id, job_id, job_type, post_id, status, scheduled_time,
+        started_at, published_at, completed_at, retry_count,
+        LEFT(error_message, 500)
+    FROM moved
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS v_archived = ROW_COUNT;
+    RETURN v_archived;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 025 completada';
+    RAISE NOTICE '   - idx_scheduled_jobs_scheduled_time_id / idx_scheduled_jobs_finished';
+    RAISE NOTICE '   - Tabla scheduled_jobs_history';
+    RAISE NOTICE '   - archive_scheduled_jobs()';
+END $$;
@@ -0,0 +1,252 @@
+-- ============================================================
+-- MIGRACIÓN 026: Dead-letter de publicaciones fallidas
+-- Fecha: Octubre 2026
+-- Descripción: Cuando se agotan los reintentos, el job y el post
+--              quedan 'failed' y recuperarlos era manual, post a post.
+--              Ahora fail_scheduled_job guarda el contexto del fallo
+--              (clase de error, código de la Graph API y contenedor
+--              ya creado) en publish_dead_letters, y
+--              replay_dead_letters reprograma en bloque los fallidos,
+--              reutilizando los contenedores todavía válidos como
+--              pre-staging (solo falta media_publish).
+--              Los reintentos normales también conservan el contenedor
+--              si llegó a estar READY.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS public.publish_dead_letters (
+    id BIGSERIAL PRIMARY KEY,
+    post_id BIGINT NOT NULL UNIQUE REFERENCES posts(id) ON DELETE CASCADE,
+    job_id TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open'
+        CHECK (status IN ('open', 'replayed', 'resolved')),
+    error_class TEXT NOT NULL DEFAULT 'unknown',
+    error_code INTEGER,
+    error_message TEXT,
+    container_id TEXT,
+    staged_container JSONB,
+    retry_count INTEGER DEFAULT 0,
+    failure_count INTEGER NOT NULL DEFAULT 1,
+    replay_count INTEGER NOT NULL DEFAULT 0,
+    failed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    replayed_at TIMESTAMPTZ
+);
+
+-- Reenvío por clase de error de los fallos abiertos
+CREATE INDEX IF NOT EXISTS idx_publish_dead_letters_open
+ON publish_dead_letters (error_class, failed_at)
+WHERE status = 'open';
+
+COMMENT ON TABLE publish_dead_letters IS
+'Publicaciones que agotaron sus reintentos, con el contexto del último fallo';
+
+COMMENT ON COLUMN publish_dead_letters.staged_container IS
+'Contenedor READY que se puede publicar sin recrearlo (caduca a las 24 h)';
+
+-- Mismo acceso de lectura que scheduled_jobs (migración 009)
+ALTER TABLE publish_dead_letters ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own dead letters"
+  ON publish_dead_letters
+  FOR SELECT
+  USING (
+    post_id IN (
+      SELECT id FROM posts WHERE user_id = auth.uid()
+    )
+  );
+
+-- fail_scheduled_job (migraciones 018 y 019) recibe además el contexto
+-- del fallo. Se elimina la firma anterior para que PostgREST no tenga
+-- que elegir entre dos funciones.
+DROP FUNCTION IF EXISTS fail_scheduled_job(BIGINT, TEXT, INTEGER);
+
+CREATE OR REPLACE FUNCTION fail_scheduled_job(
+    p_post_id BIGINT,
+    p_error TEXT,
+    p_retry_base_minutes INTEGER DEFAULT 5,
+    p_error_class TEXT DEFAULT 'unknown',
+    p_error_code INTEGER DEFAULT NULL,
+    p_container_id TEXT DEFAULT NULL,
+    p_staged_container JSONB DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_job scheduled_jobs%ROWTYPE;
+BEGIN
+    SELECT * INTO v_job
+    FROM scheduled_jobs
+    WHERE post_id = p_post_id
+    LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF COALESCE(v_job.retry_count, 0) < COALESCE(v_job.max_retries, 3) THEN
+        -- El reintento publica el contenedor READY, si lo hay
+        UPDATE scheduled_jobs
+        SET status = 'retrying',
+            retry_count = COALESCE(retry_count, 0) + 1,
+            error_message = p_error,
+            scheduled_time = NOW() + make_interval(
+                mins => p_retry_base_minutes * (2 ^ COALESCE(retry_count, 0))::INTEGER
+            ),
+            prestaged_container = p_staged_container,
+            container_ready_at = CASE
+                WHEN p_staged_container IS NOT NULL THEN NOW()
+            END,
+            prestage_claimed_at = NULL,
+            locked_by = NULL,
+            locked_until = NULL
+        WHERE id = v_job.id
+        RETURNING * INTO v_job;
+    ELSE
+        UPDATE scheduled_jobs
+        SET status = 'failed',
+            error_message = p_error,
+            completed_at = NOW(),
+            locked_by = NULL,
+            locked_until = NULL
+        WHERE id = v_job.id
+        RETURNING * INTO v_job;
+
+        UPDATE posts
+        SET status = 'failed'
+        WHERE id = p_post_id;
+
+        INSERT INTO publish_dead_letters (
+            post_id, job_id, error_class, error_code, error_message,
+            container_id, staged_container, retry_count
+        )
+        VALUES (
+            p_post_id, v_job.job_id, COALESCE(p_error_class, 'unknown'),
+            p_error_code, p_error, p_container_id, p_staged_container,
+            v_job.retry_count
+        )
+        ON CONFLICT (post_id) DO UPDATE
+        SET status = 'open',
+            job_id = EXCLUDED.job_id,
+            error_class = EXCLUDED.error_class,
+            error_code = EXCLUDED.error_code,
+            error_message = EXCLUDED.error_message,
+            container_id = EXCLUDED.container_id,
+            staged_container = EXCLUDED.staged_container,
+            retry_count = EXCLUDED.retry_count,
+            failure_count = publish_dead_letters.failure_count + 1,
+            failed_at = NOW();
+    END IF;
+
+    RETURN jsonb_build_object(
+        'status', v_job.status,
+        'retry_count', v_job.retry_count,
+        'max_retries', v_job.max_retries,
+        'scheduled_time', v_job.scheduled_time
+    );
+END;
+$$;
+
+-- Reprograma fallos abiertos en una transacción.
+-- p_items: [{"post_id": 1, "scheduled_time": "...", "container": {...} | null}, ...]
+-- Solo se reenvían los posts cuyo job sigue 'failed' (o ya se archivó);
+-- los reprogramados o publicados por otra vía se marcan 'resolved'.
+-- Devuelve los jobs reprogramados.
+CREATE OR REPLACE FUNCTION replay_dead_letters(
+    p_items JSONB
+)
+RETURNS TABLE (
+    job_id TEXT,
+    post_id BIGINT,
+    scheduled_time TIMESTAMPTZ,
+    container_reused BOOLEAN
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    UPDATE publish_dead_letters d
+    SET status = 'resolved'
+    WHERE d.status = 'open'
+      AND d.post_id IN (
+          SELECT (i->>'post_id')::BIGINT
+          FROM jsonb_array_elements(p_items) AS i
+      )
+      AND EXISTS (
+          SELECT 1
+          FROM scheduled_jobs sj
+          WHERE sj.post_id = d.post_id
+            AND sj.status <> 'failed'
+      );
+
+    RETURN QUERY
+    WITH items AS (
+        SELECT
+            (i->>'post_id')::BIGINT AS post_id,
+            (i->>'scheduled_time')::TIMESTAMPTZ AS scheduled_time,
+            NULLIF(i->'container', 'null'::JSONB) AS container
+        FROM jsonb_array_elements(p_items) AS i
+        JOIN publish_dead_letters d
+          ON d.post_id = (i->>'post_id')::BIGINT
+         AND d.status = 'open'
+    ),
+    replayed AS (
+        UPDATE publish_dead_letters d
+        SET status = 'replayed',
+            replayed_at = NOW(),
+            replay_count = d.replay_count + 1
+        FROM items
+        WHERE d.post_id = items.post_id
+        RETURNING d.post_id
+    ),
+    scheduled_posts AS (
+        UPDATE posts p
+        SET status = 'scheduled',
+            scheduled_at = items.scheduled_time
+        FROM items
+        JOIN replayed ON replayed.post_id = items.post_id
+        WHERE p.id = items.post_id
+        RETURNING p.id
+    )
+    INSERT INTO scheduled_jobs AS j (
+        job_id, job_type, post_id, scheduled_time, status,
+        retry_count, max_retries, prestaged_container, container_ready_at
+    )
+    SELECT
+        'post_' || items.post_id,
+        'publish_post',
+        items.post_id,
+        items.scheduled_time,
+        'pending',
+        0,
+        3,
+        items.container,
+        CASE WHEN items.container IS NOT NULL THEN NOW() END
+    FROM items
+    JOIN scheduled_posts ON scheduled_posts.id = items.post_id
+    ON CONFLICT (job_id) DO UPDATE
+    SET status = 'pending',
+        scheduled_time = EXCLUDED.scheduled_time,
+        retry_count = 0,
+        error_message = NULL,
+        completed_at = NULL,
+        dispatch_at = NULL,
+        prestaged_container = EXCLUDED.prestaged_container,
+        container_ready_at = EXCLUDED.container_ready_at,
+        prestage_claimed_at = NULL,
+        locked_by = NULL,
+        locked_until = NULL,
+        claimed_at = NULL,
+        started_at = NULL,
+        published_at = NULL
+    RETURNING j.job_id, j.post_id, j.scheduled_time, j.prestaged_container IS NOT NULL;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 026 completada';
+    RAISE NOTICE '   - Tabla publish_dead_letters';
+    RAISE NOTICE '   - fail_scheduled_job() con contexto del fallo';
+    RAISE NOTICE '   - replay_dead_letters()';
+END $$;
@@ -0,0 +1,90 @@
+-- ============================================================
+-- MIGRACIÓN 027: Presupuesto de sincronización compartido
+-- Fecha: Octubre 2026
+-- Descripción: El SyncPriorityPlanner guarda en memoria las llamadas
+--              a la Graph API gastadas en la última hora, así que con
+--              varios sync_worker --lease cada proceso gastaba el
+--              presupuesto completo. Los workers en modo lease cargan
+--              ahora el presupuesto en esta tabla, reservándolo de
+--              forma atómica antes de sincronizar.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS public.sync_budget_charges (
+    id BIGSERIAL PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    api_calls INTEGER NOT NULL,
+    charged_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE sync_budget_charges IS
+'Llamadas a la Graph API reservadas por los workers de sincronización';
+
+CREATE INDEX IF NOT EXISTS idx_sync_budget_charges_charged_at
+ON sync_budget_charges (charged_at);
+
+-- Solo el backend (service role) escribe y lee el presupuesto
+ALTER TABLE sync_budget_charges ENABLE ROW LEVEL SECURITY;
+
+-- Llamadas gastadas en la última hora por todos los workers
+CREATE OR REPLACE FUNCTION sync_budget_spent()
+RETURNS INTEGER
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(SUM(api_calls), 0)::INTEGER
+    FROM sync_budget_charges
+    WHERE charged_at > NOW() - INTERVAL '1 hour';
+$$;
+
+-- Reserva presupuesto para hasta p_requested sincronizaciones y
+-- devuelve cuántas caben. Sin p_hourly_budget, el presupuesto es el
+-- del antiguo barrido horario: cuentas activas * p_calls_per_sync.
+-- El advisory lock serializa las reservas de todos los workers.
+CREATE OR REPLACE FUNCTION reserve_sync_budget(
+    p_worker_id TEXT,
+    p_requested INTEGER,
+    p_calls_per_sync INTEGER,
+    p_hourly_budget INTEGER DEFAULT NULL
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_budget INTEGER;
+    v_spent INTEGER;
+    v_granted INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('reserve_sync_budget'));
+
+    DELETE FROM sync_budget_charges
+    WHERE charged_at < NOW() - INTERVAL '1 day';
+
+    v_budget := COALESCE(
+        p_hourly_budget,
+        (
+            SELECT COUNT(*)::INTEGER
+            FROM instagram_accounts
+            WHERE is_active IS DISTINCT FROM false
+        ) * p_calls_per_sync
+    );
+    v_spent := sync_budget_spent();
+    v_granted := LEAST(
+        p_requested,
+        GREATEST(0, (v_budget - v_spent) / GREATEST(p_calls_per_sync, 1))
+    );
+
+    IF v_granted > 0 THEN
+        INSERT INTO sync_budget_charges (worker_id, api_calls)
+        VALUES (p_worker_id, v_granted * p_calls_per_sync);
+    END IF;
+
+    RETURN v_granted;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 027 completada';
+    RAISE NOTICE '   - Tabla sync_budget_charges';
+    RAISE NOTICE '   - sync_budget_spent() / reserve_sync_budget()';
+END $$;
@@ -0,0 +1,135 @@
+-- ============================================================
+-- MIGRACIÓN 028: Lease de los jobs en ejecución
+-- Fecha: Octubre 2026
+-- Descripción: claim_due_jobs solo reclama jobs pending/retrying, así
+--              que un proceso que caía con un job 'running' lo dejaba
+--              bloqueado para siempre (y schedule_posts_bulk se negaba
+--              a reprogramarlo). Ahora:
+--              - claim_scheduled_job pone un lease (locked_until) que
+--                cubre el procesado del contenedor.
+--              - El contenedor creado se guarda en el job en cuanto
+--                existe (prestaged_container), desde la aplicación.
+--              - requeue_expired_scheduled_jobs pasa los jobs
+--                'running' con el lease vencido por
+--                fail_scheduled_job: reintento (que reanuda ese
+--                contenedor) o dead-letter si no quedan reintentos.
+-- ============================================================
+
+-- claim_scheduled_job (migración 021) con lease del job en ejecución
+DROP FUNCTION IF EXISTS claim_scheduled_job(BIGINT);
+
+CREATE OR REPLACE FUNCTION claim_scheduled_job(
+    p_post_id BIGINT,
+    p_lease_seconds INTEGER DEFAULT 1200
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_job scheduled_jobs%ROWTYPE;
+    v_post posts%ROWTYPE;
+    v_account JSONB;
+BEGIN
+    UPDATE scheduled_jobs
+    SET status = 'running',
+        -- Con la cola, claimed_at ya lo puso claim_due_jobs
+        claimed_at = CASE
+            WHEN locked_by IS NOT NULL AND claimed_at IS NOT NULL THEN claimed_at
+            ELSE NOW()
+        END,
+        started_at = NOW(),
+        locked_by = COALESCE(locked_by, 'post_scheduler'),
+        locked_until = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id = (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE post_id = p_post_id
+          AND status IN ('pending', 'retrying')
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING * INTO v_job;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT * INTO v_post FROM posts WHERE id = p_post_id;
+
+    SELECT jsonb_build_object(
+        'id', a.id,
+        'user_id', a.user_id,
+        'long_lived_access_token', a.long_lived_access_token,
+        'instagram_business_account_id', a.instagram_business_account_id,
+        'is_active', a.is_active,
+        'expires_at', a.expires_at
+    )
+    INTO v_account
+    FROM instagram_accounts a
+    WHERE a.user_id = v_post.user_id
+      AND a.is_active = true
+    LIMIT 1;
+
+    RETURN jsonb_build_object(
+        'job', to_jsonb(v_job),
+        'post', CASE WHEN v_post.id IS NULL THEN NULL ELSE to_jsonb(v_post) END,
+        'account', v_account
+    );
+END;
+$$;
+
+-- Jobs de publicación en ejecución con el lease vencido
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_running_lease
+ON scheduled_jobs (locked_until)
+WHERE status = 'running';
+
+-- Devuelve a la cola (o al dead-letter) los jobs de publicación cuyo
+-- proceso murió durante la ejecución. El contenedor guardado en el job
+-- pasa al reintento, que solo llama a media_publish si sigue siendo
+-- del mismo contenido. Devuelve el resultado de fail_scheduled_job de
+-- cada job, con su post_id.
+CREATE OR REPLACE FUNCTION requeue_expired_scheduled_jobs(
+    p_limit INTEGER DEFAULT 100,
+    p_retry_base_minutes INTEGER DEFAULT 5
+)
+RETURNS SETOF JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_job scheduled_jobs%ROWTYPE;
+    v_result JSONB;
+BEGIN
+    FOR v_job IN
+        SELECT *
+        FROM scheduled_jobs
+        WHERE status = 'running'
+          AND job_type = 'publish_post'
+          AND locked_until < NOW()
+        ORDER BY locked_until
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    LOOP
+        v_result := fail_scheduled_job(
+            v_job.post_id,
+            'Lease expired while running (worker lost)',
+            p_retry_base_minutes,
+            'transient',
+            NULL,
+            v_job.prestaged_container->>'container_id',
+            v_job.prestaged_container
+        );
+
+        IF v_result IS NOT NULL THEN
+            RETURN NEXT v_result || jsonb_build_object('post_id', v_job.post_id);
+        END IF;
+    END LOOP;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 028 completada';
+    RAISE NOTICE '   - claim_scheduled_job() con lease (locked_until)';
+    RAISE NOTICE '   - idx_scheduled_jobs_running_lease';
+    RAISE NOTICE '   - requeue_expired_scheduled_jobs()';
+END $$;
@@ -0,0 +1,62 @@
+-- ============================================================
+-- MIGRACIÓN 029: Reclamar jobs vencidos para la recuperación
+-- Fecha: Octubre 2026
+-- Descripción: La recuperación de posts vencidos (catch_up.py) se
+--              ejecuta al arrancar cada worker de la cola y leía los
+--              jobs vencidos sin mirar locked_until, así que varios
+--              procesos podían planificar los mismos jobs a la vez,
+--              incluso jobs ya reclamados. claim_overdue_jobs deja
+--              planificar a un solo proceso (advisory lock) y solo
+--              devuelve jobs sin lease vivo, reservándolos mientras se
+--              planifican. La hora de liberación se guarda en
+--              dispatch_at: scheduled_time sigue siendo la hora pedida
+--              y las métricas de lag no cambian.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION claim_overdue_jobs(
+    p_worker_id TEXT,
+    p_lease_seconds INTEGER DEFAULT 60
+)
+RETURNS SETOF JSONB
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Otro proceso ya está recuperando: no esperar, no hay nada que hacer
+    IF NOT pg_try_advisory_xact_lock(hashtext('claim_overdue_jobs')) THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    WITH overdue AS (
+        SELECT id
+        FROM scheduled_jobs
+        WHERE job_type = 'publish_post'
+          AND status IN ('pending', 'retrying')
+          AND COALESCE(dispatch_at, scheduled_time) < NOW()
+          AND (locked_until IS NULL OR locked_until < NOW())
+        FOR UPDATE SKIP LOCKED
+    ),
+    claimed AS (
+        UPDATE scheduled_jobs j
+        SET locked_by = p_worker_id,
+            locked_until = NOW() + make_interval(secs => p_lease_seconds)
+        FROM overdue
+        WHERE j.id = overdue.id
+        RETURNING j.job_id, j.post_id, j.scheduled_time
+    )
+    SELECT jsonb_build_object(
+        'job_id', c.job_id,
+        'post_id', c.post_id,
+        'scheduled_time', c.scheduled_time,
+        'posts', jsonb_build_object('user_id', p.user_id)
+    )
+    FROM claimed c
+    LEFT JOIN posts p ON p.id = c.post_id;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 029 completada';
+    RAISE NOTICE '   - claim_overdue_jobs() (un proceso a la vez, respeta leases)';
+END $$;
@@ -0,0 +1,94 @@
+-- ============================================================
+-- MIGRACIÓN 030: schedule_posts_bulk no reprograma posts publicados
+-- Fecha: Octubre 2026
+-- Descripción: schedule_posts_bulk (migración 024) reiniciaba a
+--              'pending' cualquier job que no estuviera 'running', así
+--              que un post ya publicado (job 'completed') se volvía a
+--              publicar al reprogramarlo. Ahora se omiten también los
+--              jobs 'completed' y los posts 'published'; la aplicación
+--              los devuelve como error del elemento.
+-- ============================================================
+
+-- p_items: [{"post_id": 1, "scheduled_time": "...", "max_retries": 3}, ...]
+-- Devuelve los jobs programados (los posts omitidos no aparecen):
+-- se omiten los posts en publicación (job 'running') y los ya
+-- publicados (job 'completed' o post 'published').
+CREATE OR REPLACE FUNCTION schedule_posts_bulk(
+    p_items JSONB
+)
+RETURNS TABLE (
+    job_id TEXT,
+    post_id BIGINT,
+    scheduled_time TIMESTAMPTZ
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH items AS (
+        SELECT
+            (i->>'post_id')::BIGINT AS post_id,
+            (i->>'scheduled_time')::TIMESTAMPTZ AS scheduled_time,
+            COALESCE((i->>'max_retries')::INTEGER, 3) AS max_retries
+        FROM jsonb_array_elements(p_items) AS i
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM scheduled_jobs sj
+            WHERE sj.job_id = 'post_' || (i->>'post_id')
+              AND sj.status IN ('running', 'completed')
+        )
+        AND NOT EXISTS (
+            SELECT 1
+            FROM posts p
+            WHERE p.id = (i->>'post_id')::BIGINT
+              AND p.status = 'published'
+        )
+    ),
+    scheduled_posts AS (
+        UPDATE posts p
+        SET status = 'scheduled',
+            scheduled_at = items.scheduled_time
+        FROM items
+        WHERE p.id = items.post_id
+        RETURNING p.id
+    )
+    INSERT INTO scheduled_jobs AS j (
+        job_id, job_type, post_id, scheduled_time, status,
+        retry_count, max_retries
+    )
+    SELECT
+        'post_' || items.post_id,
+        'publish_post',
+        items.post_id,
+        items.scheduled_time,
+        'pending',
+        0,
+        items.max_retries
+    FROM items
+    JOIN scheduled_posts ON scheduled_posts.id = items.post_id
+    ON CONFLICT (job_id) DO UPDATE
+    SET status = 'pending',
+        scheduled_time = EXCLUDED.scheduled_time,
+        retry_count = 0,
+        max_retries = EXCLUDED.max_retries,
+        error_message = NULL,
+        completed_at = NULL,
+        dispatch_at = NULL,
+        prestaged_container = NULL,
+        container_ready_at = NULL,
+        prestage_claimed_at = NULL,
+        locked_by = NULL,
+        locked_until = NULL,
+        claimed_at = NULL,
+        started_at = NULL,
+        published_at = NULL
+    RETURNING j.job_id, j.post_id, j.scheduled_time;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 030 completada';
+    RAISE NOTICE '   - schedule_posts_bulk() omite posts ya publicados';
+END $$;
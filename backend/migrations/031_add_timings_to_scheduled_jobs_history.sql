@@ -0,0 +1,63 @@
+-- ============================================================
+-- MIGRACIÓN 031: Tiempos de los jobs en el histórico
+-- Fecha: Octubre 2026
+-- Descripción: scheduled_jobs_history (migración 025) no guardaba
+--              claimed_at, container_ready_at ni dispatch_at, así que
+--              un job archivado perdía sus tiempos (lag de reclamación,
+--              espera del contenedor) al consultarlo. Se añaden las
+--              columnas y archive_scheduled_jobs las copia.
+-- ============================================================
+
+ALTER TABLE scheduled_jobs_history
+ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS container_ready_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS dispatch_at TIMESTAMPTZ;
+
+-- archive_scheduled_jobs (migración 025) copiando los tiempos
+CREATE OR REPLACE FUNCTION archive_scheduled_jobs(
+    p_older_than_days INTEGER,
+    p_batch_size INTEGER DEFAULT 1000
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_archived INTEGER;
+BEGIN
+    WITH moved AS (
+        DELETE FROM scheduled_jobs
+        WHERE id IN (
+            SELECT id
+            FROM scheduled_jobs
+            WHERE status IN ('completed', 'failed', 'cancelled', 'missed')
+              AND COALESCE(completed_at, updated_at)
+                  < NOW() - make_interval(days => p_older_than_days)
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+    )
+    INSERT INTO scheduled_jobs_history (
+        id, job_id, job_type, post_id, status, scheduled_time,
+        dispatch_at, claimed_at, started_at, container_ready_at,
+        published_at, completed_at, retry_count, error_message
+    )
+    SELECT
+        id, job_id, job_type, post_id, status, scheduled_time,
+        dispatch_at, claimed_at, started_at, container_ready_at,
+        published_at, completed_at, retry_count,
+        LEFT(error_message, 500)
+    FROM moved
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS v_archived = ROW_COUNT;
+    RETURN v_archived;
+END;
+$$;
+
+DO $$
+BEGIN
+    RAISE NOTICE '✅ Migración 031 completada';
+    RAISE NOTICE '   - scheduled_jobs_history: claimed_at, container_ready_at, dispatch_at';
+    RAISE NOTICE '   - archive_scheduled_jobs() copia los tiempos';
+END $$;
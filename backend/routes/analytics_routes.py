@@ -17,7 +17,9 @@ from pydantic import BaseModel
 from auth.jwt_handler import get_current_user
 from database import supabase
 from services.instagram_insights import InstagramInsightsService
-from services.analytics import AnalyticsService
+from services.analytics import AnalyticsService, full_sync_account
+from services.scheduler.sync_planner import get_sync_planner
+from services.account_context import get_account_context
 
 logger = logging.getLogger(__name__)
 
@@ -28,17 +30,17 @@ def get_instagram_service(current_user: dict = Depends(get_current_user)) -> Ins
     Dependency para obtener el servicio de Instagram configurado para el usuario actual
     """
     try:
-        # Obtener credenciales de Instagram del usuario
-        result = supabase.table('instagram_accounts').select('*').eq('user_id', current_user['id']).eq('is_active', True).single().execute()
+        # Obtener credenciales de Instagram del usuario (caché de cuentas)
+        instagram_account = get_account_context().get_active_for_user(
+            current_user['id']
+        )
 
-        if not result.data:
+        if not instagram_account:
             raise HTTPException(
                 status_code=404,
                 detail="No hay cuenta de Instagram conectada. Por favor conecta tu cuenta primero."
             )
 
-        instagram_account = result.data
-
         # Verificar si el token ha expirado
         expires_at_str = instagram_account.get('expires_at')
         if expires_at_str:
@@ -69,147 +71,6 @@ def get_instagram_service(current_user: dict = Depends(get_current_user)) -> Ins
             detail=f"Error al configurar el servicio de Instagram: {str(e)}"
         )
 
-def full_sync_account(instagram_service, db_client, user_id, instagram_account_id_db):
-    """
-    Realiza una sincronización completa: métricas de cuenta, audiencia y posts.
-
-    Guarda datos en:
-    - instagram_accounts (métricas básicas)
-    - instagram_account_snapshots (snapshot diario)
-    - audience_demographics (demografía)
-    - online_followers_data (actividad por hora)
-    - posts + post_performance (contenido)
-    """
-    today = datetime.utcnow().date()
-
-    # 1. Sincronizar métricas principales de la cuenta (15+ métricas)
-    logger.info(f"🔄 Sincronizando métricas de cuenta {instagram_account_id_db}")
-    try:
-        # Obtener datos básicos del perfil + métricas (usa rango de últimos 7 días por defecto)
-        account_insights = instagram_service.get_account_insights(days_back=7)
-
-        # Log para debug: ver qué métricas obtuvimos
-        logger.info(f"📊 Métricas obtenidas: "
-                   f"followers={account_insights.get('follower_count')}, "
-                   f"reach={account_insights.get('reach')}, "
-                   f"profile_views={account_insights.get('profile_views')}, "
-                   f"interactions={account_insights.get('total_interactions')}")
-
-        # Actualizar tabla principal instagram_accounts
-        update_data = {
-            "followers_count": account_insights.get("follower_count", 0),
-            "reach": account_insights.get("reach", 0),
-            "profile_views": account_insights.get("profile_views", 0),
-            "username": account_insights.get("username", ""),
-            "account_name": account_insights.get("name", ""),
-            "profile_picture_url": account_insights.get("profile_picture_url", ""),
-            "last_sync_at": datetime.now().isoformat(),
-        }
-        db_client.table("instagram_accounts").update(update_data).eq("id", instagram_account_id_db).execute()
-        logger.info(f"✅ Cuenta {instagram_account_id_db} actualizada")
-
-        # Guardar snapshot diario en instagram_account_snapshots
-        # NOTA: impressions NO existe en account-level insights de Instagram API
-        # account_insights viene de get_account_insights() que incluye perfil + métricas
-        snapshot_data = {
-            "instagram_account_id": instagram_account_id_db,
-            "date": today.isoformat(),
-            "follower_count": account_insights.get("follower_count", 0),  # Del perfil
-            "following_count": 0,  # No disponible en API básica
-            "media_count": account_insights.get("media_count", 0),  # Del perfil
-            "reach": account_insights.get("reach", 0),  # De insights
-            "impressions": 0,  # No disponible en account-level (solo media-level)
-            "profile_views": account_insights.get("profile_views", 0),  # De insights (últimos 7 días)
-            "website_clicks": 0,  # No incluida en get_account_insights básico
-            "email_contacts": 0,  # Requiere configuración especial
-            "phone_call_clicks": 0,  # Requiere configuración especial
-            "text_message_clicks": 0,  # Requiere configuración especial
-            "get_directions_clicks": 0  # Requiere configuración especial
-        }
-        # Delete + Insert para evitar problemas con upsert en múltiples columnas
-        db_client.table("instagram_account_snapshots").delete().match({
-            'instagram_account_id': instagram_account_id_db,
-            'date': today.isoformat()
-        }).execute()
-
-        result = db_client.table("instagram_account_snapshots").insert(snapshot_data).execute()
-        logger.info(f"✅ Snapshot diario guardado: {snapshot_data['date']}")
-
-    except Exception as e:
-        logger.error(f"❌ Error sincronizando métricas de cuenta {instagram_account_id_db}: {e}")
-
-    # 2. Sincronizar datos de audiencia (demografía + actividad)
-    logger.info(f"🔄 Sincronizando datos de audiencia para cuenta {instagram_account_id_db}")
-    try:
-        audience_insights = instagram_service.get_audience_insights()
-        logger.info(f"📊 DEBUG audience_insights retornado: {audience_insights}")
-
-        # Guardar demografía en audience_demographics
-        if audience_insights.get('demographics'):
-            demographics_to_upsert = []
-            for metric_type, data in audience_insights['demographics'].items():
-                logger.info(f"📊 DEBUG {metric_type}: {len(data) if isinstance(data, dict) else 0} entradas")
-                # Solo guardar si hay datos reales (no dict vacío)
-                if data and len(data) > 0:
-                    demographics_to_upsert.append({
-                        'instagram_account_id': instagram_account_id_db,
-                        'sync_date': today.isoformat(),
-                        'metric_type': metric_type,
-                        'data': data
-                    })
-                else:
-                    logger.warning(f"⚠️  {metric_type} está vacío, omitiendo...")
-
-            if demographics_to_upsert:
-                # Buscar el constraint único correcto para demographics
-                # Por simplicidad, hacer delete + insert individual por cada metric_type
-                for demo_data in demographics_to_upsert:
-                    # Eliminar registro anterior si existe
-                    db_client.table('audience_demographics').delete().match({
-                        'instagram_account_id': demo_data['instagram_account_id'],
-                        'metric_type': demo_data['metric_type']
-                    }).execute()
-                    # Insertar nuevo registro
-                    db_client.table('audience_demographics').insert(demo_data).execute()
-                logger.info(f"✅ Datos demográficos actualizados ({len(demographics_to_upsert)} métricas)")
-
-        # Guardar actividad de seguidores en online_followers_data
-        # Solo guardar si hay datos reales (no dict vacío {})
-        online_hours = audience_insights.get('online_hours')
-        if online_hours and len(online_hours) > 0:
-            # Delete + Insert para evitar problemas con upsert
-            db_client.table('online_followers_data').delete().match({
-                'instagram_account_id': instagram_account_id_db,
-                'sync_date': today.isoformat()
-            }).execute()
-
-            online_data = {
-                'instagram_account_id': instagram_account_id_db,
-                'sync_date': today.isoformat(),
-                'hour_data': online_hours  # Supabase maneja JSONB automáticamente
-            }
-            db_client.table('online_followers_data').insert(online_data).execute()
-            logger.info(f"✅ Actividad de seguidores actualizada ({len(online_hours)} horas)")
-        else:
-            logger.warning(f"⚠️  No hay datos de actividad de seguidores disponibles aún")
-
-    except Exception as e:
-        logger.error(f"❌ Error sincronizando datos de audiencia: {e}")
-
-    # 3. Sincronizar posts y su performance
-    logger.info(f"🔄 Sincronizando posts para cuenta {instagram_account_id_db}")
-    try:
-        instagram_service.sync_posts_to_database(
-            db_client=db_client,
-            user_id=user_id,
-            instagram_account_id_db=instagram_account_id_db
-        )
-        logger.info(f"✅ Posts sincronizados correctamente")
-    except Exception as e:
-        logger.error(f"❌ Error sincronizando posts: {e}")
-
-    logger.info(f"✅ Sincronización completa finalizada para cuenta {instagram_account_id_db}")
-
 @router.post(
     "/sync/{instagram_account_id}",
     summary="Sincronizar Posts y Métricas de Cuenta Instagram"
@@ -245,18 +106,14 @@ async def sync_instagram_analytics(
     """
     try:
         # Verificar que la cuenta existe y pertenece al usuario
-        result = supabase.table('instagram_accounts').select(
-            'id, user_id, is_active'
-        ).eq('id', instagram_account_id).single().execute()
+        account = get_account_context().get_by_id(instagram_account_id)
 
-        if not result.data:
+        if not account:
             raise HTTPException(
                 status_code=404,
                 detail=f"Cuenta Instagram {instagram_account_id} no encontrada"
             )
 
-        account = result.data
-
         # Verificar permisos: el usuario debe ser dueño de la cuenta
         if account['user_id'] != current_user['id']:
             raise HTTPException(
@@ -326,11 +183,11 @@ async def sync_instagram_data_deprecated(
     """
     try:
         # Obtener el ID de la cuenta de instagram en nuestra BD
-        result = supabase.table('instagram_accounts').select('id').eq('user_id', current_user['id']).eq('is_active', True).single().execute()
-        if not result.data:
+        account = get_account_context().get_active_for_user(current_user['id'])
+        if not account:
             raise HTTPException(status_code=404, detail="No se encontró una cuenta de Instagram activa para este usuario.")
         
-        instagram_account_id_db = result.data['id']
+        instagram_account_id_db = account['id']
 
         # Añadir la tarea de sincronización para que se ejecute en segundo plano
         background_tasks.add_task(
@@ -399,6 +256,7 @@ async def get_recent_posts(
 
 @router.get("/overview")
 async def get_analytics_overview(
+    background_tasks: BackgroundTasks,
     days: int = 365,
     compare: bool = False,
     current_user: dict = Depends(get_current_user),
@@ -426,7 +284,8 @@ async def get_analytics_overview(
     **Ventajas:**
     - Carga instantánea (~200ms vs ~2-3seg de Instagram API)
     - No consume API calls de Instagram
-    - Datos actualizados automáticamente cada hora via cron job
+    - Datos actualizados automáticamente via cron job (cada 15 min a
+      diario según la actividad de la cuenta)
 
     **Response incluye:**
     - overview: Métricas generales (con growth opcional)
@@ -438,6 +297,13 @@ async def get_analytics_overview(
     - last_sync_at: Timestamp de última sincronización
     """
     try:
+        # Señal para el SyncPriorityPlanner: dashboard abierto recientemente
+        background_tasks.add_task(
+            get_sync_planner().record_dashboard_access,
+            supabase,
+            current_user['id']
+        )
+
         # Inicializar servicio de analytics con el servicio de Instagram inyectado
         analytics_service = AnalyticsService(
             db_client=supabase,
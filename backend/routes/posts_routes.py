@@ -8,11 +8,14 @@ Author: SocialLab
 Date: 2025-01-16
 """
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import asyncio
+import json
 import logging
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from auth.jwt_handler import get_current_user
@@ -21,6 +24,11 @@ from services.publisher.instagram_publisher import (
     InstagramPublisher,
     InstagramPublishError
 )
+from services.publisher.batch_publisher import BatchPublisher
+from services.publisher.publishing_quota import (
+    get_publishing_quota,
+    is_publishing_limit_error
+)
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +53,52 @@ class PublishPostResponse(BaseModel):
     published_at: Optional[datetime] = None
 
 
+class BatchPublishRequest(BaseModel):
+    """Request model for batch publishing."""
+    post_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="IDs of the posts to publish, in publishing order"
+    )
+    post_type: Optional[str] = Field(
+        default=None,
+        description="Overrides the post_type of every post (FEED, REELS, STORY)"
+    )
+
+
+def _mark_post_published(supabase, post_id: int, result: Dict) -> datetime:
+    """Updates a post after it was published to Instagram."""
+    published_at = datetime.utcnow()
+    update_data = {
+        'status': 'published',
+        'instagram_post_id': result['id'],
+        'publication_date': published_at.isoformat(),
+    }
+
+    # Note: instagram_permalink column doesn't exist in schema
+    # Permalink can be generated from instagram_post_id if needed
+
+    supabase.table('posts')\
+        .update(update_data)\
+        .eq('id', post_id)\
+        .execute()
+
+    logger.info(f"Updated post {post_id} status to 'published'")
+    return published_at
+
+
+def _raise_publishing_limit(quota, instagram_account_id: int) -> None:
+    """Raises 429 with the time the account's quota should free up."""
+    retry_after = quota.retry_after(instagram_account_id)
+    seconds = max(1, int((retry_after - datetime.now(timezone.utc)).total_seconds()))
+    raise HTTPException(
+        status_code=429,
+        detail="Instagram content publishing limit reached for this account",
+        headers={'Retry-After': str(seconds)}
+    )
+
+
 @router.post("/{post_id}/publish", response_model=PublishPostResponse)
 async def publish_post_now(
     post_id: int,
@@ -141,6 +195,14 @@ async def publish_post_now(
                 detail="Post must be associated with an Instagram account"
             )
 
+        # Reject before any Graph API work if the account is over quota
+        quota = get_publishing_quota()
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(
+            None, quota.can_publish, instagram_account_id
+        ):
+            _raise_publishing_limit(quota, instagram_account_id)
+
         # Initialize publisher
         publisher = InstagramPublisher()
 
@@ -155,8 +217,9 @@ async def publish_post_now(
             f"to Instagram account {instagram_account_id}"
         )
 
-        # Publish to Instagram
-        result = publisher.publish_post(
+        # Publish to Instagram (container processing is awaited without
+        # blocking the event loop)
+        result = await publisher.publish_post_async(
             media_url=post['media_url'],
             caption=post.get('caption', ''),
             instagram_account_id=instagram_account_id,
@@ -169,22 +232,7 @@ async def publish_post_now(
         )
 
         # Update post in database
-        published_at = datetime.utcnow()
-        update_data = {
-            'status': 'published',
-            'instagram_post_id': result['id'],
-            'publication_date': published_at.isoformat(),
-        }
-
-        # Note: instagram_permalink column doesn't exist in schema
-        # Permalink can be generated from instagram_post_id if needed
-
-        supabase.table('posts')\
-            .update(update_data)\
-            .eq('id', post_id)\
-            .execute()
-
-        logger.info(f"Updated post {post_id} status to 'published'")
+        published_at = _mark_post_published(supabase, post_id, result)
 
         return PublishPostResponse(
             success=True,
@@ -196,6 +244,10 @@ async def publish_post_now(
 
     except InstagramPublishError as e:
         logger.error(f"Instagram API error publishing post {post_id}: {e}")
+        if is_publishing_limit_error(e):
+            _raise_publishing_limit(
+                get_publishing_quota(), post['instagram_account_id']
+            )
         raise HTTPException(
             status_code=502,
             detail=f"Instagram API error: {str(e)}"
@@ -215,6 +267,109 @@ async def publish_post_now(
         )
 
 
+@router.post("/publish-batch")
+async def publish_posts_batch(
+    request: BatchPublishRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Publish several posts to Instagram in one request.
+
+    Posts are grouped by Instagram account: credentials and the content
+    publishing limit are loaded once per account, accounts are published
+    in parallel and the posts of one account are published in the order
+    given. Posts over the account's remaining quota are skipped.
+
+    **Returns:**
+    Streamed NDJSON (`application/x-ndjson`), one line per post as soon
+    as it finishes, then a summary line:
+    ```
+    {"post_id": 1, "success": true, "instagram_post_id": "...",
+     "permalink": "...", "error": null, ...}
+    {"post_id": 2, "success": false, "error": "Post is already published", ...}
+    {"summary": {"total": 2, "published": 1, "failed": 1}}
+    ```
+
+    **Example:**
+    ```bash
+    POST /api/posts/publish-batch
+    {
+      "post_ids": [12, 13, 14]
+    }
+    ```
+    """
+    logger.info(
+        f"User {current_user['id']} batch publishing "
+        f"{len(request.post_ids)} posts"
+    )
+
+    supabase = get_supabase_client()
+
+    # Deduplicate, keeping the requested order
+    post_ids = list(dict.fromkeys(request.post_ids))
+
+    posts_result = supabase.table('posts')\
+        .select('*')\
+        .in_('id', post_ids)\
+        .execute()
+    posts_by_id = {post['id']: post for post in posts_result.data or []}
+
+    # Same checks as publish_post_now, reported per post
+    rejected = []
+    publishable = []
+    for post_id in post_ids:
+        post = posts_by_id.get(post_id)
+        if not post or post['user_id'] != current_user['id']:
+            error = f"Post {post_id} not found"
+        elif not post.get('media_url'):
+            error = "Post must have a media_url to be published"
+        elif post['status'] == 'published':
+            error = "Post is already published"
+        elif not post.get('instagram_account_id'):
+            error = "Post must be associated with an Instagram account"
+        else:
+            publishable.append(post)
+            continue
+
+        rejected.append({
+            'post_id': post_id,
+            'instagram_account_id': post.get('instagram_account_id') if post else None,
+            'success': False,
+            'instagram_post_id': None,
+            'permalink': None,
+            'error': error
+        })
+
+    async def stream_results():
+        published = 0
+
+        for result in rejected:
+            yield json.dumps(result) + "\n"
+
+        async for result in BatchPublisher().publish(
+            publishable,
+            post_type=request.post_type,
+            on_published=lambda post, res: _mark_post_published(
+                supabase, post['id'], res
+            )
+        ):
+            published += 1 if result['success'] else 0
+            yield json.dumps(result) + "\n"
+
+        summary = {
+            'total': len(post_ids),
+            'published': published,
+            'failed': len(post_ids) - published
+        }
+        logger.info(f"Batch publish finished: {summary}")
+        yield json.dumps({'summary': summary}) + "\n"
+
+    return StreamingResponse(
+        stream_results(),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.get("/{post_id}")
 async def get_post(
     post_id: int,
@@ -8,17 +8,26 @@ Date: 2025-01-16
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+import json
 import logging
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator
 
+from auth.jwt_handler import get_current_user
 from services.scheduler.post_scheduler import PostScheduler
+from services.scheduler.dead_letter import ERROR_CLASSES
+from services.scheduler.job_events import get_job_event_bus
+from services.scheduler.job_metrics import get_job_metrics
 from database.supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Seconds between SSE keep-alive comments on an idle stream
+EVENTS_KEEPALIVE_SECONDS = 15
+
 router = APIRouter(prefix="/api/scheduler", tags=["scheduler"])
 
 
@@ -72,6 +81,98 @@ class ReschedulePostRequest(BaseModel):
         return v
 
 
+class BulkScheduleItem(BaseModel):
+    """One post of a bulk schedule request."""
+    post_id: int = Field(..., gt=0, description="ID of the post to schedule")
+    scheduled_time: datetime = Field(
+        ...,
+        description="When to publish (ISO 8601 format, UTC timezone)"
+    )
+    retry_on_failure: bool = Field(
+        default=True,
+        description="Whether to retry on failure"
+    )
+
+
+class BulkScheduleRequest(BaseModel):
+    """Request model for scheduling many posts."""
+    items: List[BulkScheduleItem] = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        description="Posts to schedule (each post at most once)"
+    )
+
+
+class BulkRescheduleItem(BaseModel):
+    """One post of a bulk reschedule request."""
+    post_id: int = Field(..., gt=0, description="ID of the post to reschedule")
+    new_scheduled_time: datetime = Field(
+        ...,
+        description="New publication time (ISO 8601 format, UTC timezone)"
+    )
+
+
+class BulkRescheduleRequest(BaseModel):
+    """Request model for rescheduling many posts."""
+    items: List[BulkRescheduleItem] = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        description="Posts to reschedule (each post at most once)"
+    )
+
+
+class BulkScheduleResult(BaseModel):
+    """Result of one post of a bulk request."""
+    post_id: int
+    success: bool
+    job_id: Optional[str] = None
+    scheduled_time: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class BulkScheduleResponse(BaseModel):
+    """Response model for bulk schedule and reschedule."""
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BulkScheduleResult]
+
+
+def _bulk_schedule(items: List[dict]) -> BulkScheduleResponse:
+    """Runs PostScheduler.schedule_posts() and builds the response."""
+    results = get_scheduler().schedule_posts(items)
+    succeeded = sum(1 for result in results if result['success'])
+    return BulkScheduleResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=[BulkScheduleResult(**result) for result in results]
+    )
+
+
+class ReplayDeadLettersRequest(BaseModel):
+    """Request model for replaying failed publications."""
+    error_class: Optional[str] = Field(
+        default=None,
+        description="Only failures of this class (rate_limit, auth, media, "
+                    "transient, validation, unknown)"
+    )
+    post_ids: Optional[List[int]] = Field(
+        default=None,
+        max_length=500,
+        description="Only these posts"
+    )
+
+    @validator('error_class')
+    def validate_error_class(cls, v):
+        """Ensure the error class exists."""
+        if v is not None and v not in ERROR_CLASSES:
+            raise ValueError(f"error_class must be one of {', '.join(ERROR_CLASSES)}")
+        return v
+
+
 class JobStatusResponse(BaseModel):
     """Response model for job status."""
     job_id: str
@@ -80,6 +181,7 @@ class JobStatusResponse(BaseModel):
     status: str
     retry_count: int
     error_message: Optional[str]
+    timings: Dict[str, Optional[float]] = {}
 
 
 @router.post("/schedule", response_model=SchedulePostResponse)
@@ -142,6 +244,73 @@ async def schedule_post(request: SchedulePostRequest):
         )
 
 
+@router.post("/schedule/bulk", response_model=BulkScheduleResponse)
+async def schedule_posts_bulk(request: BulkScheduleRequest):
+    """
+    Schedule many posts in one request.
+
+    Valid posts are stored in one database transaction and registered
+    in the scheduler in one pass. Invalid posts (not found, no media,
+    time in the past, media not reachable, being published) are
+    reported in their result and do not stop the others.
+
+    **Example:**
+    ```json
+    {
+      "items": [
+        {"post_id": 123, "scheduled_time": "2025-01-17T10:00:00Z"},
+        {"post_id": 124, "scheduled_time": "2025-01-17T18:00:00Z"}
+      ]
+    }
+    ```
+    """
+    try:
+        logger.info(f"Bulk scheduling {len(request.items)} posts")
+
+        return _bulk_schedule([item.dict() for item in request.items])
+
+    except Exception as e:
+        logger.error(f"Error bulk scheduling posts: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to schedule posts: {str(e)}"
+        )
+
+
+@router.put("/reschedule/bulk", response_model=BulkScheduleResponse)
+async def reschedule_posts_bulk(request: BulkRescheduleRequest):
+    """
+    Reschedule many posts in one request (e.g. moving a calendar week).
+
+    Same behaviour as POST /schedule/bulk: one transaction, one pass
+    over the scheduler and one result per post.
+
+    **Example:**
+    ```json
+    {
+      "items": [
+        {"post_id": 123, "new_scheduled_time": "2025-01-24T10:00:00Z"},
+        {"post_id": 124, "new_scheduled_time": "2025-01-24T18:00:00Z"}
+      ]
+    }
+    ```
+    """
+    try:
+        logger.info(f"Bulk rescheduling {len(request.items)} posts")
+
+        return _bulk_schedule([
+            {'post_id': item.post_id, 'scheduled_time': item.new_scheduled_time}
+            for item in request.items
+        ])
+
+    except Exception as e:
+        logger.error(f"Error bulk rescheduling posts: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to reschedule posts: {str(e)}"
+        )
+
+
 @router.delete("/cancel/{post_id}")
 async def cancel_scheduled_post(post_id: int):
     """
@@ -233,11 +402,24 @@ async def reschedule_post(post_id: int, request: ReschedulePostRequest):
 
 
 @router.get("/jobs")
-async def get_scheduled_jobs(status: Optional[str] = None):
+async def get_scheduled_jobs(
+    status: Optional[str] = None,
+    scheduled_from: Optional[datetime] = None,
+    scheduled_to: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Get list of scheduled jobs.
+    Get a page of the current user's scheduled jobs.
 
-    Returns all scheduled jobs, optionally filtered by status.
+    Filters are applied in the database and pages are keyset-paginated
+    on (scheduled_time, id): pass next_cursor to get the next page
+    (null on the last one). Each job includes its timings:
+    lag_seconds, claim_lag_seconds, container_wait_seconds,
+    publish_duration_seconds and end_to_end_seconds (None until the
+    step happened). Finished jobs are archived after
+    SCHEDULED_JOBS_RETENTION_DAYS days.
 
     **Query Parameters:**
     - status (optional): Filter by status
@@ -247,20 +429,35 @@ async def get_scheduled_jobs(status: Optional[str] = None):
       - failed: Jobs that failed after max retries
       - cancelled: Jobs that were cancelled
       - retrying: Jobs that failed and are retrying
+      - missed: Jobs overdue beyond the catch-up window
+    - scheduled_from / scheduled_to (optional): Time range [from, to)
+    - limit: Page size (1-200, default 50)
+    - cursor (optional): next_cursor of the previous page
 
     **Example:**
     ```
-    GET /api/scheduler/jobs?status=pending
+    GET /api/scheduler/jobs?status=pending&limit=20
     ```
     """
     try:
-        jobs = get_scheduler().get_scheduled_jobs(status=status)
+        page = get_scheduler().get_scheduled_jobs(
+            user_id=current_user['id'],
+            status=status,
+            scheduled_from=scheduled_from,
+            scheduled_to=scheduled_to,
+            limit=limit,
+            cursor=cursor
+        )
 
         return {
-            "count": len(jobs),
-            "jobs": jobs
+            "count": len(page['jobs']),
+            "jobs": page['jobs'],
+            "next_cursor": page['next_cursor']
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     except Exception as e:
         logger.error(f"Error getting scheduled jobs: {e}")
         raise HTTPException(
@@ -269,6 +466,218 @@ async def get_scheduled_jobs(status: Optional[str] = None):
         )
 
 
+@router.get("/dead-letters")
+async def get_dead_letters(
+    error_class: Optional[str] = None,
+    status: Optional[str] = "open",
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the current user's publications that ran out of retries.
+
+    Each failure keeps its error class, Graph API error code and the
+    container already created. container_reusable tells whether a
+    replay now would publish that container instead of creating a new
+    one.
+
+    **Query Parameters:**
+    - error_class (optional): rate_limit, auth, media, transient,
+      validation or unknown
+    - status: open (default), replayed or resolved
+    - limit: Max rows (1-200, default 50)
+
+    **Example:**
+    ```
+    GET /api/scheduler/dead-letters?error_class=transient
+    ```
+    """
+    try:
+        dead_letters = get_scheduler().get_dead_letters(
+            user_id=current_user['id'],
+            error_class=error_class,
+            status=status,
+            limit=limit
+        )
+
+        return {
+            "count": len(dead_letters),
+            "dead_letters": dead_letters
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting dead letters: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get dead letters: {str(e)}"
+        )
+
+
+@router.post("/dead-letters/replay")
+async def replay_dead_letters(
+    request: ReplayDeadLettersRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Reschedule the current user's failed publications in one operation.
+
+    Open dead letters (optionally of one error class or some posts) are
+    rescheduled oldest first, paced per account like the catch-up of
+    overdue posts. Containers that reached READY and are still valid
+    are published directly, without processing the media again.
+
+    **Example:**
+    ```json
+    {"error_class": "transient"}
+    ```
+
+    **Returns:**
+    - replayed: Publications rescheduled
+    - containers_reused: Of those, how many reuse their container
+    - skipped: Posts already rescheduled or published since they failed
+    """
+    try:
+        return get_scheduler().replay_failed_posts(
+            error_class=request.error_class,
+            post_ids=request.post_ids,
+            user_id=current_user['id']
+        )
+
+    except Exception as e:
+        logger.error(f"Error replaying dead letters: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to replay dead letters: {str(e)}"
+        )
+
+
+@router.get("/events")
+async def stream_job_events(request: Request, token: str):
+    """
+    Stream the current user's scheduled job state changes (SSE).
+
+    Sends one `job_state` event each time one of the user's posts is
+    scheduled (pending), starts publishing (running), is published
+    (completed), is retried (retrying), fails (failed), is cancelled
+    or is missed. Replaces polling /jobs and /posts/{id}/status.
+
+    EventSource cannot send headers, so the access token goes in the
+    query string. An idle stream gets a keep-alive comment every 15
+    seconds.
+
+    **Event:**
+    ```
+    event: job_state
+    data: {"post_id": 123, "job_id": "post_123", "status": "completed",
+           "at": "...", "instagram_post_id": "..."}
+    ```
+
+    **Example:**
+    ```js
+    new EventSource(`/api/scheduler/events?token=${accessToken}`)
+    ```
+    """
+    current_user = await get_current_user(token)
+    bus = get_job_event_bus()
+
+    async def stream_events():
+        subscription = bus.subscribe(current_user['id'])
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=EVENTS_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                data = {
+                    k: v for k, v in event.items() if k not in ('type', 'user_id')
+                }
+                payload = json.dumps(data, default=str)
+                yield f"event: {event['type']}\ndata: {payload}\n\n"
+        finally:
+            bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@router.get("/executors")
+async def get_executor_metrics():
+    """
+    Get saturation and wait times of the scheduler's executor pools.
+
+    Publish, sync and maintenance jobs run in separate pools, sized with
+    SCHEDULER_PUBLISH_WORKERS, SCHEDULER_SYNC_WORKERS and
+    SCHEDULER_MAINTENANCE_WORKERS.
+
+    **Returns (per pool):**
+    - max_workers, running, queued
+    - saturation: running / max_workers
+    - avg/p95/max_wait_seconds: delay between the scheduled run time
+      and the start of the job
+
+    **Example:**
+    ```
+    GET /api/scheduler/executors
+    ```
+    """
+    try:
+        return {"executors": get_scheduler().get_executor_metrics()}
+
+    except Exception as e:
+        logger.error(f"Error getting executor metrics: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get executor metrics: {str(e)}"
+        )
+
+
+@router.get("/metrics")
+async def get_scheduler_metrics(format: str = "json"):
+    """
+    Get scheduler lag and throughput metrics (internal).
+
+    Histograms are built in this process from the timestamps of each
+    finished job (scheduled, claimed, started, container ready,
+    published):
+    - lag_seconds: start - scheduled time
+    - claim_lag_seconds: claim - scheduled time
+    - container_wait_seconds: container ready - start
+    - publish_duration_seconds: published - start
+    - end_to_end_seconds: published - scheduled time
+    - retries: retry count of published and failed jobs
+
+    **Query Parameters:**
+    - format: json (default) or prometheus (text exposition format)
+
+    **Example:**
+    ```
+    GET /api/scheduler/metrics?format=prometheus
+    ```
+    """
+    try:
+        metrics = get_job_metrics()
+
+        if format == "prometheus":
+            return PlainTextResponse(metrics.to_prometheus())
+
+        return {
+            **metrics.snapshot(),
+            "executors": get_scheduler().get_executor_metrics()
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting scheduler metrics: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get scheduler metrics: {str(e)}"
+        )
+
+
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(job_id: str):
     """
@@ -280,7 +689,8 @@ async def get_job_status(job_id: str):
     - job_id: The job ID (e.g., "post_123")
 
     **Returns:**
-    - Job details including status, retry count, and error message
+    - Job details including status, retry count, error message and
+      timings (also for archived jobs)
     - 404 if job not found
     """
     try:
@@ -300,7 +710,8 @@ async def get_job_status(job_id: str):
             ),
             status=job['status'],
             retry_count=job['retry_count'],
-            error_message=job.get('error_message')
+            error_message=job.get('error_message'),
+            timings=job.get('timings') or {}
         )
 
     except HTTPException:
@@ -393,6 +804,13 @@ async def test_scheduler():
     try:
         # Get APScheduler info
         sch = get_scheduler()
+        if not sch.scheduler:
+            return {
+                "scheduler_running": True,
+                "backend": "queue",
+                "worker_id": sch.queue_worker.worker_id,
+                "message": "Scheduler is operational (scheduled_jobs queue)"
+            }
         running_jobs = sch.scheduler.get_jobs()
 
         return {
@@ -0,0 +1,88 @@
+"""
+Webhook Routes
+
+Endpoints que reciben las notificaciones de Instagram (Meta Webhooks)
+para comentarios, menciones e insights de stories.
+
+- GET  /api/webhooks/instagram: verificación de la suscripción (hub.challenge)
+- POST /api/webhooks/instagram: notificaciones firmadas (X-Hub-Signature-256)
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+import os
+import json
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from services.instagram_webhooks import (
+    SIGNATURE_HEADER,
+    verify_signature,
+    parse_notification,
+    get_webhook_processor
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/webhooks", tags=["Webhooks"])
+
+
+@router.get("/instagram", response_class=PlainTextResponse)
+async def verify_instagram_subscription(
+    hub_mode: str = Query(None, alias="hub.mode"),
+    hub_verify_token: str = Query(None, alias="hub.verify_token"),
+    hub_challenge: str = Query(None, alias="hub.challenge")
+):
+    """
+    Verificación de la suscripción de webhooks de Meta.
+
+    Meta llama a este endpoint al configurar la suscripción y espera
+    recibir hub.challenge si hub.verify_token coincide con
+    INSTAGRAM_WEBHOOK_VERIFY_TOKEN.
+    """
+    expected_token = os.getenv('INSTAGRAM_WEBHOOK_VERIFY_TOKEN')
+
+    if (
+        hub_mode != 'subscribe'
+        or not expected_token
+        or hub_verify_token != expected_token
+    ):
+        logger.warning("Verificación de webhook rechazada")
+        raise HTTPException(status_code=403, detail="Verificación de webhook inválida")
+
+    logger.info("✅ Suscripción de webhook de Instagram verificada")
+    return hub_challenge or ''
+
+
+@router.post("/instagram")
+async def receive_instagram_notification(request: Request):
+    """
+    Recibe notificaciones de cambios de Instagram.
+
+    Verifica la firma con INSTAGRAM_APP_SECRET, encola los eventos y
+    responde inmediatamente (Meta reintenta si no recibe 200 rápido).
+    El refresco del media o cuenta afectada se hace en segundo plano.
+    """
+    body = await request.body()
+
+    app_secret = os.getenv('INSTAGRAM_APP_SECRET')
+    if not verify_signature(body, request.headers.get(SIGNATURE_HEADER), app_secret):
+        logger.warning("Webhook de Instagram con firma inválida")
+        raise HTTPException(status_code=403, detail="Firma inválida")
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON inválido")
+
+    events = parse_notification(payload)
+    enqueued = get_webhook_processor().enqueue(events) if events else 0
+
+    logger.info(
+        f"🔔 Webhook de Instagram recibido: {len(events)} eventos, "
+        f"{enqueued} encolados"
+    )
+
+    return {"received": len(events), "enqueued": enqueued}
@@ -0,0 +1,841 @@
+#!/usr/bin/env python3
+"""
+Banco de pruebas de carga del scheduler de publicaciones.
+
+Ejecuta el PostScheduler real (APScheduler, executors, restauración,
+catch-up, publish_post_job, ContainerMonitor) sin Instagram ni Supabase:
+
+- Supabase se sustituye por un almacén en memoria que implementa las
+  consultas y RPCs que usa el scheduler (claim/complete/fail de jobs,
+  restauración y programación en bloque).
+- La Graph API se sustituye por un publisher falso con latencia,
+  tiempo de procesado de contenedores y tasa de errores configurables.
+- El job store de APScheduler es un SQLite temporal, o un Postgres
+  local con --jobstore-url.
+
+Escenario: se crean --future-posts posts programados en los próximos
+días, se arranca el scheduler (restauración) y después se programan en
+bloque --burst-posts posts para el mismo instante.
+
+Informa del tiempo de restauración, del lag de despacho (inicio real -
+hora programada, p50/p95/p99), del throughput de publicación y de la
+memoria. Con --max-p95-lag / --max-restore-seconds termina con código 1
+si se superan, para detectar regresiones.
+
+Uso:
+    python scripts/benchmark_scheduler.py
+    python scripts/benchmark_scheduler.py --future-posts 10000 --burst-posts 500 \\
+        --latency-ms 300 --error-rate 0.02 --json
+    python scripts/benchmark_scheduler.py --max-p95-lag 30 --max-restore-seconds 60
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.account_context import AccountContextCache  # noqa: E402
+from services.publisher.container_monitor import ContainerMonitor  # noqa: E402
+from services.publisher.instagram_publisher import InstagramPublishError  # noqa: E402
+
+TERMINAL_STATUSES = ('completed', 'failed', 'retrying', 'missed', 'cancelled')
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_datetime(value):
+    """Convierte timestamps ISO para poder compararlos."""
+    if isinstance(value, str) and len(value) >= 19 and value[10] == 'T':
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return value
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class InMemoryQuery:
+    """Query de PostgREST sobre las tablas en memoria."""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.op = 'select'
+        self.payload = None
+        self.filters = []
+        self.order_by = []
+        self.limit_count = None
+        self.single_row = False
+        self.embed_posts = False
+
+    def select(self, columns='*', **kwargs):
+        self.embed_posts = self.table == 'scheduled_jobs' and 'posts' in columns
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = 'insert', payload
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = 'update', payload
+        return self
+
+    def delete(self):
+        self.op = 'delete'
+        return self
+
+    def _filter(self, column, test):
+        def check(row):
+            if '.' in column:
+                embedded, field = column.split('.', 1)
+                value = (self.db.embedded(row, embedded) or {}).get(field)
+            else:
+                value = row.get(column)
+            return test(_as_datetime(value))
+        self.filters.append(check)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v: v == _as_datetime(value))
+
+    def neq(self, column, value):
+        return self._filter(column, lambda v: v != _as_datetime(value))
+
+    def in_(self, column, values):
+        values = [_as_datetime(v) for v in values]
+        return self._filter(column, lambda v: v in values)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v is not None and v > _as_datetime(value))
+
+    def gte(self, column, value):
+        bound = _as_datetime(value)
+        return self._filter(column, lambda v: v is not None and v >= bound)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v: v is not None and v < _as_datetime(value))
+
+    def lte(self, column, value):
+        bound = _as_datetime(value)
+        return self._filter(column, lambda v: v is not None and v <= bound)
+
+    def order(self, column, desc=False):
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def execute(self):
+        with self.db.lock:
+            return Result(self._execute())
+
+    def _execute(self):
+        rows = self.db.tables[self.table]
+
+        if self.op == 'insert':
+            payloads = (
+                self.payload if isinstance(self.payload, list) else [self.payload]
+            )
+            inserted = [self.db.insert(self.table, dict(p)) for p in payloads]
+            return inserted
+
+        matched = [row for row in rows.values() if all(f(row) for f in self.filters)]
+
+        if self.op == 'update':
+            for row in matched:
+                row.update(self.payload)
+            return [dict(row) for row in matched]
+
+        if self.op == 'delete':
+            for row in matched:
+                del rows[row['id']]
+            return matched
+
+        for column, desc in reversed(self.order_by):
+            matched.sort(
+                key=lambda r: (r.get(column) is None, _as_datetime(r.get(column))),
+                reverse=desc
+            )
+        if self.limit_count is not None:
+            matched = matched[:self.limit_count]
+
+        data = []
+        for row in matched:
+            row = dict(row)
+            if self.embed_posts:
+                row['posts'] = self.db.embedded(row, 'posts')
+            data.append(row)
+
+        if self.single_row:
+            return data[0] if data else None
+        return data
+
+
+class InMemorySupabase:
+    """
+    Sustituto de Supabase con las tablas y RPCs que usa el scheduler.
+
+    Las RPCs reproducen la lógica de las migraciones 018-026.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables = {
+            'posts': {},
+            'scheduled_jobs': {},
+            'instagram_accounts': {},
+            'publish_dead_letters': {}
+        }
+        self._ids = {name: 0 for name in self.tables}
+
+    def table(self, name):
+        return InMemoryQuery(self, name)
+
+    def insert(self, table, row):
+        if table == 'scheduled_jobs' and any(
+            job['job_id'] == row['job_id'] for job in self.tables[table].values()
+        ):
+            raise ValueError(f"duplicate job_id {row['job_id']}")
+        self._ids[table] += 1
+        row.setdefault('id', self._ids[table])
+        self.tables[table][row['id']] = row
+        return dict(row)
+
+    def embedded(self, row, name):
+        if name == 'posts':
+            post = self.tables['posts'].get(row.get('post_id'))
+            return dict(post) if post else None
+        return None
+
+    def _job_of(self, post_id, statuses=None):
+        for job in self.tables['scheduled_jobs'].values():
+            if job['post_id'] != post_id:
+                continue
+            if statuses is None or job['status'] in statuses:
+                return job
+        return None
+
+    def rpc(self, name, params):
+        handler = getattr(self, f"_rpc_{name}", None)
+        if handler is None:
+            raise NotImplementedError(f"RPC {name} is not simulated")
+
+        db = self
+
+        class Call:
+            def execute(self):
+                with db.lock:
+                    return Result(handler(**params))
+
+        return Call()
+
+    def _rpc_claim_scheduled_job(self, p_post_id, p_lease_seconds=1200):
+        job = self._job_of(p_post_id, ('pending', 'retrying'))
+        if not job:
+            return None
+
+        now = _now().isoformat()
+        job.update({
+            'status': 'running',
+            'claimed_at': (
+                job['claimed_at']
+                if job.get('locked_by') and job.get('claimed_at') else now
+            ),
+            'started_at': now,
+            'locked_by': job.get('locked_by') or 'post_scheduler',
+            'locked_until': (_now() + timedelta(seconds=p_lease_seconds)).isoformat()
+        })
+        post = self.tables['posts'].get(p_post_id)
+        account = next((
+            a for a in self.tables['instagram_accounts'].values()
+            if post and a['user_id'] == post['user_id'] and a['is_active']
+        ), None)
+        return {
+            'job': dict(job),
+            'post': dict(post) if post else None,
+            'account': account
+        }
+
+    def _rpc_claim_overdue_jobs(self, p_worker_id, p_lease_seconds=60):
+        now = _now()
+        overdue = []
+        for job in self.tables['scheduled_jobs'].values():
+            due_at = job.get('dispatch_at') or job['scheduled_time']
+            if (
+                job.get('job_type') == 'publish_post'
+                and job['status'] in ('pending', 'retrying')
+                and _as_datetime(due_at) < now
+                and not (
+                    job.get('locked_until')
+                    and _as_datetime(job['locked_until']) >= now
+                )
+            ):
+                job.update({
+                    'locked_by': p_worker_id,
+                    'locked_until': (
+                        now + timedelta(seconds=p_lease_seconds)
+                    ).isoformat()
+                })
+                post = self.tables['posts'].get(job['post_id'])
+                overdue.append({
+                    'job_id': job['job_id'],
+                    'post_id': job['post_id'],
+                    'scheduled_time': job['scheduled_time'],
+                    'posts': {'user_id': post and post['user_id']}
+                })
+        return overdue
+
+    def _rpc_complete_scheduled_job(
+        self, p_post_id, p_instagram_post_id, p_container_ready_at=None
+    ):
+        now = _now().isoformat()
+        post = self.tables['posts'].get(p_post_id)
+        if post:
+            post.update({
+                'status': 'published',
+                'instagram_post_id': p_instagram_post_id
+            })
+
+        job = self._job_of(p_post_id)
+        if not job:
+            return None
+        job.update({
+            'status': 'completed',
+            'completed_at': now,
+            'published_at': now,
+            'container_ready_at': p_container_ready_at or job.get('container_ready_at')
+        })
+        return {k: job.get(k) for k in (
+            'scheduled_time', 'claimed_at', 'started_at', 'container_ready_at',
+            'published_at', 'retry_count'
+        )}
+
+    def _rpc_fail_scheduled_job(
+        self, p_post_id, p_error, p_retry_base_minutes=5, p_error_class='unknown',
+        p_error_code=None, p_container_id=None, p_staged_container=None
+    ):
+        job = self._job_of(p_post_id)
+        if not job:
+            return None
+
+        retry_count = job.get('retry_count') or 0
+        if retry_count < job.get('max_retries', 3):
+            job.update({
+                'status': 'retrying',
+                'retry_count': retry_count + 1,
+                'error_message': p_error,
+                'scheduled_time': (
+                    _now() + timedelta(minutes=p_retry_base_minutes * 2 ** retry_count)
+                ).isoformat(),
+                'dispatch_at': None,
+                'prestaged_container': p_staged_container,
+                'locked_by': None,
+                'locked_until': None
+            })
+        else:
+            job.update({
+                'status': 'failed',
+                'error_message': p_error,
+                'completed_at': _now().isoformat()
+            })
+            self.tables['posts'][p_post_id]['status'] = 'failed'
+            self.tables['publish_dead_letters'][p_post_id] = {
+                'id': p_post_id,
+                'post_id': p_post_id,
+                'status': 'open',
+                'error_class': p_error_class,
+                'error_code': p_error_code,
+                'container_id': p_container_id,
+                'staged_container': p_staged_container
+            }
+
+        return {
+            k: job[k]
+            for k in ('status', 'retry_count', 'max_retries', 'scheduled_time')
+        }
+
+    def _rpc_requeue_expired_scheduled_jobs(self, p_limit=100, p_retry_base_minutes=5):
+        expired = [
+            job for job in self.tables['scheduled_jobs'].values()
+            if job['status'] == 'running'
+            and job.get('job_type') == 'publish_post'
+            and job.get('locked_until')
+            and _as_datetime(job['locked_until']) < _now()
+        ][:p_limit]
+        requeued = []
+        for job in expired:
+            staged = job.get('prestaged_container')
+            result = self._rpc_fail_scheduled_job(
+                job['post_id'], 'Lease expired while running (worker lost)',
+                p_retry_base_minutes, 'transient', None,
+                staged and staged.get('container_id'), staged
+            )
+            requeued.append({**result, 'post_id': job['post_id']})
+        return requeued
+
+    def _rpc_restore_orphaned_scheduled_posts(self, p_after):
+        after = _as_datetime(p_after)
+        created = []
+        for post in self.tables['posts'].values():
+            if (
+                post['status'] == 'scheduled'
+                and _as_datetime(post['scheduled_at']) >= after
+                and not self._job_of(post['id'], ('pending', 'retrying', 'running'))
+            ):
+                job = self.insert(
+                    'scheduled_jobs', _new_job(post['id'], post['scheduled_at'])
+                )
+                created.append(
+                    {k: job[k] for k in ('job_id', 'post_id', 'scheduled_time')}
+                )
+        return created
+
+    def _rpc_schedule_posts_bulk(self, p_items):
+        scheduled = []
+        for item in p_items:
+            post = self.tables['posts'].get(item['post_id'])
+            if (
+                not post
+                or post.get('status') == 'published'
+                or self._job_of(item['post_id'], ('running', 'completed'))
+            ):
+                continue
+            post.update({'status': 'scheduled', 'scheduled_at': item['scheduled_time']})
+            job = self._job_of(item['post_id'])
+            new_job = _new_job(
+                item['post_id'], item['scheduled_time'], item['max_retries']
+            )
+            if job:
+                job.update(new_job)
+            else:
+                job = self.insert('scheduled_jobs', new_job)
+            scheduled.append(
+                {k: job[k] for k in ('job_id', 'post_id', 'scheduled_time')}
+            )
+        return scheduled
+
+
+def _new_job(post_id, scheduled_time, max_retries=3):
+    return {
+        'job_id': f"post_{post_id}",
+        'job_type': 'publish_post',
+        'post_id': post_id,
+        'scheduled_time': scheduled_time,
+        'status': 'pending',
+        'retry_count': 0,
+        'max_retries': max_retries,
+        'dispatch_at': None,
+        'prestaged_container': None,
+        'locked_by': None,
+        'claimed_at': None,
+        'started_at': None,
+        'published_at': None
+    }
+
+
+class FakeGraphPublisher:
+    """
+    InstagramPublisher falso: latencia por llamada, procesado del
+    contenedor y errores transitorios configurables.
+    """
+
+    def __init__(self, latency_ms, jitter, processing_seconds, error_rate, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.processing_seconds = processing_seconds
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self, name):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_ms / 1000 * self._random.lognormvariate(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            raise InstagramPublishError(f"[2] Service temporarily unavailable ({name})")
+
+    def verify_media_url_accessibility(self, url, timeout=10, force=False):
+        return True
+
+    def create_publication(
+        self, media_url, caption, instagram_account_id, post_type='FEED',
+        video_url=None
+    ):
+        self._call('create_container')
+        return {
+            'container_id': f"c-{instagram_account_id}-{time.monotonic_ns()}",
+            'ig_user_id': str(instagram_account_id),
+            'instagram_account_id': instagram_account_id,
+            'access_token': 'token',
+            'media_type': post_type,
+            'created_at': _now().isoformat(),
+            'ready_after': time.monotonic() + self.processing_seconds,
+            'checks': 0,
+            'state': 'CREATED'
+        }
+
+    def next_check_delay(self, publication):
+        return max(0.0, min(1.0, publication['ready_after'] - time.monotonic()))
+
+    def check_publication(self, publication):
+        self._call('container_status')
+        publication['checks'] += 1
+        if time.monotonic() >= publication['ready_after']:
+            publication['state'] = 'READY'
+            publication['ready_at'] = _now().isoformat()
+        else:
+            publication['state'] = 'PROCESSING'
+        return publication['state']
+
+    def resume_publication(self, staged):
+        return {
+            **staged,
+            'access_token': 'token',
+            'state': 'READY',
+            'ready_after': 0,
+            'checks': 0
+        }
+
+    def complete_publication(self, publication):
+        self._call('media_publish')
+        return {
+            'id': f"media-{publication['container_id']}",
+            'permalink': '',
+            'media_type': publication['media_type'],
+            'container_ready_at': publication.get('ready_at')
+        }
+
+    @staticmethod
+    def staged_container(publication):
+        return {k: publication.get(k) for k in (
+            'container_id', 'ig_user_id', 'instagram_account_id',
+            'media_type', 'content_hash', 'created_at'
+        )}
+
+
+class UnlimitedQuota:
+    """Cuota de publicación sin límite (la Graph API es falsa)."""
+
+    refresh_interval = timedelta(minutes=30)
+
+    def can_publish(self, account_id):
+        return True
+
+    def retry_after(self, account_id):
+        return _now()
+
+
+def seed_posts(db, accounts, future_posts, horizon_days):
+    """Crea cuentas y posts programados en los próximos días con su job."""
+    for i in range(1, accounts + 1):
+        db.insert('instagram_accounts', {
+            'id': i,
+            'user_id': f"user-{i}",
+            'long_lived_access_token': 'token',
+            'instagram_business_account_id': f"1784{i:06d}",
+            'is_active': True,
+            'expires_at': None
+        })
+
+    start = _now() + timedelta(hours=1)
+    for i in range(future_posts):
+        offset = timedelta(seconds=random.uniform(0, horizon_days * 86400))
+        scheduled_at = (start + offset).isoformat()
+        post = db.insert('posts', {
+            'user_id': f"user-{i % accounts + 1}",
+            'media_url': 'https://cdn.example.com/bench.jpg',
+            'content': 'benchmark',
+            'post_type': 'FEED',
+            'status': 'scheduled',
+            'scheduled_at': scheduled_at,
+            'instagram_account_id': i % accounts + 1
+        })
+        db.insert('scheduled_jobs', _new_job(post['id'], scheduled_at))
+
+
+def create_burst_posts(db, accounts, count):
+    """Posts en borrador que se programan en bloque para el mismo instante."""
+    return [
+        db.insert('posts', {
+            'user_id': f"user-{i % accounts + 1}",
+            'media_url': 'https://cdn.example.com/bench.jpg',
+            'content': 'burst',
+            'post_type': 'FEED',
+            'status': 'draft',
+            'instagram_account_id': i % accounts + 1
+        })['id']
+        for i in range(count)
+    ]
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+
+def summarize(values):
+    return {
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'max': round(max(values), 3) if values else None
+    }
+
+
+def run(args):
+    """Ejecuta el escenario y devuelve el informe."""
+    random.seed(args.seed)
+
+    jobstore_dir = None
+    if not args.jobstore_url:
+        jobstore_dir = tempfile.TemporaryDirectory()
+        args.jobstore_url = f"sqlite:///{jobstore_dir.name}/jobstore.sqlite"
+
+    os.environ.update({
+        'DATABASE_URL': args.jobstore_url,
+        'SCHEDULER_BACKEND': 'apscheduler',
+        'SCHEDULER_PUBLISH_WORKERS': str(args.publish_workers),
+        'PRESTAGE_LEAD_MINUTES': '0',
+        'PUBLISH_MAX_STARTS_PER_MINUTE': str(args.max_starts_per_minute)
+    })
+
+    from services.scheduler import post_scheduler
+
+    db = InMemorySupabase()
+    publisher = FakeGraphPublisher(
+        args.latency_ms, args.jitter, args.processing_seconds, args.error_rate,
+        args.seed
+    )
+    monitor = ContainerMonitor(publisher=publisher, max_workers=args.monitor_workers)
+    accounts = AccountContextCache(db_client=db, ttl_seconds=3600)
+
+    post_scheduler.get_supabase_admin_client = lambda: db
+    post_scheduler.InstagramPublisher = lambda: publisher
+    post_scheduler.get_container_monitor = lambda: monitor
+    post_scheduler.get_publishing_quota = lambda: UnlimitedQuota()
+    post_scheduler.get_account_context = lambda: accounts
+
+    seed_posts(db, args.accounts, args.future_posts, args.horizon_days)
+    burst_ids = create_burst_posts(db, args.accounts, args.burst_posts)
+
+    tracemalloc.start()
+
+    # 1. Arranque y restauración de los jobs futuros
+    started = time.perf_counter()
+    scheduler = post_scheduler.PostScheduler()
+    for thread in threading.enumerate():
+        if thread.name == 'scheduler-restore':
+            thread.join()
+    restore_seconds = time.perf_counter() - started
+    registered = len(scheduler.scheduler.get_jobs())
+
+    # 2. Pico: todos los posts para el mismo instante, en una petición
+    burst_at = _now() + timedelta(seconds=args.burst_delay)
+    started = time.perf_counter()
+    results = scheduler.schedule_posts([
+        {'post_id': post_id, 'scheduled_time': burst_at} for post_id in burst_ids
+    ])
+    bulk_schedule_seconds = time.perf_counter() - started
+    rejected = sum(1 for result in results if not result['success'])
+
+    # 3. Esperar a que todos los jobs del pico terminen (o el timeout)
+    deadline = time.monotonic() + args.burst_delay + args.timeout
+    while time.monotonic() < deadline:
+        with db.lock:
+            jobs = [db._job_of(post_id) for post_id in burst_ids]
+        if all(job and job['status'] in TERMINAL_STATUSES for job in jobs):
+            break
+        time.sleep(0.2)
+
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    scheduler.shutdown(wait=False)
+    monitor.shutdown(timeout=5)
+    if jobstore_dir:
+        jobstore_dir.cleanup()
+
+    scheduled_at = {
+        job['post_id']: _as_datetime(job['scheduled_time']) for job in jobs if job
+    }
+    started_at = [
+        _as_datetime(job['started_at'])
+        for job in jobs if job and job.get('started_at')
+    ]
+    lags = [
+        (_as_datetime(job['started_at']) - burst_at).total_seconds()
+        for job in jobs if job and job.get('started_at')
+    ]
+    published = [
+        _as_datetime(job['published_at']) for job in jobs
+        if job and job['status'] == 'completed'
+    ]
+    end_to_end = [(at - burst_at).total_seconds() for at in published]
+    statuses = {}
+    for job in jobs:
+        status = job['status'] if job else 'missing'
+        statuses[status] = statuses.get(status, 0) + 1
+
+    window = (max(published) - min(started_at)).total_seconds() if published else 0
+
+    return {
+        'config': {
+            'future_posts': args.future_posts,
+            'burst_posts': args.burst_posts,
+            'accounts': args.accounts,
+            'publish_workers': args.publish_workers,
+            'monitor_workers': args.monitor_workers,
+            'latency_ms': args.latency_ms,
+            'processing_seconds': args.processing_seconds,
+            'error_rate': args.error_rate,
+            'max_starts_per_minute': args.max_starts_per_minute,
+            'jobstore': args.jobstore_url.split('://')[0]
+        },
+        'restore': {
+            'seconds': round(restore_seconds, 3),
+            'jobs_registered': registered
+        },
+        'bulk_schedule': {
+            'seconds': round(bulk_schedule_seconds, 3),
+            'rejected': rejected
+        },
+        'burst': {
+            'statuses': statuses,
+            'dispatch_lag_seconds': summarize(lags),
+            'end_to_end_seconds': summarize(end_to_end),
+            'throughput_per_second': (
+                round(len(published) / window, 2) if window > 0 else None
+            ),
+            'graph_api_calls': publisher.calls,
+            'not_finished': len(scheduled_at) - sum(
+                count for status, count in statuses.items()
+                if status in TERMINAL_STATUSES
+            )
+        },
+        'memory': {
+            'python_peak_mb': round(peak_memory / 1024 / 1024, 1),
+            'max_rss_mb': round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            )
+        }
+    }
+
+
+def print_report(report):
+    burst = report['burst']
+    lag = burst['dispatch_lag_seconds']
+    e2e = burst['end_to_end_seconds']
+    print("\n📊 Benchmark del scheduler")
+    print(f"   Config: {report['config']}")
+    print(f"\n⏱️  Restauración: {report['restore']['seconds']}s "
+          f"({report['restore']['jobs_registered']} jobs registrados)")
+    print(f"📥 Programación en bloque: {report['bulk_schedule']['seconds']}s "
+          f"({report['bulk_schedule']['rejected']} rechazados)")
+    print(f"🚀 Pico: {burst['statuses']}")
+    print(f"   Lag de despacho: p50={lag['p50']}s p95={lag['p95']}s "
+          f"p99={lag['p99']}s max={lag['max']}s")
+    print(f"   Extremo a extremo: p50={e2e['p50']}s p95={e2e['p95']}s "
+          f"p99={e2e['p99']}s max={e2e['max']}s")
+    print(f"   Throughput: {burst['throughput_per_second']} publicaciones/s "
+          f"({burst['graph_api_calls']} llamadas a la Graph API falsa)")
+    print(f"💾 Memoria: pico Python {report['memory']['python_peak_mb']} MB, "
+          f"RSS máx. {report['memory']['max_rss_mb']} MB")
+
+
+def check_thresholds(report, args):
+    """Errores de regresión según los umbrales pedidos."""
+    errors = []
+    p95 = report['burst']['dispatch_lag_seconds']['p95']
+    if args.max_p95_lag is not None and (p95 is None or p95 > args.max_p95_lag):
+        errors.append(f"p95 dispatch lag {p95}s > {args.max_p95_lag}s")
+    restore_seconds = report['restore']['seconds']
+    if (
+        args.max_restore_seconds is not None
+        and restore_seconds > args.max_restore_seconds
+    ):
+        errors.append(
+            f"restore {restore_seconds}s > {args.max_restore_seconds}s"
+        )
+    if report['burst']['not_finished']:
+        errors.append(f"{report['burst']['not_finished']} burst jobs did not finish")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark del PostScheduler con Supabase y Graph API simulados"
+    )
+    parser.add_argument('--future-posts', type=int, default=10000)
+    parser.add_argument('--horizon-days', type=float, default=30)
+    parser.add_argument('--burst-posts', type=int, default=500)
+    parser.add_argument('--burst-delay', type=float, default=5,
+                        help='Segundos entre la programación del pico y su hora')
+    parser.add_argument('--accounts', type=int, default=50)
+    parser.add_argument('--publish-workers', type=int, default=5)
+    parser.add_argument('--monitor-workers', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=200,
+                        help='Latencia media de cada llamada a la Graph API')
+    parser.add_argument('--jitter', type=float, default=0.5,
+                        help='Sigma lognormal de la latencia (cola lenta)')
+    parser.add_argument('--processing-seconds', type=float, default=2,
+                        help='Tiempo de procesado de cada contenedor')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fracción de llamadas que fallan con un error transitorio')
+    parser.add_argument('--max-starts-per-minute', type=float, default=0,
+                        help='PUBLISH_MAX_STARTS_PER_MINUTE (0 = sin suavizado)')
+    parser.add_argument('--jobstore-url', default=None,
+                        help='Job store de APScheduler (por defecto SQLite temporal)')
+    parser.add_argument('--timeout', type=float, default=300,
+                        help='Segundos máximos de espera del pico')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true',
+                        help='Imprime el informe en JSON')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Muestra los logs del scheduler '
+                             '(errores simulados incluidos)')
+    parser.add_argument('--max-p95-lag', type=float, default=None)
+    parser.add_argument('--max-restore-seconds', type=float, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+
+    report = run(args)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    errors = check_thresholds(report, args)
+    for error in errors:
+        print(f"❌ {error}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
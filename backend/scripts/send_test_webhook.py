@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Envía una notificación de webhook de Instagram firmada a un backend local.
+
+Permite probar de extremo a extremo el endpoint /api/webhooks/instagram
+sin conexión con Meta: genera el payload con el mismo formato y firma
+(X-Hub-Signature-256) usando INSTAGRAM_APP_SECRET.
+
+Uso:
+    python scripts/send_test_webhook.py --account <ig_business_id> \\
+        --field comments --media <ig_media_id>
+    python scripts/send_test_webhook.py --account <ig_business_id> --field mentions
+"""
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.instagram_webhooks import (  # noqa: E402
+    build_signed_payload,
+    build_test_notification
+)
+
+# Cargar variables de entorno
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Envía un webhook de Instagram firmado al backend local"
+    )
+    parser.add_argument(
+        '--url', default='http://localhost:8000/api/webhooks/instagram'
+    )
+    parser.add_argument(
+        '--account', required=True, help='instagram_business_account_id'
+    )
+    parser.add_argument(
+        '--field',
+        default='comments',
+        choices=['comments', 'mentions', 'story_insights']
+    )
+    parser.add_argument('--media', default=None, help='ID del media afectado')
+    parser.add_argument('--secret', default=os.getenv('INSTAGRAM_APP_SECRET'))
+    args = parser.parse_args()
+
+    if not args.secret:
+        print("❌ INSTAGRAM_APP_SECRET no configurado (usa --secret)")
+        sys.exit(1)
+
+    notification = build_test_notification(args.account, args.field, args.media)
+    body, headers = build_signed_payload(notification, args.secret)
+
+    print(f"📤 Enviando webhook '{args.field}' a {args.url}")
+    print(json.dumps(notification, indent=2))
+
+    response = requests.post(args.url, data=body, headers=headers, timeout=10)
+    print(f"\n📥 {response.status_code}: {response.text}")
+    sys.exit(0 if response.ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Account Context Cache
+
+Caché compartida de las cuentas de Instagram conectadas (token de larga
+duración, ID de Instagram Business, usuario y estado), para no consultar
+instagram_accounts en cada publicación, job programado, petición de
+analytics o webhook.
+
+- Las entradas caducan a los ACCOUNT_CONTEXT_TTL_SECONDS (default 300)
+- invalidate() las descarta explícitamente: callback de OAuth, refresco
+  de token, desactivación de la cuenta o token rechazado por Instagram
+- Solo se cachean cuentas encontradas (nunca "no existe")
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_CONTEXT_FIELDS = (
+    'id, user_id, long_lived_access_token, instagram_business_account_id, '
+    'is_active, expires_at'
+)
+
+
+class AccountContextCache:
+    """
+    Caché TTL de cuentas de Instagram con índices por ID, usuario e
+    ID de Instagram Business.
+    """
+
+    def __init__(self, db_client=None, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            db_client: Cliente de Supabase (por defecto, cliente admin)
+            ttl_seconds: Vida de cada entrada en segundos
+        """
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('ACCOUNT_CONTEXT_TTL_SECONDS', '300'))
+
+        self._db_client = db_client
+        self.ttl_seconds = ttl_seconds
+        self._accounts: Dict[int, Dict] = {}    # id → {'account', 'loaded_at'}
+        self._by_user: Dict[str, int] = {}      # user_id → id (cuenta activa)
+        self._by_business_id: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def db_client(self):
+        if self._db_client is None:
+            from database.supabase_client import get_supabase_admin_client
+            self._db_client = get_supabase_admin_client()
+        return self._db_client
+
+    def _cached(self, account_id: Optional[int]) -> Optional[Dict]:
+        # Caller must hold self._lock
+        entry = self._accounts.get(account_id)
+        if not entry:
+            return None
+        if time.monotonic() - entry['loaded_at'] > self.ttl_seconds:
+            self._drop(account_id)
+            return None
+        return entry['account']
+
+    def _drop(self, account_id: int) -> None:
+        # Caller must hold self._lock
+        entry = self._accounts.pop(account_id, None)
+        if not entry:
+            return
+        account = entry['account']
+        if self._by_user.get(account.get('user_id')) == account_id:
+            self._by_user.pop(account.get('user_id'), None)
+        business_id = account.get('instagram_business_account_id')
+        if self._by_business_id.get(business_id) == account_id:
+            self._by_business_id.pop(business_id, None)
+
+    def _store(self, account: Dict) -> Dict:
+        with self._lock:
+            self._accounts[account['id']] = {
+                'account': account,
+                'loaded_at': time.monotonic()
+            }
+            if account.get('is_active') is not False:
+                self._by_user[account['user_id']] = account['id']
+                business_id = account['instagram_business_account_id']
+                self._by_business_id[business_id] = account['id']
+        return account
+
+    def _load(self, column: str, value, active_only: bool) -> Optional[Dict]:
+        query = self.db_client.table('instagram_accounts')\
+            .select(ACCOUNT_CONTEXT_FIELDS)\
+            .eq(column, value)
+        if active_only:
+            query = query.eq('is_active', True)
+
+        result = query.limit(1).execute()
+        if not result.data:
+            return None
+        return self._store(result.data[0])
+
+    def get_by_id(self, account_id: int) -> Optional[Dict]:
+        """Cuenta por ID interno (activa o no)."""
+        with self._lock:
+            account = self._cached(account_id)
+        return account or self._load('id', account_id, active_only=False)
+
+    def get_active_for_user(self, user_id: str) -> Optional[Dict]:
+        """Cuenta activa de un usuario de SocialLab."""
+        with self._lock:
+            account = self._cached(self._by_user.get(user_id))
+        return account or self._load('user_id', user_id, active_only=True)
+
+    def get_by_business_id(self, instagram_business_account_id: str) -> Optional[Dict]:
+        """Cuenta activa por ID de Instagram Business (webhooks)."""
+        with self._lock:
+            account = self._cached(
+                self._by_business_id.get(instagram_business_account_id)
+            )
+        return account or self._load(
+            'instagram_business_account_id',
+            instagram_business_account_id,
+            active_only=True
+        )
+
+    def put(self, account: Dict) -> Dict:
+        """
+        Cachea una cuenta ya leída por otra consulta (p. ej. la RPC
+        claim_scheduled_job), con los campos de ACCOUNT_CONTEXT_FIELDS.
+        """
+        return self._store(account)
+
+    def invalidate(
+        self,
+        account_id: Optional[int] = None,
+        user_id: Optional[str] = None,
+        instagram_business_account_id: Optional[str] = None
+    ) -> None:
+        """
+        Descarta las cuentas cacheadas que coincidan con cualquiera de
+        los criterios.
+
+        Llamar tras el callback de OAuth, un refresco de token, la
+        desactivación de una cuenta o un token rechazado al publicar
+        (post_scheduler._handle_publish_failure).
+        """
+        with self._lock:
+            to_drop = {
+                cached_id for cached_id, entry in self._accounts.items()
+                if cached_id == account_id
+                or (user_id is not None and entry['account'].get('user_id') == user_id)
+                or (
+                    instagram_business_account_id is not None
+                    and entry['account'].get('instagram_business_account_id')
+                    == instagram_business_account_id
+                )
+            }
+            for cached_id in to_drop:
+                self._drop(cached_id)
+            if user_id is not None:
+                self._by_user.pop(user_id, None)
+
+        if to_drop:
+            logger.info(f"🔄 Contexto de cuentas invalidado: {sorted(to_drop)}")
+
+    def clear(self) -> None:
+        """Vacía la caché."""
+        with self._lock:
+            self._accounts.clear()
+            self._by_user.clear()
+            self._by_business_id.clear()
+
+
+# Instancia global de la caché
+account_context_cache = None
+
+
+def get_account_context() -> AccountContextCache:
+    """Obtiene instancia singleton de la caché de cuentas."""
+    global account_context_cache
+    if account_context_cache is None:
+        account_context_cache = AccountContextCache()
+    return account_context_cache
+
+
+def invalidate_account_context(**criteria) -> None:
+    """Atajo para get_account_context().invalidate(...)."""
+    get_account_context().invalidate(**criteria)
@@ -4,5 +4,6 @@ Analytics Service Package
 Servicios de análisis y métricas de Instagram
 """
 from .analytics_service import AnalyticsService
+from .account_sync import full_sync_account
 
-__all__ = ['AnalyticsService']
+__all__ = ['AnalyticsService', 'full_sync_account']
@@ -0,0 +1,131 @@
+"""
+Account Sync
+
+Sincronización completa de una cuenta de Instagram (métricas de cuenta,
+audiencia y posts). Se usa desde el endpoint /api/analytics/sync y desde
+el worker de sincronización independiente (services.sync_worker).
+
+Author: SocialLab
+Date: 2025-01-19
+"""
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def full_sync_account(instagram_service, db_client, user_id, instagram_account_id_db):
+    """
+    Realiza una sincronización completa: métricas de cuenta, audiencia y posts.
+
+    Guarda datos en:
+    - instagram_accounts (métricas básicas)
+    - instagram_account_snapshots (snapshot diario)
+    - audience_demographics (demografía)
+    - online_followers_data (actividad por hora)
+    - posts + post_performance (contenido)
+
+    Snapshot, demografía y actividad se guardan juntos con la RPC
+    replace_audience_state (migración 012).
+    """
+    today = datetime.utcnow().date()
+    snapshot_data = None
+
+    # 1. Sincronizar métricas principales de la cuenta (15+ métricas)
+    logger.info(f"🔄 Sincronizando métricas de cuenta {instagram_account_id_db}")
+    try:
+        # Actualizar tabla principal instagram_accounts
+        account_insights = instagram_service.refresh_account_metrics(
+            db_client, instagram_account_id_db
+        )
+
+        # Preparar snapshot diario para instagram_account_snapshots
+        # NOTA: impressions NO existe en account-level insights de Instagram API
+        # account_insights viene de get_account_insights() que incluye perfil + métricas
+        snapshot_data = {
+            "follower_count": account_insights.get("follower_count", 0),  # Del perfil
+            "following_count": 0,  # No disponible en API básica
+            "media_count": account_insights.get("media_count", 0),  # Del perfil
+            "reach": account_insights.get("reach", 0),  # De insights
+            "impressions": 0,  # No disponible en account-level (solo media-level)
+            # De insights (últimos 7 días)
+            "profile_views": account_insights.get("profile_views", 0),
+            "website_clicks": 0,  # No incluida en get_account_insights básico
+            "email_contacts": 0,  # Requiere configuración especial
+            "phone_call_clicks": 0,  # Requiere configuración especial
+            "text_message_clicks": 0,  # Requiere configuración especial
+            "get_directions_clicks": 0  # Requiere configuración especial
+        }
+
+    except Exception as e:
+        logger.error(
+            f"❌ Error sincronizando métricas de cuenta {instagram_account_id_db}: {e}"
+        )
+
+    # 2. Obtener datos de audiencia (demografía + actividad)
+    logger.info(
+        f"🔄 Obteniendo datos de audiencia para cuenta {instagram_account_id_db}"
+    )
+    demographics = {}
+    online_hours = None
+    try:
+        audience_insights = instagram_service.get_audience_insights()
+        logger.info(f"📊 DEBUG audience_insights retornado: {audience_insights}")
+
+        for metric_type, data in (audience_insights.get('demographics') or {}).items():
+            entries = len(data) if isinstance(data, dict) else 0
+            logger.info(f"📊 DEBUG {metric_type}: {entries} entradas")
+            # Solo guardar si hay datos reales (no dict vacío)
+            if data and len(data) > 0:
+                demographics[metric_type] = data
+            else:
+                logger.warning(f"⚠️  {metric_type} está vacío, omitiendo...")
+
+        # Solo guardar si hay datos reales (no dict vacío {})
+        online_hours = audience_insights.get('online_hours') or None
+        if not online_hours:
+            logger.warning(
+                "⚠️  No hay datos de actividad de seguidores disponibles aún"
+            )
+
+    except Exception as e:
+        logger.error(f"❌ Error obteniendo datos de audiencia: {e}")
+
+    # Guardar snapshot + demografía + actividad en una sola llamada RPC.
+    # replace_audience_state (migración 012) hace upsert de todo dentro de
+    # una transacción: 1 round trip en lugar de hasta 8 delete + insert, y
+    # sin ventana en la que las filas desaparecen para los lectores.
+    if snapshot_data or demographics or online_hours:
+        try:
+            result = db_client.rpc('replace_audience_state', {
+                'p_instagram_account_id': instagram_account_id_db,
+                'p_sync_date': today.isoformat(),
+                'p_snapshot': snapshot_data,
+                'p_demographics': demographics,
+                'p_online_hours': online_hours  # Supabase maneja JSONB automáticamente
+            }).execute()
+            saved = result.data or {}
+            logger.info(
+                f"✅ Estado de audiencia guardado: "
+                f"snapshot={saved.get('snapshot_saved')}, "
+                f"demografía={saved.get('demographics_saved')} métricas, "
+                f"actividad={saved.get('online_followers_saved')}"
+            )
+        except Exception as e:
+            logger.error(f"❌ Error guardando estado de audiencia: {e}")
+
+    # 3. Sincronizar posts y su performance
+    logger.info(f"🔄 Sincronizando posts para cuenta {instagram_account_id_db}")
+    try:
+        instagram_service.sync_posts_to_database(
+            db_client=db_client,
+            user_id=user_id,
+            instagram_account_id_db=instagram_account_id_db
+        )
+        logger.info("✅ Posts sincronizados correctamente")
+    except Exception as e:
+        logger.error(f"❌ Error sincronizando posts: {e}")
+
+    logger.info(
+        f"✅ Sincronización completa finalizada para cuenta {instagram_account_id_db}"
+    )
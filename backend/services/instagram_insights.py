@@ -16,6 +16,11 @@ class InstagramInsightsService:
     """Servicio para interactuar con Instagram Graph API y obtener insights"""
 
     BASE_URL = "https://graph.facebook.com/v24.0"
+    MEDIA_FIELDS = (
+        'id,caption,media_type,media_url,permalink,timestamp,'
+        'like_count,comments_count'
+    )
+    MEDIA_INSIGHT_METRICS = ['reach', 'saved', 'total_interactions', 'views']
 
     def __init__(self, access_token: str, instagram_account_id: str):
         self.access_token = access_token
@@ -306,7 +311,7 @@ class InstagramInsightsService:
     def get_media_list(self, limit: int = 25) -> List[Dict]:
         endpoint = f"{self.instagram_account_id}/media"
         params = {
-            'fields': 'id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count',
+            'fields': self.MEDIA_FIELDS,
             'limit': min(limit, 100)
         }
         data = self._make_request(endpoint, params)
@@ -314,12 +319,19 @@ class InstagramInsightsService:
 
     def get_media_insights(self, media_id: str) -> Dict:
         endpoint = f"{media_id}/insights"
-        metrics = ['reach', 'saved', 'total_interactions', 'views']
-        params = {'metric': ','.join(metrics)}
+        params = {'metric': ','.join(self.MEDIA_INSIGHT_METRICS)}
         data = self._make_request(endpoint, params)
+        return self._parse_media_insights(data.get('data', []))
 
+    @staticmethod
+    def _parse_media_insights(items: List[Dict]) -> Dict:
+        """
+        Convierte la respuesta de insights de un media (bien del endpoint
+        /{media_id}/insights o bien del campo expandido insights.metric(...))
+        en un diccionario plano {métrica: valor}.
+        """
         insights = {}
-        for item in data.get('data', []):
+        for item in items or []:
             metric_name = item.get('name')
             values = item.get('values', [])
             if values:
@@ -334,28 +346,104 @@ class InstagramInsightsService:
 
         return insights
 
-    def _get_all_media_paginated(self) -> List[Dict]:
+    def _get_all_media_paginated(self, include_insights: bool = False) -> List[Dict]:
+        """
+        Obtiene todos los media de la cuenta paginando con cursores.
+
+        Con include_insights=True se pide el campo expandido
+        insights.metric(...) en cada página, de modo que las métricas de
+        cada post llegan en la misma respuesta (una petición por página en
+        lugar de una por post). Si la expansión falla en una página (la API
+        rechaza la página completa cuando algún media no soporta una
+        métrica), esa página se vuelve a pedir sin expansión y sus posts
+        quedan sin 'inline_insights' para que el llamador use
+        get_media_insights() solo con ellos.
+
+        Returns:
+            Lista de media; con include_insights, los que tienen métricas
+            inline llevan la clave 'inline_insights'.
+        """
         all_media = []
         endpoint = f"{self.instagram_account_id}/media"
-        params = {
-            'fields': 'id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count',
-            'limit': 100
-        }
-        while endpoint:
-            try:
-                data = self._make_request(endpoint, params if not all_media else {})
-                media = data.get('data', [])
-                all_media.extend(media)
-                endpoint = data.get('paging', {}).get('next')
-                params = {}
-            except Exception as e:
-                logger.error(f"❌ Error durante la paginación de media: {e}")
+        base_fields = self.MEDIA_FIELDS
+        expanded_fields = (
+            f"{base_fields},insights.metric({','.join(self.MEDIA_INSIGHT_METRICS)})"
+        )
+        after = None
+        expansion_failures = 0
+
+        while True:
+            params = {'limit': 100}
+            if after:
+                params['after'] = after
+
+            data = None
+            if include_insights:
+                try:
+                    data = self._make_request(
+                        endpoint, {**params, 'fields': expanded_fields}
+                    )
+                except Exception as e:
+                    expansion_failures += 1
+                    logger.warning(
+                        f"⚠️  Expansión de insights falló en página "
+                        f"{expansion_failures}, "
+                        f"reintentando sin expansión: {e}"
+                    )
+
+            if data is None:
+                try:
+                    data = self._make_request(
+                        endpoint, {**params, 'fields': base_fields}
+                    )
+                except Exception as e:
+                    logger.error(f"❌ Error durante la paginación de media: {e}")
+                    break
+
+            for media in data.get('data', []):
+                raw_insights = media.pop('insights', None)
+                if raw_insights is not None:
+                    media['inline_insights'] = self._parse_media_insights(
+                        raw_insights.get('data', [])
+                    )
+                all_media.append(media)
+
+            paging = data.get('paging', {})
+            after = paging.get('cursors', {}).get('after')
+            if not paging.get('next') or not after:
                 break
+
+        if include_insights:
+            inline_count = sum(1 for m in all_media if 'inline_insights' in m)
+            logger.info(
+                f"📊 Media paginados: {len(all_media)} "
+                f"({inline_count} con insights inline, "
+                f"{expansion_failures} páginas sin expansión)"
+            )
         return all_media
 
-    def sync_posts_to_database(self, db_client, user_id: str, instagram_account_id_db: int):
+    def sync_posts_to_database(
+        self,
+        db_client,
+        user_id: str,
+        instagram_account_id_db: int,
+        expand_insights: bool = True
+    ):
+        """
+        Sincroniza posts y métricas de la cuenta en la base de datos.
+
+        Args:
+            db_client: Cliente de Supabase
+            user_id: ID del usuario dueño de la cuenta
+            instagram_account_id_db: ID interno de la cuenta de Instagram
+            expand_insights: Si True, pide las métricas de cada post dentro
+                de la paginación de /media (field expansion) y solo hace
+                llamadas individuales para los posts sin insights inline.
+        """
         logger.info("🚀 Iniciando sincronización de posts...")
-        all_posts_from_api = self._get_all_media_paginated()
+        all_posts_from_api = self._get_all_media_paginated(
+            include_insights=expand_insights
+        )
         if not all_posts_from_api:
             logger.warning("⚠️  No se encontraron posts en la API para sincronizar.")
             return
@@ -403,6 +491,7 @@ class InstagramInsightsService:
             cutoff_date = datetime.now() - timedelta(days=90)
             recent_posts_count = 0
             posts_with_insights = 0
+            per_post_insight_calls = 0
 
             for post_data in all_posts_from_api:
                 instagram_post_id = post_data['id']
@@ -425,7 +514,10 @@ class InstagramInsightsService:
                 if post_date and post_date.replace(tzinfo=None) > cutoff_date:
                     recent_posts_count += 1
                     try:
-                        insights = self.get_media_insights(instagram_post_id)
+                        insights = post_data.get('inline_insights')
+                        if insights is None:
+                            insights = self.get_media_insights(instagram_post_id)
+                            per_post_insight_calls += 1
                         shares = insights.get('shares', 0)
                         saves = insights.get('saved', 0)
                         impressions = insights.get('impressions', 0)
@@ -451,7 +543,8 @@ class InstagramInsightsService:
             logger.info(
                 f"📊 Posts analizados: {len(all_posts_from_api)} total, "
                 f"{recent_posts_count} recientes (<90 días), "
-                f"{posts_with_insights} con insights disponibles"
+                f"{posts_with_insights} con insights disponibles, "
+                f"{per_post_insight_calls} llamadas individuales de insights"
             )
 
             if performance_to_upsert:
@@ -475,6 +568,114 @@ class InstagramInsightsService:
 
         logger.info(f"✅ Sincronización de posts completada: {len(posts_to_upsert)} posts procesados")
 
+    def refresh_media(self, db_client, instagram_media_id: str) -> Optional[Dict]:
+        """
+        Refresca las métricas de un único post (refresco dirigido, p.ej.
+        desde un webhook de comentarios) sin re-sincronizar la cuenta.
+
+        Pide el media con insights expandidos en una sola petición y, si
+        la expansión falla, hace la llamada de insights por separado.
+
+        Args:
+            db_client: Cliente de Supabase
+            instagram_media_id: ID del media en Instagram
+
+        Returns:
+            Fila de post_performance guardada, o None si el post no existe
+            en la base de datos
+        """
+        post_result = db_client.table('posts')\
+            .select('id')\
+            .eq('instagram_post_id', instagram_media_id)\
+            .execute()
+        if not post_result.data:
+            logger.info(
+                f"ℹ️  Media {instagram_media_id} no está en BD, se omite el refresco"
+            )
+            return None
+
+        internal_post_id = post_result.data[0]['id']
+        metrics = ','.join(self.MEDIA_INSIGHT_METRICS)
+        expanded_fields = f"{self.MEDIA_FIELDS},insights.metric({metrics})"
+        try:
+            media = self._make_request(
+                instagram_media_id, {'fields': expanded_fields}
+            )
+            insights = self._parse_media_insights(
+                media.get('insights', {}).get('data', [])
+            )
+        except Exception:
+            media = self._make_request(
+                instagram_media_id, {'fields': self.MEDIA_FIELDS}
+            )
+            try:
+                insights = self.get_media_insights(instagram_media_id)
+            except Exception as e:
+                logger.warning(
+                    f"⚠️  No se pudieron obtener insights para "
+                    f"{instagram_media_id}: {e}"
+                )
+                insights = {}
+
+        likes = media.get('like_count', 0)
+        comments = media.get('comments_count', 0)
+        shares = insights.get('shares', 0)
+        saves = insights.get('saved', 0)
+        perf_data = {
+            'post_id': internal_post_id,
+            'likes': likes,
+            'comments': comments,
+            'shares': shares,
+            'saves': saves,
+            'reach': insights.get('reach', 0),
+            'impressions': insights.get('impressions', 0),
+            'total_interactions': likes + comments + shares + saves,
+            'last_synced_at': datetime.now().isoformat()
+        }
+        db_client.table('post_performance')\
+            .upsert(perf_data, on_conflict='post_id')\
+            .execute()
+        logger.info(f"✅ Métricas del media {instagram_media_id} refrescadas")
+        return perf_data
+
+    def refresh_account_metrics(self, db_client, instagram_account_id_db: int) -> Dict:
+        """
+        Refresca las métricas básicas de la cuenta en instagram_accounts.
+
+        Args:
+            db_client: Cliente de Supabase
+            instagram_account_id_db: ID interno de la cuenta de Instagram
+
+        Returns:
+            Insights de la cuenta obtenidos de la API (ver get_account_insights)
+        """
+        # Obtener datos básicos del perfil + métricas (últimos 7 días por defecto)
+        account_insights = self.get_account_insights(days_back=7)
+
+        # Log para debug: ver qué métricas obtuvimos
+        logger.info(f"📊 Métricas obtenidas: "
+                    f"followers={account_insights.get('follower_count')}, "
+                    f"reach={account_insights.get('reach')}, "
+                    f"profile_views={account_insights.get('profile_views')}, "
+                    f"interactions={account_insights.get('total_interactions')}")
+
+        update_data = {
+            "followers_count": account_insights.get("follower_count", 0),
+            "reach": account_insights.get("reach", 0),
+            "profile_views": account_insights.get("profile_views", 0),
+            "username": account_insights.get("username", ""),
+            "account_name": account_insights.get("name", ""),
+            "profile_picture_url": account_insights.get("profile_picture_url", ""),
+            "last_sync_at": datetime.now().isoformat(),
+        }
+        db_client.table("instagram_accounts")\
+            .update(update_data)\
+            .eq("id", instagram_account_id_db)\
+            .execute()
+        logger.info(f"✅ Cuenta {instagram_account_id_db} actualizada")
+
+        return account_insights
+
     def get_top_posts(self, limit: int = 10) -> List[Dict]:
         """
         Obtener los posts con mejor engagement
@@ -0,0 +1,317 @@
+"""
+Instagram Webhooks Service
+
+Recepción de notificaciones de cambios de Instagram (Meta Webhooks):
+verificación de firma, parseo de eventos y cola de refrescos dirigidos.
+
+En lugar de esperar a la sincronización periódica, cada evento dispara
+un refresco del media o de la cuenta afectada a través de
+InstagramInsightsService:
+- comments, story_insights → refresh_media(media_id)
+- mentions                 → refresh_account_metrics()
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import hmac
+import json
+import hashlib
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Hub-Signature-256'
+
+# Campos de webhook soportados y tipo de refresco que disparan
+MEDIA_REFRESH_FIELDS = {'comments', 'story_insights'}
+ACCOUNT_REFRESH_FIELDS = {'mentions'}
+
+
+def compute_signature(payload: bytes, app_secret: str) -> str:
+    """Calcula la firma 'sha256=<hex>' que Meta envía en X-Hub-Signature-256."""
+    digest = hmac.new(
+        app_secret.encode('utf-8'),
+        payload,
+        hashlib.sha256
+    ).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(
+    payload: bytes,
+    signature_header: Optional[str],
+    app_secret: str
+) -> bool:
+    """
+    Verifica la firma de un webhook de Meta.
+
+    Args:
+        payload: Cuerpo crudo de la petición (bytes, sin re-serializar)
+        signature_header: Valor de X-Hub-Signature-256
+        app_secret: App secret de la app de Meta
+
+    Returns:
+        True si la firma es válida
+    """
+    if not signature_header or not app_secret:
+        return False
+    expected = compute_signature(payload, app_secret)
+    return hmac.compare_digest(expected, signature_header.strip())
+
+
+def build_signed_payload(
+    payload: Dict,
+    app_secret: str
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Genera un payload firmado igual que Meta (para pruebas locales).
+
+    Args:
+        payload: Notificación de webhook (dict)
+        app_secret: App secret con el que firmar
+
+    Returns:
+        (cuerpo en bytes, headers para enviar con la petición)
+    """
+    body = json.dumps(payload).encode('utf-8')
+    headers = {
+        'Content-Type': 'application/json',
+        SIGNATURE_HEADER: compute_signature(body, app_secret)
+    }
+    return body, headers
+
+
+def build_test_notification(
+    instagram_business_account_id: str,
+    field: str,
+    media_id: Optional[str] = None
+) -> Dict:
+    """
+    Construye una notificación de ejemplo con el formato de Meta.
+
+    Args:
+        instagram_business_account_id: ID de la cuenta de Instagram Business
+        field: comments, mentions o story_insights
+        media_id: ID del media afectado
+
+    Returns:
+        Notificación con la estructura object/entry/changes
+    """
+    if field == 'comments':
+        value = {
+            'id': 'test-comment-id',
+            'text': 'Comentario de prueba',
+            'media': {'id': media_id}
+        }
+    elif field == 'mentions':
+        value = {'media_id': media_id, 'comment_id': 'test-comment-id'}
+    else:
+        value = {'media_id': media_id, 'reach': 0, 'impressions': 0}
+
+    return {
+        'object': 'instagram',
+        'entry': [{
+            'id': instagram_business_account_id,
+            'time': 0,
+            'changes': [{'field': field, 'value': value}]
+        }]
+    }
+
+
+def parse_notification(payload: Dict) -> List[Dict]:
+    """
+    Convierte una notificación de Meta en eventos normalizados.
+
+    Args:
+        payload: Cuerpo JSON del webhook
+
+    Returns:
+        Lista de eventos {'instagram_business_account_id', 'field',
+        'media_id', 'refresh'} donde refresh es 'media' o 'account'.
+        Los campos no soportados se ignoran.
+    """
+    if payload.get('object') != 'instagram':
+        return []
+
+    events = []
+    for entry in payload.get('entry', []):
+        account_id = str(entry.get('id', ''))
+        for change in entry.get('changes', []):
+            field = change.get('field')
+            value = change.get('value') or {}
+
+            media_id = value.get('media_id')
+            if not media_id and isinstance(value.get('media'), dict):
+                media_id = value['media'].get('id')
+
+            if field in MEDIA_REFRESH_FIELDS and media_id:
+                refresh = 'media'
+            elif field in ACCOUNT_REFRESH_FIELDS or field in MEDIA_REFRESH_FIELDS:
+                refresh = 'account'
+            else:
+                logger.debug(f"Campo de webhook no soportado: {field}")
+                continue
+
+            events.append({
+                'instagram_business_account_id': account_id,
+                'field': field,
+                'media_id': str(media_id) if media_id else None,
+                'refresh': refresh
+            })
+
+    return events
+
+
+class InstagramWebhookProcessor:
+    """
+    Cola en memoria de refrescos disparados por webhooks.
+
+    - Un hilo worker procesa los eventos fuera del request HTTP
+    - Eventos repetidos del mismo media/cuenta pendientes se agrupan
+      (una ráfaga de comentarios = un solo refresco)
+    """
+
+    def __init__(
+        self,
+        db_client=None,
+        service_factory: Optional[Callable] = None,
+        account_context=None
+    ):
+        """
+        Args:
+            db_client: Cliente de Supabase (por defecto, cliente admin)
+            service_factory: Callable(access_token, ig_account_id) que crea
+                el servicio de insights (por defecto InstagramInsightsService)
+            account_context: AccountContextCache (por defecto, una caché
+                sobre db_client si se indica, o la caché compartida)
+        """
+        self._db_client = db_client
+        self._service_factory = service_factory
+        self._account_context = account_context
+        self._queue: "queue.Queue[Dict]" = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def db_client(self):
+        if self._db_client is None:
+            from database.supabase_client import get_supabase_admin_client
+            self._db_client = get_supabase_admin_client()
+        return self._db_client
+
+    @property
+    def account_context(self):
+        if self._account_context is None:
+            from services.account_context import (
+                AccountContextCache,
+                get_account_context
+            )
+            if self._db_client is not None:
+                self._account_context = AccountContextCache(db_client=self._db_client)
+            else:
+                self._account_context = get_account_context()
+        return self._account_context
+
+    def _create_service(self, access_token: str, ig_account_id: str):
+        if self._service_factory is None:
+            from services.instagram_insights import InstagramInsightsService
+            self._service_factory = InstagramInsightsService
+        return self._service_factory(access_token, ig_account_id)
+
+    @staticmethod
+    def _event_key(event: Dict) -> Tuple:
+        return (
+            event['instagram_business_account_id'],
+            event['refresh'],
+            event.get('media_id')
+        )
+
+    def enqueue(self, events: List[Dict]) -> int:
+        """
+        Encola eventos para refresco.
+
+        Returns:
+            Número de eventos encolados (sin contar duplicados pendientes)
+        """
+        enqueued = 0
+        with self._lock:
+            for event in events:
+                key = self._event_key(event)
+                if key in self._pending:
+                    continue
+                self._pending.add(key)
+                self._queue.put(event)
+                enqueued += 1
+            self._ensure_worker()
+        return enqueued
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run,
+                name='instagram-webhook-worker',
+                daemon=True
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                with self._lock:
+                    self._pending.discard(self._event_key(event))
+                self.process_event(event)
+            except Exception as e:
+                logger.error(f"❌ Error procesando evento de webhook {event}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def join(self) -> None:
+        """Espera a que se procesen todos los eventos encolados."""
+        self._queue.join()
+
+    def _get_account(self, instagram_business_account_id: str) -> Optional[Dict]:
+        return self.account_context.get_by_business_id(instagram_business_account_id)
+
+    def process_event(self, event: Dict) -> None:
+        """Ejecuta el refresco dirigido de un evento."""
+        account = self._get_account(event['instagram_business_account_id'])
+        if not account:
+            logger.warning(
+                f"⚠️  Webhook para cuenta desconocida o inactiva: "
+                f"{event['instagram_business_account_id']}"
+            )
+            return
+
+        service = self._create_service(
+            account['long_lived_access_token'],
+            account['instagram_business_account_id']
+        )
+
+        if event['refresh'] == 'media':
+            logger.info(
+                f"🔔 Webhook {event['field']}: refrescando media {event['media_id']}"
+            )
+            service.refresh_media(self.db_client, event['media_id'])
+        else:
+            logger.info(
+                f"🔔 Webhook {event['field']}: refrescando cuenta {account['id']}"
+            )
+            service.refresh_account_metrics(self.db_client, account['id'])
+
+
+# Instancia global del procesador
+webhook_processor = None
+
+
+def get_webhook_processor() -> InstagramWebhookProcessor:
+    """Obtiene instancia singleton del procesador de webhooks."""
+    global webhook_processor
+    if webhook_processor is None:
+        webhook_processor = InstagramWebhookProcessor()
+    return webhook_processor
@@ -5,6 +5,14 @@ This package handles the actual publication of content to Instagram
 using the Instagram Graph API.
 """
 
-from .instagram_publisher import InstagramPublisher
+from .instagram_publisher import InstagramPublisher, InstagramPublishError
+from .container_monitor import ContainerMonitor, get_container_monitor
+from .batch_publisher import BatchPublisher
 
-__all__ = ['InstagramPublisher']
+__all__ = [
+    'InstagramPublisher',
+    'InstagramPublishError',
+    'ContainerMonitor',
+    'get_container_monitor',
+    'BatchPublisher'
+]
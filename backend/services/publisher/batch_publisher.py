@@ -0,0 +1,180 @@
+"""
+Batch Publisher
+
+Publishes many posts in one call, grouped by Instagram account:
+- credentials and the remaining publishing quota (PublishingQuotaTracker)
+  are looked up once per account
+- accounts are published in parallel (at most BATCH_PUBLISH_MAX_ACCOUNTS
+  at a time)
+- posts of the same account are published one after another, in the
+  order given
+- posts beyond the account's remaining publishing quota are skipped
+
+Results are yielded per post as soon as each publication finishes.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from .instagram_publisher import InstagramPublisher, InstagramPublishError
+from .publishing_quota import get_publishing_quota
+
+logger = logging.getLogger(__name__)
+
+
+class BatchPublisher:
+    """
+    Publishes a batch of posts with per-account ordering and concurrency.
+    """
+
+    def __init__(
+        self,
+        publisher: Optional[InstagramPublisher] = None,
+        max_accounts: Optional[int] = None,
+        quota=None
+    ):
+        """
+        Args:
+            publisher: InstagramPublisher to use
+            max_accounts: Accounts published in parallel
+            quota: PublishingQuotaTracker (default: the shared tracker)
+        """
+        if max_accounts is None:
+            max_accounts = int(os.getenv('BATCH_PUBLISH_MAX_ACCOUNTS', '4'))
+
+        self.publisher = publisher or InstagramPublisher()
+        self.max_accounts = max(1, max_accounts)
+        self.quota = quota or get_publishing_quota()
+
+    @staticmethod
+    def group_by_account(posts: List[Dict]) -> "OrderedDict[int, List[Dict]]":
+        """Groups posts by instagram_account_id, keeping their order."""
+        groups: "OrderedDict[int, List[Dict]]" = OrderedDict()
+        for post in posts:
+            groups.setdefault(post['instagram_account_id'], []).append(post)
+        return groups
+
+    async def publish(
+        self,
+        posts: List[Dict],
+        post_type: Optional[str] = None,
+        on_published: Optional[Callable[[Dict, Dict], None]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Publishes the posts and yields one result per post.
+
+        Args:
+            posts: Post rows (id, instagram_account_id, media_url,
+                content, post_type, video_url)
+            post_type: Overrides each post's post_type if given
+            on_published: Called with (post, result) after each successful
+                publication (e.g. to update the posts table), in the
+                default executor
+
+        Yields:
+            {'post_id', 'instagram_account_id', 'success',
+             'instagram_post_id', 'permalink', 'error'}
+        """
+        results: "asyncio.Queue[Dict]" = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_accounts)
+        groups = self.group_by_account(posts)
+
+        async def run_account(account_id: int, account_posts: List[Dict]) -> None:
+            async with semaphore:
+                await self._publish_account(
+                    account_id, account_posts, post_type, on_published, results
+                )
+
+        tasks = [
+            asyncio.create_task(run_account(account_id, account_posts))
+            for account_id, account_posts in groups.items()
+        ]
+
+        try:
+            for _ in range(len(posts)):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _publish_account(
+        self,
+        account_id: int,
+        posts: List[Dict],
+        post_type: Optional[str],
+        on_published: Optional[Callable[[Dict, Dict], None]],
+        results: "asyncio.Queue[Dict]"
+    ) -> None:
+        loop = asyncio.get_running_loop()
+
+        def result_for(post: Dict, error: Optional[str] = None, published=None) -> Dict:
+            return {
+                'post_id': post['id'],
+                'instagram_account_id': account_id,
+                'success': error is None,
+                'instagram_post_id': (published or {}).get('id'),
+                'permalink': (published or {}).get('permalink'),
+                'error': error
+            }
+
+        # Credentials and publishing quota, once per account
+        try:
+            account = await loop.run_in_executor(
+                None, self.publisher._get_instagram_account, account_id
+            )
+            if not account:
+                raise InstagramPublishError(
+                    f"Instagram account {account_id} not found"
+                )
+            remaining = await loop.run_in_executor(
+                None, self.quota.remaining, account_id
+            )
+        except Exception as e:
+            for post in posts:
+                await results.put(result_for(post, str(e)))
+            return
+
+        logger.info(
+            f"Batch publishing {len(posts)} posts to account {account_id} "
+            f"({remaining} publications left in quota)"
+        )
+
+        for post in posts:
+            if remaining is not None and remaining <= 0:
+                await results.put(result_for(
+                    post, "Content publishing limit reached for this account"
+                ))
+                continue
+
+            try:
+                published = await self.publisher.publish_post_async(
+                    media_url=post['media_url'],
+                    caption=post.get('content') or '',
+                    instagram_account_id=account_id,
+                    post_type=post_type or post.get('post_type') or 'FEED',
+                    video_url=post.get('video_url'),
+                    account=account
+                )
+            except Exception as e:
+                logger.error(f"Batch publication of post {post['id']} failed: {e}")
+                await results.put(result_for(post, str(e)))
+                continue
+
+            if remaining is not None:
+                remaining -= 1
+
+            if on_published:
+                try:
+                    await loop.run_in_executor(None, on_published, post, published)
+                except Exception as e:
+                    logger.error(
+                        f"Post {post['id']} published but not updated: {e}"
+                    )
+
+            await results.put(result_for(post, published=published))
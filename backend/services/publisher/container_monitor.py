@@ -0,0 +1,257 @@
+"""
+Container Monitor
+
+Drives Instagram media containers from CREATED to PUBLISHED without
+holding a thread while Instagram processes the media.
+
+Publications created with InstagramPublisher.create_publication() are
+parked in a time-ordered heap, keyed by the next check time of their
+readiness schedule. A single timer thread wakes up when the next check
+is due and hands it to a small check pool, which performs one
+non-blocking status request (check_publication). Containers that are
+still processing are re-parked; ready ones are published (or, for
+pre-staged posts, just reported as ready) and the completion callback
+is invoked with the result or the error.
+
+Carousels are parked while their child containers are processed; the
+check that finds every child ready creates the album container, which
+is then parked like any other container.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from .instagram_publisher import InstagramPublisher, InstagramPublishError
+
+logger = logging.getLogger(__name__)
+
+CompletionCallback = Callable[[Optional[Dict], Optional[Exception]], None]
+
+
+class ContainerMonitor:
+    """
+    Polls parked media containers on a timer and publishes them when ready.
+
+    Features:
+    - One timer thread for all in-flight containers
+    - Bounded check pool (CONTAINER_MONITOR_WORKERS, default 4)
+    - Completion callbacks for scheduler jobs and async routes
+    """
+
+    def __init__(
+        self,
+        publisher: Optional[InstagramPublisher] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            publisher: InstagramPublisher used for checks and publishing
+            max_workers: Size of the check pool
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv('CONTAINER_MONITOR_WORKERS', '4'))
+
+        self._publisher = publisher
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix='container-check'
+        )
+        self._heap = []
+        self._counter = itertools.count()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._running = True
+        self._timer = threading.Thread(
+            target=self._run,
+            name='container-monitor',
+            daemon=True
+        )
+        self._timer.start()
+
+    @property
+    def publisher(self) -> InstagramPublisher:
+        if self._publisher is None:
+            self._publisher = InstagramPublisher()
+        return self._publisher
+
+    def submit(
+        self,
+        publication: Dict,
+        on_complete: CompletionCallback,
+        delay: Optional[float] = None,
+        publish: bool = True
+    ) -> None:
+        """
+        Parks a publication until its container is ready and published.
+
+        Args:
+            publication: Publication dict from create_publication()
+            on_complete: Called once with (result, None) on success or
+                (None, error) on failure, from a monitor thread
+            delay: Seconds before the first check (default: the first
+                delay of the publication's readiness schedule)
+            publish: If False, stop when the container is READY and call
+                on_complete with the publication dict (pre-staging)
+        """
+        if delay is None:
+            delay = self.publisher.next_check_delay(publication) or 0
+
+        with self._condition:
+            if not self._running:
+                raise InstagramPublishError("Container monitor is shut down")
+            self._in_flight += 1
+            self._schedule(publication, on_complete, publish, delay)
+
+    def in_flight(self) -> int:
+        """Number of publications not yet published or failed."""
+        with self._condition:
+            return self._in_flight
+
+    def _schedule(
+        self,
+        publication: Dict,
+        on_complete: CompletionCallback,
+        publish: bool,
+        delay: float
+    ) -> None:
+        # Caller must hold self._condition
+        heapq.heappush(
+            self._heap,
+            (
+                time.monotonic() + delay,
+                next(self._counter),
+                publication,
+                on_complete,
+                publish
+            )
+        )
+        self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and (
+                    not self._heap or self._heap[0][0] > time.monotonic()
+                ):
+                    timeout = (
+                        self._heap[0][0] - time.monotonic() if self._heap else None
+                    )
+                    self._condition.wait(timeout)
+
+                if not self._running:
+                    return
+
+                _, _, publication, on_complete, publish = heapq.heappop(self._heap)
+
+            self._pool.submit(self._check, publication, on_complete, publish)
+
+    def _check(
+        self,
+        publication: Dict,
+        on_complete: CompletionCallback,
+        publish: bool
+    ) -> None:
+        try:
+            state = self.publisher.check_publication(publication)
+            if state != 'READY':
+                # check_publication() fails once the deadline has passed,
+                # so there is always a next delay here
+                delay = self.publisher.next_check_delay(publication) or 0
+                with self._condition:
+                    if self._running:
+                        self._schedule(publication, on_complete, publish, delay)
+                        return
+                raise InstagramPublishError(
+                    "Container monitor shut down before publication"
+                )
+
+            if not publish:
+                self._finish(on_complete, publication, None)
+                return
+
+            result = self.publisher.complete_publication(publication)
+            self._finish(on_complete, result, None)
+
+        except Exception as e:
+            logger.error(
+                f"Publication of container {publication.get('container_id')} "
+                f"failed: {e}"
+            )
+            self._finish(on_complete, None, self._with_container(e, publication))
+
+    def _with_container(self, error: Exception, publication: Dict) -> Exception:
+        """
+        Attaches the publication's container to a publish error.
+
+        A container that reached READY (media_publish failed) is kept as
+        staged_container, so a retry or replay only has to publish it.
+        """
+        if isinstance(error, InstagramPublishError) and error.container_id is None:
+            error.container_id = publication.get('container_id')
+            if publication.get('state') == 'READY':
+                error.staged_container = self.publisher.staged_container(publication)
+        return error
+
+    def _finish(
+        self,
+        on_complete: CompletionCallback,
+        result: Optional[Dict],
+        error: Optional[Exception]
+    ) -> None:
+        try:
+            on_complete(result, error)
+        except Exception as e:
+            logger.error(f"Publication completion callback failed: {e}")
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Waits for in-flight publications, then stops the monitor.
+
+        Args:
+            timeout: Max seconds to wait for in-flight publications
+                (None = wait until all of them finish)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while self._in_flight > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning(
+                        f"Shutting down with {self._in_flight} "
+                        f"publications still in flight"
+                    )
+                    break
+                self._condition.wait(remaining)
+
+            self._running = False
+            self._condition.notify_all()
+
+        self._pool.shutdown(wait=True)
+
+
+# Global monitor instance
+container_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_container_monitor() -> ContainerMonitor:
+    """Gets the singleton container monitor."""
+    global container_monitor
+    with _monitor_lock:
+        if container_monitor is None:
+            container_monitor = ContainerMonitor()
+        return container_monitor
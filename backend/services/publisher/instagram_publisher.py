@@ -2,9 +2,15 @@
 Instagram Publisher Service
 
 Handles publishing content to Instagram using the Graph API.
-Supports Feed posts, Reels, and Stories with a 2-step process:
-1. Create media container
-2. Publish media container
+Supports Feed posts, Reels, Stories and carousels as a state machine:
+1. Create media container (CREATED). Carousels first create their child
+   containers (CHILDREN_PENDING) and create the album container once
+   every child is processed.
+2. Check container status until ready (PROCESSING -> READY)
+3. Publish media container (PUBLISHED)
+
+Steps 1 and 2 can be driven by ContainerMonitor so that waiting for
+Instagram to process the media does not occupy a worker thread.
 
 Author: SocialLab
 Date: 2025-01-16
@@ -12,21 +18,61 @@ Date: 2025-01-16
 
 import os
 import time
+import asyncio
 import logging
-from typing import Dict, Optional, List
-from datetime import datetime
+import functools
+from typing import Dict, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 import requests
 from requests.exceptions import RequestException
 
 from database.supabase_client import get_supabase_admin_client
+from services.account_context import get_account_context
+from services.publisher.readiness import (
+    ReadinessSchedule,
+    get_container_timing_stats
+)
+from services.publisher.media_url_checks import get_media_url_check_cache
+from services.publisher.publishing_quota import (
+    get_publishing_quota,
+    is_publishing_limit_error
+)
 
 logger = logging.getLogger(__name__)
 
+# Instagram discards unpublished containers 24 hours after creation;
+# pre-staged containers older than this are recreated instead
+CONTAINER_MAX_AGE = timedelta(hours=23)
+
+# API-published posts allowed per account in a rolling 24 hours
+DEFAULT_PUBLISHING_LIMIT = 50
+
 
 class InstagramPublishError(Exception):
-    """Custom exception for Instagram publishing errors."""
-    pass
+    """
+    Custom exception for Instagram publishing errors.
+
+    Attributes:
+        error_code: Graph API error code (error.code of the response
+            body), None if the error did not come from the API
+        container_id: Media container already created, if any
+        staged_container: staged_container() dict of a READY container
+            that can still be published, if any
+    """
+
+    def __init__(
+        self,
+        message: str = '',
+        error_code: Optional[int] = None,
+        container_id: Optional[str] = None,
+        staged_container: Optional[Dict] = None
+    ):
+        super().__init__(message)
+        self.error_code = error_code
+        self.container_id = container_id
+        self.staged_container = staged_container
 
 
 class InstagramPublisher:
@@ -51,20 +97,39 @@ class InstagramPublisher:
         self.base_url = (
             f"https://graph.facebook.com/{self.graph_api_version}"
         )
-        self.container_check_interval = 5  # seconds
-        self.max_container_checks = 12  # 60 seconds total
+        # Readiness schedules tuned from recorded processing times
+        self.timing_stats = get_container_timing_stats()
+        # Cached media URL checks (verified when posts are saved/scheduled)
+        self.media_url_checks = get_media_url_check_cache()
+        # Carousel children: parallel creation/check limit and readiness
+        # schedule (checked every second for up to 60 seconds)
+        self.carousel_max_concurrency = int(
+            os.getenv('CAROUSEL_MAX_CONCURRENCY', '5')
+        )
+        self.carousel_items_schedule = ReadinessSchedule(
+            first_delay=1,
+            fast_interval=1,
+            fast_checks=10,
+            max_interval=5,
+            deadline=60
+        )
 
     def verify_media_url_accessibility(
         self,
         url: str,
-        timeout: int = 10
+        timeout: int = 10,
+        force: bool = False
     ) -> bool:
         """
         Verifica que una URL de media sea públicamente accesible.
 
+        Reutiliza una verificación correcta reciente de la misma URL
+        (MediaUrlCheckCache) salvo que force=True.
+
         Args:
             url: URL de la imagen o video a verificar
             timeout: Timeout en segundos para la petición (default: 10s)
+            force: Verificar aunque haya una verificación reciente
 
         Returns:
             bool: True si la URL es accesible, False en caso contrario
@@ -72,9 +137,40 @@ class InstagramPublisher:
         Raises:
             InstagramPublishError: Si la URL no es accesible o no es válida
         """
+        self._check_media_url(url, timeout, force)
+        return True
+
+    def _check_media_url(
+        self,
+        url: str,
+        timeout: int = 10,
+        force: bool = False
+    ) -> Optional[int]:
+        """
+        Verifica una URL de media y devuelve su tamaño (Content-Length).
+
+        Solo hace el HEAD request si no hay una verificación correcta
+        vigente en caché; el resultado (correcto o no) se guarda.
+
+        Returns:
+            Tamaño en bytes, o None si el servidor no lo indica
+
+        Raises:
+            InstagramPublishError: Si la URL no es accesible o no es válida
+        """
+        if not force:
+            cached = self.media_url_checks.get(url)
+            if cached:
+                logger.debug(f"URL verificada previamente: {url}")
+                return cached.get('size_bytes')
+
+        status_code = None
+        content_type = None
+
         try:
             # Hacer HEAD request para verificar accesibilidad sin descargar
             response = requests.head(url, timeout=timeout, allow_redirects=True)
+            status_code = response.status_code
 
             # Verificar status code 200
             if response.status_code != 200:
@@ -96,17 +192,31 @@ class InstagramPublisher:
                 f"URL verificada exitosamente: {url} "
                 f"(Content-Type: {content_type})"
             )
-            return True
 
+            content_length = response.headers.get('Content-Length')
+            size_bytes = int(content_length) if content_length else None
+
+        except InstagramPublishError as e:
+            self.media_url_checks.store(
+                url, False, status_code, content_type, error=str(e)
+            )
+            raise
         except requests.Timeout:
-            raise InstagramPublishError(
+            error = (
                 f"Timeout al verificar URL: {url}. "
                 f"La URL tardó más de {timeout}s en responder."
             )
+            self.media_url_checks.store(url, False, error=error)
+            raise InstagramPublishError(error)
         except RequestException as e:
-            raise InstagramPublishError(
-                f"Error al verificar URL: {url}. Error: {str(e)}"
-            )
+            error = f"Error al verificar URL: {url}. Error: {str(e)}"
+            self.media_url_checks.store(url, False, error=error)
+            raise InstagramPublishError(error)
+
+        self.media_url_checks.store(
+            url, True, status_code, content_type, size_bytes
+        )
+        return size_bytes
 
     def publish_post(
         self,
@@ -120,7 +230,12 @@ class InstagramPublisher:
         carousel_children: Optional[List[str]] = None
     ) -> Dict:
         """
-        Publishes a post to Instagram.
+        Publishes a post to Instagram, blocking until it is live.
+
+        Runs the whole publication state machine in the calling thread
+        (create container, poll until ready, publish). Callers that must
+        not hold a thread while Instagram processes the media should use
+        create_publication() + ContainerMonitor, or publish_post_async().
 
         Args:
             media_url: Public URL of the image (for images)
@@ -141,9 +256,112 @@ class InstagramPublisher:
         Raises:
             InstagramPublishError: If publication fails
         """
+        publication = self.create_publication(
+            media_url=media_url,
+            caption=caption,
+            instagram_account_id=instagram_account_id,
+            post_type=post_type,
+            video_url=video_url,
+            cover_url=cover_url,
+            is_carousel=is_carousel,
+            carousel_children=carousel_children
+        )
+
+        try:
+            self._wait_for_publication(publication)
+            return self.complete_publication(publication)
+        except InstagramPublishError:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error publishing post: {e}")
+            raise InstagramPublishError(
+                f"Failed to publish post: {str(e)}"
+            )
+
+    async def publish_post_async(self, **kwargs) -> Dict:
+        """
+        Publishes a post without blocking the event loop or a thread.
+
+        The container is created in the default executor, then parked in
+        the shared ContainerMonitor. This coroutine just awaits the
+        monitor's completion callback while Instagram processes the media.
+
+        Args:
+            **kwargs: Same arguments as publish_post()
+
+        Returns:
+            Same as publish_post()
+
+        Raises:
+            InstagramPublishError: If publication fails
+        """
+        from services.publisher.container_monitor import get_container_monitor
+
+        loop = asyncio.get_running_loop()
+        publication = await loop.run_in_executor(
+            None,
+            functools.partial(self.create_publication, **kwargs)
+        )
+
+        future = loop.create_future()
+
+        def resolve(result: Optional[Dict], error: Optional[Exception]) -> None:
+            if future.done():
+                return
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        get_container_monitor().submit(
+            publication,
+            lambda result, error: loop.call_soon_threadsafe(resolve, result, error)
+        )
+
+        return await future
+
+    def create_publication(
+        self,
+        media_url: str,
+        caption: str,
+        instagram_account_id: int,
+        post_type: str = 'FEED',
+        video_url: Optional[str] = None,
+        cover_url: Optional[str] = None,
+        is_carousel: bool = False,
+        carousel_children: Optional[List[str]] = None,
+        account: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Creates the media container(s) for a post (state CREATED).
+
+        First step of the publication state machine:
+        CREATED -> PROCESSING -> READY -> PUBLISHED (or FAILED).
+        The returned publication dict is all that is needed to drive the
+        rest of the machine with check_publication() and
+        complete_publication(), from any thread or process.
+
+        Carousels only create their child containers here and start in
+        CHILDREN_PENDING (container_id None); check_publication() creates
+        the album container once every child is processed.
+
+        Args:
+            Same as publish_post(), plus:
+            account: Credentials from _get_instagram_account(), to skip
+                the lookup when publishing several posts of one account
+
+        Returns:
+            Publication dict with container_id, ig_user_id, access_token,
+            media_type, size_bytes, state, checks and the readiness
+            schedule (plus children and caption for carousels)
+
+        Raises:
+            InstagramPublishError: If validation or container creation fails
+        """
         try:
             # Get Instagram account credentials
-            account = self._get_instagram_account(instagram_account_id)
+            if account is None:
+                account = self._get_instagram_account(instagram_account_id)
 
             if not account:
                 raise InstagramPublishError(
@@ -164,52 +382,99 @@ class InstagramPublisher:
                     raise InstagramPublishError(
                         "Carousel supports maximum 10 images"
                     )
-                for image_url in carousel_children:
-                    self.verify_media_url_accessibility(image_url)
+                workers = min(self.carousel_max_concurrency, len(carousel_children))
+                with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                    sizes = list(pool.map(
+                        self._check_media_url,
+                        carousel_children
+                    ))
+                size_bytes = sum(size or 0 for size in sizes) or None
             elif post_type == 'REELS':
+                if not video_url:
+                    raise InstagramPublishError(
+                        "video_url required for REELS"
+                    )
                 # Verify video URL
-                self.verify_media_url_accessibility(video_url)
+                size_bytes = self._check_media_url(video_url)
                 # Verify cover URL if provided
                 if cover_url:
                     self.verify_media_url_accessibility(cover_url)
             else:
                 # Verify media URL for FEED and STORY
-                self.verify_media_url_accessibility(media_url)
+                size_bytes = self._check_media_url(media_url)
 
-            # Route to appropriate publishing method
+            # Create the container for the post type
             if is_carousel:
-                return self._publish_carousel(
+                children_ids = self._create_carousel_items(
                     ig_user_id,
                     access_token,
-                    carousel_children,
-                    caption
+                    carousel_children
                 )
+                return {
+                    'container_id': None,
+                    'ig_user_id': ig_user_id,
+                    'access_token': access_token,
+                    'instagram_account_id': instagram_account_id,
+                    'media_type': 'CAROUSEL',
+                    'size_bytes': size_bytes,
+                    'state': 'CHILDREN_PENDING',
+                    'children': children_ids,
+                    'pending_children': list(children_ids),
+                    'caption': caption,
+                    'checks': 0,
+                    'schedule': self.carousel_items_schedule.to_dict(),
+                    'created_at': datetime.now(timezone.utc).isoformat()
+                }
             elif post_type == 'REELS':
-                if not video_url:
-                    raise InstagramPublishError(
-                        "video_url required for REELS"
-                    )
-                return self._publish_reel(
+                media_type = 'REELS'
+                container_id = self._create_media_container(
                     ig_user_id,
                     access_token,
                     video_url,
                     caption,
-                    cover_url
+                    media_type='REELS',
+                    cover_url=cover_url
                 )
             elif post_type == 'STORY':
-                return self._publish_story(
+                media_type = 'STORIES'
+                container_id = self._create_media_container(
                     ig_user_id,
                     access_token,
-                    media_url
+                    media_url,
+                    caption,
+                    media_type='STORIES'
                 )
             else:  # FEED
-                return self._publish_feed_post(
+                media_type = 'IMAGE'
+                container_id = self._create_media_container(
                     ig_user_id,
                     access_token,
                     media_url,
-                    caption
+                    caption,
+                    media_type='IMAGE'
                 )
 
+            logger.info(
+                f"Created {media_type} container {container_id} "
+                f"for IG user {ig_user_id}"
+            )
+
+            # Readiness schedule tuned from recorded processing times
+            schedule = self.timing_stats.schedule_for(media_type, size_bytes)
+
+            return {
+                'container_id': container_id,
+                'ig_user_id': ig_user_id,
+                'access_token': access_token,
+                'instagram_account_id': instagram_account_id,
+                'media_type': media_type,
+                'size_bytes': size_bytes,
+                'state': 'CREATED',
+                'checks': 0,
+                'schedule': schedule.to_dict(),
+                'created_at': datetime.now(timezone.utc).isoformat()
+            }
+
         except InstagramPublishError:
             raise
         except Exception as e:
@@ -218,246 +483,440 @@ class InstagramPublisher:
                 f"Failed to publish post: {str(e)}"
             )
 
-    def _publish_feed_post(
-        self,
-        ig_user_id: str,
-        access_token: str,
-        image_url: str,
-        caption: str
-    ) -> Dict:
+    def check_publication(self, publication: Dict) -> str:
         """
-        Publishes a feed post (2-step process).
+        Checks the container status once, without waiting.
 
-        Step 1: Create media container
-        Step 2: Publish media container
+        Updates publication['state'] to PROCESSING or READY. Processing
+        times are recorded when the container becomes ready or fails, to
+        tune future readiness schedules.
+
+        Carousels in CHILDREN_PENDING check their children instead, and
+        move to CREATED once the album container has been created.
 
         Args:
-            ig_user_id: Instagram Business Account ID
-            access_token: Instagram API access token
-            image_url: Public URL of the image
-            caption: Caption text
+            publication: Publication dict from create_publication()
 
         Returns:
-            Dict with 'id' and 'permalink'
+            The new state (CHILDREN_PENDING, CREATED, PROCESSING or READY)
+
+        Raises:
+            InstagramPublishError: If processing failed or the container
+                was not ready by the schedule deadline (state FAILED)
         """
-        logger.info(f"Publishing feed post to IG user {ig_user_id}")
+        if publication['state'] == 'CHILDREN_PENDING':
+            return self._check_carousel_items(publication)
 
-        # Step 1: Create media container
-        container_id = self._create_media_container(
-            ig_user_id,
-            access_token,
-            image_url,
-            caption,
-            media_type='IMAGE'
-        )
+        container_id = publication['container_id']
 
-        # Step 2: Wait for container to be ready
-        self._wait_for_container(container_id, access_token)
+        publication['checks'] += 1
 
-        # Step 3: Publish container
-        media_id = self._publish_container(
-            ig_user_id,
-            access_token,
-            container_id
-        )
+        try:
+            status, error_msg = self._get_container_status(
+                container_id,
+                publication['access_token']
+            )
 
-        # Step 4: Get media details
-        media_info = self._get_media_info(media_id, access_token)
+            if status == 'FINISHED':
+                logger.info(
+                    f"Container {container_id} ready after "
+                    f"{publication['checks']} checks"
+                )
+                publication['state'] = 'READY'
+                publication['ready_at'] = datetime.now(timezone.utc).isoformat()
+                self.timing_stats.record(publication, 'ready')
+                return publication['state']
+            elif status == 'ERROR':
+                publication['state'] = 'FAILED'
+                self.timing_stats.record(publication, 'error')
+                raise InstagramPublishError(
+                    f"Container processing failed: {error_msg}"
+                )
+            elif status == 'IN_PROGRESS':
+                logger.debug(
+                    f"Container {container_id} still processing "
+                    f"(check {publication['checks']})"
+                )
+            else:
+                logger.warning(
+                    f"Unknown container status: {status}"
+                )
 
-        logger.info(
-            f"Successfully published feed post: {media_info.get('permalink')}"
-        )
+        except RequestException as e:
+            logger.error(f"Error checking container status: {e}")
+
+        if self.next_check_delay(publication) is None:
+            publication['state'] = 'FAILED'
+            self.timing_stats.record(publication, 'timeout')
+            raise InstagramPublishError(
+                f"Container {container_id} timed out after "
+                f"{publication['schedule']['deadline']} seconds"
+            )
+
+        publication['state'] = 'PROCESSING'
+        return publication['state']
+
+    def next_check_delay(self, publication: Dict) -> Optional[float]:
+        """
+        Seconds to wait before the next status check of a publication.
+
+        Args:
+            publication: Publication dict from create_publication()
 
+        Returns:
+            Delay in seconds, or None if the deadline has passed
+        """
+        schedule = ReadinessSchedule.from_dict(publication['schedule'])
+        created_at = datetime.fromisoformat(publication['created_at'])
+        elapsed = (datetime.now(timezone.utc) - created_at).total_seconds()
+        return schedule.next_delay(publication['checks'], elapsed)
+
+    @staticmethod
+    def staged_container(publication: Dict) -> Dict:
+        """
+        Returns what must be stored to publish a READY container later.
+
+        The access token is left out; resume_publication() reloads it.
+        content_hash is kept when the caller set one on the publication,
+        to tell whether the post changed since the container was created.
+        """
         return {
-            'id': media_id,
-            'permalink': media_info.get('permalink', ''),
-            'media_type': 'IMAGE'
+            'container_id': publication['container_id'],
+            'ig_user_id': publication['ig_user_id'],
+            'instagram_account_id': publication['instagram_account_id'],
+            'media_type': publication['media_type'],
+            'size_bytes': publication.get('size_bytes'),
+            'content_hash': publication.get('content_hash'),
+            'created_at': publication['created_at']
         }
 
-    def _publish_reel(
-        self,
-        ig_user_id: str,
-        access_token: str,
-        video_url: str,
-        caption: str,
-        cover_url: Optional[str] = None
-    ) -> Dict:
+    def resume_publication(self, staged: Dict) -> Dict:
         """
-        Publishes a Reel (video content).
+        Rebuilds a READY publication from a pre-staged container.
 
         Args:
-            ig_user_id: Instagram Business Account ID
-            access_token: Instagram API access token
-            video_url: Public URL of the video
-            caption: Caption text
-            cover_url: Optional cover image URL
+            staged: Dict from staged_container()
 
         Returns:
-            Dict with 'id' and 'permalink'
-        """
-        logger.info(f"Publishing reel to IG user {ig_user_id}")
-
-        # Create reel container
-        container_id = self._create_media_container(
-            ig_user_id,
-            access_token,
-            video_url,
-            caption,
-            media_type='REELS',
-            cover_url=cover_url
-        )
+            Publication dict in state READY, ready for
+            complete_publication()
 
-        # Reels take longer to process
-        self._wait_for_container(
-            container_id,
-            access_token,
-            max_checks=24  # 2 minutes for video processing
-        )
+        Raises:
+            InstagramPublishError: If the container is too old to publish
+                or the account is no longer available
+        """
+        created_at = datetime.fromisoformat(staged['created_at'])
+        if datetime.now(timezone.utc) - created_at > CONTAINER_MAX_AGE:
+            raise InstagramPublishError(
+                f"Pre-staged container {staged['container_id']} has expired"
+            )
 
-        # Publish container
-        media_id = self._publish_container(
-            ig_user_id,
-            access_token,
-            container_id
-        )
+        account = self._get_instagram_account(staged['instagram_account_id'])
+        if not account:
+            raise InstagramPublishError(
+                f"Instagram account {staged['instagram_account_id']} not found"
+            )
+
+        return {
+            **staged,
+            'access_token': account['access_token'],
+            'state': 'READY',
+            'checks': 0
+        }
+
+    def complete_publication(self, publication: Dict) -> Dict:
+        """
+        Publishes a READY container (last step of the state machine).
+
+        Args:
+            publication: Publication dict in state READY
+
+        Returns:
+            Dict with 'id', 'permalink' (not for stories), 'media_type'
+            and 'container_ready_at' (when the container became READY,
+            None for resumed containers)
+
+        Raises:
+            InstagramPublishError: If publishing fails
+        """
+        ig_user_id = publication['ig_user_id']
+        access_token = publication['access_token']
+        media_type = publication['media_type']
+
+        quota = get_publishing_quota()
+        try:
+            media_id = self._publish_container(
+                ig_user_id,
+                access_token,
+                publication['container_id']
+            )
+        except InstagramPublishError as e:
+            if is_publishing_limit_error(e):
+                quota.mark_exhausted(publication['instagram_account_id'])
+            raise
+
+        publication['state'] = 'PUBLISHED'
+        publication['media_id'] = media_id
+        quota.record_publish(publication['instagram_account_id'])
+
+        if media_type == 'STORIES':
+            logger.info(f"Successfully published story: {media_id}")
+            return {
+                'id': media_id,
+                'media_type': 'STORIES',
+                'container_ready_at': publication.get('ready_at')
+            }
 
-        # Get media details
         media_info = self._get_media_info(media_id, access_token)
 
         logger.info(
-            f"Successfully published reel: {media_info.get('permalink')}"
+            f"Successfully published {media_type}: "
+            f"{media_info.get('permalink')}"
         )
 
         return {
             'id': media_id,
             'permalink': media_info.get('permalink', ''),
-            'media_type': 'REELS'
+            'media_type': media_type,
+            'container_ready_at': publication.get('ready_at')
         }
 
-    def _publish_story(
+    def _get_container_status(
         self,
-        ig_user_id: str,
-        access_token: str,
-        media_url: str
-    ) -> Dict:
+        container_id: str,
+        access_token: str
+    ) -> Tuple[Optional[str], Optional[str]]:
         """
-        Publishes a Story.
-
-        Args:
-            ig_user_id: Instagram Business Account ID
-            access_token: Instagram API access token
-            media_url: Public URL of the image/video
+        Gets the processing status of a media container (one request).
 
         Returns:
-            Dict with 'id'
-        """
-        logger.info(f"Publishing story to IG user {ig_user_id}")
-
-        # Stories use a simplified process
-        url = f"{self.base_url}/{ig_user_id}/media"
+            (status_code, status message), e.g. ('FINISHED', None)
 
-        payload = {
-            'image_url': media_url,
-            'media_type': 'STORIES',
+        Raises:
+            RequestException: If the request fails
+        """
+        url = f"{self.base_url}/{container_id}"
+        params = {
+            'fields': 'status_code,status',
             'access_token': access_token
         }
 
-        response = requests.post(url, data=payload, timeout=30)
+        response = requests.get(url, params=params, timeout=10)
         response.raise_for_status()
 
-        container_id = response.json()['id']
+        data = response.json()
+        return data.get('status_code'), data.get('status')
 
-        # Publish immediately
-        media_id = self._publish_container(
-            ig_user_id,
-            access_token,
-            container_id
-        )
+    def _create_carousel_item(
+        self,
+        ig_user_id: str,
+        access_token: str,
+        image_url: str
+    ) -> str:
+        """
+        Creates one carousel child container.
 
-        logger.info(f"Successfully published story: {media_id}")
+        Returns:
+            Child container ID
 
-        return {
-            'id': media_id,
-            'media_type': 'STORIES'
+        Raises:
+            InstagramPublishError: If container creation fails
+        """
+        url = f"{self.base_url}/{ig_user_id}/media"
+
+        params = {
+            'image_url': image_url,
+            'is_carousel_item': True,
+            'access_token': access_token
         }
 
-    def _publish_carousel(
+        try:
+            response = requests.post(url, data=params, timeout=30)
+            response.raise_for_status()
+            return response.json()['id']
+
+        except RequestException as e:
+            error_msg = self._parse_error_response(e.response)
+            logger.error(f"Failed to create carousel item: {error_msg}")
+            raise InstagramPublishError(
+                f"Failed to create carousel item: {error_msg}",
+                error_code=self._parse_error_code(e.response)
+            )
+
+    def _create_carousel_items(
         self,
         ig_user_id: str,
         access_token: str,
-        image_urls: List[str],
-        caption: str
-    ) -> Dict:
+        image_urls: List[str]
+    ) -> List[str]:
         """
-        Publishes a carousel album (multiple images).
+        Creates the child containers of a carousel.
+
+        Children are created concurrently (at most
+        carousel_max_concurrency requests at a time).
 
         Args:
             ig_user_id: Instagram Business Account ID
             access_token: Instagram API access token
             image_urls: List of public URLs for carousel images (2-10)
-            caption: Caption text for the carousel
 
         Returns:
-            Dict with 'id' and 'permalink'
+            Child container IDs, in the order of image_urls
+
+        Raises:
+            InstagramPublishError: If a child container creation fails
         """
         logger.info(
-            f"Publishing carousel to IG user {ig_user_id} "
+            f"Creating carousel for IG user {ig_user_id} "
             f"with {len(image_urls)} images"
         )
 
-        # Step 1: Create containers for each image
-        children_ids = []
+        workers = max(1, min(self.carousel_max_concurrency, len(image_urls)))
 
-        for idx, image_url in enumerate(image_urls):
-            container_url = f"{self.base_url}/{ig_user_id}/media"
+        with ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='carousel-item'
+        ) as pool:
+            children_ids = list(pool.map(
+                lambda image_url: self._create_carousel_item(
+                    ig_user_id, access_token, image_url
+                ),
+                image_urls
+            ))
 
-            params = {
-                'image_url': image_url,
-                'is_carousel_item': True,
-                'access_token': access_token
-            }
+        logger.info(f"Created {len(children_ids)} carousel items")
+        return children_ids
 
-            logger.info(f"Creating carousel item {idx + 1}/{len(image_urls)}")
-            response = requests.post(container_url, data=params, timeout=30)
-            response.raise_for_status()
-            children_ids.append(response.json()['id'])
+    def _check_carousel_items(self, publication: Dict) -> str:
+        """
+        Checks the pending carousel children once, without waiting.
 
-        logger.info(f"Created {len(children_ids)} carousel items")
+        All pending children are checked in parallel. When the last one
+        is FINISHED the album container is created and the publication
+        moves to CREATED, with the readiness schedule of the album.
 
-        # Step 2: Create carousel container
-        carousel_url = f"{self.base_url}/{ig_user_id}/media"
+        Args:
+            publication: Carousel publication in state CHILDREN_PENDING
 
-        carousel_params = {
-            'media_type': 'CAROUSEL',
-            'caption': caption,
-            'children': ','.join(children_ids),
-            'access_token': access_token
-        }
+        Returns:
+            The new state (CHILDREN_PENDING or CREATED)
 
-        logger.info("Creating carousel container")
-        response = requests.post(carousel_url, data=carousel_params, timeout=30)
-        response.raise_for_status()
-        carousel_id = response.json()['id']
+        Raises:
+            InstagramPublishError: If a child fails, the children are not
+                ready by the deadline or the album creation fails
+                (state FAILED)
+        """
+        access_token = publication['access_token']
+        pending = publication['pending_children']
 
-        # Step 3: Publish carousel (wait briefly for processing)
-        time.sleep(3)
+        publication['checks'] += 1
 
-        media_id = self._publish_container(
-            ig_user_id,
-            access_token,
-            carousel_id
+        def child_status(child_id: str) -> Tuple[Optional[str], Optional[str]]:
+            try:
+                return self._get_container_status(child_id, access_token)
+            except RequestException as e:
+                logger.error(f"Error checking carousel item status: {e}")
+                return None, None
+
+        workers = max(1, min(self.carousel_max_concurrency, len(pending)))
+        with ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='carousel-check'
+        ) as pool:
+            statuses = list(pool.map(child_status, pending))
+
+        still_pending = []
+        for child_id, (status, error_msg) in zip(pending, statuses):
+            if status == 'ERROR':
+                publication['state'] = 'FAILED'
+                raise InstagramPublishError(
+                    f"Carousel item {child_id} processing failed: "
+                    f"{error_msg or 'Unknown error'}"
+                )
+            if status != 'FINISHED':
+                still_pending.append(child_id)
+
+        publication['pending_children'] = still_pending
+
+        if still_pending:
+            if self.next_check_delay(publication) is None:
+                publication['state'] = 'FAILED'
+                raise InstagramPublishError(
+                    f"Carousel items {', '.join(still_pending)} not ready "
+                    f"after {publication['schedule']['deadline']} seconds"
+                )
+            return publication['state']
+
+        try:
+            container_id = self._create_carousel_container(
+                publication['ig_user_id'],
+                access_token,
+                publication['children'],
+                publication['caption']
+            )
+        except InstagramPublishError:
+            publication['state'] = 'FAILED'
+            raise
+
+        # The album is polled like any other container before publishing
+        schedule = self.timing_stats.schedule_for(
+            'CAROUSEL',
+            publication.get('size_bytes')
         )
+        publication.update({
+            'container_id': container_id,
+            'state': 'CREATED',
+            'checks': 0,
+            'schedule': schedule.to_dict(),
+            'created_at': datetime.now(timezone.utc).isoformat()
+        })
+        return publication['state']
+
+    def _create_carousel_container(
+        self,
+        ig_user_id: str,
+        access_token: str,
+        children_ids: List[str],
+        caption: str
+    ) -> str:
+        """
+        Creates the carousel album container from processed children.
+
+        Args:
+            ig_user_id: Instagram Business Account ID
+            access_token: Instagram API access token
+            children_ids: FINISHED child container IDs, in album order
+            caption: Caption text for the carousel
 
-        logger.info(f"Successfully published carousel: {media_id}")
+        Returns:
+            Carousel container ID
 
-        # Get permalink
-        permalink = self._get_media_permalink(media_id, access_token)
+        Raises:
+            InstagramPublishError: If container creation fails
+        """
+        url = f"{self.base_url}/{ig_user_id}/media"
 
-        return {
-            'id': media_id,
-            'permalink': permalink
+        params = {
+            'media_type': 'CAROUSEL',
+            'caption': caption,
+            'children': ','.join(children_ids),
+            'access_token': access_token
         }
 
+        try:
+            logger.info("Creating carousel container")
+            response = requests.post(url, data=params, timeout=30)
+            response.raise_for_status()
+            return response.json()['id']
+
+        except RequestException as e:
+            error_msg = self._parse_error_response(e.response)
+            logger.error(f"Failed to create carousel container: {error_msg}")
+            raise InstagramPublishError(
+                f"Failed to create carousel container: {error_msg}",
+                error_code=self._parse_error_code(e.response)
+            )
+
     def _create_media_container(
         self,
         ig_user_id: str,
@@ -474,7 +933,7 @@ class InstagramPublisher:
             ig_user_id: Instagram Business Account ID
             access_token: Instagram API access token
             media_url: Public URL of media
-            caption: Caption text
+            caption: Caption text (ignored for stories)
             media_type: IMAGE, REELS, or STORIES
             cover_url: Optional cover image for videos
 
@@ -487,21 +946,23 @@ class InstagramPublisher:
         url = f"{self.base_url}/{ig_user_id}/media"
 
         payload = {
-            'access_token': access_token,
-            'caption': caption
+            'access_token': access_token
         }
 
         # Set appropriate URL field based on media type
         if media_type == 'REELS':
             payload['media_type'] = 'REELS'
             payload['video_url'] = media_url
+            payload['caption'] = caption
             if cover_url:
                 payload['cover_url'] = cover_url
         elif media_type == 'STORIES':
+            # Stories don't support captions
             payload['media_type'] = 'STORIES'
             payload['image_url'] = media_url
         else:  # IMAGE
             payload['image_url'] = media_url
+            payload['caption'] = caption
 
         try:
             response = requests.post(url, data=payload, timeout=30)
@@ -516,70 +977,27 @@ class InstagramPublisher:
             error_msg = self._parse_error_response(e.response)
             logger.error(f"Failed to create container: {error_msg}")
             raise InstagramPublishError(
-                f"Failed to create media container: {error_msg}"
+                f"Failed to create media container: {error_msg}",
+                error_code=self._parse_error_code(e.response)
             )
 
-    def _wait_for_container(
-        self,
-        container_id: str,
-        access_token: str,
-        max_checks: int = 12
-    ) -> None:
+    def _wait_for_publication(self, publication: Dict) -> None:
         """
-        Waits for container to be ready for publishing.
+        Blocks until the publication's container is ready.
 
         Instagram needs time to process the media before it can be published.
+        Only used by the blocking publish_post(); ContainerMonitor drives
+        the same checks without sleeping in a worker thread.
 
         Args:
-            container_id: The container ID to check
-            access_token: Instagram API access token
-            max_checks: Maximum number of status checks
+            publication: Publication dict from create_publication()
 
         Raises:
             InstagramPublishError: If container fails or times out
         """
-        url = f"{self.base_url}/{container_id}"
-        params = {
-            'fields': 'status_code,status',
-            'access_token': access_token
-        }
-
-        for attempt in range(max_checks):
-            try:
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-
-                data = response.json()
-                status = data.get('status_code')
-
-                if status == 'FINISHED':
-                    logger.info(f"Container {container_id} ready")
-                    return
-                elif status == 'ERROR':
-                    error_msg = data.get('status', 'Unknown error')
-                    raise InstagramPublishError(
-                        f"Container processing failed: {error_msg}"
-                    )
-                elif status == 'IN_PROGRESS':
-                    logger.debug(
-                        f"Container {container_id} still processing "
-                        f"(attempt {attempt + 1}/{max_checks})"
-                    )
-                    time.sleep(self.container_check_interval)
-                else:
-                    logger.warning(
-                        f"Unknown container status: {status}"
-                    )
-                    time.sleep(self.container_check_interval)
-
-            except RequestException as e:
-                logger.error(f"Error checking container status: {e}")
-                time.sleep(self.container_check_interval)
-
-        raise InstagramPublishError(
-            f"Container {container_id} timed out after "
-            f"{max_checks * self.container_check_interval} seconds"
-        )
+        time.sleep(self.next_check_delay(publication) or 0)
+        while self.check_publication(publication) != 'READY':
+            time.sleep(self.next_check_delay(publication) or 0)
 
     def _publish_container(
         self,
@@ -621,7 +1039,53 @@ class InstagramPublisher:
             error_msg = self._parse_error_response(e.response)
             logger.error(f"Failed to publish container: {error_msg}")
             raise InstagramPublishError(
-                f"Failed to publish container: {error_msg}"
+                f"Failed to publish container: {error_msg}",
+                error_code=self._parse_error_code(e.response)
+            )
+
+    def get_publishing_limit(
+        self,
+        ig_user_id: str,
+        access_token: str
+    ) -> Dict:
+        """
+        Gets the account's content publishing usage (rolling 24 hours).
+
+        Args:
+            ig_user_id: Instagram Business Account ID
+            access_token: Instagram API access token
+
+        Returns:
+            {'quota_usage': posts published, 'quota_total': limit}
+
+        Raises:
+            InstagramPublishError: If the request fails
+        """
+        url = f"{self.base_url}/{ig_user_id}/content_publishing_limit"
+        params = {
+            'fields': 'quota_usage,config',
+            'access_token': access_token
+        }
+
+        try:
+            response = requests.get(url, params=params, timeout=10)
+            response.raise_for_status()
+
+            data = (response.json().get('data') or [{}])[0]
+            return {
+                'quota_usage': data.get('quota_usage', 0),
+                'quota_total': (data.get('config') or {}).get(
+                    'quota_total',
+                    DEFAULT_PUBLISHING_LIMIT
+                )
+            }
+
+        except RequestException as e:
+            error_msg = self._parse_error_response(e.response)
+            logger.error(f"Failed to get publishing limit: {error_msg}")
+            raise InstagramPublishError(
+                f"Failed to get publishing limit: {error_msg}",
+                error_code=self._parse_error_code(e.response)
             )
 
     def _get_media_info(
@@ -658,7 +1122,7 @@ class InstagramPublisher:
         instagram_account_id: int
     ) -> Optional[Dict]:
         """
-        Retrieves Instagram account credentials from database.
+        Retrieves Instagram account credentials (shared account context cache).
 
         Args:
             instagram_account_id: Internal DB ID
@@ -667,20 +1131,13 @@ class InstagramPublisher:
             Dict with access_token and instagram_user_id
         """
         try:
-            result = self.supabase.table('instagram_accounts')\
-                .select(
-                    'long_lived_access_token, '
-                    'instagram_business_account_id'
-                )\
-                .eq('id', instagram_account_id)\
-                .single()\
-                .execute()
-
-            if result.data:
+            account = get_account_context().get_by_id(instagram_account_id)
+
+            if account:
                 # Map to expected field names for compatibility
                 return {
-                    'access_token': result.data['long_lived_access_token'],
-                    'instagram_user_id': result.data[
+                    'access_token': account['long_lived_access_token'],
+                    'instagram_user_id': account[
                         'instagram_business_account_id'
                     ]
                 }
@@ -693,6 +1150,25 @@ class InstagramPublisher:
             )
             return None
 
+    @staticmethod
+    def _parse_error_code(response) -> Optional[int]:
+        """
+        Graph API error code (error.code) of an error response.
+
+        Args:
+            response: Response object from requests, or None
+
+        Returns:
+            The error code, or None if the body has none
+        """
+        if response is None:
+            return None
+        try:
+            code = response.json().get('error', {}).get('code')
+            return int(code) if code is not None else None
+        except Exception:
+            return None
+
     def _parse_error_response(self, response) -> str:
         """
         Parses error response from Instagram API.
@@ -703,7 +1179,8 @@ class InstagramPublisher:
         Returns:
             Human-readable error message
         """
-        if not response:
+        # A 4xx/5xx Response is falsy (Response.__bool__ is .ok)
+        if response is None:
             return "No response from Instagram API"
 
         try:
@@ -0,0 +1,169 @@
+"""
+Media URL Checks
+
+Cache of media URL accessibility checks (HEAD request result), so the
+publish path does not have to verify every image again.
+
+URLs are verified when a post is saved or scheduled. The result
+(status code, content type, size) is stored in the media_url_checks
+table (migration 017) and in memory; a check is reused while it is
+younger than MEDIA_URL_CHECK_TTL_MINUTES (default 360). Only successful
+checks are reused: a failed URL is always verified again.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class MediaUrlCheckCache:
+    """
+    TTL cache of media URL checks, backed by the media_url_checks table.
+    """
+
+    def __init__(self, db_client=None, ttl: Optional[timedelta] = None):
+        """
+        Args:
+            db_client: Supabase client (default: admin client)
+            ttl: How long a successful check is reused
+        """
+        if ttl is None:
+            ttl = timedelta(
+                minutes=int(os.getenv('MEDIA_URL_CHECK_TTL_MINUTES', '360'))
+            )
+
+        self._db_client = db_client
+        self.ttl = ttl
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def db_client(self):
+        if self._db_client is None:
+            from database.supabase_client import get_supabase_admin_client
+            self._db_client = get_supabase_admin_client()
+        return self._db_client
+
+    def _is_fresh(self, entry: Optional[Dict]) -> bool:
+        if not entry or not entry.get('is_valid'):
+            return False
+        checked_at = _parse_timestamp(entry.get('checked_at'))
+        return (
+            checked_at is not None
+            and datetime.now(timezone.utc) - checked_at < self.ttl
+        )
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Returns a fresh successful check of the URL, or None.
+
+        Looks in memory first and then in the database.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        if self._is_fresh(entry):
+            return entry
+
+        try:
+            result = self.db_client.table('media_url_checks')\
+                .select('*')\
+                .eq('url', url)\
+                .execute()
+        except Exception as e:
+            logger.warning(f"Could not read media URL check for {url}: {e}")
+            return None
+
+        entry = result.data[0] if result.data else None
+        if not self._is_fresh(entry):
+            return None
+
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def store(
+        self,
+        url: str,
+        is_valid: bool,
+        status_code: Optional[int] = None,
+        content_type: Optional[str] = None,
+        size_bytes: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> Dict:
+        """Stores the outcome of a URL check."""
+        entry = {
+            'url': url,
+            'is_valid': is_valid,
+            'status_code': status_code,
+            'content_type': content_type,
+            'size_bytes': size_bytes,
+            'error': error,
+            'checked_at': datetime.now(timezone.utc).isoformat()
+        }
+
+        with self._lock:
+            if is_valid:
+                self._entries[url] = entry
+            else:
+                self._entries.pop(url, None)
+
+        try:
+            self.db_client.table('media_url_checks')\
+                .upsert(entry, on_conflict='url')\
+                .execute()
+        except Exception as e:
+            logger.warning(f"Could not store media URL check for {url}: {e}")
+
+        return entry
+
+
+def verify_media_url_in_background(url: str) -> None:
+    """
+    Verifies a media URL and stores the result (for BackgroundTasks).
+
+    Used when a post is saved, so that publishing finds a fresh check.
+    Failures are only logged; the URL is verified again when the post
+    is scheduled or published.
+    """
+    from services.publisher.instagram_publisher import (
+        InstagramPublisher,
+        InstagramPublishError
+    )
+
+    try:
+        InstagramPublisher().verify_media_url_accessibility(url, force=True)
+    except InstagramPublishError as e:
+        logger.warning(f"Media URL not publishable: {url} ({e})")
+    except Exception as e:
+        logger.warning(f"Could not verify media URL {url}: {e}")
+
+
+# Global cache instance
+media_url_check_cache = None
+
+
+def get_media_url_check_cache() -> MediaUrlCheckCache:
+    """Gets the singleton media URL check cache."""
+    global media_url_check_cache
+    if media_url_check_cache is None:
+        media_url_check_cache = MediaUrlCheckCache()
+    return media_url_check_cache
@@ -0,0 +1,192 @@
+"""
+Publishing Quota Tracker
+
+Local view of each account's Instagram content publishing limit (a
+rolling 24-hour quota of API-published posts), so posts that would be
+rejected by media_publish are deferred before any container is created.
+
+The count is seeded from the content_publishing_limit endpoint, then
+updated locally on every publish. It is re-seeded from the API every
+PUBLISHING_QUOTA_REFRESH_MINUTES (default 30), which also lets older
+publications fall out of the 24-hour window.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+QUOTA_WINDOW = timedelta(hours=24)
+
+# Graph API error code returned when the publishing limit is reached
+PUBLISHING_LIMIT_ERROR_CODE = 9
+
+
+def is_publishing_limit_error(error: Exception) -> bool:
+    """True if a publish error is Instagram's publishing limit error."""
+    return getattr(error, 'error_code', None) == PUBLISHING_LIMIT_ERROR_CODE
+
+
+class PublishingQuotaTracker:
+    """
+    Per-account publishing quota, seeded from the Graph API.
+
+    Features:
+    - Seeded lazily per account from content_publishing_limit
+    - Local publish count between seeds
+    - Fails open: if the quota cannot be read, publishing is allowed
+    """
+
+    def __init__(
+        self,
+        publisher=None,
+        refresh_interval: Optional[timedelta] = None
+    ):
+        """
+        Args:
+            publisher: InstagramPublisher used to read the limit
+            refresh_interval: How often the quota is re-read from the API
+        """
+        if refresh_interval is None:
+            refresh_interval = timedelta(
+                minutes=int(os.getenv('PUBLISHING_QUOTA_REFRESH_MINUTES', '30'))
+            )
+
+        self._publisher = publisher
+        self.refresh_interval = refresh_interval
+        self._accounts: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def publisher(self):
+        if self._publisher is None:
+            from .instagram_publisher import InstagramPublisher
+            self._publisher = InstagramPublisher()
+        return self._publisher
+
+    def seed(
+        self,
+        account_id: int,
+        quota_usage: int,
+        quota_total: int,
+        now: Optional[datetime] = None
+    ) -> None:
+        """Sets an account's quota from a content_publishing_limit read."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            self._accounts[account_id] = {
+                'quota_total': quota_total,
+                'quota_usage': quota_usage,
+                'seeded_at': now,
+                'published': []  # local publishes since the seed
+            }
+
+    def _ensure_seeded(self, account_id: int, now: datetime) -> Optional[Dict]:
+        with self._lock:
+            state = self._accounts.get(account_id)
+            if state and now - state['seeded_at'] < self.refresh_interval:
+                return state
+
+        try:
+            account = self.publisher._get_instagram_account(account_id)
+            if not account:
+                return None
+            limit = self.publisher.get_publishing_limit(
+                account['instagram_user_id'],
+                account['access_token']
+            )
+        except Exception as e:
+            logger.warning(
+                f"Could not read publishing limit of account {account_id}: {e}"
+            )
+            return state
+
+        self.seed(account_id, limit['quota_usage'], limit['quota_total'], now)
+        with self._lock:
+            return self._accounts[account_id]
+
+    def remaining(
+        self,
+        account_id: int,
+        now: Optional[datetime] = None
+    ) -> Optional[int]:
+        """
+        Publications left in the account's rolling 24-hour quota.
+
+        Returns:
+            Remaining publications, or None if the quota is unknown
+        """
+        now = now or datetime.now(timezone.utc)
+        state = self._ensure_seeded(account_id, now)
+        if state is None:
+            return None
+
+        with self._lock:
+            return max(
+                0,
+                state['quota_total'] - state['quota_usage'] - len(state['published'])
+            )
+
+    def can_publish(self, account_id: int, now: Optional[datetime] = None) -> bool:
+        """True unless the account is known to be over its quota."""
+        remaining = self.remaining(account_id, now)
+        return remaining is None or remaining > 0
+
+    def record_publish(self, account_id: int, now: Optional[datetime] = None) -> None:
+        """Counts a successful publication against the account's quota."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            state = self._accounts.get(account_id)
+            if state:
+                state['published'].append(now)
+
+    def mark_exhausted(self, account_id: int, now: Optional[datetime] = None) -> None:
+        """Marks the quota as used up (Instagram rejected a publish)."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            state = self._accounts.get(account_id)
+            quota_total = state['quota_total'] if state else 0
+            self._accounts[account_id] = {
+                'quota_total': quota_total,
+                'quota_usage': quota_total,
+                'seeded_at': now,
+                'published': []
+            }
+        logger.warning(f"Publishing limit reached for account {account_id}")
+
+    def retry_after(self, account_id: int, now: Optional[datetime] = None) -> datetime:
+        """
+        When an over-quota account should be tried again.
+
+        The earliest local publication leaving the 24-hour window, or the
+        next quota refresh, whichever comes first.
+        """
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            state = self._accounts.get(account_id)
+            seeded_at = state['seeded_at'] if state else now
+            next_refresh = seeded_at + self.refresh_interval
+            published = state['published'] if state else []
+
+        candidates = [max(next_refresh, now + timedelta(minutes=1))]
+        if published:
+            candidates.append(min(published) + QUOTA_WINDOW)
+        return min(candidates)
+
+
+# Global tracker instance
+publishing_quota = None
+
+
+def get_publishing_quota() -> PublishingQuotaTracker:
+    """Gets the singleton publishing quota tracker."""
+    global publishing_quota
+    if publishing_quota is None:
+        publishing_quota = PublishingQuotaTracker()
+    return publishing_quota
@@ -0,0 +1,267 @@
+"""
+Container Readiness Schedules
+
+Decides when to check an Instagram media container again while it is
+processing, instead of polling at a fixed interval for a fixed number
+of attempts.
+
+A ReadinessSchedule makes a few fast checks first, then backs off
+exponentially up to a maximum interval, and gives up at an overall
+deadline. The starting point and deadline for each media type and size
+bucket are tuned from the processing times recorded in the
+container_processing_times table (migration 015).
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import logging
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Media size buckets (upper bound in bytes)
+SIZE_BUCKETS = [
+    ('small', 1 * 1024 * 1024),
+    ('medium', 10 * 1024 * 1024),
+    ('large', 50 * 1024 * 1024),
+]
+
+# Samples needed before the recorded timings replace the defaults
+MIN_SAMPLES = 5
+
+# Upper bound for any tuned deadline (seconds)
+MAX_DEADLINE = 900
+
+
+def size_bucket(size_bytes: Optional[int]) -> str:
+    """Returns the size bucket name for a media size in bytes."""
+    if not size_bytes:
+        return 'unknown'
+    for name, limit in SIZE_BUCKETS:
+        if size_bytes <= limit:
+            return name
+    return 'xlarge'
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class ReadinessSchedule:
+    """
+    Check schedule for one container: fast early checks, then backoff.
+
+    Delays (seconds before each check):
+        first_delay, fast_interval x fast_checks,
+        then fast_interval * backoff^n capped at max_interval,
+    until deadline seconds after the container was created.
+    """
+
+    def __init__(
+        self,
+        first_delay: float = 2,
+        fast_interval: float = 2,
+        fast_checks: int = 3,
+        backoff: float = 1.5,
+        max_interval: float = 10,
+        deadline: float = 60
+    ):
+        self.first_delay = first_delay
+        self.fast_interval = fast_interval
+        self.fast_checks = fast_checks
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.deadline = deadline
+
+    def delay_before(self, check_number: int) -> float:
+        """Delay before the given check (0 = first check)."""
+        if check_number <= 0:
+            return self.first_delay
+        if check_number <= self.fast_checks:
+            return self.fast_interval
+        exponent = check_number - self.fast_checks
+        return min(self.max_interval, self.fast_interval * self.backoff ** exponent)
+
+    def next_delay(self, checks_done: int, elapsed: float) -> Optional[float]:
+        """
+        Delay before the next check, or None if the deadline has passed.
+
+        The last check is pulled in so it lands on the deadline.
+
+        Args:
+            checks_done: Checks already made
+            elapsed: Seconds since the container was created
+        """
+        remaining = self.deadline - elapsed
+        if remaining <= 0:
+            return None
+        return min(self.delay_before(checks_done), remaining)
+
+    def to_dict(self) -> Dict:
+        return {
+            'first_delay': self.first_delay,
+            'fast_interval': self.fast_interval,
+            'fast_checks': self.fast_checks,
+            'backoff': self.backoff,
+            'max_interval': self.max_interval,
+            'deadline': self.deadline
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ReadinessSchedule':
+        return cls(**data)
+
+
+# Defaults per media type, used until enough timings are recorded
+DEFAULT_SCHEDULES = {
+    'IMAGE': ReadinessSchedule(),
+    'STORIES': ReadinessSchedule(),
+    'CAROUSEL': ReadinessSchedule(deadline=90),
+    'REELS': ReadinessSchedule(
+        first_delay=5,
+        fast_interval=3,
+        backoff=1.5,
+        max_interval=20,
+        deadline=300
+    ),
+}
+
+
+class ContainerTimingStats:
+    """
+    Recorded container processing times, used to tune the schedules.
+
+    Keeps the most recent samples per (media_type, size_bucket) in memory
+    and persists every sample to container_processing_times.
+    """
+
+    def __init__(self, db_client=None, window: int = 50):
+        """
+        Args:
+            db_client: Supabase client (default: admin client)
+            window: Recent samples kept per media type and size bucket
+        """
+        self._db_client = db_client
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def db_client(self):
+        if self._db_client is None:
+            from database.supabase_client import get_supabase_admin_client
+            self._db_client = get_supabase_admin_client()
+        return self._db_client
+
+    def _ensure_loaded(self) -> None:
+        """Loads recent successful timings from the database once."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+
+        try:
+            result = self.db_client.table('container_processing_times')\
+                .select('media_type, size_bucket, processing_seconds')\
+                .eq('outcome', 'ready')\
+                .order('created_at', desc=True)\
+                .limit(1000)\
+                .execute()
+        except Exception as e:
+            logger.warning(f"Could not load container processing times: {e}")
+            return
+
+        with self._lock:
+            # Oldest first so the deque keeps the newest samples
+            for row in reversed(result.data or []):
+                key = (row['media_type'], row['size_bucket'])
+                self._samples[key].append(float(row['processing_seconds']))
+
+    def add_sample(
+        self,
+        media_type: str,
+        bucket: str,
+        processing_seconds: float
+    ) -> None:
+        """Adds a successful processing time to the in-memory window."""
+        with self._lock:
+            self._samples[(media_type, bucket)].append(processing_seconds)
+
+    def record(self, publication: Dict, outcome: str) -> None:
+        """
+        Records how long a container took to become ready (or to fail).
+
+        Args:
+            publication: Publication dict (media_type, size_bytes,
+                created_at, checks)
+            outcome: ready, error or timeout
+        """
+        created_at = datetime.fromisoformat(publication['created_at'])
+        processing_seconds = (
+            datetime.now(timezone.utc) - created_at
+        ).total_seconds()
+        bucket = size_bucket(publication.get('size_bytes'))
+
+        if outcome == 'ready':
+            self.add_sample(publication['media_type'], bucket, processing_seconds)
+
+        try:
+            self.db_client.table('container_processing_times').insert({
+                'media_type': publication['media_type'],
+                'size_bucket': bucket,
+                'size_bytes': publication.get('size_bytes'),
+                'processing_seconds': round(processing_seconds, 2),
+                'checks': publication.get('checks', 0),
+                'outcome': outcome
+            }).execute()
+        except Exception as e:
+            logger.warning(f"Could not record container processing time: {e}")
+
+    def schedule_for(
+        self,
+        media_type: str,
+        size_bytes: Optional[int] = None
+    ) -> ReadinessSchedule:
+        """
+        Returns the readiness schedule for a new container.
+
+        With at least MIN_SAMPLES recorded timings for the media type and
+        size bucket, the first check is moved to just before the median
+        processing time and the deadline to twice the 95th percentile
+        (never below the default deadline).
+        """
+        self._ensure_loaded()
+
+        default = DEFAULT_SCHEDULES.get(media_type, DEFAULT_SCHEDULES['IMAGE'])
+        with self._lock:
+            samples = list(self._samples.get((media_type, size_bucket(size_bytes)), ()))
+
+        if len(samples) < MIN_SAMPLES:
+            return ReadinessSchedule.from_dict(default.to_dict())
+
+        p50 = _percentile(samples, 0.5)
+        p95 = _percentile(samples, 0.95)
+
+        schedule = ReadinessSchedule.from_dict(default.to_dict())
+        schedule.first_delay = max(1.0, round(p50 * 0.8, 1))
+        schedule.deadline = min(MAX_DEADLINE, max(default.deadline, round(p95 * 2)))
+        return schedule
+
+
+# Global stats instance
+container_timing_stats = None
+
+
+def get_container_timing_stats() -> ContainerTimingStats:
+    """Gets the singleton container timing stats."""
+    global container_timing_stats
+    if container_timing_stats is None:
+        container_timing_stats = ContainerTimingStats()
+    return container_timing_stats
@@ -0,0 +1,243 @@
+"""
+Burst Smoothing
+
+Users cluster posts on round times (09:00, 18:00), so many publish jobs
+come due in the same second and compete for the publish pool and the
+Graph API. Once a minute the upcoming publish jobs are planned ahead of
+time and each gets a dispatch_at (migration 023):
+
+- At most PUBLISH_MAX_STARTS_PER_MINUTE (default 12) publications start
+  per minute (0 disables smoothing).
+- A cluster of posts is spread around its requested time, never earlier
+  than BURST_TOLERANCE_SECONDS (default 120) before it. Later than the
+  tolerance only when the rate leaves no other choice (logged).
+- Within a cluster accounts are interleaved round-robin, so one account
+  with many posts does not delay everyone else's.
+- A post that does not collide with others keeps its requested time.
+
+scheduled_time stays the requested time (lag metrics); APScheduler jobs
+and pre-staging follow dispatch_at, and the queue claims by
+COALESCE(dispatch_at, scheduled_time). Changing scheduled_time (retry,
+reschedule, deferral) clears dispatch_at.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Jobs dispatched this soon are already firing and are not moved
+FREEZE = timedelta(seconds=60)
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _account_key(job: Dict):
+    post = job.get('posts') or {}
+    return post.get('user_id') or job['post_id']
+
+
+def _round_robin(jobs: List[Dict]) -> List[Dict]:
+    """Orders jobs so each account's n-th post comes after every account's (n-1)-th."""
+    seen: Dict = {}
+    ranked = []
+    for job in sorted(jobs, key=lambda j: (j['_requested'], j['post_id'])):
+        rank = seen.get(_account_key(job), 0)
+        seen[_account_key(job)] = rank + 1
+        ranked.append((rank, job['_requested'], job['post_id'], job))
+    return [job for *_, job in sorted(ranked, key=lambda r: r[:3])]
+
+
+class BurstSmoother:
+    """
+    Plans dispatch times for upcoming publish jobs.
+    """
+
+    def __init__(
+        self,
+        max_starts_per_minute: Optional[float] = None,
+        tolerance: Optional[timedelta] = None,
+        horizon: Optional[timedelta] = None
+    ):
+        """
+        Args:
+            max_starts_per_minute: Publication start rate cap
+                (PUBLISH_MAX_STARTS_PER_MINUTE, 0 = disabled)
+            tolerance: Max shift from the requested time
+                (BURST_TOLERANCE_SECONDS)
+            horizon: How far ahead jobs are planned (BURST_HORIZON_MINUTES,
+                default 15, enough to move pre-staging too)
+        """
+        if max_starts_per_minute is None:
+            max_starts_per_minute = float(
+                os.getenv('PUBLISH_MAX_STARTS_PER_MINUTE', '12')
+            )
+        if tolerance is None:
+            tolerance = timedelta(
+                seconds=int(os.getenv('BURST_TOLERANCE_SECONDS', '120'))
+            )
+        if horizon is None:
+            horizon = timedelta(
+                minutes=int(os.getenv('BURST_HORIZON_MINUTES', '15'))
+            )
+
+        self.enabled = max_starts_per_minute > 0
+        self.interval = (
+            timedelta(minutes=1) / max_starts_per_minute
+            if self.enabled else timedelta(0)
+        )
+        self.tolerance = tolerance
+        self.horizon = horizon
+
+    def plan(
+        self,
+        jobs: List[Dict],
+        now: Optional[datetime] = None
+    ) -> List[Tuple[Dict, datetime]]:
+        """
+        Plans dispatch times.
+
+        Args:
+            jobs: Pending publish jobs (post_id, scheduled_time, dispatch_at
+                and optionally posts.user_id)
+            now: Current time
+
+        Returns:
+            [(job, dispatch time)] for the jobs that can still be moved
+        """
+        if not self.enabled:
+            return []
+
+        now = now or datetime.now(timezone.utc)
+        frozen_until = now + FREEZE
+        earliest = frozen_until
+
+        movable = []
+        for job in jobs:
+            dispatch = _parse_timestamp(job.get('dispatch_at'))
+            requested = _parse_timestamp(job['scheduled_time'])
+            if (dispatch or requested) <= frozen_until:
+                # Already firing: later blocks start after it
+                earliest = max(earliest, (dispatch or requested) + self.interval)
+            else:
+                movable.append({**job, '_requested': requested})
+
+        # Clusters: jobs closer to each other than the start interval
+        clusters: List[List[Dict]] = []
+        for job in sorted(movable, key=lambda j: j['_requested']):
+            if (
+                clusters
+                and job['_requested'] - clusters[-1][-1]['_requested'] < self.interval
+            ):
+                clusters[-1].append(job)
+            else:
+                clusters.append([job])
+
+        # Blocks of slots centred on each cluster; overlapping blocks merge
+        blocks: List[Tuple[datetime, List[Dict]]] = []
+        for cluster in clusters:
+            while True:
+                start = self._block_start(cluster, earliest)
+                if blocks and start < (
+                    blocks[-1][0] + self.interval * len(blocks[-1][1])
+                ):
+                    cluster = blocks.pop()[1] + cluster
+                    continue
+                blocks.append((start, cluster))
+                break
+
+        plan = []
+        for start, cluster in blocks:
+            for i, job in enumerate(_round_robin(cluster)):
+                dispatch_at = start + self.interval * i
+                if dispatch_at - job['_requested'] > self.tolerance:
+                    logger.warning(
+                        f"⚠️  Post {job['post_id']} dispatched "
+                        f"{int((dispatch_at - job['_requested']).total_seconds())}s "
+                        f"late: more posts due than "
+                        f"PUBLISH_MAX_STARTS_PER_MINUTE allows"
+                    )
+                job = {k: v for k, v in job.items() if k != '_requested'}
+                plan.append((job, dispatch_at))
+
+        return plan
+
+    def _block_start(self, cluster: List[Dict], earliest: datetime) -> datetime:
+        """First slot of a cluster: centred, but not before tolerance or earliest."""
+        first = cluster[0]['_requested']
+        last = cluster[-1]['_requested']
+        span = self.interval * (len(cluster) - 1)
+        centred = first + (last - first) / 2 - span / 2
+        return max(centred, first - self.tolerance, earliest)
+
+
+def smooth_upcoming_jobs(
+    supabase,
+    smoother: Optional[BurstSmoother] = None,
+    on_dispatch: Optional[Callable[[Dict, datetime], None]] = None,
+    now: Optional[datetime] = None
+) -> int:
+    """
+    Plans the publish jobs due within the horizon and stores the
+    dispatch times that changed.
+
+    Args:
+        supabase: Supabase client
+        smoother: Planner (default: BurstSmoother from env)
+        on_dispatch: Called with (job, dispatch_at) for each moved job,
+            e.g. to re-arm its APScheduler jobs
+        now: Current time
+
+    Returns:
+        Number of jobs whose dispatch time changed
+    """
+    smoother = smoother or BurstSmoother()
+    if not smoother.enabled:
+        return 0
+
+    now = now or datetime.now(timezone.utc)
+
+    upcoming = supabase.table('scheduled_jobs')\
+        .select(
+            'job_id, post_id, scheduled_time, dispatch_at, prestaged_container, '
+            'posts(user_id)'
+        )\
+        .eq('job_type', 'publish_post')\
+        .in_('status', ['pending', 'retrying'])\
+        .gte('scheduled_time', (now - smoother.tolerance).isoformat())\
+        .lte('scheduled_time', (now + smoother.horizon).isoformat())\
+        .execute()
+
+    moved = 0
+    for job, dispatch_at in smoother.plan(upcoming.data or [], now):
+        current = (
+            _parse_timestamp(job.get('dispatch_at'))
+            or _parse_timestamp(job['scheduled_time'])
+        )
+        if abs((dispatch_at - current).total_seconds()) < 1:
+            continue
+
+        supabase.table('scheduled_jobs').update({
+            'dispatch_at': dispatch_at.isoformat()
+        }).eq('job_id', job['job_id']).execute()
+
+        if on_dispatch:
+            on_dispatch(job, dispatch_at)
+        moved += 1
+
+    if moved:
+        logger.info(f"📐 Burst smoothing moved {moved} upcoming publications")
+
+    return moved
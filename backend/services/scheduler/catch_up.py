@@ -0,0 +1,254 @@
+"""
+Catch-Up Policy
+
+What to do with scheduled posts that came due while the scheduler was
+down, instead of firing all of them at once (or silently dropping the
+older ones, as APScheduler does past misfire_grace_time):
+
+- Posts overdue by more than CATCH_UP_WINDOW_MINUTES (default 60) are
+  marked 'missed' (migration 022), their post is marked 'failed' and a
+  notification is sent (log + SCHEDULER_ALERT_WEBHOOK_URL if set).
+- The rest are released gradually, oldest first: at most
+  CATCH_UP_RATE_PER_MINUTE (default 10) overall and
+  CATCH_UP_ACCOUNT_RATE_PER_MINUTE (default 2) per account. The release
+  time goes to dispatch_at; scheduled_time stays the requested time, so
+  lag metrics include the downtime.
+
+Overdue jobs are claimed with claim_overdue_jobs() (migration 029): one
+process plans at a time, and jobs leased by a worker are left alone.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from services.scheduler.job_events import emit_job_event
+from services.scheduler.job_metrics import get_job_metrics
+
+logger = logging.getLogger(__name__)
+
+# How long claimed overdue jobs are reserved while they are planned
+CATCH_UP_LEASE_SECONDS = 60
+
+
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _account_key(job: Dict):
+    """Account a job publishes to (the post's user has one active account)."""
+    post = job.get('posts') or {}
+    return post.get('user_id') or job['post_id']
+
+
+class CatchUpPolicy:
+    """
+    Splits overdue jobs into releases (with a run time) and missed jobs.
+    """
+
+    def __init__(
+        self,
+        window: Optional[timedelta] = None,
+        rate_per_minute: Optional[float] = None,
+        account_rate_per_minute: Optional[float] = None
+    ):
+        """
+        Args:
+            window: Max lateness for a post to still be published
+            rate_per_minute: Overall release rate
+            account_rate_per_minute: Release rate per account
+        """
+        if window is None:
+            window = timedelta(
+                minutes=int(os.getenv('CATCH_UP_WINDOW_MINUTES', '60'))
+            )
+        if rate_per_minute is None:
+            rate_per_minute = float(os.getenv('CATCH_UP_RATE_PER_MINUTE', '10'))
+        if account_rate_per_minute is None:
+            account_rate_per_minute = float(
+                os.getenv('CATCH_UP_ACCOUNT_RATE_PER_MINUTE', '2')
+            )
+
+        self.window = window
+        self.interval = timedelta(minutes=1) / max(rate_per_minute, 0.01)
+        self.account_interval = (
+            timedelta(minutes=1) / max(account_rate_per_minute, 0.01)
+        )
+
+    def plan(
+        self,
+        jobs: List[Dict],
+        now: Optional[datetime] = None
+    ) -> Tuple[List[Tuple[Dict, datetime]], List[Dict]]:
+        """
+        Plans the catch-up of overdue jobs.
+
+        Args:
+            jobs: Overdue scheduled_jobs rows (post_id, scheduled_time and
+                optionally posts.user_id)
+            now: Current time
+
+        Returns:
+            ([(job, release time)], [missed jobs])
+        """
+        now = now or datetime.now(timezone.utc)
+
+        pending, missed = [], []
+        for job in sorted(jobs, key=lambda j: _parse_timestamp(j['scheduled_time'])):
+            if now - _parse_timestamp(job['scheduled_time']) > self.window:
+                missed.append(job)
+            else:
+                pending.append(job)
+
+        # One release per overall interval, picking the oldest job whose
+        # account is free at that moment
+        releases = []
+        account_free: Dict = {}
+        slot = now
+        while pending:
+            job = next(
+                (j for j in pending if account_free.get(_account_key(j), now) <= slot),
+                None
+            )
+            if job is None:
+                slot = min(account_free[_account_key(j)] for j in pending)
+                continue
+
+            pending.remove(job)
+            releases.append((job, slot))
+            account_free[_account_key(job)] = slot + self.account_interval
+            slot += self.interval
+
+        return releases, missed
+
+
+def notify_missed_posts(jobs: List[Dict]) -> None:
+    """
+    Reports posts that were not published because they were too late.
+
+    Logged as an error and, if SCHEDULER_ALERT_WEBHOOK_URL is set, posted
+    there as JSON.
+    """
+    if not jobs:
+        return
+
+    logger.error(
+        f"❌ {len(jobs)} scheduled posts missed (overdue beyond the catch-up "
+        f"window): {[job['post_id'] for job in jobs]}"
+    )
+
+    webhook_url = os.getenv('SCHEDULER_ALERT_WEBHOOK_URL')
+    if not webhook_url:
+        return
+
+    try:
+        requests.post(webhook_url, json={
+            'event': 'scheduled_posts_missed',
+            'posts': [
+                {'post_id': job['post_id'], 'scheduled_time': job['scheduled_time']}
+                for job in jobs
+            ]
+        }, timeout=10)
+    except requests.RequestException as e:
+        logger.warning(f"Could not send missed posts notification: {e}")
+
+
+def mark_jobs_missed(supabase, jobs: List[Dict]) -> None:
+    """Marks jobs 'missed' and their posts 'failed', then notifies."""
+    if not jobs:
+        return
+
+    post_ids = [job['post_id'] for job in jobs]
+    now = datetime.now(timezone.utc).isoformat()
+
+    supabase.table('scheduled_jobs').update({
+        'status': 'missed',
+        'error_message': 'Missed: overdue beyond the catch-up window',
+        'completed_at': now,
+        'locked_by': None,
+        'locked_until': None
+    }).in_('post_id', post_ids).in_('status', ['pending', 'retrying']).execute()
+
+    supabase.table('posts').update({
+        'status': 'failed'
+    }).in_('id', post_ids).execute()
+
+    get_job_metrics().record_missed(len(jobs))
+    for job in jobs:
+        emit_job_event(
+            supabase, job['post_id'], 'missed',
+            user_id=(job.get('posts') or {}).get('user_id'),
+            scheduled_time=job['scheduled_time']
+        )
+    notify_missed_posts(jobs)
+
+
+def catch_up_overdue_jobs(
+    supabase,
+    policy: Optional[CatchUpPolicy] = None,
+    on_release: Optional[Callable[[int, datetime], None]] = None,
+    now: Optional[datetime] = None,
+    worker_id: str = 'catch_up'
+) -> Dict:
+    """
+    Applies the catch-up policy to every overdue publish job.
+
+    Released jobs get their release time as dispatch_at and their lease
+    is cleared (and on_release(post_id, release_time) is called, e.g. to
+    re-arm the APScheduler job); missed ones are handled by
+    mark_jobs_missed(). If another process is already catching up,
+    nothing is claimed.
+
+    Args:
+        supabase: Supabase client
+        policy: Catch-up policy (default: CatchUpPolicy from env)
+        on_release: Called with (post_id, release time) per released job
+        now: Current time
+        worker_id: Lease owner of the claimed jobs while they are planned
+
+    Returns:
+        {'released': n, 'missed': n}
+    """
+    policy = policy or CatchUpPolicy()
+    now = now or datetime.now(timezone.utc)
+
+    overdue = supabase.rpc('claim_overdue_jobs', {
+        'p_worker_id': worker_id,
+        'p_lease_seconds': CATCH_UP_LEASE_SECONDS
+    }).execute()
+
+    releases, missed = policy.plan(overdue.data or [], now)
+
+    for job, release_at in releases:
+        supabase.table('scheduled_jobs').update({
+            'dispatch_at': release_at.isoformat(),
+            'locked_by': None,
+            'locked_until': None
+        }).eq('job_id', job['job_id']).execute()
+
+        if on_release:
+            on_release(job['post_id'], release_at)
+
+        get_job_metrics().record_catch_up(
+            (release_at - _parse_timestamp(job['scheduled_time'])).total_seconds()
+        )
+
+    mark_jobs_missed(supabase, missed)
+
+    if releases or missed:
+        logger.warning(
+            f"⏪ Catch-up: {len(releases)} overdue posts released "
+            f"until {releases[-1][1].isoformat() if releases else '-'}, "
+            f"{len(missed)} missed"
+        )
+
+    return {'released': len(releases), 'missed': len(missed)}
@@ -0,0 +1,267 @@
+"""
+Dead-Letter Store
+
+Publications that run out of retries are kept in publish_dead_letters
+(migration 026) by fail_scheduled_job, with what is needed to recover
+them in bulk:
+
+- error_class: rate_limit, auth, media, transient, validation or unknown
+  (classify_publish_error)
+- error_code: Graph API error code, if any
+- container_id / staged_container: the container already created and,
+  if it reached READY, what is needed to publish it without recreating
+  it
+
+replay_dead_letters() reschedules the open ones (e.g. every 'transient'
+failure after an outage) in one transaction, paced like the catch-up of
+overdue posts (CATCH_UP_RATE_PER_MINUTE overall and
+CATCH_UP_ACCOUNT_RATE_PER_MINUTE per account). READY containers that
+will still be valid at their new time are handed back as pre-staged
+containers, so the replay only calls media_publish for them. If the
+post was edited since the container was created (its content_hash no
+longer matches), a new container is created as usual; if media_publish
+fails, the replay fails and keeps the container, like any retry.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from requests.exceptions import RequestException
+
+from services.publisher.instagram_publisher import CONTAINER_MAX_AGE
+from services.publisher.publishing_quota import is_publishing_limit_error
+from services.scheduler.catch_up import CatchUpPolicy
+from services.scheduler.job_events import emit_job_event
+from services.scheduler.job_metrics import get_job_metrics
+
+logger = logging.getLogger(__name__)
+
+ERROR_CLASSES = ('rate_limit', 'auth', 'media', 'transient', 'validation', 'unknown')
+
+# Graph API error codes per class
+RATE_LIMIT_CODES = {4, 17, 32, 613}
+AUTH_CODES = {10, 102, 190, 200}
+MEDIA_CODES = {352, 9004, 36000, 36001, 36003, 36004}
+TRANSIENT_CODES = {1, 2}
+VALIDATION_CODES = {100}
+
+# Message fragments of errors raised before or without the Graph API
+AUTH_MESSAGES = ('account', 'access token')
+MEDIA_MESSAGES = (
+    'url no accesible', 'content-type inválido', 'processing failed',
+    'carousel', 'required for'
+)
+TRANSIENT_MESSAGES = ('timed out', 'timeout', 'no response', 'shut down')
+
+# Dead letters replayed per call
+REPLAY_BATCH_SIZE = 500
+
+
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def classify_publish_error(error: Exception) -> str:
+    """
+    Error class of a publish failure, used to replay failures in bulk.
+
+    Args:
+        error: Exception raised while publishing (InstagramPublishError
+            carries the Graph API error_code)
+
+    Returns:
+        One of ERROR_CLASSES
+    """
+    code = getattr(error, 'error_code', None)
+    message = str(error).lower()
+
+    if code in RATE_LIMIT_CODES or is_publishing_limit_error(error):
+        return 'rate_limit'
+    if code in AUTH_CODES or any(m in message for m in AUTH_MESSAGES):
+        return 'auth'
+    if code in MEDIA_CODES or any(m in message for m in MEDIA_MESSAGES):
+        return 'media'
+    if (
+        code in TRANSIENT_CODES
+        or isinstance(error, RequestException)
+        or any(m in message for m in TRANSIENT_MESSAGES)
+    ):
+        return 'transient'
+    if code in VALIDATION_CODES or isinstance(error, ValueError):
+        return 'validation'
+    return 'unknown'
+
+
+def failure_context(error: Exception) -> Dict:
+    """
+    Failure parameters of the fail_scheduled_job RPC (migration 026).
+
+    The READY container, if any, is reused by the retry and kept in the
+    dead letter when the retries run out.
+    """
+    return {
+        'p_error_class': classify_publish_error(error),
+        'p_error_code': getattr(error, 'error_code', None),
+        'p_container_id': getattr(error, 'container_id', None),
+        'p_staged_container': getattr(error, 'staged_container', None)
+    }
+
+
+def reusable_container(dead_letter: Dict, publish_at: datetime) -> Optional[Dict]:
+    """The dead letter's READY container, if still valid at publish_at."""
+    staged = dead_letter.get('staged_container')
+    if not staged or not staged.get('created_at'):
+        return None
+    if publish_at - _parse_timestamp(staged['created_at']) > CONTAINER_MAX_AGE:
+        return None
+    return staged
+
+
+def get_dead_letters(
+    supabase,
+    user_id: Optional[str] = None,
+    error_class: Optional[str] = None,
+    status: Optional[str] = 'open',
+    limit: int = 50
+) -> List[Dict]:
+    """
+    Lists dead letters, most recent failures first.
+
+    Args:
+        supabase: Supabase client
+        user_id: Only failures of this user's posts
+        error_class: Only failures of this class
+        status: open, replayed or resolved (None = any)
+        limit: Max rows
+
+    Returns:
+        publish_dead_letters rows (without the staged container), with
+        'container_reusable' telling whether a replay now would reuse it
+    """
+    columns = '*, posts!inner(user_id)' if user_id else '*'
+    query = supabase.table('publish_dead_letters').select(columns)
+
+    if user_id:
+        query = query.eq('posts.user_id', user_id)
+    if error_class:
+        query = query.eq('error_class', error_class)
+    if status:
+        query = query.eq('status', status)
+
+    result = query.order('failed_at', desc=True).limit(limit).execute()
+
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            **{k: v for k, v in row.items() if k not in ('posts', 'staged_container')},
+            'container_reusable': reusable_container(row, now) is not None
+        }
+        for row in result.data or []
+    ]
+
+
+def replay_dead_letters(
+    supabase,
+    error_class: Optional[str] = None,
+    post_ids: Optional[List[int]] = None,
+    user_id: Optional[str] = None,
+    policy: Optional[CatchUpPolicy] = None,
+    on_release: Optional[Callable[[int, datetime], None]] = None,
+    now: Optional[datetime] = None
+) -> Dict:
+    """
+    Reschedules open dead letters in one transaction.
+
+    Args:
+        supabase: Supabase client
+        error_class: Only failures of this class
+        post_ids: Only these posts
+        user_id: Only failures of this user's posts
+        policy: Release pacing (default: CatchUpPolicy from env, without
+            a window: dead letters are never too late to replay)
+        on_release: Called with (post_id, run time) for each replayed
+            job, e.g. to register its APScheduler job
+        now: Current time
+
+    Returns:
+        {'replayed': n, 'containers_reused': n, 'skipped': n} where
+        skipped posts were rescheduled or published some other way
+        since they failed (their dead letter is resolved)
+    """
+    policy = policy or CatchUpPolicy(window=timedelta.max)
+    now = now or datetime.now(timezone.utc)
+
+    query = supabase.table('publish_dead_letters')\
+        .select('post_id, failed_at, staged_container, posts!inner(user_id)')\
+        .eq('status', 'open')
+
+    if error_class:
+        query = query.eq('error_class', error_class)
+    if post_ids:
+        query = query.in_('post_id', post_ids)
+    if user_id:
+        query = query.eq('posts.user_id', user_id)
+
+    dead_letters = query\
+        .order('failed_at', desc=False)\
+        .limit(REPLAY_BATCH_SIZE)\
+        .execute().data or []
+
+    if not dead_letters:
+        return {'replayed': 0, 'containers_reused': 0, 'skipped': 0}
+
+    # Oldest failures first, spread per account like overdue posts
+    releases, _ = policy.plan(
+        [{**row, 'scheduled_time': row['failed_at']} for row in dead_letters],
+        now
+    )
+
+    items = [
+        {
+            'post_id': row['post_id'],
+            'scheduled_time': release_at.isoformat(),
+            'container': reusable_container(row, release_at)
+        }
+        for row, release_at in releases
+    ]
+
+    replayed = supabase.rpc('replay_dead_letters', {
+        'p_items': items
+    }).execute().data or []
+
+    users = {
+        row['post_id']: (row.get('posts') or {}).get('user_id')
+        for row in dead_letters
+    }
+    for job in replayed:
+        run_at = _parse_timestamp(job['scheduled_time'])
+        if on_release:
+            on_release(job['post_id'], run_at)
+        emit_job_event(
+            supabase, job['post_id'], 'pending',
+            user_id=users.get(job['post_id']),
+            scheduled_time=run_at.isoformat(),
+            replayed=True
+        )
+
+    reused = sum(1 for job in replayed if job.get('container_reused'))
+    get_job_metrics().record_replay(len(replayed))
+
+    logger.info(
+        f"♻️  Replayed {len(replayed)} failed publications "
+        f"({reused} reusing their container, "
+        f"{len(dead_letters) - len(replayed)} already rescheduled)"
+    )
+
+    return {
+        'replayed': len(replayed),
+        'containers_reused': reused,
+        'skipped': len(dead_letters) - len(replayed)
+    }
@@ -0,0 +1,147 @@
+"""
+Scheduler Executors
+
+Separate APScheduler thread pools for each kind of job, so a long
+metrics sync cannot take the threads that publish jobs need:
+
+- publish (the 'default' executor): publish_post_job and its retries.
+  Jobs persisted before the named executors also run here.
+- sync: the metrics sync cron
+- maintenance: pre-staging and other background jobs
+
+Pool sizes are set with SCHEDULER_PUBLISH_WORKERS (default 5),
+SCHEDULER_SYNC_WORKERS (default 2) and SCHEDULER_MAINTENANCE_WORKERS
+(default 2).
+
+Each pool records its saturation (running / size), its backlog and how
+long jobs waited between their scheduled run time and their start.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict
+
+from apscheduler.executors.base import run_job
+from apscheduler.executors.pool import ThreadPoolExecutor
+
+# Executor aliases for add_job(executor=...)
+PUBLISH_EXECUTOR = 'default'
+SYNC_EXECUTOR = 'sync'
+MAINTENANCE_EXECUTOR = 'maintenance'
+
+# Waits kept per pool for the p95
+RECENT_WAITS = 200
+
+
+class PoolMetrics:
+    """
+    Saturation and wait-time counters of one executor pool.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits = deque(maxlen=RECENT_WAITS)
+        self._lock = threading.Lock()
+
+    def job_queued(self) -> None:
+        with self._lock:
+            self._queued += 1
+
+    def job_started(self, scheduled_run_time: datetime) -> None:
+        wait = max(
+            0.0,
+            (datetime.now(timezone.utc) - scheduled_run_time).total_seconds()
+        )
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._recent_waits.append(wait)
+
+    def job_finished(self) -> None:
+        with self._lock:
+            self._running -= 1
+            self._completed += 1
+
+    def snapshot(self) -> Dict:
+        """Current counters of the pool."""
+        with self._lock:
+            started = self._completed + self._running
+            recent = sorted(self._recent_waits)
+            return {
+                'name': self.name,
+                'max_workers': self.max_workers,
+                'running': self._running,
+                'queued': self._queued,
+                'saturation': round(self._running / self.max_workers, 2),
+                'completed': self._completed,
+                'avg_wait_seconds': (
+                    round(self._wait_total / started, 3) if started else 0.0
+                ),
+                'p95_wait_seconds': (
+                    round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3)
+                    if recent else 0.0
+                ),
+                'max_wait_seconds': round(self._wait_max, 3)
+            }
+
+
+class MeteredThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    APScheduler ThreadPoolExecutor that records PoolMetrics.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers)
+        self.metrics = PoolMetrics(name, max_workers)
+
+    def _do_submit_job(self, job, run_times):
+        metrics = self.metrics
+
+        def run(*args):
+            metrics.job_started(min(run_times))
+            try:
+                return run_job(*args)
+            finally:
+                metrics.job_finished()
+
+        def callback(f):
+            exc = f.exception()
+            if exc:
+                self._run_job_error(job.id, exc, exc.__traceback__)
+            else:
+                self._run_job_success(job.id, f.result())
+
+        metrics.job_queued()
+        f = self._pool.submit(
+            run, job, job._jobstore_alias, run_times, self._logger.name
+        )
+        f.add_done_callback(callback)
+
+
+def create_executors() -> Dict[str, MeteredThreadPoolExecutor]:
+    """Executors for BackgroundScheduler(executors=...), sized from env."""
+    sizes = {
+        PUBLISH_EXECUTOR: ('publish', 'SCHEDULER_PUBLISH_WORKERS', '5'),
+        SYNC_EXECUTOR: ('sync', 'SCHEDULER_SYNC_WORKERS', '2'),
+        MAINTENANCE_EXECUTOR: ('maintenance', 'SCHEDULER_MAINTENANCE_WORKERS', '2')
+    }
+    return {
+        alias: MeteredThreadPoolExecutor(
+            name,
+            max(1, int(os.getenv(env_var, default)))
+        )
+        for alias, (name, env_var, default) in sizes.items()
+    }
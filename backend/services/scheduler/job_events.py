@@ -0,0 +1,168 @@
+"""
+Job Event Bus
+
+In-process publish/subscribe of scheduled job state changes, so open
+dashboards are told when a post is scheduled, starts publishing, goes
+live, is retried, fails or is missed, instead of polling
+/api/scheduler/jobs.
+
+The scheduler publishes from its worker threads; subscribers are
+asyncio queues read by GET /api/scheduler/events (Server-Sent Events),
+one per connection and scoped to a user. A slow subscriber loses its
+oldest events rather than blocking the scheduler.
+
+Only transitions that happen in this process are seen: with several
+processes (SCHEDULER_BACKEND=queue) a dashboard receives the events of
+the process it is connected to.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class JobEventSubscription:
+    """
+    Events of one user for one connection, read from its event loop.
+    """
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.dropped = 0
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def push(self, event: Dict) -> None:
+        """Queues an event (thread-safe)."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # Event loop closed: the connection is gone
+
+    def _put(self, event: Dict) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Next event, or None after timeout seconds without one."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class JobEventBus:
+    """
+    Fans job state changes out to the subscriptions of each user.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[JobEventSubscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: str) -> JobEventSubscription:
+        """Subscribes the calling event loop to a user's events."""
+        subscription = JobEventSubscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: JobEventSubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscribers.pop(subscription.user_id, None)
+
+    def has_subscribers(self, user_id: Optional[str] = None) -> bool:
+        """Whether anyone (or this user) is listening."""
+        with self._lock:
+            if user_id is None:
+                return bool(self._subscribers)
+            return user_id in self._subscribers
+
+    def publish(self, event: Dict) -> None:
+        """Sends an event to its user's subscriptions."""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(event.get('user_id'), ()))
+        for subscription in subscriptions:
+            subscription.push(event)
+
+
+# Global event bus instance
+job_event_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_job_event_bus() -> JobEventBus:
+    """Gets the singleton job event bus."""
+    global job_event_bus
+    with _bus_lock:
+        if job_event_bus is None:
+            job_event_bus = JobEventBus()
+        return job_event_bus
+
+
+def emit_job_event(
+    supabase,
+    post_id: int,
+    status: str,
+    user_id: Optional[str] = None,
+    **details
+) -> None:
+    """
+    Publishes a job state change of a post.
+
+    Nothing is sent (or queried) while nobody is subscribed. Without
+    user_id the post's owner is looked up. Errors are only logged: an
+    event never breaks the job that emits it.
+
+    Args:
+        supabase: Supabase client (to look up the post's user)
+        post_id: ID of the post
+        status: New job status (pending, running, completed, retrying,
+            failed, cancelled, missed)
+        user_id: Owner of the post, if known
+        **details: Extra fields (instagram_post_id, error, scheduled_time...)
+    """
+    bus = get_job_event_bus()
+    if not bus.has_subscribers():
+        return
+
+    try:
+        if user_id is None:
+            post = supabase.table('posts')\
+                .select('user_id')\
+                .eq('id', post_id)\
+                .limit(1)\
+                .execute()
+            if not post.data:
+                return
+            user_id = post.data[0]['user_id']
+
+        if not bus.has_subscribers(user_id):
+            return
+
+        bus.publish({
+            'type': 'job_state',
+            'user_id': user_id,
+            'post_id': post_id,
+            'job_id': f"post_{post_id}",
+            'status': status,
+            'at': datetime.now(timezone.utc).isoformat(),
+            **details
+        })
+    except Exception as e:
+        logger.warning(f"Could not publish job event for post {post_id}: {e}")
@@ -0,0 +1,200 @@
+"""
+Scheduler Job Metrics
+
+Histograms of how late and how long scheduled publications run, built
+from the timestamps stored on each scheduled_jobs row (migration 021):
+
+    scheduled_time → claimed_at → started_at → container_ready_at
+    → published_at
+
+- lag_seconds: started_at - scheduled_time (scheduler lag)
+- claim_lag_seconds: claimed_at - scheduled_time
+- container_wait_seconds: container_ready_at - started_at (pre-staged
+  containers are ready before the start and are not counted)
+- publish_duration_seconds: published_at - started_at
+- end_to_end_seconds: published_at - scheduled_time
+- retries: retry_count of each finished job (published or failed)
+- catch_up_delay_seconds: how far past its scheduled time the catch-up
+  policy released an overdue job (catch_up.py)
+
+Counts are kept in memory per process, with cumulative buckets as in
+Prometheus, and exposed by GET /api/scheduler/metrics.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+SECONDS_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+RETRY_BUCKETS = (0, 1, 2, 3, 5)
+
+# (histogram, end timestamp, start timestamp)
+TIMING_SPANS = (
+    ('lag_seconds', 'started_at', 'scheduled_time'),
+    ('claim_lag_seconds', 'claimed_at', 'scheduled_time'),
+    ('container_wait_seconds', 'container_ready_at', 'started_at'),
+    ('publish_duration_seconds', 'published_at', 'started_at'),
+    ('end_to_end_seconds', 'published_at', 'scheduled_time'),
+)
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def job_timings(job: Dict) -> Dict[str, Optional[float]]:
+    """
+    Durations (seconds) between the timestamps of a scheduled_jobs row.
+
+    Spans with a missing timestamp, or negative ones (a pre-staged
+    container is ready before the job starts), are None.
+    """
+    timings = {}
+    for name, end, start in TIMING_SPANS:
+        end_at = _parse_timestamp(job.get(end))
+        start_at = _parse_timestamp(job.get(start))
+        if end_at and start_at and end_at >= start_at:
+            timings[name] = round((end_at - start_at).total_seconds(), 3)
+        else:
+            timings[name] = None
+    return timings
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram (thread-safe).
+    """
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * len(self.buckets)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'buckets': {
+                    str(bound): count
+                    for bound, count in zip(self.buckets, self._counts)
+                },
+                'count': self._count,
+                'sum': round(self._sum, 3)
+            }
+
+
+class SchedulerJobMetrics:
+    """
+    Lag, duration and retry histograms of scheduled publications.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {
+            name: Histogram(SECONDS_BUCKETS) for name, _, _ in TIMING_SPANS
+        }
+        self.histograms['retries'] = Histogram(RETRY_BUCKETS)
+        self.histograms['catch_up_delay_seconds'] = Histogram(SECONDS_BUCKETS)
+        self.published = 0
+        self.failed = 0
+        self.missed = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+
+    def record_completion(self, job: Dict) -> None:
+        """Records a published job (row timestamps and retry_count)."""
+        for name, seconds in job_timings(job).items():
+            if seconds is not None:
+                self.histograms[name].observe(seconds)
+        self.histograms['retries'].observe(job.get('retry_count') or 0)
+        with self._lock:
+            self.published += 1
+
+    def record_failure(self, retry_count: int) -> None:
+        """Records a job that failed after its last retry."""
+        self.histograms['retries'].observe(retry_count or 0)
+        with self._lock:
+            self.failed += 1
+
+    def record_catch_up(self, delay_seconds: float) -> None:
+        """Records an overdue job released by the catch-up policy."""
+        self.histograms['catch_up_delay_seconds'].observe(max(0.0, delay_seconds))
+
+    def record_missed(self, count: int = 1) -> None:
+        """Records jobs given up as missed by the catch-up policy."""
+        with self._lock:
+            self.missed += count
+
+    def record_replay(self, count: int = 1) -> None:
+        """Records failed jobs rescheduled from the dead-letter store."""
+        with self._lock:
+            self.replayed += count
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = {
+                'published': self.published,
+                'failed': self.failed,
+                'missed': self.missed,
+                'replayed': self.replayed
+            }
+        return {
+            **counters,
+            'histograms': {
+                name: histogram.snapshot()
+                for name, histogram in self.histograms.items()
+            }
+        }
+
+    def to_prometheus(self, prefix: str = 'sociallab_scheduler') -> str:
+        """Metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        for counter in ('published', 'failed', 'missed', 'replayed'):
+            lines.append(f"# TYPE {prefix}_jobs_{counter}_total counter")
+            lines.append(f"{prefix}_jobs_{counter}_total {snapshot[counter]}")
+
+        for name, histogram in snapshot['histograms'].items():
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for bound, count in histogram['buckets'].items():
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram["count"]}')
+            lines.append(f"{metric}_sum {histogram['sum']}")
+            lines.append(f"{metric}_count {histogram['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+# Global metrics instance
+job_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_job_metrics() -> SchedulerJobMetrics:
+    """Gets the singleton scheduler job metrics."""
+    global job_metrics
+    with _metrics_lock:
+        if job_metrics is None:
+            job_metrics = SchedulerJobMetrics()
+        return job_metrics
@@ -0,0 +1,364 @@
+"""
+Job Queue
+
+Database-backed alternative to APScheduler for scheduled jobs
+(SCHEDULER_BACKEND=queue).
+
+The scheduled_jobs table is the queue: workers claim due rows with
+claim_due_jobs() (migration 019, FOR UPDATE SKIP LOCKED plus a lease),
+so any number of processes can pull jobs without running one twice.
+Publish jobs keep a lease while running (migration 028); jobs left
+running by a stopped worker are recovered once their lease expires.
+Every API process runs a worker thread, and more workers can be started
+on their own:
+
+    python -m services.scheduler.job_queue --concurrency 8
+
+Job types:
+- publish_post: publish_post_job(post_id); containers are pre-staged
+  with claim_prestage_jobs() PRESTAGE_LEAD_MINUTES ahead
+- sync_insights: one metrics sync per 15-minute slot. Each worker
+  inserts the row of the current slot idempotently (unique job_id), so
+  only one of them runs it. Skipped with SYNC_WORKER_MODE=external.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import sys
+import uuid
+import socket
+import logging
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from services.scheduler.burst_smoothing import smooth_upcoming_jobs
+from services.scheduler.catch_up import catch_up_overdue_jobs
+
+logger = logging.getLogger(__name__)
+
+SYNC_SLOT_MINUTES = 15
+BURST_SMOOTHING_SECONDS = 60
+ARCHIVE_INTERVAL_SECONDS = 3600
+REQUEUE_EXPIRED_SECONDS = 60
+
+
+def use_job_queue() -> bool:
+    """True if scheduled jobs run on the database queue."""
+    return os.getenv('SCHEDULER_BACKEND', 'apscheduler') == 'queue'
+
+
+def sync_slot(now: datetime, minutes: int = SYNC_SLOT_MINUTES) -> datetime:
+    """Start of the sync slot containing now."""
+    return now.replace(
+        minute=now.minute - now.minute % minutes,
+        second=0,
+        microsecond=0
+    )
+
+
+def sync_job_id(slot: datetime) -> str:
+    """job_id of a slot's sync row, e.g. sync_insights_20261019T1215."""
+    return f"sync_insights_{slot.strftime('%Y%m%dT%H%M')}"
+
+
+class JobQueueWorker:
+    """
+    Claims due scheduled_jobs rows and runs them in a thread pool.
+    """
+
+    def __init__(
+        self,
+        db_client=None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: int = 300
+    ):
+        """
+        Args:
+            db_client: Supabase client (default: admin client)
+            concurrency: Jobs run in parallel (JOB_QUEUE_CONCURRENCY)
+            batch_size: Max jobs claimed per poll (JOB_QUEUE_BATCH_SIZE)
+            poll_interval: Seconds between polls (JOB_QUEUE_POLL_SECONDS)
+            lease_seconds: How long a claimed job is reserved for this
+                worker before another one may take it
+        """
+        if concurrency is None:
+            concurrency = int(os.getenv('JOB_QUEUE_CONCURRENCY', '5'))
+        if batch_size is None:
+            batch_size = int(os.getenv('JOB_QUEUE_BATCH_SIZE', '10'))
+        if poll_interval is None:
+            poll_interval = float(os.getenv('JOB_QUEUE_POLL_SECONDS', '5'))
+
+        self._db_client = db_client
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.sync_enabled = os.getenv('SYNC_WORKER_MODE', 'inline') != 'external'
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix='job-queue'
+        )
+        self._active = 0
+        self._active_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def db(self):
+        if self._db_client is None:
+            from database.supabase_client import get_supabase_admin_client
+            self._db_client = get_supabase_admin_client()
+        return self._db_client
+
+    def ensure_sync_job(self, now: Optional[datetime] = None) -> None:
+        """Inserts the current slot's sync row if no worker did yet."""
+        slot = sync_slot(now or datetime.now(timezone.utc))
+        self.db.table('scheduled_jobs').upsert({
+            'job_id': sync_job_id(slot),
+            'job_type': 'sync_insights',
+            'scheduled_time': slot.isoformat(),
+            'status': 'pending',
+            'retry_count': 0,
+            'max_retries': 0
+        }, on_conflict='job_id', ignore_duplicates=True).execute()
+
+    def _free_slots(self) -> int:
+        with self._active_lock:
+            return min(self.batch_size, self.concurrency - self._active)
+
+    def claim_due(self, limit: int) -> List[Dict]:
+        """Claims up to limit due jobs for this worker."""
+        result = self.db.rpc('claim_due_jobs', {
+            'p_worker_id': self.worker_id,
+            'p_limit': limit,
+            'p_lease_seconds': self.lease_seconds
+        }).execute()
+        return result.data or []
+
+    def claim_prestage(self, limit: int) -> List[Dict]:
+        """Claims up to limit publish jobs whose container is due for pre-staging."""
+        from services.scheduler.post_scheduler import get_prestage_lead
+
+        lead = get_prestage_lead()
+        if lead <= timedelta(0):
+            return []
+
+        result = self.db.rpc('claim_prestage_jobs', {
+            'p_worker_id': self.worker_id,
+            'p_lead_seconds': int(lead.total_seconds()),
+            'p_limit': limit
+        }).execute()
+        return result.data or []
+
+    def run_job(self, job: Dict) -> None:
+        """Runs one claimed job."""
+        from services.scheduler.post_scheduler import publish_post_job
+
+        try:
+            if job['job_type'] == 'publish_post':
+                publish_post_job(job['post_id'])
+            elif job['job_type'] == 'sync_insights':
+                self._run_sync(job)
+            else:
+                logger.warning(
+                    f"Unknown job type {job['job_type']} ({job['job_id']})"
+                )
+        except Exception as e:
+            # publish_post_job records its own failures
+            logger.error(f"Queued job {job['job_id']} failed: {e}")
+
+    def _run_sync(self, job: Dict) -> None:
+        from services.sync_worker import SyncWorker
+
+        self.db.table('scheduled_jobs').update({
+            'status': 'running'
+        }).eq('id', job['id']).execute()
+
+        try:
+            summary = SyncWorker(use_lease=True, db_client=self.db).run_once()
+            self.db.table('scheduled_jobs').update({
+                'status': 'completed',
+                'completed_at': datetime.now(timezone.utc).isoformat()
+            }).eq('id', job['id']).execute()
+            logger.info(f"Metrics sync {job['job_id']} completed: {summary}")
+        except Exception as e:
+            self.db.table('scheduled_jobs').update({
+                'status': 'failed',
+                'error_message': str(e),
+                'completed_at': datetime.now(timezone.utc).isoformat()
+            }).eq('id', job['id']).execute()
+            raise
+
+    def _run_prestage(self, job: Dict) -> None:
+        from services.scheduler.post_scheduler import prestage_post_job
+
+        try:
+            prestage_post_job(job['post_id'])
+        except Exception as e:
+            logger.warning(f"Pre-staging of post {job['post_id']} failed: {e}")
+
+    def _submit(self, func, job: Dict) -> None:
+        with self._active_lock:
+            self._active += 1
+
+        def run():
+            try:
+                func(job)
+            finally:
+                with self._active_lock:
+                    self._active -= 1
+
+        self._pool.submit(run)
+
+    def run_once(self) -> int:
+        """
+        Polls the queue once and submits the claimed jobs.
+
+        Returns:
+            Number of jobs submitted
+        """
+        if self.sync_enabled:
+            try:
+                self.ensure_sync_job()
+            except Exception as e:
+                logger.warning(f"Could not enqueue metrics sync: {e}")
+
+        submitted = 0
+        for claim, run in (
+            (self.claim_prestage, self._run_prestage),
+            (self.claim_due, self.run_job)
+        ):
+            free = self._free_slots()
+            if free <= 0:
+                break
+            for job in claim(free):
+                self._submit(run, job)
+                submitted += 1
+
+        return submitted
+
+    def _archive_finished(self) -> None:
+        from services.scheduler.post_scheduler import archive_finished_jobs
+
+        try:
+            archive_finished_jobs(self.db)
+        except Exception as e:
+            logger.warning(f"Could not archive finished jobs: {e}")
+
+    def _requeue_expired(self) -> None:
+        from services.scheduler.post_scheduler import requeue_expired_jobs
+
+        try:
+            requeue_expired_jobs(self.db)
+        except Exception as e:
+            logger.warning(f"Could not recover jobs with an expired lease: {e}")
+
+    def run_forever(self) -> None:
+        """Polls the queue until stop() is called."""
+        logger.info(
+            f"🚀 Job queue worker {self.worker_id} started "
+            f"(concurrency {self.concurrency})"
+        )
+
+        # Spread out (or mark missed) what came due while no worker ran
+        try:
+            catch_up_overdue_jobs(self.db, worker_id=self.worker_id)
+        except Exception as e:
+            logger.error(f"❌ Error catching up overdue jobs: {e}")
+
+        next_smoothing = next_archive = next_requeue = 0.0
+        while not self._stop.is_set():
+            # Plan dispatch_at of upcoming publications (burst_smoothing.py)
+            if time.monotonic() >= next_smoothing:
+                try:
+                    smooth_upcoming_jobs(self.db)
+                except Exception as e:
+                    logger.warning(f"Could not smooth upcoming publications: {e}")
+                next_smoothing = time.monotonic() + BURST_SMOOTHING_SECONDS
+
+            # Retention of finished jobs (idempotent across workers)
+            if time.monotonic() >= next_archive:
+                self._archive_finished()
+                next_archive = time.monotonic() + ARCHIVE_INTERVAL_SECONDS
+
+            # Jobs left running by a stopped worker (idempotent across workers)
+            if time.monotonic() >= next_requeue:
+                self._requeue_expired()
+                next_requeue = time.monotonic() + REQUEUE_EXPIRED_SECONDS
+
+            try:
+                submitted = self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Error polling job queue: {e}")
+                submitted = 0
+
+            # Poll again right away while there is a backlog
+            if not submitted or self._free_slots() <= 0:
+                self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        """Runs the worker in a background thread."""
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            name='job-queue-worker',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stops polling and, if wait, lets running jobs finish."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._pool.shutdown(wait=wait)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Worker of the scheduled_jobs queue (SCHEDULER_BACKEND=queue)"
+    )
+    parser.add_argument('--concurrency', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--poll-interval', type=float, default=None)
+    parser.add_argument('--once', action='store_true', help="Poll the queue once")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    worker = JobQueueWorker(
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        poll_interval=args.poll_interval
+    )
+
+    from services.publisher.container_monitor import get_container_monitor
+
+    try:
+        if args.once:
+            worker.run_once()
+        else:
+            worker.run_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Job queue worker stopped")
+    finally:
+        worker.stop(wait=True)
+        # Let parked containers finish publishing before exiting
+        get_container_monitor().shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
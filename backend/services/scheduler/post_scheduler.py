@@ -1,7 +1,8 @@
 """
 Post Scheduler Service
 
-Manages scheduled post publishing using APScheduler.
+Manages scheduled post publishing using APScheduler, or the
+scheduled_jobs queue with SCHEDULER_BACKEND=queue (job_queue.py).
 Provides job persistence, retry logic, and automatic job restoration.
 
 Author: SocialLab
@@ -9,24 +10,458 @@ Date: 2025-01-16
 """
 
 import os
+import base64
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
-from apscheduler.executors.pool import ThreadPoolExecutor
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
+from apscheduler.events import (
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_ERROR,
+    EVENT_JOB_MISSED
+)
 
 from database.supabase_client import get_supabase_admin_client
+from services.account_context import (
+    get_account_context,
+    invalidate_account_context
+)
 from services.publisher.instagram_publisher import (
     InstagramPublisher,
     InstagramPublishError
 )
+from services.publisher.container_monitor import get_container_monitor
+from services.publisher.publishing_quota import (
+    get_publishing_quota,
+    is_publishing_limit_error
+)
+from services.scheduler.burst_smoothing import (
+    BurstSmoother,
+    smooth_upcoming_jobs
+)
+from services.scheduler.catch_up import (
+    CatchUpPolicy,
+    catch_up_overdue_jobs,
+    mark_jobs_missed
+)
+from services.scheduler.dead_letter import (
+    failure_context,
+    get_dead_letters,
+    replay_dead_letters
+)
+from services.scheduler.executors import (
+    MAINTENANCE_EXECUTOR,
+    PUBLISH_EXECUTOR,
+    create_executors
+)
+from services.scheduler.job_events import emit_job_event
+from services.scheduler.job_metrics import get_job_metrics, job_timings
+from services.scheduler.job_queue import JobQueueWorker, use_job_queue
 
 logger = logging.getLogger(__name__)
 
+# Base delay of the exponential retry backoff (fail_scheduled_job RPC)
+RETRY_BASE_MINUTES = 5
+
+# How long a running publish job is reserved for its worker. Covers the
+# longest container readiness deadline (readiness.MAX_DEADLINE) plus
+# carousel children and publishing.
+RUNNING_LEASE_SECONDS = int(os.getenv('RUNNING_JOB_LEASE_SECONDS', '1200'))
+
+# Error recorded for jobs whose running lease expired
+LEASE_EXPIRED_ERROR = 'Lease expired while running (worker lost)'
+
+# Media URLs verified in parallel by schedule_posts()
+BULK_MEDIA_CHECK_WORKERS = 8
+
+# Finished jobs moved to scheduled_jobs_history per archive_scheduled_jobs call
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def encode_job_cursor(job: Dict) -> str:
+    """Keyset cursor of the last job of a page: (scheduled_time, id)."""
+    raw = f"{job['scheduled_time']}|{job['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_job_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decodes a cursor from encode_job_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        scheduled_time, job_row_id = base64.urlsafe_b64decode(
+            cursor.encode()
+        ).decode().rsplit('|', 1)
+        datetime.fromisoformat(scheduled_time.replace('Z', '+00:00'))
+        return scheduled_time, int(job_row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def archive_finished_jobs(supabase, retention_days: Optional[int] = None) -> int:
+    """
+    Moves finished jobs older than the retention period to
+    scheduled_jobs_history (archive_scheduled_jobs RPC, migration 025).
+
+    Args:
+        supabase: Supabase client
+        retention_days: Days finished jobs stay in scheduled_jobs
+            (SCHEDULED_JOBS_RETENTION_DAYS, default 30, 0 = never archive)
+
+    Returns:
+        Number of jobs archived
+    """
+    if retention_days is None:
+        retention_days = int(os.getenv('SCHEDULED_JOBS_RETENTION_DAYS', '30'))
+    if retention_days <= 0:
+        return 0
+
+    archived = 0
+    while True:
+        moved = supabase.rpc('archive_scheduled_jobs', {
+            'p_older_than_days': retention_days,
+            'p_batch_size': ARCHIVE_BATCH_SIZE
+        }).execute().data or 0
+        archived += moved
+        if moved < ARCHIVE_BATCH_SIZE:
+            break
+
+    if archived:
+        logger.info(f"🗄️  Archived {archived} finished scheduled jobs")
+    return archived
+
+
+def archive_scheduled_jobs_job() -> None:
+    """Daily retention job for scheduled_jobs (maintenance pool)."""
+    archive_finished_jobs(get_supabase_admin_client())
+
+
+def get_prestage_lead() -> timedelta:
+    """
+    How long before the scheduled time the container is pre-staged.
+
+    Configured with PRESTAGE_LEAD_MINUTES (default 10, 0 disables).
+    """
+    return timedelta(minutes=int(os.getenv('PRESTAGE_LEAD_MINUTES', '10')))
+
+
+def _load_post_and_account(supabase, post_id: int) -> Tuple[Dict, Dict]:
+    """
+    Loads a post and the active Instagram account of its user.
+
+    Returns:
+        (post row, account context)
+    """
+    # Get post data
+    post_result = supabase.table('posts')\
+        .select('*')\
+        .eq('id', post_id)\
+        .single()\
+        .execute()
+
+    if not post_result.data:
+        raise ValueError(f"Post {post_id} not found")
+
+    post_data = post_result.data
+
+    # Get Instagram account ID (cached with its credentials, reused by
+    # the publisher)
+    account = get_account_context().get_active_for_user(post_data['user_id'])
+
+    if not account:
+        raise ValueError(
+            f"No active Instagram account found for user "
+            f"{post_data['user_id']}"
+        )
+
+    return post_data, account
+
+
+def _claimed_post_and_account(post_id: int, claim: Dict) -> Tuple[Dict, Dict]:
+    """
+    Post and account returned by the claim_scheduled_job RPC.
+
+    The account is added to the shared account context, so the
+    publisher does not read it again.
+    """
+    post_data = claim.get('post')
+    if not post_data:
+        raise ValueError(f"Post {post_id} not found")
+
+    account = claim.get('account')
+    if not account:
+        raise ValueError(
+            f"No active Instagram account found for user "
+            f"{post_data['user_id']}"
+        )
+
+    get_account_context().put(account)
+    return post_data, account
+
+
+def _create_post_publication(
+    publisher: InstagramPublisher,
+    post_data: Dict,
+    account: Dict
+) -> Dict:
+    """
+    Creates the Instagram container of a post.
+
+    Returns:
+        Publication dict from InstagramPublisher.create_publication(),
+        with the post's content_hash
+    """
+    publication = publisher.create_publication(
+        media_url=post_data['media_url'],
+        caption=post_data.get('content', ''),
+        instagram_account_id=account['id'],
+        post_type=post_data.get('post_type', 'FEED'),
+        video_url=post_data.get('video_url')
+    )
+    publication['content_hash'] = _post_content_hash(post_data)
+    return publication
+
+
+def _post_content_hash(post_data: Dict) -> str:
+    """
+    Fingerprint of the post fields a container is built from.
+
+    Kept in staged containers (pre-staged, retried or dead-lettered), so
+    a container created before the post was edited is not published.
+    """
+    fields = ('content', 'media_url', 'post_type', 'video_url')
+    content = '\x1f'.join(str(post_data.get(field) or '') for field in fields)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _requeue_publish_job(post_id: int, run_date: datetime, name: str) -> None:
+    """
+    Runs a post's publish job again at run_date.
+
+    With the database queue (SCHEDULER_BACKEND=queue) the scheduled_time
+    of the job row is enough, so only APScheduler needs a new job.
+    """
+    if use_job_queue():
+        return
+
+    scheduler_instance = PostScheduler()
+    scheduler_instance.scheduler.add_job(
+        func=publish_post_job,
+        executor=PUBLISH_EXECUTOR,
+        trigger=DateTrigger(run_date=run_date),
+        args=[post_id],
+        id=f"post_{post_id}",
+        name=name,
+        replace_existing=True
+    )
+
+
+def _defer_for_quota(supabase, post_id: int, retry_at: datetime) -> None:
+    """
+    Moves a publication past the account's publishing limit.
+
+    Unlike a failure, this does not use up one of the job's retries.
+    """
+    _requeue_publish_job(post_id, retry_at, f"Publish post {post_id} (deferred)")
+
+    supabase.table('scheduled_jobs').update({
+        'status': 'pending',
+        'scheduled_time': retry_at.isoformat(),
+        'error_message': 'Deferred: Instagram publishing limit reached',
+        'locked_by': None,
+        'locked_until': None
+    }).eq('post_id', post_id).execute()
+
+    emit_job_event(
+        supabase, post_id, 'pending',
+        scheduled_time=retry_at.isoformat(),
+        error='Deferred: Instagram publishing limit reached'
+    )
+
+    logger.warning(
+        f"⏸️  Post {post_id} deferred to {retry_at.isoformat()}: "
+        f"publishing limit reached"
+    )
+
+
+def prestage_post_job(post_id: int) -> None:
+    """
+    Creates and verifies a scheduled post's container ahead of time.
+
+    Runs get_prestage_lead() before the scheduled time. Once the container
+    is READY it is stored on the scheduled_jobs row, so publish_post_job
+    only has to call media_publish at the scheduled time.
+
+    Failures are only logged: publish_post_job then falls back to
+    creating the container at the scheduled time.
+
+    Args:
+        post_id: ID of the post to pre-stage
+    """
+    logger.info(f"🧰 Pre-staging container for post {post_id}")
+
+    supabase = get_supabase_admin_client()
+    publisher = InstagramPublisher()
+
+    try:
+        post_data, account = _load_post_and_account(supabase, post_id)
+        publication = _create_post_publication(publisher, post_data, account)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not pre-stage post {post_id}: {e}")
+        return
+
+    get_container_monitor().submit(
+        publication,
+        lambda staged, error: _on_container_staged(post_id, staged, error),
+        publish=False
+    )
+
+
+def smooth_publish_bursts_job() -> None:
+    """
+    Plans dispatch times of upcoming publications (burst_smoothing.py).
+
+    Runs every minute on the maintenance pool.
+    """
+    scheduler_instance = PostScheduler()
+    smooth_upcoming_jobs(
+        scheduler_instance.supabase,
+        scheduler_instance.burst_smoother,
+        on_dispatch=scheduler_instance._rearm_dispatched_job
+    )
+
+
+def _on_container_staged(
+    post_id: int,
+    publication: Optional[Dict],
+    error: Optional[Exception]
+) -> None:
+    """Stores a pre-staged READY container (called by ContainerMonitor)."""
+    if error:
+        logger.warning(
+            f"⚠️  Pre-staged container for post {post_id} failed, "
+            f"it will be created at publish time: {error}"
+        )
+        return
+
+    supabase = get_supabase_admin_client()
+
+    # Only while the publication has not started yet
+    supabase.table('scheduled_jobs').update({
+        'prestaged_container': InstagramPublisher.staged_container(publication),
+        'container_ready_at': datetime.now(timezone.utc).isoformat()
+    }).eq('post_id', post_id).in_('status', ['pending', 'retrying']).execute()
+
+    logger.info(
+        f"✅ Post {post_id} container {publication['container_id']} "
+        f"ready for publication"
+    )
+
+
+def _store_running_container(
+    supabase,
+    publisher: InstagramPublisher,
+    post_id: int,
+    publication: Dict
+) -> None:
+    """
+    Keeps a new container on its running job.
+
+    If the worker stops before the publication finishes, the job is
+    recovered by requeue_expired_jobs() and its retry resumes this
+    container instead of creating (and maybe publishing) another one.
+    The container is marked running_job: media_publish may already have
+    been called for it, so if it cannot be resumed the retry fails
+    (_publish_prestaged) rather than creating a new one.
+    Carousels still waiting for their children have no container yet.
+    """
+    if not publication.get('container_id'):
+        return
+
+    try:
+        supabase.table('scheduled_jobs').update({
+            'prestaged_container': {
+                **publisher.staged_container(publication),
+                'running_job': True
+            }
+        }).eq('post_id', post_id).eq('status', 'running').execute()
+    except Exception as e:
+        logger.warning(f"⚠️  Could not store container of post {post_id}: {e}")
+
+
+def _publish_prestaged(
+    supabase,
+    publisher: InstagramPublisher,
+    post_id: int,
+    staged: Dict,
+    post_data: Dict
+) -> bool:
+    """
+    Publishes a pre-staged container (media_publish only).
+
+    Containers created from an older version of the post (edited caption
+    or media since it was staged), expired ones and those of an account
+    that is gone are dropped before media_publish, and a new one is
+    created. Once media_publish has been called the container is never
+    replaced: it may have been published even if the call failed, so
+    the error is raised (with the container) for the caller's failure
+    handling. The same applies to containers of a running job that was
+    recovered (running_job, see _store_running_container), even when
+    they cannot be resumed.
+
+    Returns:
+        True if published, False if the container could not be used and
+        a new one has to be created
+
+    Raises:
+        InstagramPublishError: If media_publish fails, or a running job's
+            container cannot be resumed
+    """
+    try:
+        if staged.get('content_hash') != _post_content_hash(post_data):
+            raise InstagramPublishError("Post was edited after staging")
+        publication = publisher.resume_publication(staged)
+    except Exception as e:
+        if staged.get('running_job'):
+            raise InstagramPublishError(
+                f"Container {staged.get('container_id')} of the interrupted "
+                f"publication could not be resumed: {e}",
+                container_id=staged.get('container_id'),
+                staged_container=staged
+            )
+        logger.warning(
+            f"⚠️  Pre-staged container {staged.get('container_id')} for post "
+            f"{post_id} could not be used, creating a new one: {e}"
+        )
+        supabase.table('scheduled_jobs').update({
+            'prestaged_container': None,
+            'container_ready_at': None
+        }).eq('post_id', post_id).execute()
+        return False
+
+    try:
+        result = publisher.complete_publication(publication)
+    except InstagramPublishError as e:
+        # The retry (or the dead letter) keeps this container
+        if e.container_id is None:
+            e.container_id = staged.get('container_id')
+            e.staged_container = staged
+        raise
+
+    _on_publication_complete(post_id, result, None)
+    return True
+
 
 def publish_post_job(post_id: int) -> None:
     """
@@ -35,6 +470,18 @@ def publish_post_job(post_id: int) -> None:
     This function is independent of PostScheduler instance to avoid
     serialization issues with pickle.
 
+    The job is claimed and its post and account loaded in a single RPC
+    (claim_scheduled_job), with a running lease so the job is recovered
+    if this process stops (requeue_expired_jobs); jobs that are no longer
+    pending or retrying are skipped. Posts of accounts over their
+    publishing limit are deferred before any Graph API call. If the
+    container was pre-staged (prestage_post_job), or kept by a retry or
+    replay, and the post has not been edited since,
+    only media_publish is called. Otherwise the media container is
+    created and handed to the ContainerMonitor, so the executor thread is
+    released while Instagram processes the media. The post and job are
+    updated by _on_publication_complete().
+
     Args:
         post_id: ID of the post to publish
     """
@@ -43,131 +490,250 @@ def publish_post_job(post_id: int) -> None:
     # Create fresh instances (no serialization issues)
     supabase = get_supabase_admin_client()
     publisher = InstagramPublisher()
+    account_id = None
 
     try:
-        # Update job status to running
-        supabase.table('scheduled_jobs').update({
-            'status': 'running'
-        }).eq('post_id', post_id).eq('status', 'pending').execute()
-
-        # Get post data
-        post_result = supabase.table('posts')\
-            .select('*')\
-            .eq('id', post_id)\
-            .single()\
-            .execute()
-
-        if not post_result.data:
-            raise ValueError(f"Post {post_id} not found")
+        # Mark the job running and load post + account in one round trip
+        claim = supabase.rpc('claim_scheduled_job', {
+            'p_post_id': post_id,
+            'p_lease_seconds': RUNNING_LEASE_SECONDS
+        }).execute().data
+
+        if not claim:
+            logger.warning(
+                f"⚠️  Job of post {post_id} is not pending, skipping"
+            )
+            return
 
-        post_data = post_result.data
+        post_data, account = _claimed_post_and_account(post_id, claim)
+        emit_job_event(supabase, post_id, 'running', user_id=post_data.get('user_id'))
 
-        # Get Instagram account ID
-        instagram_result = supabase.table('instagram_accounts')\
-            .select('id')\
-            .eq('user_id', post_data['user_id'])\
-            .eq('is_active', True)\
-            .single()\
-            .execute()
+        # Publish the pre-staged container, if there is one
+        staged = claim['job'].get('prestaged_container')
+        account_id = staged['instagram_account_id'] if staged else account['id']
 
-        if not instagram_result.data:
-            raise ValueError(
-                f"No active Instagram account found for user "
-                f"{post_data['user_id']}"
-            )
+        # Defer before any Graph API work if the account is over quota
+        quota = get_publishing_quota()
+        if not quota.can_publish(account_id):
+            _defer_for_quota(supabase, post_id, quota.retry_after(account_id))
+            return
 
-        instagram_account_id = instagram_result.data['id']
+        if staged and _publish_prestaged(
+            supabase, publisher, post_id, staged, post_data
+        ):
+            return
 
-        # Publish to Instagram
+        # Create the media container
         logger.info(f"📤 Publishing post {post_id} to Instagram...")
-        result = publisher.publish_post(
-            media_url=post_data['media_url'],
-            caption=post_data.get('content', ''),
-            instagram_account_id=instagram_account_id,
-            post_type=post_data.get('post_type', 'FEED'),
-            video_url=post_data.get('video_url')
+        publication = _create_post_publication(publisher, post_data, account)
+        _store_running_container(supabase, publisher, post_id, publication)
+
+    except Exception as e:
+        logger.error(f"❌ Error publishing post {post_id}: {e}")
+        _handle_publish_failure(post_id, e, account_id)
+        raise
+
+    # Wait for processing and publish outside of the executor thread
+    get_container_monitor().submit(
+        publication,
+        lambda result, error: _on_publication_complete(
+            post_id, result, error, publication['instagram_account_id']
         )
+    )
+    logger.info(
+        f"⏳ Post {post_id} container {publication['container_id']} "
+        f"waiting for Instagram processing"
+    )
+
+
+def _on_publication_complete(
+    post_id: int,
+    result: Optional[Dict],
+    error: Optional[Exception],
+    account_id: Optional[int] = None
+) -> None:
+    """
+    Finishes a scheduled publication (called by ContainerMonitor).
 
-        # Update post as published
-        supabase.table('posts').update({
-            'status': 'published',
-            'instagram_post_id': result.get('id'),
-            'publication_date': datetime.now().isoformat()
-        }).eq('id', post_id).execute()
+    Args:
+        post_id: ID of the post
+        result: publish result ('id', 'permalink') on success
+        error: Exception if the container failed or publishing failed
+        account_id: Instagram account the post was published with
+    """
+    if error:
+        logger.error(f"❌ Error publishing post {post_id}: {error}")
+        _handle_publish_failure(post_id, error, account_id)
+        return
 
-        # Mark job as completed
-        supabase.table('scheduled_jobs').update({
-            'status': 'completed',
-            'completed_at': datetime.now().isoformat()
-        }).eq('post_id', post_id).execute()
+    supabase = get_supabase_admin_client()
 
-        logger.info(f"✅ Post {post_id} published successfully")
+    # Update post as published and mark job as completed (one transaction)
+    job = supabase.rpc('complete_scheduled_job', {
+        'p_post_id': post_id,
+        'p_instagram_post_id': result.get('id'),
+        'p_container_ready_at': result.get('container_ready_at')
+    }).execute().data
 
-    except Exception as e:
-        logger.error(f"❌ Error publishing post {post_id}: {e}")
+    if job:
+        get_job_metrics().record_completion(job)
 
-        # Update job status
-        job_result = supabase.table('scheduled_jobs')\
-            .select('retry_count, max_retries')\
-            .eq('post_id', post_id)\
-            .single()\
-            .execute()
+    emit_job_event(
+        supabase, post_id, 'completed',
+        instagram_post_id=result.get('id'),
+        permalink=result.get('permalink')
+    )
 
-        if job_result.data:
-            retry_count = job_result.data.get('retry_count', 0)
-            max_retries = job_result.data.get('max_retries', 3)
+    logger.info(f"✅ Post {post_id} published successfully")
 
-            if retry_count < max_retries:
-                # Calculate retry time (exponential backoff)
-                # 1st retry: 5 min, 2nd: 15 min, 3rd: 30 min
-                delay_minutes = 5 * (2 ** retry_count)
-                retry_time = datetime.now(timezone.utc) + timedelta(
-                    minutes=delay_minutes
-                )
 
-                # Create singleton scheduler instance
-                from services.scheduler.post_scheduler import PostScheduler
-                scheduler_instance = PostScheduler()
+def _handle_publish_failure(
+    post_id: int,
+    error: Exception,
+    account_id: Optional[int] = None
+) -> None:
+    """
+    Schedules a retry with exponential backoff or marks the post as failed.
+
+    Auth errors (e.g. a token rejected with Graph API code 190) also drop
+    the account from the shared account context, so the retry reloads
+    its credentials.
 
-                # Schedule retry job in APScheduler
-                job_id = f"post_{post_id}"
-                scheduler_instance.scheduler.add_job(
-                    func=publish_post_job,
-                    trigger=DateTrigger(run_date=retry_time),
-                    args=[post_id],
-                    id=job_id,
-                    name=f"Publish post {post_id} (retry {retry_count + 1})",
-                    replace_existing=True
-                )
+    Args:
+        post_id: ID of the post
+        error: The publication error
+        account_id: Instagram account the post was published with, if
+            it was already loaded
+    """
+    supabase = get_supabase_admin_client()
 
-                # Update job in database with new retry time and status
-                supabase.table('scheduled_jobs').update({
-                    'status': 'retrying',
-                    'retry_count': retry_count + 1,
-                    'error_message': str(e),
-                    'scheduled_time': retry_time.isoformat()
-                }).eq('post_id', post_id).execute()
-
-                logger.info(
-                    f"🔄 Scheduled retry {retry_count + 1}/{max_retries} "
-                    f"for post {post_id} at {retry_time.isoformat()} "
-                    f"(in {delay_minutes} minutes)"
-                )
-            else:
-                # Max retries reached
-                supabase.table('scheduled_jobs').update({
-                    'status': 'failed',
-                    'error_message': str(e),
-                    'completed_at': datetime.now().isoformat()
-                }).eq('post_id', post_id).execute()
+    # Rejected by the publishing limit: wait for quota, keep the retries
+    if is_publishing_limit_error(error):
+        _defer_for_quota(
+            supabase,
+            post_id,
+            datetime.now(timezone.utc) + get_publishing_quota().refresh_interval
+        )
+        return
+
+    # Record the failure: the RPC schedules the retry time (exponential
+    # backoff, 1st retry: 5 min, 2nd: 10 min, 3rd: 20 min) or marks the
+    # job and the post as failed and keeps the failure in the dead-letter
+    # store, in one transaction. A READY container is reused by the retry
+    context = failure_context(error)
+    if context['p_error_class'] == 'auth' and account_id is not None:
+        invalidate_account_context(account_id=account_id)
+
+    job = supabase.rpc('fail_scheduled_job', {
+        'p_post_id': post_id,
+        'p_error': str(error),
+        'p_retry_base_minutes': RETRY_BASE_MINUTES,
+        **context
+    }).execute().data
+
+    if job:
+        _on_job_failed(supabase, post_id, job, str(error), context['p_error_class'])
+
+
+def _on_job_failed(
+    supabase,
+    post_id: int,
+    job: Dict,
+    error: str,
+    error_class: str
+) -> None:
+    """
+    Schedules the retry or reports the final failure of a job, after
+    fail_scheduled_job has recorded it.
 
-                supabase.table('posts').update({
-                    'status': 'failed'
-                }).eq('id', post_id).execute()
+    Args:
+        supabase: Supabase client
+        post_id: ID of the post
+        job: Result of fail_scheduled_job (status, retry_count,
+            max_retries, scheduled_time)
+        error: Error message
+        error_class: Error class (dead_letter.ERROR_CLASSES)
+    """
+    retry_count = job['retry_count']
+    max_retries = job['max_retries']
 
-                logger.error(f"❌ Post {post_id} failed after {max_retries} retries")
+    if job['status'] == 'retrying':
+        retry_time = datetime.fromisoformat(
+            job['scheduled_time'].replace('Z', '+00:00')
+        )
 
-        raise
+        # Schedule retry job
+        _requeue_publish_job(
+            post_id,
+            retry_time,
+            f"Publish post {post_id} (retry {retry_count})"
+        )
+
+        emit_job_event(
+            supabase, post_id, 'retrying',
+            scheduled_time=retry_time.isoformat(),
+            retry_count=retry_count,
+            error=error
+        )
+
+        logger.info(
+            f"🔄 Scheduled retry {retry_count}/{max_retries} "
+            f"for post {post_id} at {retry_time.isoformat()}"
+        )
+    else:
+        # Max retries reached (job and post already marked as failed)
+        get_job_metrics().record_failure(retry_count)
+        emit_job_event(
+            supabase, post_id, 'failed',
+            retry_count=retry_count,
+            error=error,
+            error_class=error_class
+        )
+        logger.error(
+            f"❌ Post {post_id} failed after {max_retries} retries "
+            f"({error_class}), moved to the dead-letter store"
+        )
+
+
+def requeue_expired_jobs(supabase) -> int:
+    """
+    Recovers publish jobs whose worker stopped while running them.
+
+    Jobs still 'running' after their lease (claim_scheduled_job,
+    migration 028) are failed as transient errors by the
+    requeue_expired_scheduled_jobs RPC: they are retried, resuming the
+    container stored on the job, or moved to the dead-letter store when
+    no retries are left.
+
+    Args:
+        supabase: Supabase client
+
+    Returns:
+        Number of jobs recovered
+    """
+    jobs = supabase.rpc('requeue_expired_scheduled_jobs', {
+        'p_retry_base_minutes': RETRY_BASE_MINUTES
+    }).execute().data or []
+
+    for job in jobs:
+        _on_job_failed(
+            supabase,
+            job['post_id'],
+            job,
+            LEASE_EXPIRED_ERROR,
+            'transient'
+        )
+
+    if jobs:
+        logger.warning(
+            f"♻️  Recovered {len(jobs)} jobs left running by a stopped worker"
+        )
+    return len(jobs)
+
+
+def requeue_expired_jobs_job() -> None:
+    """Recovers jobs with an expired running lease (maintenance pool)."""
+    requeue_expired_jobs(get_supabase_admin_client())
 
 
 class PostScheduler:
@@ -180,6 +746,15 @@ class PostScheduler:
     - Automatic retry on failure
     - Job cancellation and rescheduling
     - Restore pending jobs on restart
+    - Optional scheduled_jobs queue instead of APScheduler
+      (SCHEDULER_BACKEND=queue, see job_queue.py) for multi-process
+      deployments
+    - Separate publish / sync / maintenance pools (executors.py)
+    - Lag and duration histograms per job (job_metrics.py)
+    - Paced catch-up of posts that came due during downtime, and
+      'missed' status past the catch-up window (catch_up.py)
+    - Publication start rate cap and account interleaving for posts
+      clustered on the same time (burst_smoothing.py)
     """
 
     _instance = None  # Singleton instance
@@ -199,6 +774,18 @@ class PostScheduler:
         self.supabase = get_supabase_admin_client()
         self.publisher = InstagramPublisher()
 
+        # Database queue: scheduled_jobs rows are the jobs, claimed by
+        # this process's worker and any external ones (no APScheduler)
+        if use_job_queue():
+            self.scheduler = None
+            self.queue_worker = JobQueueWorker(db_client=self.supabase)
+            self.queue_worker.start()
+            logger.info("PostScheduler started on the scheduled_jobs queue")
+            self._initialized = True
+            return
+
+        self.queue_worker = None
+
         # Configure job store with PostgreSQL
         database_url = os.getenv('DATABASE_URL')
         if not database_url:
@@ -208,22 +795,25 @@ class PostScheduler:
             'default': SQLAlchemyJobStore(url=database_url)
         }
 
-        # Configure thread pool executor
-        executors = {
-            'default': ThreadPoolExecutor(max_workers=5)
-        }
+        # Separate thread pools for publish, sync and maintenance jobs
+        self.executors = create_executors()
+
+        # What to do with posts that came due while the scheduler was down
+        self.catch_up_policy = CatchUpPolicy()
 
         # Configure job defaults
         job_defaults = {
             'coalesce': False,  # Run all missed jobs
             'max_instances': 1,  # One instance per job
-            'misfire_grace_time': 300  # 5 minutes grace period
+            # Late jobs still run within the catch-up window; past it they
+            # are reported as missed (_job_missed_listener)
+            'misfire_grace_time': int(self.catch_up_policy.window.total_seconds())
         }
 
         # Create and start scheduler
         self.scheduler = BackgroundScheduler(
             jobstores=jobstores,
-            executors=executors,
+            executors=self.executors,
             job_defaults=job_defaults,
             timezone='UTC'
         )
@@ -237,16 +827,57 @@ class PostScheduler:
             self._job_error_listener,
             EVENT_JOB_ERROR
         )
+        self.scheduler.add_listener(
+            self._job_missed_listener,
+            EVENT_JOB_MISSED
+        )
 
-        # Start scheduler
-        self.scheduler.start()
-        logger.info("PostScheduler initialized and started")
+        # Move finished jobs to scheduled_jobs_history once a day
+        self.scheduler.add_job(
+            func=archive_scheduled_jobs_job,
+            executor=MAINTENANCE_EXECUTOR,
+            trigger=CronTrigger(hour=3, minute=30),
+            id='archive_scheduled_jobs',
+            name='Archive finished scheduled jobs',
+            replace_existing=True
+        )
 
-        # Restore pending jobs from database
-        self._restore_pending_jobs()
+        # Recover jobs left running by a stopped process (migration 028)
+        self.scheduler.add_job(
+            func=requeue_expired_jobs_job,
+            executor=MAINTENANCE_EXECUTOR,
+            trigger=IntervalTrigger(minutes=1),
+            id='requeue_expired_jobs',
+            name='Recover jobs with an expired running lease',
+            replace_existing=True
+        )
+
+        # Spread posts clustered on the same time (burst_smoothing.py)
+        self.burst_smoother = BurstSmoother()
+        if self.burst_smoother.enabled:
+            self.scheduler.add_job(
+                func=smooth_publish_bursts_job,
+                executor=MAINTENANCE_EXECUTOR,
+                trigger=IntervalTrigger(minutes=1),
+                id='burst_smoothing',
+                name='Smooth publication bursts',
+                replace_existing=True
+            )
+
+        # Start paused: overdue jobs in the job store would otherwise all
+        # fire at once. _start_up() spreads them out and then resumes.
+        self.scheduler.start(paused=True)
+        logger.info("PostScheduler initialized and started")
 
         self._initialized = True
 
+        # Catch up and restore pending jobs without blocking startup
+        threading.Thread(
+            target=self._start_up,
+            name='scheduler-restore',
+            daemon=True
+        ).start()
+
     def schedule_post(
         self,
         post_id: int,
@@ -283,15 +914,27 @@ class PostScheduler:
                     f"Post {post_id} missing media_url"
                 )
 
+            # Verify the media now; publishing reuses the cached check
+            media_to_verify = post.data['media_url']
+            if post.data.get('post_type') == 'REELS' and post.data.get('video_url'):
+                media_to_verify = post.data['video_url']
+            try:
+                self.publisher.verify_media_url_accessibility(media_to_verify)
+            except InstagramPublishError as e:
+                raise ValueError(
+                    f"Post {post_id} media is not publishable: {e}"
+                )
+
             # Create job ID
             job_id = f"post_{post_id}"
 
             # Remove existing job from APScheduler if any
-            try:
-                self.scheduler.remove_job(job_id)
-                logger.info(f"Removed existing job {job_id} from APScheduler")
-            except Exception:
-                pass  # Job doesn't exist, that's fine
+            if self.scheduler:
+                try:
+                    self.scheduler.remove_job(job_id)
+                    logger.info(f"Removed existing job {job_id} from APScheduler")
+                except Exception:
+                    pass  # Job doesn't exist, that's fine
 
             # Remove existing job from database if any
             try:
@@ -312,18 +955,21 @@ class PostScheduler:
                 scheduled_time_aware = scheduled_time
 
             # Create new job in APScheduler with timezone-aware datetime
-            job = self.scheduler.add_job(
-                func=publish_post_job,
-                trigger=DateTrigger(run_date=scheduled_time_aware),
-                args=[post_id],
-                id=job_id,
-                name=f"Publish post {post_id}",
-                replace_existing=True
-            )
+            # (the queue picks up the scheduled_jobs row by itself)
+            if self.scheduler:
+                self.scheduler.add_job(
+                    func=publish_post_job,
+                    executor=PUBLISH_EXECUTOR,
+                    trigger=DateTrigger(run_date=scheduled_time_aware),
+                    args=[post_id],
+                    id=job_id,
+                    name=f"Publish post {post_id}",
+                    replace_existing=True
+                )
 
             # Store in scheduled_jobs table (fresh insert)
             self.supabase.table('scheduled_jobs').insert({
-                'job_id': job.id,
+                'job_id': job_id,
                 'job_type': 'publish_post',
                 'post_id': post_id,
                 'scheduled_time': scheduled_time.isoformat(),
@@ -332,23 +978,78 @@ class PostScheduler:
                 'max_retries': 3 if retry_on_failure else 0
             }).execute()
 
+            # Create the container ahead of time
+            self._schedule_prestage(post_id, scheduled_time_aware)
+
             # Update post status
             self.supabase.table('posts').update({
                 'status': 'scheduled',
                 'scheduled_at': scheduled_time.isoformat()
             }).eq('id', post_id).execute()
 
+            emit_job_event(
+                self.supabase, post_id, 'pending',
+                user_id=post.data.get('user_id'),
+                scheduled_time=scheduled_time_aware.isoformat()
+            )
+
             logger.info(
                 f"Post {post_id} scheduled for {scheduled_time} "
-                f"(job_id: {job.id})"
+                f"(job_id: {job_id})"
             )
 
-            return job.id
+            return job_id
 
         except Exception as e:
             logger.error(f"Error scheduling post {post_id}: {e}")
             raise
 
+    def _schedule_prestage(
+        self,
+        post_id: int,
+        scheduled_time: datetime
+    ) -> None:
+        """
+        Schedules prestage_post_job ahead of a post's publication.
+
+        Runs get_prestage_lead() before scheduled_time, or right away if
+        that moment has already passed. Skipped when pre-staging is
+        disabled or the post is due within a minute (publish_post_job
+        then creates the container itself). With the database queue the
+        workers claim pre-staging themselves (claim_prestage_jobs).
+
+        Args:
+            post_id: ID of the post
+            scheduled_time: Publication time (timezone-aware)
+        """
+        if not self.scheduler:
+            return
+
+        lead = get_prestage_lead()
+        now = datetime.now(timezone.utc)
+
+        if lead <= timedelta(0) or scheduled_time - now <= timedelta(minutes=1):
+            return
+
+        self.scheduler.add_job(
+            func=prestage_post_job,
+            executor=MAINTENANCE_EXECUTOR,
+            trigger=DateTrigger(run_date=max(scheduled_time - lead, now)),
+            args=[post_id],
+            id=f"prestage_{post_id}",
+            name=f"Pre-stage post {post_id}",
+            replace_existing=True
+        )
+
+    def _remove_prestage(self, post_id: int) -> None:
+        """Removes the pre-stage job of a post, if any."""
+        if not self.scheduler:
+            return
+        try:
+            self.scheduler.remove_job(f"prestage_{post_id}")
+        except Exception:
+            pass  # Already ran or never scheduled
+
     def cancel_scheduled_post(self, post_id: int) -> bool:
         """
         Cancels a scheduled post.
@@ -363,7 +1064,9 @@ class PostScheduler:
             job_id = f"post_{post_id}"
 
             # Remove from APScheduler
-            self.scheduler.remove_job(job_id)
+            if self.scheduler:
+                self.scheduler.remove_job(job_id)
+            self._remove_prestage(post_id)
 
             # Update database
             self.supabase.table('scheduled_jobs').update({
@@ -375,6 +1078,8 @@ class PostScheduler:
                 'status': 'draft'  # Revert to draft
             }).eq('id', post_id).execute()
 
+            emit_job_event(self.supabase, post_id, 'cancelled')
+
             logger.info(f"Cancelled scheduled post {post_id}")
             return True
 
@@ -407,188 +1112,453 @@ class PostScheduler:
         # Create new schedule
         return self.schedule_post(post_id, new_scheduled_time)
 
+    def schedule_posts(self, items: List[Dict]) -> List[Dict]:
+        """
+        Schedules (or reschedules) many posts at once.
+
+        Posts are loaded in one query and their media verified in
+        parallel; the valid ones are stored in one transaction
+        (schedule_posts_bulk RPC, migrations 024 and 030) and then
+        registered in APScheduler in one pass. An invalid item does not
+        stop the others; posts already published are never rescheduled.
+
+        Args:
+            items: Dicts with post_id, scheduled_time and optionally
+                retry_on_failure (default True)
+
+        Returns:
+            One result per item, in order: post_id, success and either
+            job_id and scheduled_time or error
+        """
+        now = datetime.now(timezone.utc)
+        results: Dict[int, Dict] = {}
+        valid: Dict[int, Dict] = {}
+
+        post_ids = [item['post_id'] for item in items]
+        posts = self.supabase.table('posts')\
+            .select('id, user_id, status, media_url, video_url, post_type')\
+            .in_('id', list(set(post_ids)))\
+            .execute()
+        posts_by_id = {post['id']: post for post in posts.data or []}
+
+        def fail(post_id: int, error: str) -> None:
+            results[post_id] = {'post_id': post_id, 'success': False, 'error': error}
+
+        for item in items:
+            post_id = item['post_id']
+            scheduled_time = item['scheduled_time']
+            if scheduled_time.tzinfo is None:
+                scheduled_time = scheduled_time.replace(tzinfo=timezone.utc)
+
+            post = posts_by_id.get(post_id)
+            if post_id in valid or post_id in results:
+                fail(post_id, f"Post {post_id} appears more than once")
+                valid.pop(post_id, None)
+            elif not post:
+                fail(post_id, f"Post {post_id} not found")
+            elif post.get('status') == 'published':
+                fail(post_id, f"Post {post_id} is already published")
+            elif not post.get('media_url'):
+                fail(post_id, f"Post {post_id} missing media_url")
+            elif scheduled_time <= now:
+                fail(post_id, "scheduled_time must be in the future")
+            else:
+                valid[post_id] = {
+                    'post_id': post_id,
+                    'scheduled_time': scheduled_time,
+                    'max_retries': 3 if item.get('retry_on_failure', True) else 0
+                }
+
+        # Verify the media now; publishing reuses the cached checks
+        def verify(post_id: int) -> Optional[str]:
+            post = posts_by_id[post_id]
+            media_to_verify = post['media_url']
+            if post.get('post_type') == 'REELS' and post.get('video_url'):
+                media_to_verify = post['video_url']
+            try:
+                self.publisher.verify_media_url_accessibility(media_to_verify)
+                return None
+            except InstagramPublishError as e:
+                return f"Post {post_id} media is not publishable: {e}"
+
+        if valid:
+            with ThreadPoolExecutor(
+                max_workers=min(BULK_MEDIA_CHECK_WORKERS, len(valid))
+            ) as pool:
+                checks = dict(zip(valid, pool.map(verify, list(valid))))
+            for post_id, error in checks.items():
+                if error:
+                    fail(post_id, error)
+                    del valid[post_id]
+
+        if valid:
+            scheduled = self.supabase.rpc('schedule_posts_bulk', {
+                'p_items': [
+                    {**item, 'scheduled_time': item['scheduled_time'].isoformat()}
+                    for item in valid.values()
+                ]
+            }).execute()
+            stored = {job['post_id']: job for job in scheduled.data or []}
+
+            for post_id, item in valid.items():
+                job = stored.get(post_id)
+                if not job:
+                    # Running, or published since the posts were loaded
+                    fail(
+                        post_id,
+                        f"Post {post_id} is being published or already published"
+                    )
+                    continue
+
+                if self.scheduler:
+                    self.scheduler.add_job(
+                        func=publish_post_job,
+                        executor=PUBLISH_EXECUTOR,
+                        trigger=DateTrigger(run_date=item['scheduled_time']),
+                        args=[post_id],
+                        id=job['job_id'],
+                        name=f"Publish post {post_id}",
+                        replace_existing=True
+                    )
+                    self._remove_prestage(post_id)
+                    self._schedule_prestage(post_id, item['scheduled_time'])
+
+                results[post_id] = {
+                    'post_id': post_id,
+                    'success': True,
+                    'job_id': job['job_id'],
+                    'scheduled_time': item['scheduled_time']
+                }
+                emit_job_event(
+                    self.supabase, post_id, 'pending',
+                    user_id=posts_by_id[post_id].get('user_id'),
+                    scheduled_time=item['scheduled_time'].isoformat()
+                )
+
+        succeeded = sum(1 for result in results.values() if result['success'])
+        logger.info(
+            f"Bulk scheduled {succeeded}/{len(items)} posts "
+            f"({len(items) - succeeded} rejected)"
+        )
+
+        return [results[post_id] for post_id in post_ids]
+
     def get_scheduled_jobs(
         self,
-        status: Optional[str] = None
-    ) -> List[Dict]:
+        user_id: Optional[str] = None,
+        status: Optional[str] = None,
+        scheduled_from: Optional[datetime] = None,
+        scheduled_to: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Dict:
         """
-        Gets list of scheduled jobs.
+        Gets a page of scheduled jobs, filtered in the database.
+
+        Pages are keyset-paginated on (scheduled_time, id), so every
+        page costs the same however many jobs there are.
 
         Args:
+            user_id: Only jobs of this user's posts
             status: Filter by status (pending, completed, failed, etc.)
+            scheduled_from: Only jobs scheduled at or after this time
+            scheduled_to: Only jobs scheduled before this time
+            limit: Page size
+            cursor: next_cursor of the previous page
 
         Returns:
-            List of scheduled jobs
+            {'jobs': [...], 'next_cursor': str or None}. Each job has its
+            'timings' (lag and durations in seconds, see
+            job_metrics.job_timings)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        try:
-            query = self.supabase.table('scheduled_jobs').select('*')
+        columns = '*, posts!inner(user_id)' if user_id else '*'
+        query = self.supabase.table('scheduled_jobs').select(columns)
+
+        if user_id:
+            query = query.eq('posts.user_id', user_id)
+        if status:
+            query = query.eq('status', status)
+        if scheduled_from:
+            query = query.gte('scheduled_time', scheduled_from.isoformat())
+        if scheduled_to:
+            query = query.lt('scheduled_time', scheduled_to.isoformat())
+        if cursor:
+            after_time, after_id = decode_job_cursor(cursor)
+            query = query.or_(
+                f'scheduled_time.gt."{after_time}",'
+                f'and(scheduled_time.eq."{after_time}",id.gt.{after_id})'
+            )
 
-            if status:
-                query = query.eq('status', status)
+        # One extra row tells whether there is a next page
+        result = query\
+            .order('scheduled_time', desc=False)\
+            .order('id', desc=False)\
+            .limit(limit + 1)\
+            .execute()
 
-            result = query.order('scheduled_time', desc=False).execute()
-            return result.data or []
+        rows = result.data or []
+        page = rows[:limit]
+        jobs = []
+        for job in page:
+            job = {k: v for k, v in job.items() if k != 'posts'}
+            jobs.append({**job, 'timings': job_timings(job)})
 
-        except Exception as e:
-            logger.error(f"Error getting scheduled jobs: {e}")
-            return []
+        return {
+            'jobs': jobs,
+            'next_cursor': encode_job_cursor(page[-1]) if len(rows) > limit else None
+        }
 
     def get_job_status(self, job_id: str) -> Optional[Dict]:
         """
         Gets status of a specific job.
 
+        Archived jobs (scheduled_jobs_history) keep their timestamps
+        (migration 031), so their timings are available too.
+
         Args:
             job_id: The job ID
 
         Returns:
-            Job data or None if not found
+            Job data with 'timings' (see job_metrics.job_timings) or
+            None if not found
         """
         try:
             result = self.supabase.table('scheduled_jobs')\
                 .select('*')\
                 .eq('job_id', job_id)\
-                .single()\
+                .limit(1)\
                 .execute()
 
-            return result.data if result.data else None
+            if result.data:
+                job = result.data[0]
+                return {**job, 'timings': job_timings(job)}
+
+            # Finished jobs are archived after a while
+            archived = self.supabase.table('scheduled_jobs_history')\
+                .select('*')\
+                .eq('job_id', job_id)\
+                .order('archived_at', desc=True)\
+                .limit(1)\
+                .execute()
+
+            if not archived.data:
+                return None
+            job = archived.data[0]
+            return {**job, 'timings': job_timings(job)}
 
         except Exception as e:
             logger.error(f"Error getting job status for {job_id}: {e}")
             return None
 
+    def get_dead_letters(
+        self,
+        user_id: Optional[str] = None,
+        error_class: Optional[str] = None,
+        status: Optional[str] = 'open',
+        limit: int = 50
+    ) -> List[Dict]:
+        """
+        Lists publications that ran out of retries (dead_letter.py).
+
+        Args:
+            user_id: Only this user's posts
+            error_class: Only failures of this class
+            status: open, replayed or resolved (None = any)
+            limit: Max rows
+
+        Returns:
+            Dead letters, most recent failures first
+        """
+        return get_dead_letters(self.supabase, user_id, error_class, status, limit)
+
+    def replay_failed_posts(
+        self,
+        error_class: Optional[str] = None,
+        post_ids: Optional[List[int]] = None,
+        user_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Reschedules failed publications from the dead-letter store.
+
+        Releases are paced like the catch-up of overdue posts, and READY
+        containers that are still valid are published without being
+        recreated.
+
+        Args:
+            error_class: Only failures of this class (e.g. 'transient')
+            post_ids: Only these posts
+            user_id: Only this user's posts
+
+        Returns:
+            {'replayed': n, 'containers_reused': n, 'skipped': n}
+        """
+        return replay_dead_letters(
+            self.supabase,
+            error_class=error_class,
+            post_ids=post_ids,
+            user_id=user_id,
+            on_release=lambda post_id, run_at: _requeue_publish_job(
+                post_id, run_at, f"Publish post {post_id} (replay)"
+            )
+        )
+
+    def _start_up(self) -> None:
+        """
+        Releases overdue jobs under the catch-up policy, resumes the
+        scheduler and restores pending jobs.
+        """
+        try:
+            catch_up_overdue_jobs(
+                self.supabase,
+                self.catch_up_policy,
+                on_release=lambda post_id, release_at: _requeue_publish_job(
+                    post_id, release_at, f"Publish post {post_id} (catch-up)"
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error catching up overdue jobs: {e}")
+        finally:
+            self.scheduler.resume()
+
+        self._restore_pending_jobs()
+
     def _restore_pending_jobs(self) -> None:
         """
         Restores pending jobs from database on scheduler startup.
 
         This ensures scheduled posts survive server restarts.
-        Also detects orphaned posts with status='scheduled' but no job.
+        Also creates the missing jobs of orphaned posts with
+        status='scheduled', in one statement
+        (restore_orphaned_scheduled_posts, migration 020).
+
+        Runs in a background thread (see __init__), so the API does not
+        wait for it. Jobs already in the APScheduler job store (persisted
+        across restarts) are not registered again.
         """
         try:
             logger.info("Restoring pending scheduled jobs...")
+            now = datetime.now(timezone.utc)
 
-            # Step 1: Restore jobs from scheduled_jobs table
+            # Step 1: Pending jobs from scheduled_jobs table
             pending_jobs = self.supabase.table('scheduled_jobs')\
-                .select('*')\
+                .select(
+                    'job_id, post_id, scheduled_time, dispatch_at, '
+                    'prestaged_container'
+                )\
+                .eq('job_type', 'publish_post')\
                 .in_('status', ['pending', 'retrying'])\
-                .gte('scheduled_time', datetime.now(timezone.utc).isoformat())\
+                .gte('scheduled_time', now.isoformat())\
                 .execute()
 
-            restored_count = 0
-
-            for job in pending_jobs.data or []:
-                try:
-                    # Recreate job in APScheduler
-                    scheduled_time_str = job['scheduled_time'].replace('Z', '+00:00')
-                    scheduled_time = datetime.fromisoformat(scheduled_time_str)
-
-                    # Ensure it's timezone-aware
-                    if scheduled_time.tzinfo is None:
-                        scheduled_time = scheduled_time.replace(tzinfo=timezone.utc)
+            # Step 2: Jobs created for orphaned posts (anti-join + bulk insert)
+            logger.info("Checking for orphaned scheduled posts...")
+            orphaned_jobs = self.supabase.rpc('restore_orphaned_scheduled_posts', {
+                'p_after': now.isoformat()
+            }).execute()
 
-                    self.scheduler.add_job(
-                        func=publish_post_job,
-                        trigger=DateTrigger(run_date=scheduled_time),
-                        args=[job['post_id']],
-                        id=job['job_id'],
-                        name=f"Publish post {job['post_id']}",
-                        replace_existing=True
-                    )
+            for job in orphaned_jobs.data or []:
+                logger.warning(
+                    f"Found orphaned post {job['post_id']} scheduled for "
+                    f"{job['scheduled_time']}. Job created"
+                )
 
-                    restored_count += 1
-                    logger.info(f"Restored job {job['job_id']}")
+            # Step 3: Register what the job store does not have yet
+            registered = {job.id for job in self.scheduler.get_jobs()}
+            restored_count = self._register_restored_jobs(
+                pending_jobs.data or [], registered
+            )
+            orphaned_count = self._register_restored_jobs(
+                orphaned_jobs.data or [], registered
+            )
 
-                except Exception as e:
-                    logger.error(
-                        f"Failed to restore job {job['job_id']}: {e}"
-                    )
+            total_jobs = len(pending_jobs.data or []) + len(orphaned_jobs.data or [])
+            logger.info(
+                f"Scheduler ready with {total_jobs} total jobs "
+                f"({restored_count} restored + {orphaned_count} orphaned, "
+                f"{total_jobs - restored_count - orphaned_count} already "
+                f"in the job store)"
+            )
 
-            logger.info(f"Restored {restored_count} jobs from scheduled_jobs table")
+        except Exception as e:
+            logger.error(f"Error restoring pending jobs: {e}")
 
-            # Step 2: Auto-detect orphaned posts with status='scheduled'
-            logger.info("Checking for orphaned scheduled posts...")
+    def _register_restored_jobs(self, jobs: List[Dict], registered: set) -> int:
+        """
+        Adds restored jobs (and their pre-stage jobs) to APScheduler.
 
-            orphaned_posts = self.supabase.table('posts')\
-                .select('id, scheduled_at')\
-                .eq('status', 'scheduled')\
-                .not_.is_('scheduled_at', 'null')\
-                .gte('scheduled_at', datetime.now(timezone.utc).isoformat())\
-                .execute()
+        Args:
+            jobs: scheduled_jobs rows (job_id, post_id, scheduled_time and
+                optionally dispatch_at and prestaged_container)
+            registered: IDs already in the job store (updated in place)
 
-            orphaned_count = 0
+        Returns:
+            Number of publish jobs added
+        """
+        added = 0
 
-            for post in orphaned_posts.data or []:
-                try:
-                    post_id = post['id']
-                    job_id = f"post_{post_id}"
-
-                    # Check if job already exists in scheduled_jobs
-                    existing_job = self.supabase.table('scheduled_jobs')\
-                        .select('job_id')\
-                        .eq('job_id', job_id)\
-                        .in_('status', ['pending', 'retrying'])\
-                        .execute()
-
-                    if existing_job.data:
-                        # Job already exists, skip
-                        continue
-
-                    # Orphaned post found! Create job for it
-                    scheduled_time_str = post['scheduled_at'].replace('Z', '+00:00')
-                    scheduled_time = datetime.fromisoformat(scheduled_time_str)
-
-                    # Ensure timezone-aware
-                    if scheduled_time.tzinfo is None:
-                        scheduled_time = scheduled_time.replace(tzinfo=timezone.utc)
-
-                    logger.warning(
-                        f"Found orphaned post {post_id} scheduled for "
-                        f"{scheduled_time}. Creating job..."
-                    )
+        for job in jobs:
+            try:
+                # Burst smoothing may have moved the dispatch time
+                run_at = job.get('dispatch_at') or job['scheduled_time']
+                scheduled_time = datetime.fromisoformat(
+                    run_at.replace('Z', '+00:00')
+                )
+                # Ensure it's timezone-aware
+                if scheduled_time.tzinfo is None:
+                    scheduled_time = scheduled_time.replace(tzinfo=timezone.utc)
 
-                    # Create job in APScheduler
+                if job['job_id'] not in registered:
                     self.scheduler.add_job(
                         func=publish_post_job,
+                        executor=PUBLISH_EXECUTOR,
                         trigger=DateTrigger(run_date=scheduled_time),
-                        args=[post_id],
-                        id=job_id,
-                        name=f"Publish post {post_id}",
+                        args=[job['post_id']],
+                        id=job['job_id'],
+                        name=f"Publish post {job['post_id']}",
                         replace_existing=True
                     )
+                    registered.add(job['job_id'])
+                    added += 1
 
-                    # Create entry in scheduled_jobs table
-                    self.supabase.table('scheduled_jobs').insert({
-                        'job_id': job_id,
-                        'job_type': 'publish_post',
-                        'post_id': post_id,
-                        'scheduled_time': scheduled_time.isoformat(),
-                        'status': 'pending',
-                        'retry_count': 0,
-                        'max_retries': 3
-                    }).execute()
-
-                    orphaned_count += 1
-                    logger.info(f"Created job for orphaned post {post_id}")
-
-                except Exception as e:
-                    logger.error(
-                        f"Failed to create job for orphaned post {post.get('id')}: {e}"
-                    )
+                # Pre-staged containers survive restarts in the row
+                if (
+                    not job.get('prestaged_container')
+                    and f"prestage_{job['post_id']}" not in registered
+                ):
+                    self._schedule_prestage(job['post_id'], scheduled_time)
 
-            if orphaned_count > 0:
-                logger.warning(
-                    f"Auto-scheduled {orphaned_count} orphaned posts"
-                )
-            else:
-                logger.info("No orphaned scheduled posts found")
+            except Exception as e:
+                logger.error(f"Failed to restore job {job['job_id']}: {e}")
 
-            total_jobs = restored_count + orphaned_count
-            logger.info(
-                f"Scheduler ready with {total_jobs} total jobs "
-                f"({restored_count} restored + {orphaned_count} orphaned)"
-            )
+        return added
 
-        except Exception as e:
-            logger.error(f"Error restoring pending jobs: {e}")
+    def _rearm_dispatched_job(self, job: Dict, dispatch_at: datetime) -> None:
+        """
+        Moves a post's publish job (and pending pre-stage job) to the
+        dispatch time planned by the burst smoother.
+        """
+        post_id = job['post_id']
+        _requeue_publish_job(post_id, dispatch_at, f"Publish post {post_id}")
+
+        if (
+            not job.get('prestaged_container')
+            and self.scheduler.get_job(f"prestage_{post_id}")
+        ):
+            self._schedule_prestage(post_id, dispatch_at)
+
+    def get_executor_metrics(self) -> List[Dict]:
+        """
+        Saturation and wait times of each executor pool.
+
+        Returns:
+            One PoolMetrics snapshot per pool (empty with the job queue)
+        """
+        if not self.scheduler:
+            return []
+        return [executor.metrics.snapshot() for executor in self.executors.values()]
 
     def _job_executed_listener(self, event) -> None:
         """Listener for successful job executions."""
@@ -600,6 +1570,25 @@ class PostScheduler:
             f"Job {event.job_id} failed with exception: {event.exception}"
         )
 
+    def _job_missed_listener(self, event) -> None:
+        """
+        Listener for jobs that ran later than misfire_grace_time.
+
+        A missed publish job is marked 'missed' and notified instead of
+        being dropped silently.
+        """
+        if not event.job_id.startswith('post_'):
+            logger.warning(f"Job {event.job_id} missed its run time")
+            return
+
+        try:
+            mark_jobs_missed(self.supabase, [{
+                'post_id': int(event.job_id[len('post_'):]),
+                'scheduled_time': event.scheduled_run_time.isoformat()
+            }])
+        except Exception as e:
+            logger.error(f"Error marking job {event.job_id} as missed: {e}")
+
     def shutdown(self, wait: bool = True) -> None:
         """
         Shuts down the scheduler gracefully.
@@ -608,5 +1597,11 @@ class PostScheduler:
             wait: Whether to wait for running jobs to complete
         """
         logger.info("Shutting down PostScheduler...")
-        self.scheduler.shutdown(wait=wait)
+        if self.scheduler:
+            self.scheduler.shutdown(wait=wait)
+        else:
+            self.queue_worker.stop(wait=wait)
+        # Let parked containers finish publishing before exiting
+        if wait:
+            get_container_monitor().shutdown()
         logger.info("PostScheduler shutdown complete")
@@ -0,0 +1,371 @@
+"""
+Sync Priority Planner
+
+Decides which Instagram accounts the periodic metrics sync should refresh
+on each run, instead of syncing every active account every hour.
+
+Accounts are classified into tiers from their recent activity:
+- hot: posted in the last 24h, dashboard opened in the last hour,
+  or a scheduled post going out in the next 2 hours
+- active: posted in the last 7 days, dashboard opened in the last day,
+  or has pending scheduled posts
+- idle: posted in the last 30 days or dashboard opened in the last week
+- dormant: everything else
+
+Each tier has a target sync interval. Due accounts are ranked by score
+(tier, how overdue they are, pending posts) and picked until the hourly
+Graph API budget is spent. By default the budget equals what the old
+"sync everything hourly" job used, so total API usage does not grow.
+
+The spent budget is kept in memory, which is enough for the API process
+and for sync_worker shards (each shard gets its share of an explicit
+budget). Lease workers plan over every account, so they pass in the
+spend recorded in the database (migration 027) instead.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import logging
+import threading
+from collections import deque, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, List, Dict
+
+logger = logging.getLogger(__name__)
+
+
+# Target freshness per tier
+SYNC_TIER_INTERVALS = {
+    'hot': timedelta(minutes=15),
+    'active': timedelta(hours=1),
+    'idle': timedelta(hours=6),
+    'dormant': timedelta(hours=24),
+}
+
+# Base score per tier (higher = synced first when budget is tight)
+SYNC_TIER_WEIGHTS = {
+    'hot': 100,
+    'active': 50,
+    'idle': 20,
+    'dormant': 10,
+}
+
+# Overdue ratio is capped so a long-dormant account cannot starve the rest,
+# but grows enough to outrank fresh "active" accounts after a few days.
+MAX_OVERDUE_RATIO = 4
+
+# How often the dashboard access timestamp is written per user
+DASHBOARD_ACCESS_WRITE_INTERVAL = timedelta(minutes=5)
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Parses an ISO timestamp from Supabase into an aware UTC datetime."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class SyncPriorityPlanner:
+    """
+    Picks the accounts to sync on each run within an hourly API budget.
+
+    Features:
+    - Tiered sync intervals from posting/dashboard/scheduling activity
+    - Rolling one-hour Graph API budget shared by all runs
+    - Overdue boost so dormant accounts are still synced daily
+    """
+
+    def __init__(
+        self,
+        hourly_budget: Optional[int] = None,
+        calls_per_sync: Optional[int] = None,
+        budget_shares: int = 1
+    ):
+        """
+        Args:
+            hourly_budget: Max Graph API calls per hour for metric syncs.
+                None = number of active accounts * calls_per_sync (the
+                usage of the previous hourly full sweep).
+            calls_per_sync: Estimated Graph API calls per account sync
+            budget_shares: Planners splitting an explicit hourly_budget
+                (sync_worker shards); each gets hourly_budget / shares
+        """
+        if hourly_budget is None and os.getenv('SYNC_API_BUDGET_PER_HOUR'):
+            hourly_budget = int(os.getenv('SYNC_API_BUDGET_PER_HOUR'))
+        if calls_per_sync is None:
+            calls_per_sync = int(os.getenv('SYNC_CALLS_PER_ACCOUNT', '3'))
+
+        self.hourly_budget = hourly_budget
+        self.calls_per_sync = max(1, calls_per_sync)
+        self.budget_shares = max(1, budget_shares)
+        self._spent = deque()  # (timestamp, api_calls)
+        self._dashboard_writes: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def classify(self, account: Dict, now: datetime) -> str:
+        """
+        Returns the sync tier of an account.
+
+        Args:
+            account: Account dict with activity signals
+                (last_post_at, last_dashboard_access_at,
+                pending_scheduled, next_scheduled_at)
+            now: Reference time (UTC)
+        """
+        last_post = _parse_timestamp(account.get('last_post_at'))
+        last_access = _parse_timestamp(account.get('last_dashboard_access_at'))
+        next_scheduled = _parse_timestamp(account.get('next_scheduled_at'))
+        pending = account.get('pending_scheduled', 0)
+
+        def within(ts: Optional[datetime], delta: timedelta) -> bool:
+            return ts is not None and now - ts <= delta
+
+        if (
+            within(last_post, timedelta(hours=24))
+            or within(last_access, timedelta(hours=1))
+            or (next_scheduled and next_scheduled - now <= timedelta(hours=2))
+        ):
+            return 'hot'
+        if (
+            within(last_post, timedelta(days=7))
+            or within(last_access, timedelta(days=1))
+            or pending > 0
+        ):
+            return 'active'
+        if (
+            within(last_post, timedelta(days=30))
+            or within(last_access, timedelta(days=7))
+        ):
+            return 'idle'
+        return 'dormant'
+
+    def score(self, account: Dict, tier: str, now: datetime) -> float:
+        """
+        Returns the priority of a due account (higher = sooner).
+
+        Returns 0 if the account is not due yet for its tier.
+        """
+        interval = SYNC_TIER_INTERVALS[tier]
+        last_sync = _parse_timestamp(account.get('last_sync_at'))
+
+        if last_sync is None:
+            overdue_ratio = MAX_OVERDUE_RATIO
+        else:
+            overdue_ratio = (now - last_sync) / interval
+            if overdue_ratio < 1:
+                return 0.0
+
+        return (
+            SYNC_TIER_WEIGHTS[tier]
+            + min(overdue_ratio, MAX_OVERDUE_RATIO) * 10
+            + min(account.get('pending_scheduled', 0), 5) * 2
+        )
+
+    def budget_for(self, accounts: List[Dict]) -> int:
+        """Hourly budget of this planner for the given accounts."""
+        if self.hourly_budget is None:
+            return len(accounts) * self.calls_per_sync
+        return self.hourly_budget // self.budget_shares
+
+    def plan(
+        self,
+        accounts: List[Dict],
+        now: Optional[datetime] = None,
+        spent: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Selects the due accounts that fit in the remaining hourly budget.
+
+        Args:
+            accounts: Active accounts with activity signals
+            now: Reference time (UTC)
+            spent: Calls already spent in the last hour (default: the
+                ones recorded by this planner)
+
+        Returns:
+            Accounts to sync, highest priority first. Each dict gets
+            'sync_tier' and 'sync_score' keys.
+        """
+        now = now or datetime.now(timezone.utc)
+
+        budget = self.budget_for(accounts)
+        if spent is None:
+            spent = self.spent_last_hour(now)
+
+        remaining = budget - spent
+
+        candidates = []
+        for account in accounts:
+            tier = self.classify(account, now)
+            score = self.score(account, tier, now)
+            if score > 0:
+                candidates.append({
+                    **account,
+                    'sync_tier': tier,
+                    'sync_score': score
+                })
+
+        candidates.sort(key=lambda a: a['sync_score'], reverse=True)
+
+        selected = []
+        for account in candidates:
+            if remaining < self.calls_per_sync:
+                break
+            selected.append(account)
+            remaining -= self.calls_per_sync
+
+        if len(selected) < len(candidates):
+            logger.info(
+                f"Sync budget reached: {len(selected)}/{len(candidates)} "
+                f"due accounts selected (budget {budget} calls/hour)"
+            )
+
+        return selected
+
+    def spent_last_hour(self, now: Optional[datetime] = None) -> int:
+        """Graph API calls spent by syncs in the last hour."""
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(hours=1)
+        with self._lock:
+            while self._spent and self._spent[0][0] < cutoff:
+                self._spent.popleft()
+            return sum(calls for _, calls in self._spent)
+
+    def record_sync(
+        self,
+        account_id: int,
+        api_calls: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> None:
+        """Charges a completed (or attempted) sync to the hourly budget."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            self._spent.append((now, api_calls or self.calls_per_sync))
+        logger.debug(f"Sync of account {account_id} charged to budget")
+
+    def select_accounts(
+        self,
+        supabase,
+        now: Optional[datetime] = None,
+        account_filter: Optional[Callable[[Dict], bool]] = None,
+        spent: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Loads active accounts and their activity signals and plans the run.
+
+        Uses three queries regardless of the number of accounts:
+        accounts, recently published posts and pending scheduled posts.
+
+        Args:
+            supabase: Supabase client
+            now: Reference time (UTC)
+            account_filter: Optional predicate to restrict the accounts
+                considered (e.g. a worker's shard). The default budget is
+                then computed over the filtered accounts only.
+            spent: Calls already spent in the last hour (see plan())
+
+        Returns:
+            Accounts to sync on this run (see plan())
+        """
+        now = now or datetime.now(timezone.utc)
+
+        all_accounts = supabase.table('instagram_accounts')\
+            .select('id, user_id, long_lived_access_token, '
+                    'instagram_business_account_id, is_active, '
+                    'last_sync_at, last_dashboard_access_at')\
+            .execute()
+
+        # Active = is_active true or NULL (older accounts without the field)
+        accounts = [
+            acc for acc in (all_accounts.data or [])
+            if acc.get('is_active') is not False
+        ]
+        if account_filter:
+            accounts = [acc for acc in accounts if account_filter(acc)]
+        if not accounts:
+            return []
+
+        last_post_at = {}
+        recent_posts = supabase.table('posts')\
+            .select('instagram_account_id, publication_date')\
+            .eq('status', 'published')\
+            .gte('publication_date', (now - timedelta(days=30)).isoformat())\
+            .execute()
+        for post in recent_posts.data or []:
+            account_id = post.get('instagram_account_id')
+            published = _parse_timestamp(post.get('publication_date'))
+            if account_id is None or published is None:
+                continue
+            if account_id not in last_post_at or published > last_post_at[account_id]:
+                last_post_at[account_id] = published
+
+        pending_counts = defaultdict(int)
+        next_scheduled_at = {}
+        scheduled_posts = supabase.table('posts')\
+            .select('instagram_account_id, scheduled_at')\
+            .eq('status', 'scheduled')\
+            .execute()
+        for post in scheduled_posts.data or []:
+            account_id = post.get('instagram_account_id')
+            scheduled = _parse_timestamp(post.get('scheduled_at'))
+            if account_id is None:
+                continue
+            pending_counts[account_id] += 1
+            if scheduled and (
+                account_id not in next_scheduled_at
+                or scheduled < next_scheduled_at[account_id]
+            ):
+                next_scheduled_at[account_id] = scheduled
+
+        for account in accounts:
+            account['last_post_at'] = last_post_at.get(account['id'])
+            account['pending_scheduled'] = pending_counts.get(account['id'], 0)
+            account['next_scheduled_at'] = next_scheduled_at.get(account['id'])
+
+        return self.plan(accounts, now, spent)
+
+    def record_dashboard_access(self, supabase, user_id: str) -> None:
+        """
+        Stores the dashboard access time for the user's active account.
+
+        Writes at most once every few minutes per user, so it can be
+        called on every analytics request.
+        """
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            last_write = self._dashboard_writes.get(user_id)
+            if last_write and now - last_write < DASHBOARD_ACCESS_WRITE_INTERVAL:
+                return
+            self._dashboard_writes[user_id] = now
+
+        try:
+            supabase.table('instagram_accounts')\
+                .update({'last_dashboard_access_at': now.isoformat()})\
+                .eq('user_id', user_id)\
+                .eq('is_active', True)\
+                .execute()
+        except Exception as e:
+            logger.warning(f"Could not record dashboard access for {user_id}: {e}")
+
+
+# Global planner instance (keeps the hourly budget across runs)
+sync_planner = None
+
+
+def get_sync_planner() -> SyncPriorityPlanner:
+    """Gets the singleton sync planner."""
+    global sync_planner
+    if sync_planner is None:
+        sync_planner = SyncPriorityPlanner()
+    return sync_planner
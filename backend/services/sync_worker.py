@@ -0,0 +1,296 @@
+"""
+Sync Worker
+
+Worker independiente para la sincronización de métricas de Instagram,
+fuera del proceso de FastAPI y del pool de APScheduler de PostScheduler.
+
+Cada worker se queda con un subconjunto de cuentas:
+- Por shard de hash: --shard 2/8 (shard 2 de 8, numeración desde 1).
+  Cada cuenta pertenece siempre al mismo shard.
+- Por lease en BD: --lease. Los workers reclaman cuentas con
+  claim_sync_accounts() (migración 014, FOR UPDATE SKIP LOCKED), así
+  que se pueden añadir o quitar workers sin reasignar shards.
+
+En cada ciclo el SyncPriorityPlanner elige qué cuentas del worker tocan
+y se ejecuta full_sync_account para cada una.
+
+Presupuesto de Graph API (SYNC_API_BUDGET_PER_HOUR): cada shard gasta
+su parte (presupuesto / total de shards). Los workers por lease planifican
+sobre todas las cuentas y comparten el presupuesto a través de la BD:
+reservan las sincronizaciones con reserve_sync_budget() (migración 027)
+antes de hacerlas.
+
+Uso:
+    python -m services.sync_worker --shard 2/8
+    python -m services.sync_worker --lease --concurrency 4
+    python -m services.sync_worker --shard 1/1 --once
+
+Para que la API no ejecute también el cron de sincronización, arrancar
+la API con SYNC_WORKER_MODE=external.
+
+Author: SocialLab
+Date: 2026-10-19
+"""
+
+import os
+import sys
+import time
+import uuid
+import zlib
+import socket
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parsea '2/8' → (2, 8).
+
+    Raises:
+        ValueError: Si el formato no es 'índice/total' con 1 <= índice <= total
+    """
+    try:
+        index_str, total_str = value.split('/')
+        index, total = int(index_str), int(total_str)
+    except ValueError:
+        raise ValueError(f"Shard inválido '{value}', formato esperado: 2/8")
+
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(
+            f"Shard inválido '{value}': índice debe estar entre 1 y {total}"
+        )
+
+    return index, total
+
+
+def account_shard(account_id: int, total_shards: int) -> int:
+    """Shard (1..total) estable de una cuenta, independiente del proceso."""
+    return zlib.crc32(str(account_id).encode('utf-8')) % total_shards + 1
+
+
+class SyncWorker:
+    """
+    Ejecuta full_sync_account para las cuentas de su shard o lease.
+    """
+
+    def __init__(
+        self,
+        shard: Optional[Tuple[int, int]] = None,
+        use_lease: bool = False,
+        concurrency: int = 1,
+        lease_seconds: int = 900,
+        db_client=None,
+        planner=None
+    ):
+        """
+        Args:
+            shard: (índice, total) para reparto por hash, o None
+            use_lease: Reclamar cuentas con leases en BD
+            concurrency: Cuentas sincronizadas en paralelo por ciclo
+            lease_seconds: Duración del lease por cuenta
+            db_client: Cliente de Supabase (por defecto, cliente admin)
+            planner: SyncPriorityPlanner (por defecto, uno con la parte
+                del presupuesto de este shard)
+        """
+        if not shard and not use_lease:
+            raise ValueError("Indica --shard o --lease")
+
+        if db_client is None:
+            from database.supabase_client import get_supabase_admin_client
+            db_client = get_supabase_admin_client()
+        if planner is None:
+            from services.scheduler.sync_planner import SyncPriorityPlanner
+            planner = SyncPriorityPlanner(
+                budget_shares=shard[1] if shard and not use_lease else 1
+            )
+
+        self.shard = shard
+        self.use_lease = use_lease
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.db = db_client
+        self.planner = planner
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    def _in_shard(self, account: Dict) -> bool:
+        index, total = self.shard
+        return account_shard(account['id'], total) == index
+
+    def select_accounts(self) -> List[Dict]:
+        """
+        Cuentas a sincronizar en este ciclo.
+
+        Con leases, el gasto de la última hora sale de la BD y solo se
+        devuelven las cuentas reclamadas para las que se pudo reservar
+        presupuesto; el resto de leases se liberan.
+        """
+        spent = None
+        if self.use_lease:
+            spent = self.db.rpc('sync_budget_spent', {}).execute().data or 0
+
+        accounts = self.planner.select_accounts(
+            self.db,
+            account_filter=self._in_shard if self.shard else None,
+            spent=spent
+        )
+
+        if not self.use_lease or not accounts:
+            return accounts
+
+        claimed = self.db.rpc('claim_sync_accounts', {
+            'p_worker_id': self.worker_id,
+            'p_account_ids': [acc['id'] for acc in accounts],
+            'p_lease_seconds': self.lease_seconds
+        }).execute()
+        claimed_ids = {row['id'] for row in claimed.data or []}
+        claimed_accounts = [acc for acc in accounts if acc['id'] in claimed_ids]
+        if not claimed_accounts:
+            return []
+
+        granted = self.db.rpc('reserve_sync_budget', {
+            'p_worker_id': self.worker_id,
+            'p_requested': len(claimed_accounts),
+            'p_calls_per_sync': self.planner.calls_per_sync,
+            'p_hourly_budget': self.planner.hourly_budget
+        }).execute().data or 0
+
+        for account in claimed_accounts[granted:]:
+            self._release(account['id'])
+
+        return claimed_accounts[:granted]
+
+    def _release(self, account_id: int) -> None:
+        """Libera el lease de una cuenta (los errores solo se registran)."""
+        try:
+            self.db.rpc('release_sync_account', {
+                'p_worker_id': self.worker_id,
+                'p_account_id': account_id
+            }).execute()
+        except Exception as e:
+            logger.warning(
+                f"⚠️  No se pudo liberar el lease de la cuenta {account_id}: {e}"
+            )
+
+    def sync_account(self, account: Dict) -> bool:
+        """Sincronización completa de una cuenta."""
+        from services.instagram_insights import InstagramInsightsService
+        from services.analytics import full_sync_account
+
+        try:
+            instagram_service = InstagramInsightsService(
+                access_token=account['long_lived_access_token'],
+                instagram_account_id=account['instagram_business_account_id']
+            )
+            full_sync_account(
+                instagram_service=instagram_service,
+                db_client=self.db,
+                user_id=account['user_id'],
+                instagram_account_id_db=account['id']
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Error sincronizando cuenta {account['id']}: {e}")
+            return False
+
+        finally:
+            if self.use_lease:
+                # El presupuesto ya se cargó en la BD al reservarlo
+                self._release(account['id'])
+            else:
+                self.planner.record_sync(account['id'])
+
+    def run_once(self) -> Dict:
+        """
+        Ejecuta un ciclo de sincronización.
+
+        Returns:
+            {'selected': n, 'synced': n, 'failed': n}
+        """
+        accounts = self.select_accounts()
+        if not accounts:
+            logger.info("No hay cuentas pendientes de sincronizar en este worker")
+            return {'selected': 0, 'synced': 0, 'failed': 0}
+
+        logger.info(f"📋 {len(accounts)} cuentas seleccionadas ({self.worker_id})")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(self.sync_account, accounts))
+
+        synced = sum(1 for ok in results if ok)
+        summary = {
+            'selected': len(accounts),
+            'synced': synced,
+            'failed': len(results) - synced
+        }
+        logger.info(
+            f"📊 Ciclo completado: {summary['synced']} exitosas, "
+            f"{summary['failed']} fallidas"
+        )
+        return summary
+
+    def run_forever(self, interval_seconds: int = 900) -> None:
+        """Ejecuta ciclos cada interval_seconds hasta Ctrl+C."""
+        mode = f"shard {self.shard[0]}/{self.shard[1]}" if self.shard else "lease"
+        logger.info(f"🚀 Sync worker {self.worker_id} iniciado ({mode})")
+
+        while True:
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Error en ciclo de sincronización: {e}")
+
+            elapsed = time.monotonic() - started
+            time.sleep(max(0, interval_seconds - elapsed))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Worker independiente de sincronización de métricas de Instagram"
+    )
+    parser.add_argument('--shard', help="Shard de este worker, p.ej. 2/8")
+    parser.add_argument(
+        '--lease', action='store_true', help="Reclamar cuentas con leases en BD"
+    )
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument(
+        '--interval', type=int, default=900, help="Segundos entre ciclos"
+    )
+    parser.add_argument('--lease-seconds', type=int, default=900)
+    parser.add_argument('--once', action='store_true', help="Ejecutar un solo ciclo")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+        worker = SyncWorker(
+            shard=shard,
+            use_lease=args.lease,
+            concurrency=args.concurrency,
+            lease_seconds=args.lease_seconds
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.once:
+        summary = worker.run_once()
+        return 1 if summary['failed'] else 0
+
+    try:
+        worker.run_forever(interval_seconds=args.interval)
+    except KeyboardInterrupt:
+        logger.info("🛑 Sync worker detenido")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -23,4 +23,29 @@ pytest tests/test_template_selector.py -v
 - `test_template_selector.py` - Pruebas de selección de templates
 - `test_image_composer.py` - Pruebas de composición de imágenes
 - `test_end_to_end.py` - **Flujo completo** de generación de contenido
+- `test_sync_planner.py` - Priorización de la sincronización de métricas
+- `test_instagram_webhooks.py` - Webhooks de Instagram con payloads firmados localmente
+- `test_container_monitor.py` - Publicación de contenedores sin bloquear hilos
+- `test_readiness_schedule.py` - Backoff y deadline de comprobación de contenedores
+- `test_batch_publisher.py` - Publicación por lotes agrupada por cuenta
+- `test_account_context.py` - Caché de credenciales de cuentas de Instagram
+- `test_publishing_quota.py` - Cuota de publicación por cuenta de Instagram
+- `test_scheduled_job_rpcs.py` - Reclamar, completar y fallar jobs programados por RPC
+- `test_job_queue.py` - Cola de jobs con reclamación SKIP LOCKED
+- `test_scheduler_executors.py` - Pools separados de publicación, sincronización
+  y mantenimiento
+- `test_job_metrics.py` - Histogramas de lag y duración de jobs programados
+- `test_catch_up.py` - Recuperación de posts vencidos tras una caída del scheduler
+- `test_burst_smoothing.py` - Reparto de picos de publicaciones a la misma hora
+- `test_bulk_schedule.py` - Programación y reprogramación de posts en bloque
+- `test_job_listing.py` - Listado paginado por keyset y archivado de jobs programados
+- `test_job_events.py` - Bus de eventos de estado de jobs por usuario
+- `test_dead_letter.py` - Dead-letter de publicaciones fallidas y reenvío en bloque
+- `test_instagram_insights.py` - Paginación de media con insights expandidos y
+  reintento por página
+- `test_sync_worker.py` - Worker de sincronización por shards o leases y su presupuesto
+- `test_carousel_publication.py` - Carruseles en varias etapas: hijos en paralelo
+  y álbum desde el monitor
+- `test_media_url_checks.py` - Caché de verificaciones de URLs de media (TTL,
+  force y publicación)
 """
@@ -0,0 +1,144 @@
+"""
+Fixtures compartidas de los tests.
+
+- fake_supabase: crea un cliente de Supabase falso que registra cada
+  consulta y RPC (FakeSupabase).
+- graph_error_response: respuestas reales de requests con el cuerpo de
+  error de la Graph API (ojo: un Response 4xx/5xx es falsy).
+"""
+
+import json
+
+import pytest
+import requests
+
+
+class FakeResult:
+    """Resultado de execute() con sus filas en data."""
+
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """
+    Consulta encadenable que registra cada llamada.
+
+    select/eq/in_/order/limit... se guardan en calls como (método, args);
+    insert, update, upsert y delete guardan además la operación, su
+    payload y sus opciones (p. ej. ignore_duplicates). execute() devuelve
+    las filas configuradas para la tabla.
+    """
+
+    def __init__(self, supabase, table):
+        self.supabase = supabase
+        self.table = table
+        self.operation = 'select'
+        self.payload = None
+        self.options = {}
+        self.calls = []
+
+    def _write(self, operation, payload=None, **options):
+        self.operation = operation
+        self.payload = payload
+        self.options = options
+        self.calls.append((operation, (payload,)))
+        return self
+
+    def insert(self, payload, **options):
+        return self._write('insert', payload, **options)
+
+    def update(self, payload):
+        return self._write('update', payload)
+
+    def upsert(self, payload, **options):
+        return self._write('upsert', payload, **options)
+
+    def delete(self):
+        return self._write('delete')
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+
+        return record
+
+    def filters(self, name):
+        """Argumentos de cada llamada a name (p. ej. 'eq')."""
+        return [args for method, args in self.calls if method == name]
+
+    def execute(self):
+        self.supabase.queries.append(self)
+        if self.operation == 'update':
+            self.supabase.updates.append((self.table, self.payload, self.calls))
+        rows = self.supabase.tables.get(self.table, [])
+        return FakeResult(rows(self) if callable(rows) else rows)
+
+
+class FakeSupabase:
+    """
+    Cliente de Supabase en memoria para los tests.
+
+    Args:
+        tables: {tabla: filas} devueltas por execute(), o una función
+            (FakeQuery) -> filas para respuestas que dependen de la consulta
+        rpcs: {nombre: datos} de cada RPC, o una función (params) -> datos
+
+    Registra en orden las tablas y RPCs usadas (calls), las consultas
+    ejecutadas (queries), los updates (updates) y los parámetros de
+    cada RPC (rpcs).
+    """
+
+    def __init__(self, tables=None, rpcs=None):
+        self.tables = tables or {}
+        self.rpc_results = rpcs or {}
+        self.calls = []
+        self.queries = []
+        self.updates = []
+        self.rpcs = []
+
+    def table(self, name):
+        self.calls.append(('table', name))
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        self.calls.append(('rpc', name))
+        self.rpcs.append((name, params))
+        result = self.rpc_results.get(name)
+
+        class Call:
+            def execute(self):
+                return FakeResult(result(params) if callable(result) else result)
+
+        return Call()
+
+    def rpc_params(self, name):
+        """Parámetros de la última llamada a la RPC name."""
+        return [params for rpc, params in self.rpcs if rpc == name][-1]
+
+
+@pytest.fixture
+def fake_supabase():
+    """Crea FakeSupabase(tables=..., rpcs=...)."""
+    return FakeSupabase
+
+
+@pytest.fixture
+def graph_error_response():
+    """Crea un requests.Response de error de la Graph API."""
+
+    def build(code, message, status=400, error_type='OAuthException'):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = 'Bad Request'
+        response.url = 'https://graph.facebook.com/v24.0/ig-1/media_publish'
+        response._content = json.dumps({
+            'error': {'message': message, 'type': error_type, 'code': code}
+        }).encode()
+        return response
+
+    return build
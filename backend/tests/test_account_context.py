@@ -0,0 +1,61 @@
+"""
+Tests de la caché de contexto de cuentas de Instagram.
+
+Comprueba que las consultas a instagram_accounts se reutilizan entre
+búsquedas por ID, usuario e ID de Business, y que caducan o se
+invalidan correctamente.
+"""
+
+from services.account_context import AccountContextCache
+
+ACCOUNT = {
+    'id': 7,
+    'user_id': 'user-1',
+    'long_lived_access_token': 'token-1',
+    'instagram_business_account_id': '1784',
+    'is_active': True,
+    'expires_at': None
+}
+
+
+def test_lookups_share_cached_account(fake_supabase):
+    db = fake_supabase(tables={'instagram_accounts': [ACCOUNT]})
+    cache = AccountContextCache(db_client=db, ttl_seconds=60)
+
+    assert cache.get_active_for_user('user-1')['id'] == 7
+    assert cache.get_by_id(7)['long_lived_access_token'] == 'token-1'
+    assert cache.get_by_business_id('1784')['id'] == 7
+    assert len(db.queries) == 1
+
+
+def test_invalidate_reloads_new_token(fake_supabase):
+    db = fake_supabase(tables={'instagram_accounts': [ACCOUNT]})
+    cache = AccountContextCache(db_client=db, ttl_seconds=60)
+    cache.get_by_id(7)
+
+    db.tables['instagram_accounts'] = [
+        {**ACCOUNT, 'long_lived_access_token': 'token-2'}
+    ]
+    cache.invalidate(user_id='user-1')
+
+    assert cache.get_by_id(7)['long_lived_access_token'] == 'token-2'
+    assert len(db.queries) == 2
+
+
+def test_entries_expire_after_ttl(fake_supabase):
+    db = fake_supabase(tables={'instagram_accounts': [ACCOUNT]})
+    cache = AccountContextCache(db_client=db, ttl_seconds=0)
+
+    cache.get_by_id(7)
+    cache.get_by_id(7)
+
+    assert len(db.queries) == 2
+
+
+def test_missing_accounts_are_not_cached(fake_supabase):
+    db = fake_supabase(tables={'instagram_accounts': []})
+    cache = AccountContextCache(db_client=db, ttl_seconds=60)
+
+    assert cache.get_active_for_user('user-1') is None
+    db.tables['instagram_accounts'] = [ACCOUNT]
+    assert cache.get_active_for_user('user-1')['id'] == 7
@@ -0,0 +1,96 @@
+"""
+Tests del BatchPublisher.
+
+Publica lotes con un publisher simulado (sin Graph API) y comprueba el
+orden por cuenta, el paralelismo entre cuentas y el límite de
+publicación.
+"""
+
+import asyncio
+
+from services.publisher.batch_publisher import BatchPublisher
+from services.publisher.publishing_quota import PublishingQuotaTracker
+
+
+class FakePublisher:
+    """Publisher que registra el orden de publicación por cuenta."""
+
+    def __init__(self, quota_left=None):
+        self.quota_left = quota_left or {}
+        self.account_lookups = []
+        self.published = []
+        self.active = 0
+        self.max_active = 0
+
+    def _get_instagram_account(self, account_id):
+        self.account_lookups.append(account_id)
+        return {'access_token': 'token', 'instagram_user_id': f"ig-{account_id}"}
+
+    def get_publishing_limit(self, ig_user_id, access_token):
+        account_id = int(ig_user_id.split('-')[1])
+        left = self.quota_left.get(account_id, 50)
+        return {'quota_usage': 50 - left, 'quota_total': 50}
+
+    async def publish_post_async(self, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        self.published.append((kwargs['instagram_account_id'], kwargs['media_url']))
+        return {'id': f"media-{kwargs['media_url']}", 'permalink': ''}
+
+
+def make_posts():
+    return [
+        {'id': i, 'instagram_account_id': account, 'media_url': f"p{i}"}
+        for i, account in enumerate([1, 2, 1, 3, 2, 1], start=1)
+    ]
+
+
+def run_batch(batch, posts, **kwargs):
+    async def collect():
+        return [result async for result in batch.publish(posts, **kwargs)]
+    return asyncio.run(collect())
+
+
+def test_publishes_in_order_per_account_and_loads_accounts_once():
+    publisher = FakePublisher()
+    updated = []
+
+    results = run_batch(
+        BatchPublisher(
+            publisher=publisher,
+            max_accounts=3,
+            quota=PublishingQuotaTracker(publisher=publisher)
+        ),
+        make_posts(),
+        on_published=lambda post, result: updated.append(post['id'])
+    )
+
+    assert len(results) == 6
+    assert all(result['success'] for result in results)
+    assert sorted(updated) == [1, 2, 3, 4, 5, 6]
+    # Una búsqueda de credenciales por cuenta (más la del tracker de cuota)
+    assert sorted(set(publisher.account_lookups)) == [1, 2, 3]
+    assert len(publisher.account_lookups) == 6
+    account_1 = [url for account, url in publisher.published if account == 1]
+    assert account_1 == ['p1', 'p3', 'p6']
+    assert publisher.max_active > 1
+
+
+def test_skips_posts_over_publishing_limit():
+    publisher = FakePublisher(quota_left={1: 1})
+
+    results = run_batch(
+        BatchPublisher(
+            publisher=publisher,
+            quota=PublishingQuotaTracker(publisher=publisher)
+        ),
+        make_posts()
+    )
+
+    by_post = {result['post_id']: result for result in results}
+    assert by_post[1]['success']
+    assert not by_post[3]['success']
+    assert 'limit' in by_post[6]['error']
+    assert by_post[2]['success'] and by_post[4]['success']
@@ -0,0 +1,166 @@
+"""
+Tests de la programación en bloque de posts.
+
+Comprueba que los posts se cargan en una consulta, que todos los válidos
+se guardan con una única RPC y se registran en el scheduler, que los
+inválidos devuelven su error sin bloquear al resto y que los posts ya
+publicados no se reprograman.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from services.publisher.instagram_publisher import InstagramPublishError
+from services.scheduler import post_scheduler
+
+FUTURE = datetime.now(timezone.utc) + timedelta(days=1)
+
+
+def bulk_supabase(fake_supabase, posts, running=(), completed=()):
+    """Supabase con los posts y la RPC schedule_posts_bulk."""
+    # schedule_posts_bulk omite los jobs 'running' y 'completed'
+    skipped = set(running) | set(completed)
+
+    def schedule_posts_bulk(params):
+        return [
+            {'job_id': f"post_{item['post_id']}", 'post_id': item['post_id'],
+             'scheduled_time': item['scheduled_time']}
+            for item in params['p_items'] if item['post_id'] not in skipped
+        ]
+
+    return fake_supabase(
+        tables={'posts': posts},
+        rpcs={'schedule_posts_bulk': schedule_posts_bulk}
+    )
+
+
+def stored_items(supabase):
+    return supabase.rpc_params('schedule_posts_bulk')['p_items']
+
+
+class FakePublisher:
+    def verify_media_url_accessibility(self, url):
+        if 'broken' in url:
+            raise InstagramPublishError("404")
+        return True
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.jobs = []
+
+    def add_job(self, **kwargs):
+        self.jobs.append(kwargs)
+
+    def remove_job(self, job_id):
+        pass
+
+
+def scheduler_with(supabase, monkeypatch):
+    monkeypatch.setenv('PRESTAGE_LEAD_MINUTES', '0')
+    sch = object.__new__(post_scheduler.PostScheduler)
+    sch.supabase = supabase
+    sch.publisher = FakePublisher()
+    sch.scheduler = FakeScheduler()
+    return sch
+
+
+def post(post_id, media_url='https://cdn.example.com/a.jpg', status='draft'):
+    return {
+        'id': post_id,
+        'status': status,
+        'media_url': media_url,
+        'video_url': None,
+        'post_type': 'FEED'
+    }
+
+
+def test_valid_posts_are_stored_in_one_rpc(monkeypatch, fake_supabase):
+    supabase = bulk_supabase(fake_supabase, [post(1), post(2)])
+    sch = scheduler_with(supabase, monkeypatch)
+
+    results = sch.schedule_posts([
+        {'post_id': 1, 'scheduled_time': FUTURE},
+        {
+            'post_id': 2,
+            'scheduled_time': FUTURE + timedelta(hours=1),
+            'retry_on_failure': False
+        }
+    ])
+
+    assert supabase.calls == [('table', 'posts'), ('rpc', 'schedule_posts_bulk')]
+    assert [item['max_retries'] for item in stored_items(supabase)] == [3, 0]
+    assert all(result['success'] for result in results)
+    assert [job['id'] for job in sch.scheduler.jobs] == ['post_1', 'post_2']
+
+
+def test_invalid_items_do_not_block_the_rest(monkeypatch, fake_supabase):
+    supabase = bulk_supabase(
+        fake_supabase,
+        [
+            post(1),
+            post(2, media_url=None),
+            post(3, media_url='https://cdn.example.com/broken.jpg'),
+            post(4),
+            post(5)
+        ],
+        running=[5]
+    )
+    sch = scheduler_with(supabase, monkeypatch)
+
+    results = sch.schedule_posts([
+        {'post_id': 1, 'scheduled_time': FUTURE},
+        {'post_id': 2, 'scheduled_time': FUTURE},
+        {'post_id': 3, 'scheduled_time': FUTURE},
+        {
+            'post_id': 4,
+            'scheduled_time': datetime.now(timezone.utc) - timedelta(minutes=1)
+        },
+        {'post_id': 5, 'scheduled_time': FUTURE},
+        {'post_id': 9, 'scheduled_time': FUTURE}
+    ])
+
+    assert [result['success'] for result in results] == [
+        True, False, False, False, False, False
+    ]
+    assert 'missing media_url' in results[1]['error']
+    assert 'not publishable' in results[2]['error']
+    assert 'future' in results[3]['error']
+    assert 'being published' in results[4]['error']
+    assert 'not found' in results[5]['error']
+    assert [item['post_id'] for item in stored_items(supabase)] == [1, 5]
+    assert [job['id'] for job in sch.scheduler.jobs] == ['post_1']
+
+
+def test_duplicate_posts_are_rejected(monkeypatch, fake_supabase):
+    supabase = bulk_supabase(fake_supabase, [post(1)])
+    sch = scheduler_with(supabase, monkeypatch)
+
+    results = sch.schedule_posts([
+        {'post_id': 1, 'scheduled_time': FUTURE},
+        {'post_id': 1, 'scheduled_time': FUTURE + timedelta(hours=1)}
+    ])
+
+    assert not any(result['success'] for result in results)
+    assert supabase.rpcs == []
+
+
+def test_published_posts_are_not_rescheduled(monkeypatch, fake_supabase):
+    # 2: post ya publicado; 3: job 'completed' con el post aún sin marcar
+    supabase = bulk_supabase(
+        fake_supabase,
+        [post(1), post(2, status='published'), post(3)],
+        completed=[3]
+    )
+    sch = scheduler_with(supabase, monkeypatch)
+
+    results = sch.schedule_posts([
+        {'post_id': 1, 'scheduled_time': FUTURE},
+        {'post_id': 2, 'scheduled_time': FUTURE},
+        {'post_id': 3, 'scheduled_time': FUTURE}
+    ])
+
+    assert [result['success'] for result in results] == [True, False, False]
+    assert 'already published' in results[1]['error']
+    assert 'already published' in results[2]['error']
+    assert [item['post_id'] for item in stored_items(supabase)] == [1, 3]
+    assert [job['id'] for job in sch.scheduler.jobs] == ['post_1']
@@ -0,0 +1,110 @@
+"""
+Tests del suavizado de ráfagas de publicaciones programadas.
+
+Comprueba que un pico a la misma hora se reparte al ritmo máximo sin
+adelantarse más de la tolerancia, que las cuentas se intercalan y que
+los posts aislados o a punto de ejecutarse no se mueven.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from services.scheduler.burst_smoothing import BurstSmoother, smooth_upcoming_jobs
+
+NOW = datetime(2026, 10, 19, 8, 50, tzinfo=timezone.utc)
+PEAK = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+def job(post_id, at=PEAK, user_id='user-1', dispatch_at=None):
+    return {
+        'job_id': f"post_{post_id}",
+        'post_id': post_id,
+        'scheduled_time': at.isoformat(),
+        'dispatch_at': dispatch_at.isoformat() if dispatch_at else None,
+        'posts': {'user_id': user_id}
+    }
+
+
+def smoother():
+    return BurstSmoother(
+        max_starts_per_minute=6,
+        tolerance=timedelta(seconds=30),
+        horizon=timedelta(minutes=15)
+    )
+
+
+def offsets(plan):
+    return {j['post_id']: (at - PEAK).total_seconds() for j, at in plan}
+
+
+def test_peak_is_spread_around_requested_time():
+    plan = smoother().plan([job(i, user_id=f"user-{i}") for i in range(1, 6)], NOW)
+
+    # Un inicio cada 10 s, centrados en las 09:00
+    assert sorted(offsets(plan).values()) == [-20, -10, 0, 10, 20]
+
+
+def test_spread_never_starts_before_tolerance():
+    plan = smoother().plan([job(i, user_id=f"user-{i}") for i in range(1, 11)], NOW)
+
+    assert min(offsets(plan).values()) == -30
+    assert max(offsets(plan).values()) == 60
+
+
+def test_accounts_are_interleaved():
+    jobs = [
+        job(1, user_id='a'),
+        job(2, user_id='a'),
+        job(3, user_id='a'),
+        job(4, user_id='b')
+    ]
+
+    plan = smoother().plan(jobs, NOW)
+    order = [j['posts']['user_id'] for j, _ in sorted(plan, key=lambda p: p[1])]
+
+    assert order == ['a', 'b', 'a', 'a']
+
+
+def test_isolated_post_keeps_its_time():
+    plan = smoother().plan([job(1), job(2, at=PEAK + timedelta(minutes=5))], NOW)
+
+    assert offsets(plan) == {1: 0, 2: 300}
+
+
+def test_firing_jobs_are_not_moved_and_push_the_next_block():
+    now = PEAK - timedelta(seconds=30)
+    jobs = [
+        job(1, at=PEAK + timedelta(seconds=25)),
+        job(2, at=PEAK + timedelta(seconds=32))
+    ]
+
+    plan = smoother().plan(jobs, now)
+
+    # El post 1 sale en menos de un minuto: se queda y el 2 va 10 s después
+    assert offsets(plan) == {2: 35}
+
+
+def test_only_changed_dispatch_times_are_stored(fake_supabase):
+    supabase = fake_supabase(tables={
+        'scheduled_jobs': [job(1, user_id='a'), job(2, user_id='b')]
+    })
+    moved = []
+
+    count = smooth_upcoming_jobs(
+        supabase,
+        smoother(),
+        on_dispatch=lambda j, at: moved.append((j['post_id'], at)),
+        now=NOW
+    )
+
+    # Dos posts a las 09:00: -5 s y +5 s
+    assert count == 2
+    assert [at - PEAK for _, at in moved] == [
+        timedelta(seconds=-5), timedelta(seconds=5)
+    ]
+    assert len(supabase.updates) == 2
+
+    supabase.tables['scheduled_jobs'] = [
+        job(1, user_id='a', dispatch_at=moved[0][1]),
+        job(2, user_id='b', dispatch_at=moved[1][1])
+    ]
+    assert smooth_upcoming_jobs(supabase, smoother(), now=NOW) == 0
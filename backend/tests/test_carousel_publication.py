@@ -0,0 +1,201 @@
+"""
+Tests de la publicación de carruseles en varias etapas.
+
+Simula la Graph API (sin llamadas reales) y comprueba que los hijos se
+crean en paralelo y en orden, que el ContainerMonitor comprueba los
+hijos sin bloquear antes de crear el álbum, y que un hijo con ERROR, el
+timeout de los hijos o un fallo al crear el álbum terminan en error.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from requests.exceptions import HTTPError
+
+import services.publisher.instagram_publisher as instagram_publisher
+from services.publisher.container_monitor import ContainerMonitor
+from services.publisher.instagram_publisher import (
+    InstagramPublisher,
+    InstagramPublishError
+)
+from services.publisher.readiness import ReadinessSchedule
+
+FAST = ReadinessSchedule(first_delay=0.01, fast_interval=0.01, deadline=2)
+ACCOUNT = {'access_token': 'token', 'instagram_user_id': 'ig-1'}
+IMAGES = [f"https://cdn.example.com/{i}.jpg" for i in range(1, 5)]
+
+
+class FakeTimingStats:
+    def schedule_for(self, media_type, size_bytes=None):
+        return FAST
+
+    def record(self, publication, outcome):
+        pass
+
+
+class FakeResponse:
+    def __init__(self, data, status=200):
+        self.data = data
+        self.status = status
+        self.text = ''
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPError(response=self)
+
+
+class FakeGraph:
+    """Hijos de carrusel que terminan tras N comprobaciones."""
+
+    def __init__(self, checks_until_ready=2, statuses=None, album_error=None):
+        self.checks_until_ready = checks_until_ready
+        self.statuses = statuses or {}
+        self.album_error = album_error
+        self.checks = {}
+        self.albums = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def create_item(self, ig_user_id, access_token, image_url):
+        index = IMAGES.index(image_url)
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        # Los primeros hijos tardan más: el orden no depende de quién acaba antes
+        time.sleep(0.02 * (len(IMAGES) - index))
+        with self.lock:
+            self.active -= 1
+        return f"child-{index + 1}"
+
+    def status(self, container_id, access_token):
+        with self.lock:
+            self.checks[container_id] = self.checks.get(container_id, 0) + 1
+            checks = self.checks[container_id]
+        if container_id in self.statuses:
+            return self.statuses[container_id], 'Unsupported image'
+        if checks >= self.checks_until_ready:
+            return 'FINISHED', None
+        return 'IN_PROGRESS', None
+
+    def post(self, url, data=None, timeout=None):
+        self.albums.append(data)
+        if self.album_error:
+            return FakeResponse({'error': self.album_error}, status=400)
+        return FakeResponse({'id': 'album-1'})
+
+
+@pytest.fixture
+def graph():
+    return FakeGraph()
+
+
+def make_publisher(monkeypatch, graph):
+    publisher = InstagramPublisher()
+    publisher.timing_stats = FakeTimingStats()
+    publisher.carousel_items_schedule = FAST
+    monkeypatch.setattr(publisher, '_check_media_url', lambda url: 100)
+    monkeypatch.setattr(publisher, '_create_carousel_item', graph.create_item)
+    monkeypatch.setattr(publisher, '_get_container_status', graph.status)
+    monkeypatch.setattr(instagram_publisher.requests, 'post', graph.post)
+    return publisher
+
+
+def create_carousel(publisher):
+    return publisher.create_publication(
+        media_url=IMAGES[0],
+        caption='Carrusel',
+        instagram_account_id=1,
+        is_carousel=True,
+        carousel_children=IMAGES,
+        account=ACCOUNT
+    )
+
+
+def test_children_are_created_concurrently_in_order(monkeypatch, graph):
+    publisher = make_publisher(monkeypatch, graph)
+
+    publication = create_carousel(publisher)
+
+    assert publication['state'] == 'CHILDREN_PENDING'
+    assert publication['container_id'] is None
+    assert publication['children'] == ['child-1', 'child-2', 'child-3', 'child-4']
+    assert graph.max_active > 1
+    assert graph.albums == []  # el álbum se crea al comprobar los hijos
+
+
+def test_monitor_creates_album_once_children_are_ready(monkeypatch, graph):
+    publisher = make_publisher(monkeypatch, graph)
+    monitor = ContainerMonitor(publisher=publisher, max_workers=1)
+    staged = {}
+    done = threading.Event()
+
+    def on_ready(publication, error):
+        staged.update(publication=publication, error=error)
+        done.set()
+
+    monitor.submit(create_carousel(publisher), on_ready, publish=False)
+
+    assert done.wait(5)
+    assert staged['error'] is None
+    assert staged['publication']['state'] == 'READY'
+    assert staged['publication']['container_id'] == 'album-1'
+    assert [album['children'] for album in graph.albums] == [
+        'child-1,child-2,child-3,child-4'
+    ]
+    assert graph.checks['album-1'] == 2
+
+    monitor.shutdown(timeout=1)
+
+
+def test_error_child_fails_without_creating_album(monkeypatch):
+    graph = FakeGraph(statuses={'child-3': 'ERROR'})
+    publisher = make_publisher(monkeypatch, graph)
+    publication = create_carousel(publisher)
+
+    with pytest.raises(InstagramPublishError, match='child-3'):
+        publisher.check_publication(publication)
+
+    assert publication['state'] == 'FAILED'
+    assert graph.albums == []
+
+
+def test_children_time_out(monkeypatch):
+    graph = FakeGraph(checks_until_ready=1000)
+    publisher = make_publisher(monkeypatch, graph)
+    publication = create_carousel(publisher)
+
+    assert publisher.check_publication(publication) == 'CHILDREN_PENDING'
+
+    publication['created_at'] = (
+        datetime.now(timezone.utc) - timedelta(seconds=5)
+    ).isoformat()
+    with pytest.raises(InstagramPublishError, match='not ready after'):
+        publisher.check_publication(publication)
+
+    assert publication['state'] == 'FAILED'
+    assert graph.albums == []
+
+
+def test_album_creation_error_is_parsed(monkeypatch):
+    graph = FakeGraph(
+        checks_until_ready=1,
+        album_error={
+            'code': 9007,
+            'type': 'OAuthException',
+            'message': 'Media ID is not available'
+        }
+    )
+    publisher = make_publisher(monkeypatch, graph)
+    publication = create_carousel(publisher)
+
+    with pytest.raises(InstagramPublishError) as raised:
+        publisher.check_publication(publication)
+
+    assert raised.value.error_code == 9007
+    assert publication['state'] == 'FAILED'
@@ -0,0 +1,109 @@
+"""
+Tests de la política de recuperación tras una caída del scheduler.
+
+Comprueba que los posts vencidos fuera de la ventana se marcan como
+perdidos y se notifican, que el resto se libera respetando el ritmo
+global y por cuenta (en dispatch_at, sin tocar scheduled_time) y que no
+se hace nada si otro proceso ya está recuperando.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from services.scheduler import catch_up
+from services.scheduler.catch_up import CatchUpPolicy, catch_up_overdue_jobs
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def overdue(post_id, minutes_ago, user_id='user-1'):
+    return {
+        'job_id': f"post_{post_id}",
+        'post_id': post_id,
+        'scheduled_time': (NOW - timedelta(minutes=minutes_ago)).isoformat(),
+        'posts': {'user_id': user_id}
+    }
+
+
+def policy():
+    return CatchUpPolicy(
+        window=timedelta(minutes=60),
+        rate_per_minute=6,
+        account_rate_per_minute=1
+    )
+
+
+def test_jobs_beyond_window_are_missed():
+    releases, missed = policy().plan([overdue(1, 90), overdue(2, 30)], NOW)
+
+    assert [job['post_id'] for job in missed] == [1]
+    assert [(job['post_id'], at) for job, at in releases] == [(2, NOW)]
+
+
+def test_releases_are_paced_overall_and_per_account():
+    jobs = [
+        overdue(1, 50, 'user-1'),
+        overdue(2, 40, 'user-1'),
+        overdue(3, 30, 'user-2'),
+        overdue(4, 20, 'user-3')
+    ]
+
+    releases, _ = policy().plan(jobs, NOW)
+    offsets = {job['post_id']: (at - NOW).total_seconds() for job, at in releases}
+
+    # Un post cada 10 s en total; user-1 espera un minuto a su segundo post
+    # y los de otras cuentas ocupan los huecos intermedios
+    assert offsets == {1: 0, 3: 10, 4: 20, 2: 60}
+
+
+def test_catch_up_reschedules_and_marks_missed(monkeypatch, fake_supabase):
+    notified = []
+    monkeypatch.setattr(catch_up, 'notify_missed_posts', notified.extend)
+    supabase = fake_supabase(rpcs={
+        'claim_overdue_jobs': [overdue(1, 120), overdue(2, 5)]
+    })
+    released = []
+
+    result = catch_up_overdue_jobs(
+        supabase,
+        policy(),
+        on_release=lambda post_id, at: released.append((post_id, at)),
+        now=NOW,
+        worker_id='worker-1'
+    )
+
+    assert result == {'released': 1, 'missed': 1}
+    assert released == [(2, NOW)]
+    assert [post['post_id'] for post in notified] == [1]
+    assert supabase.rpcs[0] == ('claim_overdue_jobs', {
+        'p_worker_id': 'worker-1',
+        'p_lease_seconds': catch_up.CATCH_UP_LEASE_SECONDS
+    })
+
+    statuses = [
+        (table, payload.get('status'), payload.get('dispatch_at'))
+        for table, payload, _ in supabase.updates
+    ]
+    assert statuses == [
+        ('scheduled_jobs', None, NOW.isoformat()),
+        ('scheduled_jobs', 'missed', None),
+        ('posts', 'failed', None)
+    ]
+    # La hora pedida no cambia y el lease de planificación se libera
+    released_payload = supabase.updates[0][1]
+    assert 'scheduled_time' not in released_payload
+    assert released_payload['locked_until'] is None
+
+
+def test_catch_up_does_nothing_while_another_process_holds_the_lock(
+    monkeypatch, fake_supabase
+):
+    notified = []
+    monkeypatch.setattr(catch_up, 'notify_missed_posts', notified.extend)
+    # claim_overdue_jobs no devuelve nada sin el advisory lock
+    supabase = fake_supabase(rpcs={'claim_overdue_jobs': []})
+
+    result = catch_up_overdue_jobs(supabase, policy(), now=NOW)
+
+    assert result == {'released': 0, 'missed': 0}
+    assert supabase.updates == []
+    assert notified == []
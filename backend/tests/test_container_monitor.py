@@ -0,0 +1,113 @@
+"""
+Tests del ContainerMonitor.
+
+Publica contenedores simulados (sin llamadas a la Graph API) y comprueba
+que el monitor los revisa sin bloquear, los publica cuando están listos
+y notifica los errores.
+"""
+
+import threading
+
+from services.publisher.container_monitor import ContainerMonitor
+from services.publisher.instagram_publisher import InstagramPublishError
+
+
+class FakePublisher:
+    """Publisher cuyos contenedores están listos tras N comprobaciones."""
+
+    def __init__(self, checks_until_ready=2, fail=False):
+        self.checks_until_ready = checks_until_ready
+        self.fail = fail
+        self.published = []
+
+    def check_publication(self, publication):
+        publication['checks'] += 1
+        if self.fail:
+            publication['state'] = 'FAILED'
+            raise InstagramPublishError("Container processing failed: ERROR")
+        if publication['checks'] >= self.checks_until_ready:
+            publication['state'] = 'READY'
+        else:
+            publication['state'] = 'PROCESSING'
+        return publication['state']
+
+    def next_check_delay(self, publication):
+        return 0.01
+
+    def complete_publication(self, publication):
+        self.published.append(publication['container_id'])
+        return {'id': f"media-{publication['container_id']}", 'permalink': ''}
+
+
+def make_publication(container_id):
+    return {
+        'container_id': container_id,
+        'state': 'CREATED',
+        'checks': 0
+    }
+
+
+def submit_and_wait(monitor, publications):
+    results = {}
+    done = threading.Event()
+
+    def on_complete(container_id):
+        def callback(result, error):
+            results[container_id] = (result, error)
+            if len(results) == len(publications):
+                done.set()
+        return callback
+
+    for publication in publications:
+        monitor.submit(publication, on_complete(publication['container_id']))
+
+    assert done.wait(5)
+    return results
+
+
+def test_publishes_containers_when_ready():
+    publisher = FakePublisher(checks_until_ready=3)
+    monitor = ContainerMonitor(publisher=publisher, max_workers=2)
+
+    publications = [make_publication(f"c{i}") for i in range(10)]
+    results = submit_and_wait(monitor, publications)
+
+    assert sorted(publisher.published) == sorted(
+        p['container_id'] for p in publications
+    )
+    assert all(error is None for _, error in results.values())
+    assert all(p['checks'] == 3 for p in publications)
+
+    monitor.shutdown(timeout=1)
+    assert monitor.in_flight() == 0
+
+
+def test_reports_container_errors():
+    monitor = ContainerMonitor(publisher=FakePublisher(fail=True), max_workers=1)
+
+    results = submit_and_wait(monitor, [make_publication('bad')])
+
+    result, error = results['bad']
+    assert result is None
+    assert isinstance(error, InstagramPublishError)
+
+    monitor.shutdown(timeout=1)
+
+
+def test_prestage_stops_at_ready_without_publishing():
+    publisher = FakePublisher(checks_until_ready=2)
+    monitor = ContainerMonitor(publisher=publisher, max_workers=1)
+    staged = {}
+    done = threading.Event()
+
+    def on_ready(publication, error):
+        staged['publication'] = publication
+        done.set()
+
+    monitor.submit(make_publication('early'), on_ready, publish=False)
+
+    assert done.wait(5)
+    assert staged['publication']['state'] == 'READY'
+    assert publisher.published == []
+
+    monitor.shutdown(timeout=1)
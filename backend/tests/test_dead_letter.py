@@ -0,0 +1,271 @@
+"""
+Tests del almacén dead-letter de publicaciones fallidas.
+
+Comprueba la clasificación de errores (también desde respuestas HTTP
+reales de la Graph API), que el contexto del fallo
+(código de la Graph API y contenedor READY) llega a fail_scheduled_job,
+que un token rechazado descarta la cuenta de la caché de contexto,
+y que el reenvío en bloque se reparte por cuenta y reutiliza solo los
+contenedores todavía válidos.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+import services.publisher.instagram_publisher as instagram_publisher
+from services.publisher.container_monitor import ContainerMonitor
+from services.publisher.instagram_publisher import (
+    InstagramPublisher,
+    InstagramPublishError
+)
+from services.scheduler import post_scheduler
+from services.scheduler.catch_up import CatchUpPolicy
+from services.scheduler.dead_letter import (
+    classify_publish_error,
+    replay_dead_letters
+)
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def test_errors_are_classified_by_graph_code_and_message():
+    codes = {2: 'transient', 190: 'auth', 4: 'rate_limit', 9: 'rate_limit'}
+    for code, error_class in codes.items():
+        error = InstagramPublishError("Failed to publish container", error_code=code)
+        assert classify_publish_error(error) == error_class
+
+    messages = {
+        "URL no accesible. Status code: 404": 'media',
+        "Container processing failed: ERROR": 'media',
+        "Container c-1 timed out after 300 seconds": 'transient',
+        "Failed to publish container: No response from Instagram API": 'transient',
+    }
+    for message, error_class in messages.items():
+        assert classify_publish_error(InstagramPublishError(message)) == error_class
+
+    assert classify_publish_error(requests.ConnectionError("reset")) == 'transient'
+    assert classify_publish_error(ValueError("Post 1 not found")) == 'validation'
+    assert classify_publish_error(RuntimeError("boom")) == 'unknown'
+
+
+def publish_with_response(monkeypatch, response):
+    """Llama a _publish_container con requests.post devolviendo response."""
+    monkeypatch.setattr(
+        instagram_publisher.requests, 'post', lambda *args, **kwargs: response
+    )
+    try:
+        InstagramPublisher()._publish_container('ig-1', 'token', 'c-1')
+    except InstagramPublishError as e:
+        return e
+    raise AssertionError("media_publish no falló")
+
+
+def test_graph_error_response_is_parsed(monkeypatch, graph_error_response):
+    response = graph_error_response(2207026, 'Media expired', error_type='Other')
+    # Un Response 4xx es falsy: no debe confundirse con "sin respuesta"
+    assert not response
+
+    error = publish_with_response(monkeypatch, response)
+
+    assert error.error_code == 2207026
+    assert 'Media expired' in str(error)
+    assert 'No response' not in str(error)
+    assert InstagramPublishError("URL no accesible").error_code is None
+
+
+def test_graph_error_classes_come_from_the_response(
+    monkeypatch, graph_error_response
+):
+    cases = [
+        (graph_error_response(190, 'Error validating access token'), 'auth'),
+        (graph_error_response(4, 'Application request limit reached'), 'rate_limit'),
+        (graph_error_response(36003, 'Invalid aspect ratio'), 'media'),
+        (graph_error_response(2, 'Service unavailable', status=503), 'transient'),
+    ]
+    for response, error_class in cases:
+        error = publish_with_response(monkeypatch, response)
+        context = post_scheduler.failure_context(error)
+        assert context['p_error_class'] == error_class
+        assert context['p_error_code'] == response.json()['error']['code']
+
+
+class FailingPublisher:
+    """El contenedor está READY pero media_publish falla."""
+
+    def check_publication(self, publication):
+        publication['state'] = 'READY'
+        return 'READY'
+
+    def complete_publication(self, publication):
+        raise InstagramPublishError(
+            "Failed to publish container: [2] Service unavailable"
+        )
+
+    @staticmethod
+    def staged_container(publication):
+        return {
+            'container_id': publication['container_id'],
+            'created_at': publication['created_at']
+        }
+
+
+def test_monitor_attaches_ready_container_to_publish_error():
+    monitor = ContainerMonitor(publisher=FailingPublisher(), max_workers=1)
+    errors = []
+    publication = {
+        'container_id': 'c-1',
+        'created_at': NOW.isoformat(),
+        'state': 'CREATED'
+    }
+
+    try:
+        monitor._check(publication, lambda result, error: errors.append(error), True)
+    finally:
+        monitor.shutdown(timeout=1)
+
+    assert errors[0].container_id == 'c-1'
+    assert errors[0].staged_container == {
+        'container_id': 'c-1',
+        'created_at': NOW.isoformat()
+    }
+
+
+def test_final_failure_sends_context_to_dead_letter(monkeypatch, fake_supabase):
+    supabase = fake_supabase(rpcs={'fail_scheduled_job': {
+        'status': 'failed',
+        'retry_count': 3,
+        'max_retries': 3,
+        'scheduled_time': NOW.isoformat()
+    }})
+    monkeypatch.setattr(post_scheduler, 'get_supabase_admin_client', lambda: supabase)
+    staged = {'container_id': 'c-1', 'created_at': NOW.isoformat()}
+    error = InstagramPublishError(
+        "Failed to publish container: [2] Service unavailable",
+        error_code=2,
+        container_id='c-1',
+        staged_container=staged
+    )
+
+    post_scheduler._handle_publish_failure(42, error)
+
+    name, params = supabase.rpcs[0]
+    assert name == 'fail_scheduled_job'
+    assert params['p_error_class'] == 'transient'
+    assert params['p_error_code'] == 2
+    assert params['p_container_id'] == 'c-1'
+    assert params['p_staged_container'] == staged
+
+
+def test_auth_failure_invalidates_account_context(
+    monkeypatch, graph_error_response, fake_supabase
+):
+    final = {
+        'status': 'failed',
+        'retry_count': 3,
+        'max_retries': 3,
+        'scheduled_time': NOW.isoformat()
+    }
+    supabase = fake_supabase(rpcs={'fail_scheduled_job': final})
+    monkeypatch.setattr(post_scheduler, 'get_supabase_admin_client', lambda: supabase)
+    invalidated = []
+    monkeypatch.setattr(
+        post_scheduler,
+        'invalidate_account_context',
+        lambda **criteria: invalidated.append(criteria)
+    )
+
+    # Errores reales de media_publish (HTTP 400 / 503 de la Graph API)
+    expired = publish_with_response(
+        monkeypatch,
+        graph_error_response(190, 'Error validating access token: Session expired')
+    )
+    unavailable = publish_with_response(
+        monkeypatch,
+        graph_error_response(2, 'Service temporarily unavailable', status=503)
+    )
+
+    post_scheduler._handle_publish_failure(42, expired, account_id=7)
+    post_scheduler._handle_publish_failure(43, unavailable, account_id=8)
+
+    # Solo el token rechazado descarta la cuenta cacheada
+    assert invalidated == [{'account_id': 7}]
+
+
+def replay_supabase(fake_supabase, dead_letters):
+    """Devuelve los dead letters abiertos y reprograma todos los enviados."""
+
+    def replay(params):
+        return [
+            {
+                'job_id': f"post_{item['post_id']}",
+                'post_id': item['post_id'],
+                'scheduled_time': item['scheduled_time'],
+                'container_reused': item['container'] is not None
+            }
+            for item in params['p_items']
+        ]
+
+    return fake_supabase(
+        tables={'publish_dead_letters': dead_letters},
+        rpcs={'replay_dead_letters': replay}
+    )
+
+
+def dead_letter(post_id, user_id, container_age_hours=None):
+    staged = None
+    if container_age_hours is not None:
+        staged = {
+            'container_id': f"c-{post_id}",
+            'created_at': (NOW - timedelta(hours=container_age_hours)).isoformat()
+        }
+    return {
+        'post_id': post_id,
+        'failed_at': (NOW - timedelta(hours=1, minutes=-post_id)).isoformat(),
+        'staged_container': staged,
+        'posts': {'user_id': user_id}
+    }
+
+
+def test_replay_paces_per_account_and_reuses_valid_containers(fake_supabase):
+    supabase = replay_supabase(fake_supabase, [
+        dead_letter(1, 'user-1', container_age_hours=2),
+        dead_letter(2, 'user-1'),
+        dead_letter(3, 'user-2', container_age_hours=30)
+    ])
+    released = []
+
+    result = replay_dead_letters(
+        supabase,
+        error_class='transient',
+        policy=CatchUpPolicy(
+            window=timedelta.max,
+            rate_per_minute=6,
+            account_rate_per_minute=1
+        ),
+        on_release=lambda post_id, at: released.append((post_id, at)),
+        now=NOW
+    )
+
+    assert result == {'replayed': 3, 'containers_reused': 1, 'skipped': 0}
+    assert ('error_class', 'transient') in supabase.queries[0].filters('eq')
+
+    name, params = supabase.rpcs[0]
+    assert name == 'replay_dead_letters'
+    containers = {item['post_id']: item['container'] for item in params['p_items']}
+    # Solo el contenedor de 2 h sigue siendo válido; el de 30 h caducó
+    assert containers[1]['container_id'] == 'c-1'
+    assert containers[2] is None and containers[3] is None
+
+    # Un post cada 10 s; el segundo de user-1 espera un minuto
+    offsets = {post_id: (at - NOW).total_seconds() for post_id, at in released}
+    assert offsets == {1: 0, 3: 10, 2: 60}
+
+
+def test_replay_without_dead_letters_does_nothing(fake_supabase):
+    supabase = replay_supabase(fake_supabase, [])
+
+    result = replay_dead_letters(supabase, now=NOW)
+
+    assert result == {'replayed': 0, 'containers_reused': 0, 'skipped': 0}
+    assert supabase.rpcs == []
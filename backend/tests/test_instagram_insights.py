@@ -0,0 +1,69 @@
+"""
+Tests de la paginación de media con insights expandidos.
+
+Comprueba que se sigue el cursor 'after' entre páginas y que una página
+cuya expansión insights.metric(...) falla se vuelve a pedir sin
+expansión, sin perder las métricas inline de las demás páginas.
+"""
+
+from services.instagram_insights import InstagramInsightsService
+
+
+def insights(reach, views):
+    return {'data': [
+        {'name': 'reach', 'values': [{'value': reach}]},
+        {'name': 'views', 'values': [{'value': views}]}
+    ]}
+
+
+PAGE_1 = {
+    'data': [{'id': 'm1'}, {'id': 'm2'}],
+    'paging': {'cursors': {'after': 'cursor-2'}, 'next': 'https://graph/next'}
+}
+PAGE_2 = {
+    'data': [{'id': 'm3', 'insights': insights(10, 25)}],
+    'paging': {'cursors': {'after': 'cursor-3'}}
+}
+
+
+def test_pagination_follows_cursor_and_falls_back_per_page(monkeypatch):
+    service = InstagramInsightsService('token', '1784')
+    requests = []
+
+    def fake_request(endpoint, params):
+        requests.append((params.get('after'), 'insights.metric' in params['fields']))
+        if params.get('after') is None:
+            if 'insights.metric' in params['fields']:
+                raise Exception("(#100) metric not supported for this media")
+            return PAGE_1
+        return PAGE_2
+
+    monkeypatch.setattr(service, '_make_request', fake_request)
+
+    media = service._get_all_media_paginated(include_insights=True)
+
+    # Página 1: expansión fallida y reintento sin expansión; página 2
+    # con el cursor de la primera y expansión correcta
+    assert requests == [(None, True), (None, False), ('cursor-2', True)]
+    assert [m['id'] for m in media] == ['m1', 'm2', 'm3']
+    assert 'inline_insights' not in media[0]
+    assert 'inline_insights' not in media[1]
+    assert media[2]['inline_insights']['reach'] == 10
+    assert media[2]['inline_insights']['impressions'] == 25
+    assert 'insights' not in media[2]
+
+
+def test_pagination_without_insights_never_expands(monkeypatch):
+    service = InstagramInsightsService('token', '1784')
+    fields = []
+
+    def fake_request(endpoint, params):
+        fields.append(params['fields'])
+        return PAGE_2 if params.get('after') else PAGE_1
+
+    monkeypatch.setattr(service, '_make_request', fake_request)
+
+    media = service._get_all_media_paginated(include_insights=False)
+
+    assert len(media) == 3
+    assert all('insights.metric' not in f for f in fields)
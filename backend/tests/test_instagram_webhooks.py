@@ -0,0 +1,129 @@
+"""
+Tests de los webhooks de Instagram.
+
+Prueba de extremo a extremo el endpoint /api/webhooks/instagram con
+payloads firmados generados localmente (sin conexión con Meta):
+verificación de la suscripción, firma, parseo y refrescos dirigidos.
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.webhook_routes as webhook_routes
+from services.instagram_webhooks import (
+    InstagramWebhookProcessor,
+    build_signed_payload,
+    build_test_notification,
+    parse_notification,
+    verify_signature
+)
+
+APP_SECRET = 'test-app-secret'
+IG_ACCOUNT_ID = '17841400000000000'
+
+
+class FakeInsightsService:
+    calls = []
+
+    def __init__(self, access_token, instagram_account_id):
+        self.instagram_account_id = instagram_account_id
+
+    def refresh_media(self, db_client, media_id):
+        self.calls.append(('media', media_id))
+
+    def refresh_account_metrics(self, db_client, account_id):
+        self.calls.append(('account', account_id))
+
+
+def make_client(monkeypatch, fake_supabase):
+    processor = InstagramWebhookProcessor(
+        db_client=fake_supabase(tables={'instagram_accounts': [{
+            'id': 7,
+            'user_id': 'user-1',
+            'long_lived_access_token': 'token',
+            'instagram_business_account_id': IG_ACCOUNT_ID
+        }]}),
+        service_factory=FakeInsightsService
+    )
+    monkeypatch.setattr(webhook_routes, 'get_webhook_processor', lambda: processor)
+    monkeypatch.setenv('INSTAGRAM_APP_SECRET', APP_SECRET)
+    monkeypatch.setenv('INSTAGRAM_WEBHOOK_VERIFY_TOKEN', 'verify-me')
+
+    app = FastAPI()
+    app.include_router(webhook_routes.router)
+    return TestClient(app), processor
+
+
+def test_signature_roundtrip():
+    body, headers = build_signed_payload({'object': 'instagram'}, APP_SECRET)
+
+    assert verify_signature(body, headers['X-Hub-Signature-256'], APP_SECRET)
+    assert not verify_signature(body + b' ', headers['X-Hub-Signature-256'], APP_SECRET)
+    assert not verify_signature(body, None, APP_SECRET)
+
+
+def test_parse_notification_fields():
+    comments = parse_notification(
+        build_test_notification(IG_ACCOUNT_ID, 'comments', '111')
+    )
+    mentions = parse_notification(
+        build_test_notification(IG_ACCOUNT_ID, 'mentions', '222')
+    )
+
+    assert comments == [{
+        'instagram_business_account_id': IG_ACCOUNT_ID,
+        'field': 'comments',
+        'media_id': '111',
+        'refresh': 'media'
+    }]
+    assert mentions[0]['refresh'] == 'account'
+    assert parse_notification({'object': 'page', 'entry': []}) == []
+
+
+def test_subscription_challenge(monkeypatch, fake_supabase):
+    client, _ = make_client(monkeypatch, fake_supabase)
+
+    ok = client.get('/api/webhooks/instagram', params={
+        'hub.mode': 'subscribe',
+        'hub.verify_token': 'verify-me',
+        'hub.challenge': '12345'
+    })
+    bad = client.get('/api/webhooks/instagram', params={
+        'hub.mode': 'subscribe',
+        'hub.verify_token': 'wrong',
+        'hub.challenge': '12345'
+    })
+
+    assert ok.status_code == 200 and ok.text == '12345'
+    assert bad.status_code == 403
+
+
+def test_signed_notification_triggers_targeted_refresh(monkeypatch, fake_supabase):
+    client, processor = make_client(monkeypatch, fake_supabase)
+    FakeInsightsService.calls = []
+
+    notification = build_test_notification(IG_ACCOUNT_ID, 'comments', '111')
+    mention = build_test_notification(IG_ACCOUNT_ID, 'mentions', '222')
+    notification['entry'][0]['changes'].append(
+        mention['entry'][0]['changes'][0]
+    )
+    body, headers = build_signed_payload(notification, APP_SECRET)
+
+    response = client.post('/api/webhooks/instagram', content=body, headers=headers)
+    processor.join()
+
+    assert response.status_code == 200
+    assert response.json() == {'received': 2, 'enqueued': 2}
+    assert sorted(FakeInsightsService.calls) == [('account', 7), ('media', '111')]
+
+
+def test_invalid_signature_rejected(monkeypatch, fake_supabase):
+    client, _ = make_client(monkeypatch, fake_supabase)
+    body, headers = build_signed_payload(
+        build_test_notification(IG_ACCOUNT_ID, 'comments', '111'),
+        'another-secret'
+    )
+
+    response = client.post('/api/webhooks/instagram', content=body, headers=headers)
+
+    assert response.status_code == 403
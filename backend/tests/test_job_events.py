@@ -0,0 +1,90 @@
+"""
+Tests del bus de eventos de jobs programados.
+
+Comprueba que cada usuario solo recibe los eventos de sus posts, que los
+eventos publicados desde otros hilos llegan al event loop, que un
+suscriptor lento pierde los más antiguos y que sin suscriptores no se
+consulta la base de datos.
+"""
+
+import asyncio
+import threading
+
+from services.scheduler import job_events
+from services.scheduler.job_events import JobEventBus, emit_job_event
+
+
+def test_events_are_scoped_per_user():
+    async def scenario():
+        bus = JobEventBus()
+        mine = bus.subscribe('user-1')
+        other = bus.subscribe('user-2')
+
+        bus.publish({'user_id': 'user-1', 'post_id': 1, 'status': 'completed'})
+
+        assert (await mine.get(timeout=1))['post_id'] == 1
+        assert await other.get(timeout=0.05) is None
+
+    asyncio.run(scenario())
+
+
+def test_events_from_scheduler_threads_reach_the_loop():
+    async def scenario():
+        bus = JobEventBus()
+        subscription = bus.subscribe('user-1')
+
+        thread = threading.Thread(target=bus.publish, args=(
+            {'user_id': 'user-1', 'post_id': 7, 'status': 'running'},
+        ))
+        thread.start()
+        thread.join()
+
+        assert (await subscription.get(timeout=1))['status'] == 'running'
+
+        bus.unsubscribe(subscription)
+        assert not bus.has_subscribers()
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_drops_oldest_events(monkeypatch):
+    monkeypatch.setattr(job_events, 'SUBSCRIBER_QUEUE_SIZE', 2)
+
+    async def scenario():
+        bus = JobEventBus()
+        subscription = bus.subscribe('user-1')
+        for post_id in (1, 2, 3):
+            bus.publish({'user_id': 'user-1', 'post_id': post_id})
+        await asyncio.sleep(0)
+
+        received = [(await subscription.get(timeout=1))['post_id'] for _ in range(2)]
+        assert received == [2, 3]
+        assert subscription.dropped == 1
+
+    asyncio.run(scenario())
+
+
+def test_emit_skips_lookup_without_subscribers(monkeypatch, fake_supabase):
+    monkeypatch.setattr(job_events, 'job_event_bus', JobEventBus())
+    supabase = fake_supabase(tables={'posts': [{'user_id': 'user-1'}]})
+
+    emit_job_event(supabase, 42, 'completed')
+
+    assert supabase.queries == []
+
+
+def test_emit_looks_up_post_owner(monkeypatch, fake_supabase):
+    bus = JobEventBus()
+    monkeypatch.setattr(job_events, 'job_event_bus', bus)
+    supabase = fake_supabase(tables={'posts': [{'user_id': 'user-1'}]})
+
+    async def scenario():
+        subscription = bus.subscribe('user-1')
+        emit_job_event(supabase, 42, 'failed', error='boom')
+        event = await subscription.get(timeout=1)
+        assert (event['job_id'], event['status'], event['error']) == (
+            'post_42', 'failed', 'boom'
+        )
+
+    asyncio.run(scenario())
+    assert len(supabase.queries) == 1
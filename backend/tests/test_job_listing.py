@@ -0,0 +1,120 @@
+"""
+Tests del listado paginado de jobs programados y de su archivado.
+
+Comprueba que los filtros y el keyset se envían a la base de datos, que
+el cursor de la página siguiente solo aparece si hay más filas, que el
+archivado se repite por lotes hasta vaciar los jobs antiguos y que un
+job archivado conserva sus tiempos.
+"""
+
+import pytest
+
+from services.scheduler import post_scheduler
+
+
+def job(row_id, scheduled_time='2026-10-19T09:00:00+00:00'):
+    return {
+        'id': row_id,
+        'job_id': f"post_{row_id}",
+        'post_id': row_id,
+        'scheduled_time': scheduled_time,
+        'status': 'pending',
+        'posts': {'user_id': 'user-1'}
+    }
+
+
+def paged(rows):
+    """Filas de scheduled_jobs cortadas por el limit de la consulta."""
+    return lambda query: rows[:query.filters('limit')[0][0]]
+
+
+def scheduler_with(supabase):
+    sch = object.__new__(post_scheduler.PostScheduler)
+    sch.supabase = supabase
+    return sch
+
+
+def test_filters_are_applied_in_the_database(fake_supabase):
+    supabase = fake_supabase(tables={
+        'scheduled_jobs': paged([job(1), job(2), job(3)])
+    })
+
+    page = scheduler_with(supabase).get_scheduled_jobs(
+        user_id='user-1', status='pending', limit=2
+    )
+
+    query = supabase.queries[0]
+    assert ('select', ('*, posts!inner(user_id)',)) in query.calls
+    assert ('posts.user_id', 'user-1') in query.filters('eq')
+    assert ('status', 'pending') in query.filters('eq')
+    assert query.filters('limit') == [(3,)]
+    assert [j['id'] for j in page['jobs']] == [1, 2]
+    assert 'posts' not in page['jobs'][0]
+    assert 'timings' in page['jobs'][0]
+    assert post_scheduler.decode_job_cursor(page['next_cursor']) == (
+        '2026-10-19T09:00:00+00:00', 2
+    )
+
+
+def test_cursor_continues_after_last_row(fake_supabase):
+    supabase = fake_supabase(tables={'scheduled_jobs': paged([job(3)])})
+    cursor = post_scheduler.encode_job_cursor(job(2))
+
+    page = scheduler_with(supabase).get_scheduled_jobs(
+        user_id='user-1', limit=2, cursor=cursor
+    )
+
+    keyset, = supabase.queries[0].filters('or_')
+    assert keyset[0] == (
+        'scheduled_time.gt."2026-10-19T09:00:00+00:00",'
+        'and(scheduled_time.eq."2026-10-19T09:00:00+00:00",id.gt.2)'
+    )
+    assert page['next_cursor'] is None
+
+
+def test_malformed_cursor_is_rejected(fake_supabase):
+    with pytest.raises(ValueError):
+        scheduler_with(fake_supabase()).get_scheduled_jobs(cursor='not-a-cursor')
+
+
+def test_archive_repeats_until_batch_is_not_full(monkeypatch, fake_supabase):
+    monkeypatch.setattr(post_scheduler, 'ARCHIVE_BATCH_SIZE', 2)
+    batches = [2, 2, 1]
+    supabase = fake_supabase(rpcs={
+        'archive_scheduled_jobs': lambda params: batches.pop(0)
+    })
+
+    assert post_scheduler.archive_finished_jobs(supabase, retention_days=30) == 5
+    assert len(supabase.calls) == 3
+
+
+def test_archive_disabled_with_zero_retention(fake_supabase):
+    supabase = fake_supabase()
+
+    assert post_scheduler.archive_finished_jobs(supabase, retention_days=0) == 0
+    assert supabase.calls == []
+
+
+def test_archived_job_status_keeps_timings(fake_supabase):
+    archived = {
+        **job(7),
+        'status': 'completed',
+        'scheduled_time': '2026-10-19T09:00:00+00:00',
+        'claimed_at': '2026-10-19T09:00:02+00:00',
+        'started_at': '2026-10-19T09:00:03+00:00',
+        'container_ready_at': '2026-10-19T09:00:13+00:00',
+        'published_at': '2026-10-19T09:00:15+00:00',
+        'archived_at': '2026-11-19T03:00:00+00:00'
+    }
+
+    supabase = fake_supabase(tables={'scheduled_jobs_history': [archived]})
+    status = scheduler_with(supabase).get_job_status('post_7')
+
+    assert ('table', 'scheduled_jobs_history') in supabase.calls
+    assert status['timings'] == {
+        'lag_seconds': 3.0,
+        'claim_lag_seconds': 2.0,
+        'container_wait_seconds': 10.0,
+        'publish_duration_seconds': 12.0,
+        'end_to_end_seconds': 15.0
+    }
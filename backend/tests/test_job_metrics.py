@@ -0,0 +1,54 @@
+"""
+Tests de las métricas de lag y duración del scheduler.
+
+Comprueba los tiempos derivados de una fila de scheduled_jobs y los
+histogramas acumulados (JSON y formato Prometheus).
+"""
+
+from services.scheduler.job_metrics import SchedulerJobMetrics, job_timings
+
+JOB = {
+    'scheduled_time': '2026-10-19T12:00:00+00:00',
+    'claimed_at': '2026-10-19T12:00:02+00:00',
+    'started_at': '2026-10-19T12:00:03+00:00',
+    'container_ready_at': '2026-10-19T12:00:33+00:00',
+    'published_at': '2026-10-19T12:00:35Z',
+    'retry_count': 1
+}
+
+
+def test_job_timings():
+    timings = job_timings(JOB)
+
+    assert timings['claim_lag_seconds'] == 2
+    assert timings['lag_seconds'] == 3
+    assert timings['container_wait_seconds'] == 30
+    assert timings['publish_duration_seconds'] == 32
+    assert timings['end_to_end_seconds'] == 35
+
+
+def test_prestaged_and_pending_jobs_have_no_negative_spans():
+    prestaged = {**JOB, 'container_ready_at': '2026-10-19T11:55:00+00:00'}
+    assert job_timings(prestaged)['container_wait_seconds'] is None
+
+    pending = {'scheduled_time': JOB['scheduled_time']}
+    assert set(job_timings(pending).values()) == {None}
+
+
+def test_histograms_are_cumulative():
+    metrics = SchedulerJobMetrics()
+    metrics.record_completion(JOB)
+    metrics.record_completion({**JOB, 'started_at': '2026-10-19T12:02:00+00:00'})
+    metrics.record_failure(3)
+
+    snapshot = metrics.snapshot()
+    lag = snapshot['histograms']['lag_seconds']
+    assert lag['count'] == 2
+    assert lag['buckets']['5'] == 1
+    assert lag['buckets']['120'] == 2
+    assert snapshot['histograms']['retries']['buckets']['1'] == 2
+    assert (snapshot['published'], snapshot['failed']) == (2, 1)
+
+    text = metrics.to_prometheus()
+    assert 'sociallab_scheduler_lag_seconds_bucket{le="+Inf"} 2' in text
+    assert 'sociallab_scheduler_jobs_failed_total 1' in text
@@ -0,0 +1,92 @@
+"""
+Tests de la cola de jobs sobre scheduled_jobs (SCHEDULER_BACKEND=queue).
+
+Simula las RPCs claim_due_jobs / claim_prestage_jobs y comprueba que el
+worker ejecuta cada job reclamado una sola vez, respeta su concurrencia
+y encola la sincronización de métricas de forma idempotente.
+"""
+
+import threading
+from datetime import datetime, timezone
+
+from services.scheduler import post_scheduler
+from services.scheduler.job_queue import JobQueueWorker, sync_job_id, sync_slot
+
+
+def queue_db(fake_supabase, due):
+    """Cliente de Supabase con una cola de jobs vencidos en memoria."""
+    due = list(due)
+
+    def claim_due_jobs(params):
+        claimed = due[:params['p_limit']]
+        del due[:params['p_limit']]
+        return claimed
+
+    db = fake_supabase(rpcs={
+        'claim_due_jobs': claim_due_jobs,
+        'claim_prestage_jobs': []
+    })
+    db.due = due
+    return db
+
+
+def upserts(db):
+    return [query for query in db.queries if query.operation == 'upsert']
+
+
+def publish_job(post_id):
+    return {
+        'id': post_id,
+        'job_id': f'post_{post_id}',
+        'job_type': 'publish_post',
+        'post_id': post_id
+    }
+
+
+def test_sync_rows_are_one_per_slot(fake_supabase):
+    now = datetime(2026, 10, 19, 12, 29, 59, tzinfo=timezone.utc)
+
+    assert sync_slot(now) == datetime(2026, 10, 19, 12, 15, tzinfo=timezone.utc)
+    assert sync_job_id(sync_slot(now)) == 'sync_insights_20261019T1215'
+
+    db = queue_db(fake_supabase, [])
+    worker = JobQueueWorker(db_client=db, concurrency=1)
+    worker.ensure_sync_job(now)
+    worker.ensure_sync_job(now)
+    worker.stop()
+
+    assert {query.payload['job_id'] for query in upserts(db)} == {
+        'sync_insights_20261019T1215'
+    }
+    assert all(query.options['ignore_duplicates'] for query in upserts(db))
+
+
+def test_claimed_jobs_run_once_within_concurrency(monkeypatch, fake_supabase):
+    monkeypatch.setenv('PRESTAGE_LEAD_MINUTES', '0')
+    monkeypatch.setenv('SYNC_WORKER_MODE', 'external')
+
+    published = []
+    release = threading.Event()
+
+    def fake_publish(post_id):
+        published.append(post_id)
+        release.wait(5)
+
+    monkeypatch.setattr(post_scheduler, 'publish_post_job', fake_publish)
+
+    db = queue_db(fake_supabase, [publish_job(i) for i in range(5)])
+    worker = JobQueueWorker(db_client=db, concurrency=2, batch_size=10)
+
+    assert worker.run_once() == 2
+    # Sin hilos libres no se reclaman más jobs
+    assert worker.run_once() == 0
+
+    release.set()
+    worker.stop(wait=True)
+
+    assert sorted(published) == [0, 1]
+    claim_limits = [
+        params['p_limit'] for name, params in db.rpcs if name == 'claim_due_jobs'
+    ]
+    assert claim_limits == [2]
+    assert len(db.due) == 3
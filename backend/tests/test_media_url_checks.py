@@ -0,0 +1,129 @@
+"""
+Tests de la caché de verificaciones de URLs de media.
+
+Comprueba que una verificación correcta se reutiliza mientras no caduca
+(en memoria y desde la BD), que las fallidas no se reutilizan, que
+force=True vuelve a verificar y que al publicar no se hace el HEAD
+request si hay una verificación vigente.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import services.publisher.instagram_publisher as instagram_publisher
+from services.publisher.instagram_publisher import InstagramPublisher
+from services.publisher.media_url_checks import MediaUrlCheckCache
+from services.publisher.readiness import ReadinessSchedule
+
+URL = 'https://cdn.example.com/a.jpg'
+
+
+def url_checks_db(fake_supabase):
+    """Tabla media_url_checks en memoria: devuelve el cliente y sus filas."""
+    rows = {}
+
+    def media_url_checks(query):
+        if query.operation == 'upsert':
+            rows[query.payload['url']] = dict(query.payload)
+            return [query.payload]
+        (_, url), = query.filters('eq')
+        return [rows[url]] if url in rows else []
+
+    return fake_supabase(tables={'media_url_checks': media_url_checks}), rows
+
+
+class FakeHead:
+    """requests.head simulado que cuenta las peticiones."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, timeout=None, allow_redirects=None):
+        self.calls.append(url)
+        return type('Response', (), {
+            'status_code': 200,
+            'headers': {'Content-Type': 'image/jpeg', 'Content-Length': '2048'}
+        })()
+
+
+def age_entry(cache, rows, url, age):
+    checked_at = (datetime.now(timezone.utc) - age).isoformat()
+    cache._entries[url]['checked_at'] = checked_at
+    rows[url]['checked_at'] = checked_at
+
+
+def test_valid_check_is_reused_until_ttl_expires(fake_supabase):
+    db, rows = url_checks_db(fake_supabase)
+    cache = MediaUrlCheckCache(db_client=db, ttl=timedelta(minutes=30))
+
+    cache.store(URL, True, 200, 'image/jpeg', 2048)
+    assert cache.get(URL)['size_bytes'] == 2048
+
+    # Otro proceso (caché vacía) la encuentra en la BD
+    assert MediaUrlCheckCache(db_client=db, ttl=timedelta(minutes=30)).get(URL)
+
+    age_entry(cache, rows, URL, timedelta(minutes=31))
+    assert cache.get(URL) is None
+
+
+def test_failed_check_is_not_reused(fake_supabase):
+    db, rows = url_checks_db(fake_supabase)
+    cache = MediaUrlCheckCache(db_client=db, ttl=timedelta(minutes=30))
+
+    cache.store(URL, True, 200, 'image/jpeg', 2048)
+    cache.store(URL, False, 404, error='URL no accesible')
+
+    assert cache.get(URL) is None
+    assert rows[URL]['is_valid'] is False
+
+
+def make_publisher(monkeypatch, db):
+    head = FakeHead()
+    monkeypatch.setattr(instagram_publisher.requests, 'head', head)
+    publisher = InstagramPublisher()
+    publisher.media_url_checks = MediaUrlCheckCache(
+        db_client=db, ttl=timedelta(minutes=30)
+    )
+    return publisher, head
+
+
+def test_force_and_expired_checks_send_head_request(monkeypatch, fake_supabase):
+    db, rows = url_checks_db(fake_supabase)
+    publisher, head = make_publisher(monkeypatch, db)
+
+    assert publisher._check_media_url(URL) == 2048
+    assert publisher._check_media_url(URL) == 2048
+    assert len(head.calls) == 1
+
+    publisher.verify_media_url_accessibility(URL, force=True)
+    assert len(head.calls) == 2
+
+    age_entry(publisher.media_url_checks, rows, URL, timedelta(hours=1))
+    publisher._check_media_url(URL)
+    assert len(head.calls) == 3
+
+
+def test_publish_skips_head_request_on_fresh_check(monkeypatch, fake_supabase):
+    db, rows = url_checks_db(fake_supabase)
+    publisher, head = make_publisher(monkeypatch, db)
+    # Verificada al guardar el post
+    publisher.media_url_checks.store(URL, True, 200, 'image/jpeg', 4096)
+    monkeypatch.setattr(
+        publisher,
+        '_create_media_container',
+        lambda *args, **kwargs: 'c-1'
+    )
+    monkeypatch.setattr(
+        publisher.timing_stats,
+        'schedule_for',
+        lambda media_type, size_bytes=None: ReadinessSchedule()
+    )
+
+    publication = publisher.create_publication(
+        media_url=URL,
+        caption='Hola',
+        instagram_account_id=7,
+        account={'access_token': 'token', 'instagram_user_id': 'ig-7'}
+    )
+
+    assert head.calls == []
+    assert publication['size_bytes'] == 4096
@@ -0,0 +1,143 @@
+"""
+Tests del control de cuota de publicación de Instagram.
+
+Comprueba que la cuota se lee una vez por cuenta, se descuenta con cada
+publicación, que una cuenta agotada se reintenta cuando corresponde y
+que el error de límite de la Graph API (HTTP 400, código 9) agota la
+cuota y aplaza el post sin gastar reintentos.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import services.publisher.instagram_publisher as instagram_publisher
+from services.publisher.instagram_publisher import (
+    InstagramPublisher,
+    InstagramPublishError
+)
+from services.publisher.publishing_quota import (
+    PublishingQuotaTracker,
+    QUOTA_WINDOW,
+    is_publishing_limit_error
+)
+from services.scheduler import post_scheduler
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+class FakePublisher:
+    """Publisher que devuelve un límite fijo y cuenta las lecturas."""
+
+    def __init__(self, quota_usage=0, quota_total=50):
+        self.limit = {'quota_usage': quota_usage, 'quota_total': quota_total}
+        self.reads = 0
+
+    def _get_instagram_account(self, account_id):
+        return {'instagram_user_id': f'ig-{account_id}', 'access_token': 'token'}
+
+    def get_publishing_limit(self, ig_user_id, token):
+        self.reads += 1
+        return dict(self.limit)
+
+
+def test_quota_is_read_once_and_counted_locally():
+    publisher = FakePublisher(quota_usage=48)
+    quota = PublishingQuotaTracker(
+        publisher=publisher, refresh_interval=timedelta(minutes=30)
+    )
+
+    assert quota.remaining(7, NOW) == 2
+    quota.record_publish(7, NOW)
+    quota.record_publish(7, NOW)
+
+    assert quota.can_publish(7, NOW) is False
+    assert publisher.reads == 1
+
+
+def test_quota_is_refreshed_after_interval():
+    publisher = FakePublisher(quota_usage=50)
+    quota = PublishingQuotaTracker(
+        publisher=publisher, refresh_interval=timedelta(minutes=30)
+    )
+    assert quota.can_publish(7, NOW) is False
+
+    publisher.limit['quota_usage'] = 10
+    assert quota.remaining(7, NOW + timedelta(minutes=31)) == 40
+    assert publisher.reads == 2
+
+
+def test_unknown_quota_allows_publishing():
+    class BrokenPublisher(FakePublisher):
+        def get_publishing_limit(self, ig_user_id, token):
+            raise RuntimeError("Graph API unavailable")
+
+    quota = PublishingQuotaTracker(publisher=BrokenPublisher())
+
+    assert quota.remaining(7, NOW) is None
+    assert quota.can_publish(7, NOW) is True
+
+
+def test_exhausted_account_retries_at_next_refresh_or_window():
+    quota = PublishingQuotaTracker(
+        publisher=FakePublisher(), refresh_interval=timedelta(minutes=30)
+    )
+    quota.mark_exhausted(7, NOW)
+
+    assert quota.can_publish(7, NOW) is False
+    assert quota.retry_after(7, NOW) == NOW + timedelta(minutes=30)
+
+    quota = PublishingQuotaTracker(
+        publisher=FakePublisher(), refresh_interval=timedelta(hours=48)
+    )
+    quota.seed(7, 49, 50, NOW)
+    quota.record_publish(7, NOW)
+    assert quota.retry_after(7, NOW) == NOW + QUOTA_WINDOW
+
+
+def test_publishing_limit_error_is_recognised():
+    assert is_publishing_limit_error(InstagramPublishError("x", error_code=9))
+    assert not is_publishing_limit_error(InstagramPublishError("x", error_code=100))
+    assert not is_publishing_limit_error(Exception("Publish failed: [9] limit"))
+
+
+def test_publishing_limit_response_exhausts_quota_and_defers(
+    monkeypatch, graph_error_response
+):
+    response = graph_error_response(
+        9, 'Application request limit reached', error_type='OAuthException'
+    )
+    monkeypatch.setattr(
+        instagram_publisher.requests, 'post', lambda *args, **kwargs: response
+    )
+    quota = PublishingQuotaTracker(
+        publisher=FakePublisher(quota_usage=10), refresh_interval=timedelta(hours=1)
+    )
+    monkeypatch.setattr(instagram_publisher, 'get_publishing_quota', lambda: quota)
+    publication = {
+        'ig_user_id': 'ig-7',
+        'access_token': 'token',
+        'media_type': 'IMAGE',
+        'container_id': 'c-1',
+        'instagram_account_id': 7
+    }
+
+    try:
+        InstagramPublisher().complete_publication(publication)
+    except InstagramPublishError as e:
+        error = e
+    else:
+        raise AssertionError("media_publish no falló")
+
+    assert error.error_code == 9
+    assert quota.can_publish(7) is False
+
+    # El job se aplaza hasta que haya cuota, sin fail_scheduled_job
+    deferred = []
+    monkeypatch.setattr(post_scheduler, 'get_supabase_admin_client', lambda: None)
+    monkeypatch.setattr(
+        post_scheduler,
+        '_defer_for_quota',
+        lambda supabase, post_id, retry_at: deferred.append(post_id)
+    )
+    post_scheduler._handle_publish_failure(42, error, account_id=7)
+
+    assert deferred == [42]
@@ -0,0 +1,69 @@
+"""
+Tests de los calendarios de comprobación de contenedores.
+
+Comprueba el backoff, el deadline y el ajuste a partir de tiempos de
+procesamiento registrados (sin base de datos).
+"""
+
+from services.publisher.readiness import (
+    ContainerTimingStats,
+    DEFAULT_SCHEDULES,
+    ReadinessSchedule,
+    size_bucket
+)
+
+
+def make_stats(db):
+    # Muestras ya cargadas: las inserciones solo se registran en db
+    stats = ContainerTimingStats(db_client=db)
+    stats._loaded = True
+    return stats
+
+
+def test_fast_checks_then_backoff_capped():
+    schedule = ReadinessSchedule(
+        first_delay=2, fast_interval=2, fast_checks=3,
+        backoff=2, max_interval=10, deadline=60
+    )
+
+    delays = [schedule.delay_before(n) for n in range(7)]
+
+    assert delays == [2, 2, 2, 2, 4, 8, 10]
+
+
+def test_last_check_lands_on_deadline():
+    schedule = ReadinessSchedule(max_interval=10, deadline=60)
+
+    assert schedule.next_delay(checks_done=10, elapsed=55) == 5
+    assert schedule.next_delay(checks_done=10, elapsed=60) is None
+
+
+def test_size_buckets():
+    assert size_bucket(None) == 'unknown'
+    assert size_bucket(500 * 1024) == 'small'
+    assert size_bucket(30 * 1024 * 1024) == 'large'
+    assert size_bucket(200 * 1024 * 1024) == 'xlarge'
+
+
+def test_defaults_until_enough_samples(fake_supabase):
+    stats = make_stats(fake_supabase())
+    stats.add_sample('REELS', 'large', 40)
+
+    schedule = stats.schedule_for('REELS', 30 * 1024 * 1024)
+
+    assert schedule.to_dict() == DEFAULT_SCHEDULES['REELS'].to_dict()
+
+
+def test_schedule_tuned_from_recorded_times(fake_supabase):
+    stats = make_stats(fake_supabase())
+    for seconds in [30, 35, 40, 45, 200]:
+        stats.add_sample('REELS', 'large', seconds)
+
+    schedule = stats.schedule_for('REELS', 30 * 1024 * 1024)
+
+    # Primera comprobación justo antes de la mediana (40s)
+    assert schedule.first_delay == 32
+    # Deadline = 2 x p95, por encima del deadline por defecto
+    assert schedule.deadline == 400
+    # Otros tamaños siguen con los valores por defecto
+    assert stats.schedule_for('REELS', 1024).first_delay == 5
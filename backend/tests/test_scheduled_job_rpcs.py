@@ -0,0 +1,348 @@
+"""
+Tests de publish_post_job con las RPCs de jobs programados.
+
+Comprueba que el job se reclama y carga en una sola llamada, que un job
+no reclamable no se publica, que un contenedor ya creado solo se publica
+si el post no se editó después (y que si media_publish falla no se crea
+otro en la misma ejecución), que completar o fallar la publicación es
+una única RPC, que los jobs que quedaron en ejecución al caer un worker
+se recuperan sin crear un segundo contenedor y que la restauración al
+arrancar no consulta post a post.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.account_context import AccountContextCache
+from services.publisher.instagram_publisher import InstagramPublishError
+from services.scheduler import post_scheduler
+
+ACCOUNT = {
+    'id': 7,
+    'user_id': 'user-1',
+    'long_lived_access_token': 'token-1',
+    'instagram_business_account_id': '1784',
+    'is_active': True,
+    'expires_at': None
+}
+POST = {
+    'id': 42,
+    'user_id': 'user-1',
+    'media_url': 'https://cdn.example.com/a.jpg',
+    'content': 'Hola',
+    'post_type': 'FEED'
+}
+
+
+class FakePublisher:
+    def __init__(self):
+        self.created = []
+        self.published = []
+
+    def create_publication(self, **kwargs):
+        self.created.append(kwargs)
+        return {
+            'container_id': 'c-1',
+            'ig_user_id': '1784',
+            'media_type': 'IMAGE',
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            **kwargs
+        }
+
+    staged_container = staticmethod(post_scheduler.InstagramPublisher.staged_container)
+
+    def resume_publication(self, staged):
+        return {**staged, 'state': 'READY'}
+
+    def complete_publication(self, publication):
+        self.published.append(publication['container_id'])
+        return {'id': f"media-{publication['container_id']}"}
+
+
+class FakeMonitor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, publication, on_complete):
+        self.submitted.append(publication)
+
+
+class FakeQuota:
+    def can_publish(self, account_id):
+        return True
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.jobs = []
+
+    def add_job(self, **kwargs):
+        self.jobs.append(kwargs)
+
+
+def patch_scheduler(monkeypatch, supabase):
+    publisher = FakePublisher()
+    monitor = FakeMonitor()
+    accounts = AccountContextCache(db_client=object(), ttl_seconds=60)
+
+    monkeypatch.setattr(post_scheduler, 'get_supabase_admin_client', lambda: supabase)
+    monkeypatch.setattr(post_scheduler, 'InstagramPublisher', lambda: publisher)
+    monkeypatch.setattr(post_scheduler, 'get_container_monitor', lambda: monitor)
+    monkeypatch.setattr(post_scheduler, 'get_publishing_quota', lambda: FakeQuota())
+    monkeypatch.setattr(post_scheduler, 'get_account_context', lambda: accounts)
+    return publisher, monitor, accounts
+
+
+def test_claim_loads_post_and_account_in_one_call(monkeypatch, fake_supabase):
+    supabase = fake_supabase(rpcs=claim_with_staged(None))
+    publisher, monitor, accounts = patch_scheduler(monkeypatch, supabase)
+
+    post_scheduler.publish_post_job(42)
+
+    # Una RPC para reclamar y cargar, y el contenedor nuevo queda en el job
+    assert supabase.calls == [
+        ('rpc', 'claim_scheduled_job'),
+        ('table', 'scheduled_jobs')
+    ]
+    assert supabase.rpc_params('claim_scheduled_job')['p_lease_seconds'] > 900
+    assert supabase.updates[0][1]['prestaged_container']['container_id'] == 'c-1'
+    assert supabase.updates[0][1]['prestaged_container']['running_job'] is True
+    assert publisher.created[0]['instagram_account_id'] == 7
+    assert monitor.submitted[0]['container_id'] == 'c-1'
+    # La cuenta reclamada queda en la caché para el publisher
+    assert accounts.get_by_id(7)['long_lived_access_token'] == 'token-1'
+
+
+def claim_with_staged(staged):
+    return {'claim_scheduled_job': {
+        'job': {'post_id': 42, 'status': 'running', 'prestaged_container': staged},
+        'post': POST,
+        'account': ACCOUNT
+    }}
+
+
+def staged_container(post):
+    return {
+        'container_id': 'staged-1',
+        'instagram_account_id': 7,
+        'content_hash': post_scheduler._post_content_hash(post),
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+
+
+def test_staged_container_of_unchanged_post_is_published(monkeypatch, fake_supabase):
+    supabase = fake_supabase(rpcs=claim_with_staged(staged_container(POST)))
+    publisher, monitor, _ = patch_scheduler(monkeypatch, supabase)
+
+    post_scheduler.publish_post_job(42)
+
+    assert publisher.published == ['staged-1']
+    assert publisher.created == []
+    assert supabase.updates == []
+
+
+def test_staged_container_of_edited_post_is_recreated(monkeypatch, fake_supabase):
+    # Contenedor pre-staged (o devuelto por un reintento o un replay)
+    # antes de cambiar el caption
+    edited_before = {**POST, 'content': 'Caption anterior'}
+    supabase = fake_supabase(rpcs=claim_with_staged(staged_container(edited_before)))
+    publisher, monitor, _ = patch_scheduler(monkeypatch, supabase)
+
+    post_scheduler.publish_post_job(42)
+
+    assert publisher.published == []
+    assert publisher.created[0]['caption'] == 'Hola'
+    assert supabase.updates[0][1] == {
+        'prestaged_container': None, 'container_ready_at': None
+    }
+    # El nuevo contenedor lleva el hash del post actual
+    current_hash = staged_container(POST)['content_hash']
+    assert monitor.submitted[0]['content_hash'] == current_hash
+
+
+def record_failures(monkeypatch):
+    failures = []
+    monkeypatch.setattr(
+        post_scheduler,
+        '_handle_publish_failure',
+        lambda post_id, error, account_id=None: failures.append(error)
+    )
+    return failures
+
+
+def test_failed_media_publish_of_staged_container_is_not_recreated(
+    monkeypatch, fake_supabase
+):
+    supabase = fake_supabase(rpcs=claim_with_staged(staged_container(POST)))
+    publisher, monitor, _ = patch_scheduler(monkeypatch, supabase)
+    failures = record_failures(monkeypatch)
+
+    def timeout(publication):
+        # Puede que Instagram ya la aceptara: otro contenedor la duplicaría
+        raise InstagramPublishError("Failed to publish container: timed out")
+
+    publisher.complete_publication = timeout
+
+    with pytest.raises(InstagramPublishError):
+        post_scheduler.publish_post_job(42)
+
+    assert publisher.created == []
+    assert monitor.submitted == []
+    assert supabase.updates == []
+    # El reintento (o el dead letter) conserva el contenedor
+    assert failures[0].container_id == 'staged-1'
+    assert failures[0].staged_container['container_id'] == 'staged-1'
+
+
+def test_published_container_of_recovered_job_fails_the_job(monkeypatch, fake_supabase):
+    # El worker cayó tras media_publish y antes de complete_scheduled_job
+    running = {**staged_container(POST), 'running_job': True}
+    supabase = fake_supabase(rpcs=claim_with_staged(running))
+    publisher, monitor, _ = patch_scheduler(monkeypatch, supabase)
+    failures = record_failures(monkeypatch)
+
+    def already_published(publication):
+        raise InstagramPublishError(
+            "Failed to publish container: [9007] OAuthException: "
+            "The media has already been published",
+            error_code=9007
+        )
+
+    publisher.complete_publication = already_published
+
+    with pytest.raises(InstagramPublishError):
+        post_scheduler.publish_post_job(42)
+
+    # Falla el job (reintento o dead letter), sin publicar otro contenedor
+    assert publisher.created == []
+    assert monitor.submitted == []
+    assert failures[0].error_code == 9007
+    assert failures[0].staged_container['running_job'] is True
+
+
+def test_unresumable_container_of_recovered_job_fails_the_job(
+    monkeypatch, fake_supabase
+):
+    running = {
+        **staged_container({**POST, 'content': 'Caption anterior'}),
+        'running_job': True
+    }
+    supabase = fake_supabase(rpcs=claim_with_staged(running))
+    publisher, monitor, _ = patch_scheduler(monkeypatch, supabase)
+    failures = record_failures(monkeypatch)
+
+    with pytest.raises(InstagramPublishError, match='could not be resumed'):
+        post_scheduler.publish_post_job(42)
+
+    assert publisher.created == []
+    assert publisher.published == []
+    assert supabase.updates == []
+    assert failures[0].container_id == 'staged-1'
+
+
+def test_unclaimable_job_is_skipped(monkeypatch, fake_supabase):
+    supabase = fake_supabase(rpcs={'claim_scheduled_job': None})
+    publisher, monitor, _ = patch_scheduler(monkeypatch, supabase)
+
+    post_scheduler.publish_post_job(42)
+
+    assert publisher.created == []
+    assert monitor.submitted == []
+
+
+def test_completion_is_a_single_rpc(monkeypatch, fake_supabase):
+    supabase = fake_supabase()
+    patch_scheduler(monkeypatch, supabase)
+
+    post_scheduler._on_publication_complete(42, {'id': 'ig-1'}, None)
+
+    assert supabase.calls == [('rpc', 'complete_scheduled_job')]
+
+
+def test_failure_schedules_retry_from_rpc_result(monkeypatch, fake_supabase):
+    retry_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    supabase = fake_supabase(rpcs={'fail_scheduled_job': {
+        'status': 'retrying',
+        'retry_count': 1,
+        'max_retries': 3,
+        'scheduled_time': retry_at.isoformat()
+    }})
+    patch_scheduler(monkeypatch, supabase)
+    scheduler = FakeScheduler()
+    monkeypatch.setattr(
+        post_scheduler,
+        'PostScheduler',
+        lambda: type('Instance', (), {'scheduler': scheduler})()
+    )
+
+    post_scheduler._handle_publish_failure(42, Exception("[2] Service unavailable"))
+
+    assert supabase.calls == [('rpc', 'fail_scheduled_job')]
+    assert scheduler.jobs[0]['id'] == 'post_42'
+    assert scheduler.jobs[0]['trigger'].run_date == retry_at
+
+
+def test_expired_running_jobs_are_retried_or_dead_lettered(monkeypatch, fake_supabase):
+    retry_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    supabase = fake_supabase(rpcs={'requeue_expired_scheduled_jobs': [
+        {
+            'post_id': 42,
+            'status': 'retrying',
+            'retry_count': 1,
+            'max_retries': 3,
+            'scheduled_time': retry_at.isoformat()
+        },
+        {
+            'post_id': 43,
+            'status': 'failed',
+            'retry_count': 3,
+            'max_retries': 3,
+            'scheduled_time': retry_at.isoformat()
+        }
+    ]})
+    scheduler = FakeScheduler()
+    monkeypatch.setattr(post_scheduler, 'use_job_queue', lambda: False)
+    monkeypatch.setattr(
+        post_scheduler,
+        'PostScheduler',
+        lambda: type('Instance', (), {'scheduler': scheduler})()
+    )
+
+    assert post_scheduler.requeue_expired_jobs(supabase) == 2
+
+    assert supabase.calls == [('rpc', 'requeue_expired_scheduled_jobs')]
+    # Solo el job con reintentos vuelve a APScheduler
+    assert [job['id'] for job in scheduler.jobs] == ['post_42']
+    assert scheduler.jobs[0]['trigger'].run_date == retry_at
+
+
+def test_restore_registers_only_missing_jobs(monkeypatch, fake_supabase):
+    monkeypatch.setenv('PRESTAGE_LEAD_MINUTES', '0')
+    future = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    supabase = fake_supabase(
+        tables={'scheduled_jobs': [
+            {'job_id': 'post_1', 'post_id': 1, 'scheduled_time': future},
+            {'job_id': 'post_2', 'post_id': 2, 'scheduled_time': future}
+        ]},
+        rpcs={'restore_orphaned_scheduled_posts': [
+            {'job_id': 'post_3', 'post_id': 3, 'scheduled_time': future}
+        ]}
+    )
+
+    class JobStoreScheduler(FakeScheduler):
+        def get_jobs(self):
+            return [type('Job', (), {'id': 'post_1'})()]
+
+    sch = object.__new__(post_scheduler.PostScheduler)
+    sch.supabase = supabase
+    sch.scheduler = JobStoreScheduler()
+
+    sch._restore_pending_jobs()
+
+    # Una consulta y una RPC, sin consultas por post
+    assert supabase.calls == [
+        ('table', 'scheduled_jobs'),
+        ('rpc', 'restore_orphaned_scheduled_posts')
+    ]
+    assert [job['id'] for job in sch.scheduler.jobs] == ['post_2', 'post_3']
@@ -0,0 +1,68 @@
+"""
+Tests de los pools de ejecución del scheduler.
+
+Comprueba que un job de sincronización largo no ocupa los hilos de
+publicación y que cada pool registra saturación y tiempo de espera.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.date import DateTrigger
+
+from services.scheduler.executors import (
+    PUBLISH_EXECUTOR,
+    SYNC_EXECUTOR,
+    MeteredThreadPoolExecutor,
+    PoolMetrics
+)
+
+
+def test_sync_job_does_not_block_publish_pool():
+    executors = {
+        PUBLISH_EXECUTOR: MeteredThreadPoolExecutor('publish', 1),
+        SYNC_EXECUTOR: MeteredThreadPoolExecutor('sync', 1)
+    }
+    scheduler = BackgroundScheduler(executors=executors, timezone='UTC')
+    scheduler.start()
+
+    release_sync = threading.Event()
+    published = threading.Event()
+    now = datetime.now(timezone.utc)
+
+    try:
+        scheduler.add_job(
+            release_sync.wait, args=[5], executor=SYNC_EXECUTOR,
+            trigger=DateTrigger(run_date=now)
+        )
+        scheduler.add_job(
+            published.set, executor=PUBLISH_EXECUTOR,
+            trigger=DateTrigger(run_date=now + timedelta(milliseconds=100))
+        )
+
+        # La publicación corre aunque la sincronización siga en curso
+        assert published.wait(3)
+        sync_metrics = executors[SYNC_EXECUTOR].metrics.snapshot()
+        assert sync_metrics['running'] == 1
+        assert sync_metrics['saturation'] == 1.0
+    finally:
+        release_sync.set()
+        scheduler.shutdown(wait=True)
+
+    assert executors[PUBLISH_EXECUTOR].metrics.snapshot()['completed'] == 1
+
+
+def test_wait_times_are_recorded():
+    metrics = PoolMetrics('publish', 4)
+    now = datetime.now(timezone.utc)
+
+    metrics.job_queued()
+    metrics.job_started(now - timedelta(seconds=2))
+    metrics.job_queued()
+
+    snapshot = metrics.snapshot()
+    assert snapshot['running'] == 1
+    assert snapshot['queued'] == 1
+    assert snapshot['saturation'] == 0.25
+    assert snapshot['max_wait_seconds'] >= 2
@@ -0,0 +1,74 @@
+"""
+Tests del SyncPriorityPlanner.
+
+Verifica la clasificación por tiers, que solo se sincronicen cuentas
+vencidas y que se respete el presupuesto horario de Graph API.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from services.scheduler.sync_planner import SyncPriorityPlanner
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def make_account(account_id, **signals):
+    """Crea una cuenta con señales de actividad."""
+    return {'id': account_id, 'user_id': f'user-{account_id}', **signals}
+
+
+def test_classify_tiers():
+    planner = SyncPriorityPlanner(hourly_budget=100)
+
+    hot = make_account(1, last_post_at=NOW - timedelta(hours=2))
+    active = make_account(2, pending_scheduled=1)
+    idle = make_account(3, last_dashboard_access_at=NOW - timedelta(days=3))
+    dormant = make_account(4, last_post_at=NOW - timedelta(days=200))
+
+    assert planner.classify(hot, NOW) == 'hot'
+    assert planner.classify(active, NOW) == 'active'
+    assert planner.classify(idle, NOW) == 'idle'
+    assert planner.classify(dormant, NOW) == 'dormant'
+
+
+def test_dormant_account_not_due_within_a_day():
+    planner = SyncPriorityPlanner(hourly_budget=100)
+
+    dormant = make_account(1, last_sync_at=(NOW - timedelta(hours=5)).isoformat())
+
+    assert planner.plan([dormant], NOW) == []
+
+
+def test_hot_accounts_first_within_budget():
+    planner = SyncPriorityPlanner(hourly_budget=6, calls_per_sync=3)
+
+    stale = (NOW - timedelta(days=2)).isoformat()
+    accounts = [
+        make_account(1, last_sync_at=stale),
+        make_account(2, last_sync_at=stale, last_post_at=NOW - timedelta(hours=1)),
+        make_account(3, last_sync_at=stale, pending_scheduled=2),
+    ]
+
+    selected = planner.plan(accounts, NOW)
+
+    assert [a['id'] for a in selected] == [2, 3]
+    assert selected[0]['sync_tier'] == 'hot'
+
+
+def test_budget_is_shared_across_runs():
+    planner = SyncPriorityPlanner(hourly_budget=3, calls_per_sync=3)
+    account = make_account(1, last_post_at=NOW - timedelta(hours=1))
+
+    assert len(planner.plan([account], NOW)) == 1
+    planner.record_sync(1, now=NOW)
+
+    assert planner.plan([account], NOW + timedelta(minutes=15)) == []
+    assert len(planner.plan([account], NOW + timedelta(minutes=61))) == 1
+
+
+def test_default_budget_matches_hourly_full_sweep():
+    planner = SyncPriorityPlanner(calls_per_sync=3)
+    accounts = [make_account(i) for i in range(5)]
+
+    assert len(planner.plan(accounts, NOW)) == 5
@@ -0,0 +1,149 @@
+"""
+Tests del worker independiente de sincronización.
+
+Comprueba el parseo de --shard, que el shard de cada cuenta es estable,
+que cada worker solo sincroniza su shard con su parte del presupuesto,
+y que los leases se reclaman, se limitan al presupuesto compartido y se
+liberan también cuando la sincronización falla.
+"""
+
+import pytest
+
+import services.analytics
+import services.instagram_insights
+from services.sync_worker import SyncWorker, account_shard, parse_shard
+
+
+def test_parse_shard():
+    assert parse_shard('2/8') == (2, 8)
+    assert parse_shard('1/1') == (1, 1)
+    assert parse_shard('8/8') == (8, 8)
+
+    for value in ('abc', '2', '2/8/1', 'a/8', '0/8', '9/8', '1/0', '-1/4'):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+def test_account_shard_is_stable_and_in_range():
+    shards = [account_shard(account_id, 4) for account_id in range(1, 201)]
+
+    # Mismo resultado en cada llamada (crc32, no hash() del proceso)
+    assert shards == [account_shard(account_id, 4) for account_id in range(1, 201)]
+    assert account_shard(42, 4) == 1
+    assert set(shards) == {1, 2, 3, 4}
+    assert all(account_shard(account_id, 1) == 1 for account_id in range(1, 50))
+
+
+class FakePlanner:
+    """Devuelve las cuentas que pasan el filtro del worker."""
+
+    def __init__(self, accounts):
+        self.accounts = accounts
+        self.hourly_budget = None
+        self.calls_per_sync = 3
+        self.spent = []
+        self.recorded = []
+
+    def select_accounts(self, db, account_filter=None, spent=None):
+        self.spent.append(spent)
+        return [a for a in self.accounts if not account_filter or account_filter(a)]
+
+    def record_sync(self, account_id):
+        self.recorded.append(account_id)
+
+
+def lease_db(fake_supabase, claimable=(), granted=None, spent=0):
+    """Cliente que responde a las RPCs de leases y presupuesto."""
+    return fake_supabase(rpcs={
+        'claim_sync_accounts': lambda params: [
+            {'id': i} for i in params['p_account_ids'] if i in claimable
+        ],
+        'reserve_sync_budget': lambda params: (
+            params['p_requested'] if granted is None else granted
+        ),
+        'sync_budget_spent': spent
+    })
+
+
+def released(db):
+    return [
+        params['p_account_id'] for name, params in db.rpcs
+        if name == 'release_sync_account'
+    ]
+
+
+def accounts(*ids):
+    return [
+        {
+            'id': i,
+            'user_id': f"user-{i}",
+            'long_lived_access_token': 'token',
+            'instagram_business_account_id': f"1784{i}"
+        }
+        for i in ids
+    ]
+
+
+def test_shard_worker_only_selects_its_accounts(fake_supabase):
+    planner = FakePlanner(accounts(*range(1, 41)))
+    worker = SyncWorker(
+        shard=(3, 4), db_client=lease_db(fake_supabase), planner=planner
+    )
+
+    selected = worker.select_accounts()
+
+    assert selected
+    assert all(account_shard(a['id'], 4) == 3 for a in selected)
+    assert planner.spent == [None]  # presupuesto en memoria del shard
+
+
+def test_shard_worker_gets_its_share_of_an_explicit_budget(
+    monkeypatch, fake_supabase
+):
+    monkeypatch.setenv('SYNC_API_BUDGET_PER_HOUR', '100')
+
+    sharded = SyncWorker(shard=(1, 4), db_client=lease_db(fake_supabase))
+    leased = SyncWorker(use_lease=True, db_client=lease_db(fake_supabase))
+
+    assert sharded.planner.budget_for([]) == 25
+    assert leased.planner.budget_for([]) == 100
+
+
+def test_lease_worker_syncs_only_claimed_accounts_within_budget(fake_supabase):
+    db = lease_db(fake_supabase, claimable={1, 2, 3}, granted=2, spent=30)
+    planner = FakePlanner(accounts(1, 2, 3, 4))
+    worker = SyncWorker(use_lease=True, db_client=db, planner=planner)
+
+    selected = worker.select_accounts()
+
+    # Cuenta 4 ya reclamada por otro worker; solo hay presupuesto para 2
+    assert [a['id'] for a in selected] == [1, 2]
+    assert planner.spent == [30]
+    assert released(db) == [3]
+    reserve = db.rpc_params('reserve_sync_budget')
+    assert reserve['p_requested'] == 3
+    assert reserve['p_calls_per_sync'] == 3
+
+
+def test_lease_is_released_when_sync_fails(monkeypatch, fake_supabase):
+    db = lease_db(fake_supabase, claimable={1, 2})
+    planner = FakePlanner(accounts(1, 2))
+    worker = SyncWorker(use_lease=True, db_client=db, planner=planner)
+
+    def fake_sync(instagram_service, db_client, user_id, instagram_account_id_db):
+        if instagram_account_id_db == 2:
+            raise RuntimeError("Graph API down")
+
+    monkeypatch.setattr(services.analytics, 'full_sync_account', fake_sync)
+    monkeypatch.setattr(
+        services.instagram_insights,
+        'InstagramInsightsService',
+        lambda **kwargs: object()
+    )
+
+    summary = worker.run_once()
+
+    assert summary == {'selected': 2, 'synced': 1, 'failed': 1}
+    assert sorted(released(db)) == [1, 2]
+    # En modo lease el presupuesto se carga en la BD, no en memoria
+    assert planner.recorded == []